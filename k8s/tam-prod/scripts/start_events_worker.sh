@@ -0,0 +1,8 @@
+#!/bin/bash
+
+set -o errexit
+set -o pipefail
+set -o nounset
+
+# Worker riêng cho queue outbox (events.tasks.drain_outbox / purge_outbox), beat chạy ở worker báo cáo
+/usr/local/bin/celery -A core worker -Q events --concurrency ${EVENTS_WORKER_CONCURRENCY:-1} --max-tasks-per-child ${EVENTS_WORKER_MAX_TASKS:-1000} --loglevel INFO --workdir /app
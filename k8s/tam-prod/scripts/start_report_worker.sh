@@ -0,0 +1,8 @@
+#!/bin/bash
+
+set -o errexit
+set -o pipefail
+set -o nounset
+
+# Worker riêng cho queue báo cáo, chạy 1 tiến trình để không chiếm CPU của pod API
+/usr/local/bin/celery -A core worker -Q reports -B --concurrency ${REPORT_WORKER_CONCURRENCY:-1} --max-tasks-per-child ${REPORT_WORKER_MAX_TASKS:-20} --loglevel INFO --workdir /app
@@ -0,0 +1,21 @@
+import pytest
+from rest_framework.test import APIClient
+
+from users.models import User
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="user@example.com", password="password")
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(email="other@example.com", password="password")
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
@@ -0,0 +1,10 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+app = Celery("core")
+# Toàn bộ cấu hình celery nằm trong settings với tiền tố CELERY_
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
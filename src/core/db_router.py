@@ -0,0 +1,153 @@
+"""
+Định tuyến đọc sang database replica cho các API báo cáo / danh sách.
+
+- Mặc định mọi truy vấn dùng `default` (primary), chỉ các request đọc của view dùng `ReplicaReadMixin`
+  (hoặc đoạn code trong `use_replica()`) mới đọc từ alias `REPLICA_DB_ALIAS`.
+- Sticky primary: trong một request đã ghi thì các lần đọc sau đó quay về primary; sau request có ghi,
+  user được ghim vào primary `REPLICA_STICKY_SECONDS` giây để không đọc phải dữ liệu replica chưa kịp đồng bộ.
+- Đọc bên trong transaction của primary (vd: `select_for_update`, đọc lại dữ liệu vừa ghi) luôn dùng primary.
+- Replica không được cấu hình, không kết nối được hoặc trễ quá `REPLICA_MAX_LAG_SECONDS` thì đọc từ primary.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CACHE_KEY = "db-router:replica-healthy:{alias}"
+STICKY_CACHE_KEY = "db-router:sticky:{user_id}"
+
+# Độ trễ replica (giây), 0 khi replica đã replay hết WAL nhận được
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    read_alias: str = None
+    # Đã ghi trong request / tác vụ hiện tại: các lần đọc sau dùng primary
+    wrote: bool = False
+
+
+_state: ContextVar[RoutingState | None] = ContextVar("db_routing_state", default=None)
+
+
+def current_state() -> RoutingState | None:
+    return _state.get()
+
+
+def begin_routing():
+    """Bắt đầu phạm vi định tuyến mới (mỗi request), trả về token để `end_routing`"""
+    return _state.set(RoutingState())
+
+
+def end_routing(token):
+    try:
+        _state.reset(token)
+    except ValueError:
+        # Token được tạo ở context khác (vd: response stream được ASGI đọc trong event loop): chỉ xoá trạng thái
+        _state.set(None)
+
+
+def replica_alias() -> str | None:
+    alias = getattr(settings, "REPLICA_DB_ALIAS", None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def replica_lag(alias: str) -> float:
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor != "postgresql":
+            cursor.execute("SELECT 1")
+            return 0
+        cursor.execute(POSTGRES_LAG_SQL)
+        lag = cursor.fetchone()[0]
+    return float(lag or 0)
+
+
+def replica_is_healthy(alias: str) -> bool:
+    """Kiểm tra kết nối và độ trễ của replica, kết quả được cache `REPLICA_HEALTH_CHECK_INTERVAL` giây"""
+    key = HEALTH_CACHE_KEY.format(alias=alias)
+    healthy = cache.get(key)
+    if healthy is None:
+        try:
+            lag = replica_lag(alias)
+            healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                logger.warning("Replica %s is lagging %.1fs, reading from primary", alias, lag)
+        except DatabaseError:
+            logger.exception("Replica %s is unavailable, reading from primary", alias)
+            healthy = False
+        cache.set(key, healthy, settings.REPLICA_HEALTH_CHECK_INTERVAL)
+    return healthy
+
+
+def stick_to_primary(user):
+    if user is not None and user.is_authenticated:
+        cache.set(STICKY_CACHE_KEY.format(user_id=user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user) -> bool:
+    return user is not None and user.is_authenticated and bool(cache.get(STICKY_CACHE_KEY.format(user_id=user.pk)))
+
+
+def read_from_replica(user=None) -> str | None:
+    """Chuyển các lần đọc còn lại của phạm vi hiện tại sang replica nếu được, trả về alias đang dùng"""
+    state = current_state()
+    alias = replica_alias()
+    if state is None or alias is None or state.wrote or is_sticky(user) or not replica_is_healthy(alias):
+        return None
+    state.read_alias = alias
+    return alias
+
+
+@contextmanager
+def use_replica(user=None):
+    """Đọc từ replica trong khối lệnh (tác vụ nền, management command)"""
+    token = begin_routing()
+    try:
+        read_from_replica(user)
+        yield current_state()
+    finally:
+        end_routing(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current_state()
+        if not state or not state.read_alias or state.wrote:
+            return None
+        # Trong transaction của primary: đọc cùng snapshot / khoá dòng trên primary
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = current_state()
+        if state:
+            state.wrote = True
+        # Luôn ghi vào primary, kể cả khi instance được đọc từ replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replica là bản sao của primary nên không chạy migrate
+        if db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,137 @@
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from core.db_router import begin_routing
+from core.db_router import current_state
+from core.db_router import end_routing
+from core.db_router import stick_to_primary
+from utils.instrumentation import QueryRecorder
+from utils.instrumentation import endpoint_name
+from utils.instrumentation import get_query_budget
+from utils.instrumentation import view_action
+
+logger = logging.getLogger("core.instrumentation")
+
+
+class DatabaseRoutingMiddleware:
+    """Mở phạm vi định tuyến database cho từng request, ghim user vào primary sau request có ghi"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = begin_routing()
+        response = self.get_response(request)
+        state = current_state()
+        if state.wrote:
+            # request.user đã được DRF gán lại sau khi xác thực (JWT / token)
+            stick_to_primary(getattr(request, "user", None))
+        if response.streaming:
+            # Response stream (xuất file) còn đọc dữ liệu sau khi trả về: kết thúc phạm vi khi stream xong / đóng
+            content_class = AsyncRoutingStreamingContent if response.is_async else RoutingStreamingContent
+            response.streaming_content = content_class(response.streaming_content, token)
+        else:
+            end_routing(token)
+        return response
+
+
+class RoutingStreamingContent:
+    """
+    Bọc nội dung của response stream để giữ phạm vi định tuyến trong lúc stream và kết thúc phạm vi khi
+    stream được đọc hết hoặc khi response bị đóng (client ngắt kết nối trước khi đọc xong)
+    """
+
+    def __init__(self, content, token):
+        self.content = content
+        self.token = token
+
+    def close(self):
+        token, self.token = self.token, None
+        if token is not None:
+            end_routing(token)
+
+    def __iter__(self):
+        try:
+            yield from self.content
+        finally:
+            self.close()
+
+
+class AsyncRoutingStreamingContent(RoutingStreamingContent):
+    # Không cho iter(): StreamingHttpResponse nhận biết nội dung async qua aiter()
+    __iter__ = None
+
+    async def __aiter__(self):
+        try:
+            async for part in self.content:
+                yield part
+        finally:
+            self.close()
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Đo số truy vấn, thời gian SQL và thời gian Python của từng request:
+    - trả về header `Server-Timing` (khi DEBUG hoặc user là staff)
+    - ghi một dòng log JSON cho mỗi request
+    - log kèm các câu SQL (lặp lại / chậm nhất) khi request chậm hơn `SLOW_REQUEST_MS` hoặc vượt query budget của endpoint
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_INSTRUMENTATION:
+            return self.get_response(request)
+
+        request.query_budget_endpoint = None
+        start = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        endpoint, budget = request.query_budget_endpoint or (request.path, None)
+        db_ms, total_ms = recorder.duration * 1000, total * 1000
+        app_ms = total_ms - db_ms
+        # Header lộ số truy vấn / thời gian xử lý: chỉ trả về khi DEBUG hoặc cho tài khoản staff
+        if settings.DEBUG or getattr(getattr(request, "user", None), "is_staff", False):
+            response["Server-Timing"] = ", ".join(
+                (f'db;dur={db_ms:.1f};desc="{recorder.count} queries"', f"app;dur={app_ms:.1f}", f"total;dur={total_ms:.1f}")
+            )
+
+        metrics = {
+            "endpoint": endpoint,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(db_ms, 1),
+            "app_ms": round(app_ms, 1),
+            "total_ms": round(total_ms, 1),
+        }
+        logger.info(json.dumps(metrics))
+
+        over_budget = budget is not None and recorder.count > budget
+        is_slow = total_ms > settings.SLOW_REQUEST_MS
+        # Chỉ lấy mẫu log request chậm, không dùng cho mục đích bảo mật nên không cần random an toàn mật mã
+        if over_budget or (is_slow and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE):  # nosec B311
+            logger.warning(
+                "%s request %s %s (budget %s): %s",
+                "Over budget" if over_budget else "Slow",
+                request.method,
+                request.get_full_path(),
+                budget,
+                recorder.summary(),
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not hasattr(request, "query_budget_endpoint"):
+            return None
+        view_class, action = view_action(view_func, request.method)
+        if view_class is not None:
+            request.query_budget_endpoint = (endpoint_name(view_class, action), get_query_budget(view_class, action))
+        return None
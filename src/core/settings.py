@@ -70,11 +70,15 @@ INSTALLED_APPS = [
     "delivery",
     "files",
     "webhook",
+    "reports",
+    "events",
 ]
 
 MIDDLEWARE = [
     "allow_cidr.middleware.AllowCIDRMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.QueryInstrumentationMiddleware",
+    "core.middleware.DatabaseRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -120,6 +124,37 @@ DATABASES = {
     }
 }
 
+# Read replica cho các API báo cáo / danh sách (core.db_router), bỏ trống SQL_REPLICA_HOST để chỉ dùng primary
+REPLICA_DB_ALIAS = "replica"
+SQL_REPLICA_HOST = os.environ.get("SQL_REPLICA_HOST", "")
+if SQL_REPLICA_HOST or os.environ.get("SQL_REPLICA_DATABASE"):
+    DATABASES[REPLICA_DB_ALIAS] = {
+        **DATABASES["default"],
+        "NAME": os.environ.get("SQL_REPLICA_DATABASE", DATABASES["default"]["NAME"]),
+        "HOST": SQL_REPLICA_HOST or DATABASES["default"]["HOST"],
+        "PORT": os.environ.get("SQL_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+REPLICA_MAX_LAG_SECONDS = int(os.environ.get("REPLICA_MAX_LAG_SECONDS", 30))
+REPLICA_HEALTH_CHECK_INTERVAL = int(os.environ.get("REPLICA_HEALTH_CHECK_INTERVAL", 5))
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 10))
+
+REDIS_URL = os.environ.get("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "IGNORE_EXCEPTIONS": True,
+            },
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -146,7 +181,7 @@ USE_TZ = True
 # DRF configs
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -212,6 +247,8 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_LIFETIME": timedelta(days=1),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=7),
 }
+# Thời gian cache user dùng cho CachedJWTAuthentication (giây)
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 300))
 
 # AWS S3 Base Settings
 AWS_S3_ENDPOINT_URL = os.environ.get("AWS_S3_ENDPOINT_URL")
@@ -265,6 +302,53 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5 MB
 # AIRFLOW
 DAG_ID_AFTER_IMPORT_FILE = os.environ.get("DAG_ID_AFTER_IMPORT_FILE", "")
 
+# OUTBOX (xem events.outbox): tiền tố topic -> dispatcher, "" là mặc định
+OUTBOX_DISPATCHERS = {
+    "airflow.": os.environ.get("OUTBOX_AIRFLOW_DISPATCHER", "events.dispatchers.AirflowDispatcher"),
+    "memphis.": os.environ.get("OUTBOX_MEMPHIS_DISPATCHER", "events.dispatchers.MemphisDispatcher"),
+    "": os.environ.get("OUTBOX_DEFAULT_DISPATCHER", "events.dispatchers.LogDispatcher"),
+}
+OUTBOX_FILE_PATH = os.environ.get("OUTBOX_FILE_PATH", os.path.join(BASE_DIR, "logs", "outbox.jsonl"))
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_BATCHES_PER_RUN = int(os.environ.get("OUTBOX_MAX_BATCHES_PER_RUN", 10))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 10))
+# Backoff (giây): base * 2^(lần thử - 1), tối đa OUTBOX_RETRY_MAX_SECONDS
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get("OUTBOX_RETRY_BASE_SECONDS", 5))
+OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get("OUTBOX_RETRY_MAX_SECONDS", 60 * 60))
+OUTBOX_DISPATCH_TIMEOUT = int(os.environ.get("OUTBOX_DISPATCH_TIMEOUT", 10))
+OUTBOX_SENT_RETENTION_DAYS = int(os.environ.get("OUTBOX_SENT_RETENTION_DAYS", 7))
+
+# GHN
+GHN_API_TOKEN = os.environ.get("GHN_API_TOKEN", "")
+
+# CELERY
+# Không cấu hình broker thì dùng broker in-memory và chạy task đồng bộ (eager) để dev / test local
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "memory://")
+CELERY_TASK_ALWAYS_EAGER = bool(int(os.environ.get("CELERY_TASK_ALWAYS_EAGER", CELERY_BROKER_URL.startswith("memory://"))))
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = TIME_ZONE
+# Báo cáo chạy trên queue riêng để không tranh tài nguyên với các task khác, outbox chạy trên queue `events`
+# để không phải chờ sau các báo cáo dài (worker: k8s/tam-prod/scripts/start_events_worker.sh)
+CELERY_TASK_ROUTES = {
+    "reports.tasks.*": {"queue": "reports"},
+    "events.tasks.*": {"queue": "events"},
+}
+CELERY_BEAT_SCHEDULE = {
+    "expire-report-jobs": {"task": "reports.tasks.expire_report_jobs", "schedule": timedelta(minutes=30)},
+    "ensure-history-partitions": {"task": "reports.tasks.ensure_history_partitions", "schedule": timedelta(days=1)},
+    "drain-outbox": {"task": "events.tasks.drain_outbox", "schedule": timedelta(seconds=10)},
+    "purge-outbox": {"task": "events.tasks.purge_outbox", "schedule": timedelta(days=1)},
+}
+
+# REPORT JOBS (giây)
+REPORT_JOB_RESULT_TTL = int(os.environ.get("REPORT_JOB_RESULT_TTL", 60 * 60 * 24))
+REPORT_JOB_TIMEOUT = int(os.environ.get("REPORT_JOB_TIMEOUT", 60 * 60))
+CELERY_TASK_TIME_LIMIT = REPORT_JOB_TIMEOUT
+# Số truy vấn báo cáo chạy song song trong một process (vd: các kỳ của báo cáo so sánh), mỗi truy vấn một connection
+REPORT_QUERY_WORKERS = int(os.environ.get("REPORT_QUERY_WORKERS", 4))
+
 # Logging settings
 LOG_VIEWER_FILES_PATTERN = "*.log*"
 LOG_VIEWER_FILES_DIR = os.path.join(BASE_DIR, "logs")
@@ -317,9 +401,19 @@ LOGGING = {
 "backupCount": 3,  # how many backup file to keep, 3 days
 },
 },
-"loggers": {"": {"level": "WARNING", "handlers": ["console", "file"]}},
+"loggers": {
+"": {"level": "WARNING", "handlers": ["console", "file"]},
+"core.instrumentation": {"level": os.environ.get("REQUEST_METRICS_LOG_LEVEL", "INFO")},
+},
 }
 
+# Đo truy vấn / thời gian xử lý request (core.middleware.QueryInstrumentationMiddleware)
+REQUEST_INSTRUMENTATION = os.environ.get("REQUEST_INSTRUMENTATION", "true").lower() == "true"
+SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", 1000))
+SLOW_REQUEST_SAMPLE_RATE = float(os.environ.get("SLOW_REQUEST_SAMPLE_RATE", 1))
+# Số truy vấn tối đa của endpoint không khai báo `query_budget`, None: không giới hạn
+QUERY_BUDGET_DEFAULT = int(os.environ["QUERY_BUDGET_DEFAULT"]) if os.environ.get("QUERY_BUDGET_DEFAULT") else None
+
 # VIETTEL POST
 VIETTEL_POST_WEBHOOK_SECRET_KEY = os.environ.get("VIETTEL_POST_WEBHOOK_SECRET_KEY")
 
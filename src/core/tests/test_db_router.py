@@ -0,0 +1,172 @@
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db import transaction
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+
+from core.db_router import HEALTH_CACHE_KEY
+from core.db_router import ReplicaRouter
+from core.db_router import begin_routing
+from core.db_router import current_state
+from core.db_router import end_routing
+from core.db_router import is_sticky
+from core.db_router import read_from_replica
+from core.db_router import use_replica
+from core.middleware import DatabaseRoutingMiddleware
+from orders.models import Orders
+
+REPLICA = "replica"
+
+
+@pytest.fixture(autouse=True)
+def two_aliases(settings):
+    """Cấu hình primary + replica; replica được đánh dấu healthy trong cache nên không cần kết nối thật"""
+    settings.DATABASES = {**settings.DATABASES, REPLICA: {**settings.DATABASES[DEFAULT_DB_ALIAS], "TEST": {"MIRROR": "default"}}}
+    settings.REPLICA_DB_ALIAS = REPLICA
+    cache.clear()
+    cache.set(HEALTH_CACHE_KEY.format(alias=REPLICA), True, None)
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter()
+
+
+@pytest.fixture
+def reader():
+    return SimpleNamespace(pk=1, is_authenticated=True)
+
+
+def test_reads_go_to_replica_only_inside_a_replica_scope(router):
+    assert router.db_for_read(Orders) is None
+
+    with use_replica():
+        assert router.db_for_read(Orders) == REPLICA
+    assert current_state() is None
+    assert router.db_for_read(Orders) is None
+
+
+def test_write_pins_the_rest_of_the_scope_to_primary(router):
+    with use_replica():
+        assert router.db_for_read(Orders) == REPLICA
+        assert router.db_for_write(Orders) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(Orders) is None
+        # Đã ghi thì không chuyển lại sang replica
+        assert read_from_replica() is None
+
+
+def test_unhealthy_or_missing_replica_falls_back_to_primary(router, settings):
+    cache.set(HEALTH_CACHE_KEY.format(alias=REPLICA), False, None)
+    with use_replica():
+        assert router.db_for_read(Orders) is None
+
+    settings.REPLICA_DB_ALIAS = "missing"
+    with use_replica():
+        assert router.db_for_read(Orders) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_inside_a_primary_transaction_stay_on_primary(router):
+    with use_replica():
+        with transaction.atomic():
+            assert router.db_for_read(Orders) is None
+        assert router.db_for_read(Orders) == REPLICA
+
+
+def test_replica_never_migrates(router):
+    assert router.allow_migrate(REPLICA, "orders") is False
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, "orders") is None
+
+
+def test_end_routing_tolerates_tokens_from_another_context():
+    token = begin_routing()
+
+    asyncio.run(asyncio.to_thread(end_routing, token))
+
+    end_routing(token)
+    assert current_state() is None
+
+
+def middleware_request(user, view):
+    request = RequestFactory().get("/")
+    request.user = user
+    return DatabaseRoutingMiddleware(view)(request)
+
+
+def test_middleware_pins_user_to_primary_after_a_write(router, reader):
+    def view(request):
+        read_from_replica(request.user)
+        assert router.db_for_read(Orders) == REPLICA
+        router.db_for_write(Orders)
+        return HttpResponse()
+
+    middleware_request(reader, view)
+
+    assert current_state() is None
+    assert is_sticky(reader)
+    # Request sau của user (trong thời gian ghim) đọc từ primary
+    middleware_request(reader, lambda request: HttpResponse(str(read_from_replica(request.user))))
+    assert read_from_replica(reader) is None
+
+
+def test_middleware_does_not_pin_read_only_requests(reader):
+    middleware_request(reader, lambda request: HttpResponse(str(read_from_replica(request.user))))
+
+    assert not is_sticky(reader)
+    assert current_state() is None
+
+
+def test_streaming_response_keeps_scope_until_consumed(router, reader):
+    def content():
+        # Dữ liệu stream được đọc sau khi middleware trả về, vẫn trong phạm vi replica của request
+        yield router.db_for_read(Orders) or DEFAULT_DB_ALIAS
+
+    def view(request):
+        read_from_replica(request.user)
+        return StreamingHttpResponse(content())
+
+    response = middleware_request(reader, view)
+    assert current_state() is not None
+
+    assert b"".join(response.streaming_content) == REPLICA.encode()
+    assert current_state() is None
+
+
+@pytest.mark.django_db
+def test_streaming_response_ends_scope_when_closed_unread(reader):
+    response = middleware_request(reader, lambda request: StreamingHttpResponse(iter([b"data"])))
+    assert current_state() is not None
+
+    response.close()
+
+    assert current_state() is None
+
+
+def test_async_streaming_response_ends_scope_in_the_consuming_context(reader):
+    async def content():
+        yield b"data"
+
+    # Như ASGI: middleware chạy trong một context, response được đọc trong context khác (có trạng thái được chép sang)
+    request_context = contextvars.copy_context()
+    response = request_context.run(middleware_request, reader, lambda request: StreamingHttpResponse(content()))
+    assert response.is_async
+
+    async def consume():
+        before = current_state()
+        parts = [part async for part in response]
+        return before, parts, current_state()
+
+    before, parts, after = request_context.copy().run(asyncio.run, consume())
+
+    assert before is not None
+    assert parts == [b"data"]
+    assert after is None
+    assert current_state() is None
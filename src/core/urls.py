@@ -76,6 +76,7 @@ urlpatterns = [
     path("api/warehouses/", include("warehouses.api.urls")),
     path("api/orders/", include("orders.api.urls")),
     path("api/files/", include("files.api.urls")),
+    path("api/reports/", include("reports.api.urls")),
 ]
 
 
@@ -1,7 +1,76 @@
+import time
+
 from rest_framework import viewsets
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from core.db_router import read_from_replica
 
 from users.activity_log import ActivityLogMixin
+from utils.export import EXPORT_FORMATS
+from utils.export import export_response
+from utils.export import iter_queryset
 
 
 class CustomModelViewSet(ActivityLogMixin, viewsets.ModelViewSet):
     pass
+
+
+class ReplicaReadMixin:
+    """
+    Request đọc (GET / HEAD / OPTIONS) của view được đọc từ database replica (xem `core.db_router`).
+    Đặt trước các mixin / view khác để áp dụng sau khi đã xác thực user.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            read_from_replica(request.user)
+
+
+class ExportMixin:
+    """
+    Cho phép xuất toàn bộ kết quả (không phân trang) của view danh sách / báo cáo ra file
+    bằng query param `?export=xlsx|csv`, các dòng được stream ra file với bộ nhớ không đổi.
+
+    Mặc định: view có `get_report_data()` thì xuất kết quả đó, ngược lại duyệt queryset đã lọc bằng
+    server-side cursor và serialize từng object. Override `get_export_rows` để tự sinh các dòng.
+    View dùng mixin đặt logic GET trong `list()`.
+    """
+
+    export_chunk_size = 2000
+    export_columns = None
+    export_file_name = "export"
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get("export")
+        if file_format:
+            return self.export(request, file_format)
+        return self.list(request, *args, **kwargs)
+
+    def get_export_rows(self):
+        if hasattr(self, "get_report_data"):
+            data = self.get_report_data()
+            return data["results"] if isinstance(data, dict) else data
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        return (
+            serializer_class(obj, context=context).data
+            for obj in iter_queryset(queryset, chunk_size=self.export_chunk_size)
+        )
+
+    def export(self, request, file_format):
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({"export": f"Định dạng hỗ trợ: {', '.join(EXPORT_FORMATS)}"})
+        if not (request.user.is_superuser or request.user.is_exportdata):
+            raise PermissionDenied("Tài khoản không có quyền xuất dữ liệu")
+        return export_response(
+            request,
+            self.get_export_rows(),
+            file_name=f"{self.export_file_name}_{int(time.time())}",
+            file_format=file_format,
+            columns=self.export_columns,
+        )
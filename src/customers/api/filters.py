@@ -8,6 +8,7 @@ from rest_framework import exceptions
 from customers.enums import CustomerGender
 from customers.enums import CustomerRank
 from customers.models import Customer
+from utils.filters import LocalDateRangeFilter
 
 
 class CustomerFilterSet(django_filters.FilterSet):
@@ -17,10 +18,10 @@ class CustomerFilterSet(django_filters.FilterSet):
 
     birthday_from = django_filters.CharFilter(method="filter_birthday_from", required=False)
     birthday_to = django_filters.CharFilter(method="filter_birthday_to", required=False)
-    last_order_time_from = django_filters.DateTimeFilter(field_name="last_order_time__date", lookup_expr="gte")
-    last_order_time_to = django_filters.DateTimeFilter(field_name="last_order_time__date", lookup_expr="lte")
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
+    last_order_time_from = LocalDateRangeFilter(field_name="last_order_time", lookup_expr="gte")
+    last_order_time_to = LocalDateRangeFilter(field_name="last_order_time", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
 
     class Meta:
         model = Customer
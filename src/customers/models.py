@@ -116,6 +116,11 @@ class Customer(TimeStampedModel):
     class Meta:
         db_table = "tbl_Customers"
         ordering = ["-created"]
+        # Lọc theo khoảng ngày (LocalDateRangeFilter) là range scan trên các cột timestamptz
+        indexes = [
+            models.Index(fields=["created"], name="customers_created"),
+            models.Index(fields=["last_order_time"], name="customers_last_order_time"),
+        ]
 
 
 class CustomerTagDetail(UUIDModel):
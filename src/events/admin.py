@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from events.models import OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "status", "attempts", "available_at", "sent_at", "created")
+    list_filter = ("status", "topic")
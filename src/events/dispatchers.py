@@ -0,0 +1,106 @@
+"""
+Dispatcher gửi một sự kiện outbox ra ngoài, chọn theo tiền tố topic trong `OUTBOX_DISPATCHERS`
+(tiền tố dài nhất khớp, "" là mặc định). `send()` raise exception khi gửi lỗi để worker thử lại sau.
+"""
+import asyncio
+import json
+import logging
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from memphis import Memphis
+from rest_framework.utils.encoders import JSONEncoder
+
+from utils.airflow import Airflow
+
+logger = logging.getLogger(__name__)
+
+AIRFLOW_TOPIC_PREFIX = "airflow."
+MEMPHIS_TOPIC_PREFIX = "memphis."
+
+
+class Dispatcher:
+    def send(self, event):
+        raise NotImplementedError
+
+
+class LogDispatcher(Dispatcher):
+    """Chỉ ghi log, dùng khi chưa cấu hình hệ thống nhận (dev / test)"""
+
+    def send(self, event):
+        logger.info("Outbox event %s [%s]: %s", event.pk, event.topic, json.dumps(event.payload, cls=JSONEncoder, ensure_ascii=False))
+
+
+class FileDispatcher(Dispatcher):
+    """Ghi mỗi sự kiện một dòng JSON vào `OUTBOX_FILE_PATH`"""
+
+    def __init__(self, path=None):
+        self.path = path or settings.OUTBOX_FILE_PATH
+
+    def send(self, event):
+        line = json.dumps(
+            {"id": event.pk, "topic": event.topic, "payload": event.payload, "created": event.created}, cls=JSONEncoder, ensure_ascii=False
+        )
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+
+class AirflowDispatcher(Dispatcher):
+    """Topic `airflow.<dag_id>`: tạo DAG run, payload là body của request (vd: {"conf": {...}})"""
+
+    def send(self, event):
+        dag_id = event.topic.removeprefix(AIRFLOW_TOPIC_PREFIX)
+        response = Airflow.call_trigger_new_dag_run(dag_id, event.payload, timeout=settings.OUTBOX_DISPATCH_TIMEOUT)
+        response.raise_for_status()
+
+
+class MemphisDispatcher(Dispatcher):
+    """
+    Topic `memphis.<station>`: gửi payload (JSON) vào station bằng producer `SERVICE_PRODUCER`.
+    `msg_id` là id sự kiện để Memphis bỏ qua bản gửi lại.
+    """
+
+    def __init__(self):
+        # Client của memphis-py là async: giữ một event loop và một kết nối cho cả process
+        self.loop = asyncio.new_event_loop()
+        self.client = None
+
+    def get_client(self) -> Memphis:
+        if self.client is None or not self.client.is_connected():
+            client = Memphis()
+            self.loop.run_until_complete(
+                client.connect(
+                    host=settings.MEMPHIS_HOST,
+                    username=settings.MEMPHIS_USERNAME,
+                    password=settings.MEMPHIS_PASSWORD,
+                    timeout_ms=settings.OUTBOX_DISPATCH_TIMEOUT * 1000,
+                )
+            )
+            self.client = client
+        return self.client
+
+    def send(self, event):
+        message = bytearray(json.dumps(event.payload, cls=JSONEncoder, ensure_ascii=False), "utf-8")
+        self.loop.run_until_complete(
+            self.get_client().produce(
+                station_name=event.topic.removeprefix(MEMPHIS_TOPIC_PREFIX),
+                producer_name=settings.SERVICE_PRODUCER,
+                message=message,
+                msg_id=str(event.pk),
+            )
+        )
+
+
+@lru_cache(maxsize=None)
+def _load_dispatcher(path: str) -> Dispatcher:
+    return import_string(path)()
+
+
+def get_dispatcher(topic: str) -> Dispatcher:
+    prefixes = sorted((prefix for prefix in settings.OUTBOX_DISPATCHERS if topic.startswith(prefix)), key=len, reverse=True)
+    if not prefixes:
+        raise LookupError(f"Không có dispatcher cho topic `{topic}`")
+    return _load_dispatcher(settings.OUTBOX_DISPATCHERS[prefixes[0]])
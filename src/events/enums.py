@@ -0,0 +1,8 @@
+from utils.enums import EnumBase
+
+
+class OutboxStatus(EnumBase):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    # Hết số lần thử, cần xử lý thủ công
+    FAILED = "FAILED"
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Gửi các sự kiện outbox (tbl_Outbox_Events) đang chờ qua dispatcher của từng topic"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", action="store_true", help="Chạy liên tục, nghỉ `--interval` giây khi không còn sự kiện")
+        parser.add_argument("--interval", type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            counts = drain_outbox(options["batch_size"])
+            if counts:
+                self.stdout.write(", ".join(f"{status}: {count}" for status, count in counts.items()))
+                continue
+            # Không còn sự kiện sẵn sàng gửi
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
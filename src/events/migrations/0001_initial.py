@@ -0,0 +1,53 @@
+# Generated by Django 5.0 on 2026-10-19 14:55
+
+import django.utils.timezone
+import events.enums
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created", model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name="created")),
+                (
+                    "modified",
+                    model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name="modified"),
+                ),
+                ("topic", models.CharField(max_length=255)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "PENDING"), ("SENT", "SENT"), ("FAILED", "FAILED")],
+                        default=events.enums.OutboxStatus["PENDING"],
+                        max_length=16,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("available_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "tbl_Outbox_Events",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", events.enums.OutboxStatus["PENDING"])),
+                        fields=["topic", "id"],
+                        name="outbox_event_pending",
+                    ),
+                    models.Index(fields=["status", "modified"], name="outbox_event_status"),
+                ],
+            },
+        ),
+    ]
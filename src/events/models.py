@@ -0,0 +1,29 @@
+from django.db import models
+from django.utils import timezone
+from model_utils.models import TimeStampedModel
+
+from events.enums import OutboxStatus
+
+
+class OutboxEvent(TimeStampedModel):
+    """
+    Sự kiện gửi ra hệ thống ngoài (Airflow, Memphis...), được ghi trong cùng transaction với thay đổi nghiệp vụ
+    và được worker gửi đi sau khi commit (xem `events.outbox`). Các sự kiện cùng `topic` được gửi theo thứ tự `id`.
+    """
+
+    topic = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=OutboxStatus.choices(), default=OutboxStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Thời điểm sớm nhất được gửi (lùi lại sau mỗi lần gửi lỗi)
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = "tbl_Outbox_Events"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["topic", "id"], condition=models.Q(status=OutboxStatus.PENDING), name="outbox_event_pending"),
+            models.Index(fields=["status", "modified"], name="outbox_event_status"),
+        ]
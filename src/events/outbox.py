@@ -0,0 +1,95 @@
+"""
+Transactional outbox: `publish()` ghi sự kiện vào `tbl_Outbox_Events` trong transaction hiện tại
+(sự kiện chỉ tồn tại khi thay đổi nghiệp vụ được commit), `drain_outbox()` gửi các sự kiện đã commit
+theo lô qua dispatcher của topic (`events.dispatchers`), ngoài vòng request / response.
+
+- Sự kiện cùng topic được gửi theo thứ tự `id`: sự kiện gửi lỗi được lùi thời điểm gửi
+  (backoff lũy thừa) và chặn các sự kiện sau của topic tới khi gửi được hoặc hết số lần thử
+  (FAILED, không chặn nữa).
+- Nhiều worker chạy cùng lúc: các lô được khóa bằng `select_for_update(skip_locked=True)`, topic đang được
+  worker khác gửi bị bỏ qua.
+- Gửi ít nhất một lần: worker dừng giữa lô thì các sự kiện đã gửi của lô được gửi lại ở lần sau.
+"""
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from events.dispatchers import get_dispatcher
+from events.enums import OutboxStatus
+from events.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def publish(topic: str, payload: dict = None) -> OutboxEvent:
+    return OutboxEvent.objects.create(topic=topic, payload=payload if payload is not None else {})
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_SECONDS))
+
+
+def _claim_batch(batch_size: int, now) -> dict[str, list[OutboxEvent]]:
+    """Khóa tối đa `batch_size` sự kiện sẵn sàng gửi: {topic: [sự kiện theo thứ tự id]}"""
+    pending = OutboxEvent.objects.filter(status=OutboxStatus.PENDING)
+    # Topic có sự kiện đang chờ thử lại: các sự kiện sau của topic phải đợi
+    blocked_topics = pending.filter(available_at__gt=now).values("topic")
+    events = list(pending.exclude(topic__in=blocked_topics).select_for_update(skip_locked=True).order_by("id")[:batch_size])
+
+    batches = {}
+    for event in events:
+        batches.setdefault(event.topic, []).append(event)
+    heads = dict(pending.filter(topic__in=batches).order_by().values("topic").annotate(head=Min("id")).values_list("topic", "head"))
+    # Sự kiện đầu của topic đã bị worker khác khóa: bỏ qua cả topic để giữ thứ tự
+    return {topic: items for topic, items in batches.items() if items[0].pk == heads.get(topic)}
+
+
+def _dispatch(event: OutboxEvent, now) -> bool:
+    """Gửi một sự kiện, False nếu các sự kiện sau của topic phải đợi sự kiện này được gửi lại"""
+    event.attempts += 1
+    event.modified = now
+    try:
+        get_dispatcher(event.topic).send(event)
+    except Exception as err:  # pylint: disable=W0718
+        logger.warning("Outbox event %s [%s] failed (attempt %s): %s", event.pk, event.topic, event.attempts, err)
+        event.last_error = f"{type(err).__name__}: {err}"
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            logger.error("Outbox event %s [%s] gave up after %s attempts", event.pk, event.topic, event.attempts)
+            event.status = OutboxStatus.FAILED
+            return True
+        event.available_at = now + retry_delay(event.attempts)
+        return False
+    event.status = OutboxStatus.SENT
+    event.sent_at = timezone.now()
+    event.last_error = None
+    return True
+
+
+def drain_outbox(batch_size: int = None) -> Counter:
+    """
+    Gửi một lô sự kiện, trả về số sự kiện đã xử lý theo trạng thái mới
+    (PENDING: gửi lỗi, chờ thử lại)
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    processed = []
+    with transaction.atomic():
+        for events in _claim_batch(batch_size, now).values():
+            for event in events:
+                processed.append(event)
+                if not _dispatch(event, now):
+                    break
+        OutboxEvent.objects.bulk_update(processed, ["status", "attempts", "available_at", "sent_at", "last_error", "modified"])
+    return Counter(OutboxStatus(event.status).value for event in processed)
+
+
+def purge_outbox() -> int:
+    """Xoá các sự kiện đã gửi quá `OUTBOX_SENT_RETENTION_DAYS` ngày"""
+    sent_before = timezone.now() - timedelta(days=settings.OUTBOX_SENT_RETENTION_DAYS)
+    deleted, _ = OutboxEvent.objects.filter(status=OutboxStatus.SENT, modified__lt=sent_before).delete()
+    return deleted
@@ -0,0 +1,16 @@
+from celery import shared_task
+from django.conf import settings
+
+from events import outbox
+
+
+@shared_task(ignore_result=True)
+def drain_outbox():
+    for _ in range(settings.OUTBOX_MAX_BATCHES_PER_RUN):
+        if not outbox.drain_outbox():
+            break
+
+
+@shared_task(ignore_result=True)
+def purge_outbox():
+    outbox.purge_outbox()
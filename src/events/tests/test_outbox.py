@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.celery import app
+from events import tasks
+from events.dispatchers import _load_dispatcher
+from events.dispatchers import Dispatcher
+from events.enums import OutboxStatus
+from events.models import OutboxEvent
+from events.outbox import drain_outbox
+from events.outbox import publish
+from events.outbox import purge_outbox
+
+pytestmark = pytest.mark.django_db
+
+
+class RecordingDispatcher(Dispatcher):
+    """Ghi lại các sự kiện đã gửi, gửi lỗi với các topic trong `failing`"""
+
+    sent = []
+    failing = set()
+
+    def send(self, event):
+        if event.topic in self.failing:
+            raise ConnectionError("unavailable")
+        self.sent.append((event.topic, event.payload["n"]))
+
+
+@pytest.fixture(autouse=True)
+def dispatcher(settings):
+    settings.OUTBOX_DISPATCHERS = {"": f"{__name__}.RecordingDispatcher"}
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    _load_dispatcher.cache_clear()
+    RecordingDispatcher.sent, RecordingDispatcher.failing = [], set()
+    yield RecordingDispatcher
+    _load_dispatcher.cache_clear()
+
+
+def statuses():
+    return list(OutboxEvent.objects.order_by("id").values_list("topic", "status", "attempts"))
+
+
+def test_drain_sends_events_in_order(dispatcher):
+    for n in range(3):
+        publish("a", {"n": n})
+    publish("b", {"n": 0})
+
+    assert drain_outbox() == {OutboxStatus.SENT.value: 4}
+    assert [event for event in dispatcher.sent if event[0] == "a"] == [("a", 0), ("a", 1), ("a", 2)]
+    assert not OutboxEvent.objects.exclude(status=OutboxStatus.SENT).exists()
+    assert drain_outbox() == {}
+
+
+def test_drain_respects_batch_size(dispatcher):
+    for n in range(5):
+        publish("a", {"n": n})
+
+    assert drain_outbox(batch_size=2) == {OutboxStatus.SENT.value: 2}
+    assert drain_outbox(batch_size=10) == {OutboxStatus.SENT.value: 3}
+    assert [n for _, n in dispatcher.sent] == [0, 1, 2, 3, 4]
+
+
+def test_failed_event_blocks_its_topic_until_retry(dispatcher):
+    publish("a", {"n": 0})
+    publish("a", {"n": 1})
+    publish("b", {"n": 0})
+    dispatcher.failing = {"a"}
+
+    assert drain_outbox() == {OutboxStatus.PENDING.value: 1, OutboxStatus.SENT.value: 1}
+    assert statuses() == [("a", "PENDING", 1), ("a", "PENDING", 0), ("b", "SENT", 1)]
+    head = OutboxEvent.objects.get(topic="a", attempts=1)
+    assert head.available_at > timezone.now()
+    assert head.last_error == "ConnectionError: unavailable"
+
+    # Chưa tới thời điểm thử lại: cả topic phải đợi
+    dispatcher.failing = set()
+    assert drain_outbox() == {}
+
+    OutboxEvent.objects.filter(pk=head.pk).update(available_at=timezone.now())
+    assert drain_outbox() == {OutboxStatus.SENT.value: 2}
+    assert [event for event in dispatcher.sent if event[0] == "a"] == [("a", 0), ("a", 1)]
+
+
+def test_event_fails_after_max_attempts_and_unblocks_topic(dispatcher):
+    publish("a", {"n": 0})
+    publish("a", {"n": 1})
+    dispatcher.failing = {"a"}
+
+    drain_outbox()
+    OutboxEvent.objects.update(available_at=timezone.now())
+    # Lần thử cuối: sự kiện đầu FAILED, sự kiện sau của topic tiếp tục được gửi (và cũng lỗi)
+    assert drain_outbox() == {OutboxStatus.FAILED.value: 1, OutboxStatus.PENDING.value: 1}
+    assert statuses() == [("a", "FAILED", 2), ("a", "PENDING", 1)]
+
+
+def test_purge_removes_only_old_sent_events():
+    old_sent, new_sent, old_pending = (publish("a", {"n": n}) for n in range(3))
+    OutboxEvent.objects.filter(pk__in=[old_sent.pk, new_sent.pk]).update(status=OutboxStatus.SENT)
+    OutboxEvent.objects.filter(pk__in=[old_sent.pk, old_pending.pk]).update(modified=timezone.now() - timedelta(days=30))
+
+    assert purge_outbox() == 1
+    assert set(OutboxEvent.objects.values_list("pk", flat=True)) == {new_sent.pk, old_pending.pk}
+
+
+def test_drain_task_runs_several_batches(dispatcher, settings):
+    settings.OUTBOX_BATCH_SIZE = 2
+    for n in range(5):
+        publish("a", {"n": n})
+
+    tasks.drain_outbox()
+
+    assert len(dispatcher.sent) == 5
+
+
+@pytest.mark.parametrize("task", ["events.tasks.drain_outbox", "events.tasks.purge_outbox"])
+def test_outbox_tasks_are_routed_to_events_queue(task):
+    """Beat gửi task outbox vào queue `events`, queue của `start_events_worker.sh`"""
+    assert task in {entry["task"] for entry in app.conf.beat_schedule.values()}
+    assert app.amqp.router.route({}, task)["queue"].name == "events"
@@ -1,7 +1,9 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from locations.api.views import AddressViewSet
 from locations.api.views import DistrictViewSet
+from locations.api.views import LocationTreeAPIView
 from locations.api.views import ProvinceViewSet
 from locations.api.views import WardViewSet
 
@@ -11,4 +13,7 @@ router.register("districts", DistrictViewSet, basename="districts")
 router.register("wards", WardViewSet, basename="wards")
 router.register("addresses", AddressViewSet, basename="addresses")
 
-urlpatterns = [*router.urls]
+urlpatterns = [
+    path("tree/", LocationTreeAPIView.as_view(), name="location-tree"),
+    *router.urls,
+]
@@ -1,6 +1,11 @@
 import django_filters.rest_framework as django_filters
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
 from rest_framework import filters
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from core.views import CustomModelViewSet
 from locations.api.filters import AddressFilter
@@ -16,9 +21,35 @@ from locations.models import Address
 from locations.models import Districts
 from locations.models import Provinces
 from locations.models import Wards
+from locations.reference_data import etag_matches
+from locations.reference_data import get_cached_list
+from locations.reference_data import get_list_etag
+from locations.reference_data import get_tree
+from locations.reference_data import set_cached_list
 
+REFERENCE_CACHE_CONTROL = "private, no-cache"
 
-class ProvinceViewSet(CustomModelViewSet):
+
+class ReferenceDataCacheMixin:
+    """
+    Dữ liệu địa giới hầu như không đổi: danh sách được cache theo version dữ liệu
+    và trả về ETag để client nhận 304 Not Modified khi không có thay đổi.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag = get_list_etag(request)
+        headers = {"ETag": etag, "Cache-Control": REFERENCE_CACHE_CONTROL}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        data = get_cached_list(etag)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            set_cached_list(etag, data)
+        return Response(data, headers=headers)
+
+
+class ProvinceViewSet(ReferenceDataCacheMixin, CustomModelViewSet):
     serializer_class = ProvinceSerializer
     permission_classes = [IsAuthenticated]
     queryset = Provinces.objects.all()
@@ -31,7 +62,7 @@ class ProvinceViewSet(CustomModelViewSet):
     ordering_fields = "code"
 
 
-class DistrictViewSet(CustomModelViewSet):
+class DistrictViewSet(ReferenceDataCacheMixin, CustomModelViewSet):
     serializer_class = DistrictSerializer
     permission_classes = [IsAuthenticated]
     queryset = Districts.objects.prefetch_related("province").all()
@@ -46,7 +77,7 @@ class DistrictViewSet(CustomModelViewSet):
     ordering_fields = "code"
 
 
-class WardViewSet(CustomModelViewSet):
+class WardViewSet(ReferenceDataCacheMixin, CustomModelViewSet):
     serializer_class = WardSerializer
     permission_classes = [IsAuthenticated]
     queryset = Wards.objects.prefetch_related("province", "district").all()
@@ -61,6 +92,26 @@ class WardViewSet(CustomModelViewSet):
     ordering_fields = "code"
 
 
+class LocationTreeAPIView(APIView):
+    """Toàn bộ cây tỉnh -> huyện -> xã trong một response, JSON được dựng sẵn và cache theo version"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        tree = get_tree()
+        if etag_matches(request, tree.etag):
+            response = HttpResponseNotModified()
+        elif "gzip" in request.headers.get("Accept-Encoding", ""):
+            response = HttpResponse(tree.gzip_content, content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(tree.content, content_type="application/json")
+        response["ETag"] = tree.etag
+        response["Cache-Control"] = REFERENCE_CACHE_CONTROL
+        response["Vary"] = "Accept-Encoding"
+        return response
+
+
 class AddressViewSet(CustomModelViewSet):
     http_method_names = ("get", "post", "patch", "delete")
     permission_classes = (IsAuthenticated,)
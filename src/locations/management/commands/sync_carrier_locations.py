@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from locations.services.carrier_sync import LEVELS
+from locations.services.carrier_sync import PROVIDERS
+from locations.services.carrier_sync import CarrierLocationSync
+from locations.services.carrier_sync import load_payload
+
+
+class Command(BaseCommand):
+    help = "Đồng bộ mã tỉnh / huyện / xã của nhà vận chuyển (vtpost, ghn) vào bảng địa giới"
+
+    def add_arguments(self, parser):
+        parser.add_argument("provider", choices=sorted(PROVIDERS))
+        parser.add_argument("--levels", nargs="+", choices=LEVELS, default=list(LEVELS))
+        parser.add_argument("--provinces", help="File JSON danh sách tỉnh của nhà vận chuyển")
+        parser.add_argument("--districts", help="File JSON danh sách huyện của nhà vận chuyển")
+        parser.add_argument("--wards", help="File JSON danh sách xã của nhà vận chuyển")
+        parser.add_argument("--dry-run", action="store_true", help="Chỉ so khớp và báo cáo, không ghi DB")
+        parser.add_argument("--show-unmatched", action="store_true")
+
+    def handle(self, *args, **options):
+        payloads = {}
+        for level, option in (("province", "provinces"), ("district", "districts"), ("ward", "wards")):
+            if options[option]:
+                try:
+                    payloads[level] = load_payload(options[option])
+                except (OSError, ValueError) as e:
+                    raise CommandError(f"Không đọc được file {options[option]}: {e}")
+
+        sync = CarrierLocationSync(PROVIDERS[options["provider"]], payloads)
+        results = sync.run(levels=options["levels"], commit=not options["dry_run"])
+
+        for result in results:
+            self.stdout.write(str(result.summary()))
+            if options["show_unmatched"]:
+                for row in result.unmatched:
+                    self.stdout.write(f"  {row['code']}\t{row['label']}")
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: không ghi thay đổi"))
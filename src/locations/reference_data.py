@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from locations.models import Districts
+from locations.models import Provinces
+from locations.models import Wards
+
+VERSION_CACHE_KEY = "locations:version"
+TREE_CACHE_KEY = "locations:tree:{}"
+LIST_CACHE_KEY = "locations:list:{version}:{key}"
+REFERENCE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Không có Redis (LocMemCache) thì version chỉ nằm trong một tiến trình: bump_version ở tiến trình ghi
+# không tới được các worker khác. Khi đó version chỉ sống tối đa LOCAL_VERSION_TIMEOUT giây để các
+# tiến trình còn lại tự nhận dữ liệu mới sau tối đa khoảng thời gian này.
+LOCAL_VERSION_TIMEOUT = 60
+
+# Cache trong tiến trình cho cây địa giới: {"version": ..., "tree": TreePayload}
+_local = {}
+
+
+class TreePayload:
+    """JSON đã được dựng sẵn (kèm bản gzip) của cây tỉnh -> huyện -> xã"""
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.gzip_content = gzip.compress(content)
+        self.etag = '"%s"' % hashlib.sha1(content).hexdigest()
+
+
+def get_version_timeout():
+    """Cache dùng chung (Redis) thì version không hết hạn, cache trong tiến trình thì hết hạn sau LOCAL_VERSION_TIMEOUT"""
+    return LOCAL_VERSION_TIMEOUT if isinstance(caches["default"], LocMemCache) else None
+
+
+def get_version() -> str:
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        # add() để tránh ghi đè version do tiến trình khác vừa tạo
+        if not cache.add(VERSION_CACHE_KEY, version, get_version_timeout()):
+            version = cache.get(VERSION_CACHE_KEY, version)
+    return version
+
+
+def bump_version():
+    """Gọi sau mỗi lần ghi dữ liệu địa giới để các cache / ETag cũ hết hiệu lực"""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, get_version_timeout())
+    _local.clear()
+
+
+def build_tree() -> list[dict]:
+    fields = ("code", "name", "label", "slug", "type")
+    wards_by_district = {}
+    for ward in Wards.objects.order_by("name").values(*fields, "district_id"):
+        wards_by_district.setdefault(ward.pop("district_id"), []).append(ward)
+
+    districts_by_province = {}
+    for district in Districts.objects.order_by("name").values(*fields, "province_id"):
+        district["wards"] = wards_by_district.get(district["code"], [])
+        districts_by_province.setdefault(district.pop("province_id"), []).append(district)
+
+    provinces = []
+    for province in Provinces.objects.order_by("name").values(*fields):
+        province["districts"] = districts_by_province.get(province["code"], [])
+        provinces.append(province)
+    return provinces
+
+
+def get_tree() -> TreePayload:
+    version = get_version()
+    if _local.get("version") == version:
+        return _local["tree"]
+
+    cache_key = TREE_CACHE_KEY.format(version)
+    content = cache.get(cache_key)
+    if content is None:
+        content = json.dumps(build_tree(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        cache.set(cache_key, content, REFERENCE_CACHE_TIMEOUT)
+
+    tree = TreePayload(content)
+    _local.update(version=version, tree=tree)
+    return tree
+
+
+def get_list_etag(request) -> str:
+    """ETag của API danh sách: phụ thuộc version dữ liệu và toàn bộ query của request"""
+    raw = f"{get_version()}:{request.get_full_path()}"
+    return '"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_list(etag):
+    return cache.get(LIST_CACHE_KEY.format(version=get_version(), key=etag.strip('"')))
+
+
+def set_cached_list(etag, data):
+    cache.set(LIST_CACHE_KEY.format(version=get_version(), key=etag.strip('"')), data, REFERENCE_CACHE_TIMEOUT)
+
+
+def etag_matches(request, etag) -> bool:
+    if_none_match = request.headers.get("If-None-Match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
@@ -0,0 +1,502 @@
+import json
+import re
+from dataclasses import dataclass
+from dataclasses import field
+
+import requests
+import unidecode
+from django.conf import settings
+from django.db import transaction
+
+from locations.models import Districts
+from locations.models import Provinces
+from locations.models import Wards
+from locations.reference_data import bump_version
+
+LEVELS = ("province", "district", "ward")
+BULK_UPDATE_BATCH_SIZE = 2000
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+
+def canonical(text) -> str:
+    """Chuẩn hoá tên địa danh về dạng so khớp: bỏ dấu, chữ thường, chỉ giữ a-z0-9"""
+    if not text:
+        return ""
+    return _NON_ALNUM.sub("", unidecode.unidecode(str(text)).lower())
+
+
+def load_payload(path) -> list[dict]:
+    """Đọc dữ liệu nhà vận chuyển từ file JSON (chấp nhận list hoặc response có key `data`)"""
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    return extract_rows(payload)
+
+
+def extract_rows(payload) -> list[dict]:
+    if isinstance(payload, dict):
+        payload = payload.get("data") or []
+    return list(payload or [])
+
+
+# Mã đặc biệt không khớp được theo tên: {code: (vtpost_district_id, vtpost_province_id)}
+special_district_vtpost_mapping = {
+    "318": ("60", "3"),
+    "666": ("117", "9"),
+    "654": ("525", "45"),
+    "317": ("66", "3"),
+    "602": ("586", "52"),
+    "540": ("464", "40"),
+}
+
+# {code: (vtpost_ward_id, vtpost_district_id, vtpost_province_id)}
+special_vtpost_ward_mapping = {
+    "06616": ("4158", "238", "22"),
+    "03244": ("11758", "717", "64"),
+    "19114": ("7659", "402", "35"),
+    "02902": ("3844", "222", "20"),
+    "23707": ("9006", "498", "44"),
+    "23344": ("8918", "492", "43"),
+    "04136": ("5710", "316", "30"),
+    "03460": ("5608", "310", "29"),
+    "02431": ("4246", "243", "23"),
+    "23671": ("9074", "503", "44"),
+    "03177": ("11706", "713", "64"),
+    "24700": ("1635", "114", "9"),
+    "25819": ("9801", "568", "50"),
+    "14863": ("6529", "353", "32"),
+    "24826": ("9466", "535", "46"),
+    "03454": ("5581", "308", "29"),
+    "03772": ("5739", "318", "30"),
+    "05245": ("6044", "334", "31"),
+    "25231": ("9674", "555", "48"),
+    "24079": ("8965", "495", "44"),
+    "25438": ("9617", "549", "48"),
+    "02683": ("3726", "217", "20"),
+    "13141": ("3094", "181", "16"),
+    "20707": ("8025", "426", "38"),
+    "13459": ("18477", "160", "14"),
+    "24160": ("9228", "515", "45"),
+    "25060": ("9358", "527", "46"),
+    "24397": ("9192", "514", "45"),
+    "04225": ("5831", "323", "30"),
+    "23335": ("8883", "488", "43"),
+    "03223": ("11759", "717", "64"),
+    "23536": ("8843", "485", "43"),
+    "04222": ("5673", "314", "30"),
+    "05722": ("4637", "260", "25"),
+    "24694": ("1640", "114", "9"),
+    "14896": ("6562", "355", "32"),
+    "03371": ("11681", "711", "64"),
+    "24226": ("9273", "520", "45"),
+    "00067": ("11", "1", "1"),
+    "26257": ("9866", "574", "51"),
+    "20719": ("8021", "426", "38"),
+    "20440": ("8095", "431", "38"),
+    "01096": ("3340", "194", "18"),
+    "23140": ("10160", "592", "52"),
+    "19246": ("7525", "396", "35"),
+    "30259": ("10550", "623", "55"),
+    "03226": ("11762", "717", "64"),
+    "05392": ("5866", "325", "31"),
+    "24430": ("9303", "522", "45"),
+    "24103": ("8952", "495", "44"),
+    "23800": ("9101", "505", "44"),
+    "00796": ("3432", "199", "18"),
+    "23404": ("8851", "486", "43"),
+    "09724": ("319", "15", "1"),
+    "12664": ("2907", "176", "16"),
+    "23647": ("9068", "503", "44"),
+    "03466": ("5579", "308", "29"),
+    "25117": ("9408", "530", "46"),
+    "32131": ("11540", "700", "63"),
+    "24955": ("9478", "536", "46"),
+    "03982": ("25661", "319", "30"),
+    "23395": ("8907", "490", "43"),
+    "24388": ("9199", "514", "45"),
+    "30985": ("11088", "659", "59"),
+    "24973": ("9492", "537", "46"),
+    "23929": ("8936", "494", "44"),
+    "02068": ("3874", "224", "21"),
+    "25099": ("9403", "530", "46"),
+    "03892": ("5828", "322", "30"),
+    "25907": ("9812", "569", "50"),
+    "02848": ("3782", "219", "20"),
+    "23942": ("9128", "508", "44"),
+    "23353": ("8928", "492", "43"),
+    "12538": ("2888", "175", "16"),
+    "31346": ("1533", "103", "8"),
+    "23827": ("9085", "504", "44"),
+    "23806": ("9093", "505", "44"),
+    "29143": ("10925", "650", "58"),
+    "25057": ("9360", "527", "46"),
+    "18871": ("7557", "398", "35"),
+    "12982": ("3031", "180", "16"),
+    "15037": ("6289", "343", "32"),
+    "00898": ("3285", "191", "18"),
+    "04075": ("5788", "320", "30"),
+    "30502": ("10742", "638", "56"),
+    "01978": ("3949", "228", "21"),
+    "24031": ("9120", "507", "44"),
+    "16763": ("6826", "369", "33"),
+    "26308": ("9904", "576", "51"),
+    "24850": ("9353", "526", "46"),
+    "31115": ("11232", "672", "59"),
+    "23413": ("8854", "486", "43"),
+    "24274": ("9263", "518", "45"),
+    "23794": ("9091", "505", "44"),
+    "23660": ("9073", "503", "44"),
+    "22093": ("8649", "471", "41"),
+    "24727": ("1649", "115", "9"),
+    "24065": ("9154", "510", "44"),
+    "23938": ("8938", "494", "44"),
+    "23317": ("8886", "488", "43"),
+    "02836": ("3811", "220", "20"),
+    "20458": ("8094", "431", "38"),
+    "21631": ("8484", "460", "40"),
+    "06553": ("4099", "236", "22"),
+    "03010": ("3688", "215", "20"),
+    "29218": ("11018", "655", "58"),
+    "24064": ("9153", "510", "44"),
+    "14848": ("6530", "353", "32"),
+    "24949": ("9477", "536", "46"),
+    "06313": ("3984", "231", "22"),
+    "29929": ("10501", "619", "55"),
+    "24289": ("9259", "518", "45"),
+    "24928": ("9481", "536", "46"),
+    "09781": ("305", "15", "1"),
+    "25398": ("9647", "552", "48"),
+    "03697": ("5629", "312", "30"),
+    "23535": ("8930", "493", "43"),
+    "24640": ("1631", "113", "9"),
+    "01102": ("3342", "194", "18"),
+    "03391": ("5535", "305", "29"),
+    "19477": ("7728", "406", "36"),
+    "20701": ("8026", "426", "38"),
+    "01147": ("3339", "194", "18"),
+    "31018": ("11233", "673", "59"),
+    "02908": ("3838", "222", "20"),
+    "28159": ("10317", "606", "54"),
+    "23668": ("9067", "503", "44"),
+    "24049": ("8970", "496", "44"),
+    "01888": ("3953", "229", "21"),
+    "03784": ("5757", "318", "30"),
+    "23824": ("9077", "504", "44"),
+    "00811": ("3435", "199", "18"),
+    "03574": ("5526", "305", "29"),
+    "24514": ("9335", "525", "45"),
+    "24718": ("1647", "115", "9"),
+    "01290": ("3577", "208", "19"),
+    "23650": ("9070", "503", "44"),
+    "16777": ("6785", "366", "33"),
+    "01561": ("3485", "202", "19"),
+    "01720": ("3596", "209", "19"),
+    "24412": ("9306", "522", "45"),
+    "19768": ("7968", "422", "37"),
+    "02302": ("4311", "245", "23"),
+    "02473": ("4251", "243", "23"),
+    "05299": ("5987", "332", "31"),
+    "05335": ("6013", "332", "31"),
+    "10282": ("537", "27", "1"),
+    "19603": ("7737", "408", "36"),
+    "19756": ("7953", "422", "37"),
+    "30265": ("10552", "623", "55"),
+    "24505": ("9334", "525", "45"),
+}
+
+
+@dataclass
+class LevelSpec:
+    """Mô tả cách đọc dữ liệu 1 cấp địa giới của nhà vận chuyển và các field cần ghi ở local"""
+
+    id_key: str
+    name_key: str
+    parent_key: str = None
+    alias_key: str = None
+    # Field local lưu id của nhà vận chuyển cho chính cấp này và cho cấp cha
+    id_field: str = None
+    parent_field: str = None
+    province_field: str = None
+    # {code: {field: value}} - overrides được ưu tiên trước so khớp tên, fallbacks dùng khi không khớp
+    overrides: dict = field(default_factory=dict)
+    fallbacks: dict = field(default_factory=dict)
+
+
+@dataclass
+class Provider:
+    name: str
+    levels: dict
+    urls: dict = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+
+    def fetch(self, level, parents=None) -> list[dict]:
+        url = self.urls.get(level)
+        if not url:
+            raise ValueError(f"{self.name} không hỗ trợ tải dữ liệu {level} online, hãy dùng file JSON")
+        if "{parent}" not in url:
+            response = requests.get(url, headers=self.headers, timeout=60)
+            response.raise_for_status()
+            return extract_rows(response.json())
+        rows = []
+        for parent_id in parents or ():
+            response = requests.get(url.format(parent=parent_id), headers=self.headers, timeout=60)
+            response.raise_for_status()
+            rows.extend(extract_rows(response.json()))
+        return rows
+
+
+VTPOST = Provider(
+    name="vtpost",
+    urls={
+        "province": "https://partner.viettelpost.vn/v2/categories/listProvinceById?provinceId=0",
+        "district": "https://partner.viettelpost.vn/v2/categories/listDistrict?provinceId=-1",
+        "ward": "https://partner.viettelpost.vn/v2/categories/listWards?districtId=-1",
+    },
+    levels={
+        "province": LevelSpec(id_key="PROVINCE_ID", name_key="PROVINCE_NAME", id_field="vtpost_province_id"),
+        "district": LevelSpec(
+            id_key="DISTRICT_ID",
+            name_key="DISTRICT_NAME",
+            parent_key="PROVINCE_ID",
+            id_field="vtpost_district_id",
+            province_field="vtpost_province_id",
+            overrides={
+                code: {"vtpost_district_id": district_id, "vtpost_province_id": province_id}
+                for code, (district_id, province_id) in special_district_vtpost_mapping.items()
+            },
+        ),
+        "ward": LevelSpec(
+            id_key="WARDS_ID",
+            name_key="WARDS_NAME",
+            parent_key="DISTRICT_ID",
+            id_field="vtpost_ward_id",
+            parent_field="vtpost_district_id",
+            province_field="vtpost_province_id",
+            fallbacks={
+                code: {"vtpost_ward_id": ward_id, "vtpost_district_id": district_id, "vtpost_province_id": province_id}
+                for code, (ward_id, district_id, province_id) in special_vtpost_ward_mapping.items()
+            },
+        ),
+    },
+)
+
+GHN = Provider(
+    name="ghn",
+    urls={
+        "province": "https://online-gateway.ghn.vn/shiip/public-api/master-data/province",
+        "district": "https://online-gateway.ghn.vn/shiip/public-api/master-data/district",
+        "ward": "https://online-gateway.ghn.vn/shiip/public-api/master-data/ward?district_id={parent}",
+    },
+    headers={"Token": getattr(settings, "GHN_API_TOKEN", "")},
+    levels={
+        "province": LevelSpec(id_key="ProvinceID", name_key="ProvinceName", alias_key="NameExtension", id_field="ghn_province_id"),
+        "district": LevelSpec(
+            id_key="DistrictID",
+            name_key="DistrictName",
+            parent_key="ProvinceID",
+            alias_key="NameExtension",
+            id_field="ghn_district_id",
+            province_field="ghn_province_id",
+        ),
+        "ward": LevelSpec(
+            id_key="WardCode",
+            name_key="WardName",
+            parent_key="DistrictID",
+            alias_key="NameExtension",
+            id_field="ghn_ward_id",
+            parent_field="ghn_district_id",
+            province_field="ghn_province_id",
+        ),
+    },
+)
+
+PROVIDERS = {provider.name: provider for provider in (VTPOST, GHN)}
+
+
+# Các biến thể tên local, theo thứ tự ưu tiên
+DISTRICT_PREFIXES = ("huyen", "thixa", "thanhpho", "quan")
+WARD_PREFIXES = ("phuong", "xa", "thitran", "tt", "kcn", "p")
+ROMAN_REPLACEMENTS = (
+    ("I", "1"),
+    ("II", "2"),
+    ("III", "3"),
+    ("IV", "4"),
+    ("V", "5"),
+    ("VI", "6"),
+    ("VII", "7"),
+    ("1", "I"),
+    ("2", "II"),
+    ("3", "III"),
+)
+
+
+def province_candidates(province):
+    yield canonical(province.slug)
+    yield canonical(province.name)
+    yield canonical(province.label)
+
+
+def district_candidates(district):
+    yield canonical(district.label)
+    name = canonical(district.name)
+    for prefix in DISTRICT_PREFIXES:
+        yield prefix + name
+    yield name
+
+
+def ward_candidates(ward):
+    ward_type = canonical(ward.type)
+    name = canonical(ward.name)
+    yield ward_type + name
+    if ward.name and ward.name[0] == "0":
+        yield ward_type + canonical(ward.name[1:])
+    yield name
+    for prefix in WARD_PREFIXES:
+        yield prefix + name
+    for old, new in ROMAN_REPLACEMENTS:
+        yield ward_type + canonical((ward.name or "").replace(old, new))
+    yield name.replace("i", "y")
+    yield name.replace("y", "i")
+
+
+@dataclass
+class LevelResult:
+    level: str
+    total: int = 0
+    matched: list = field(default_factory=list)
+    unmatched: list = field(default_factory=list)
+    unused_provider_rows: int = 0
+
+    def summary(self) -> dict:
+        return {
+            "level": self.level,
+            "total": self.total,
+            "matched": len(self.matched),
+            "unmatched": len(self.unmatched),
+            "unused_provider_rows": self.unused_provider_rows,
+        }
+
+
+class CarrierLocationSync:
+    """
+    Đồng bộ mã địa giới của nhà vận chuyển vào Provinces / Districts / Wards.
+    Mỗi phía chỉ được chuẩn hoá một lần thành dict index theo tên canonical (kèm id cấp cha),
+    nên việc so khớp là O(N + M) thay vì so từng cặp.
+    """
+
+    levels = {
+        "province": (Provinces, province_candidates),
+        "district": (Districts, district_candidates),
+        "ward": (Wards, ward_candidates),
+    }
+
+    def __init__(self, provider: Provider, payloads: dict = None):
+        self.provider = provider
+        self.payloads = dict(payloads or {})
+        # {local code: provider id} của cấp vừa đồng bộ, dùng làm khoá cha cho cấp con
+        self.resolved = {"province": {}, "district": {}}
+
+    def get_rows(self, level):
+        if level not in self.payloads:
+            parents = None
+            if level == "ward":
+                district_field = self.provider.levels["district"].id_field
+                parents = set(self.resolved["district"].values()) or set(
+                    Districts.objects.filter(**{f"{district_field}__isnull": False}).values_list(district_field, flat=True)
+                )
+            self.payloads[level] = self.provider.fetch(level, parents=parents)
+        return self.payloads[level]
+
+    @staticmethod
+    def build_index(rows, spec: LevelSpec) -> dict:
+        index = {}
+        for row in rows:
+            parent = str(row.get(spec.parent_key, "")) if spec.parent_key else ""
+            names = [row.get(spec.name_key)]
+            if spec.alias_key:
+                names.extend(row.get(spec.alias_key) or [])
+            for name in names:
+                key = canonical(name)
+                if key:
+                    index.setdefault((key, parent), row)
+        return index
+
+    def get_queryset(self, level):
+        model = self.levels[level][0]
+        if level == "province":
+            return model.objects.all()
+        return model.objects.select_related("district" if level == "ward" else "province")
+
+    def parent_id(self, level, instance):
+        """Id nhà vận chuyển của cấp cha, ưu tiên kết quả vừa đồng bộ rồi mới tới giá trị đang lưu"""
+        province_field = self.provider.levels["province"].id_field
+        district_field = self.provider.levels["district"].id_field
+        if level == "district":
+            value = self.resolved["province"].get(instance.province_id)
+            if value is None and instance.province:
+                value = getattr(instance.province, province_field)
+        else:
+            value = self.resolved["district"].get(instance.district_id)
+            if value is None and instance.district:
+                value = getattr(instance.district, district_field)
+        return "" if value is None else str(value)
+
+    def province_id(self, level, instance, row):
+        spec = self.provider.levels[level]
+        if level == "district":
+            return row.get(spec.parent_key)
+        province_field = self.provider.levels["province"].id_field
+        if instance.district:
+            return self.resolved["province"].get(instance.district.province_id) or getattr(instance.district, province_field)
+        return None
+
+    def match(self, level) -> LevelResult:
+        spec = self.provider.levels[level]
+        model, candidates = self.levels[level]
+        index = self.build_index(self.get_rows(level), spec)
+        result = LevelResult(level=level)
+        used = set()
+
+        for instance in self.get_queryset(level):
+            result.total += 1
+            code = str(instance.code)
+            values = spec.overrides.get(code)
+            if values is None:
+                parent = self.parent_id(level, instance) if spec.parent_key else ""
+                row = next((index[key] for key in ((c, parent) for c in candidates(instance)) if key in index), None)
+                if row is not None:
+                    used.add(id(row))
+                    values = {spec.id_field: row[spec.id_key]}
+                    if spec.parent_field:
+                        values[spec.parent_field] = row[spec.parent_key]
+                    if spec.province_field:
+                        values[spec.province_field] = self.province_id(level, instance, row)
+                else:
+                    values = spec.fallbacks.get(code)
+
+            if values is None:
+                result.unmatched.append({"code": code, "label": instance.label or instance.name})
+                continue
+
+            for field_name, value in values.items():
+                setattr(instance, field_name, value)
+            if level in self.resolved:
+                self.resolved[level][instance.code] = values[spec.id_field]
+            result.matched.append(instance)
+
+        result.unused_provider_rows = len({id(row) for row in index.values()} - used)
+        return result
+
+    def update_fields(self, level):
+        spec = self.provider.levels[level]
+        return [name for name in (spec.id_field, spec.parent_field, spec.province_field) if name]
+
+    def run(self, levels=LEVELS, commit=True) -> list[LevelResult]:
+        results = [self.match(level) for level in LEVELS if level in levels]
+        if commit:
+            with transaction.atomic():
+                for result in results:
+                    model = self.levels[result.level][0]
+                    model.objects.bulk_update(result.matched, fields=self.update_fields(result.level), batch_size=BULK_UPDATE_BATCH_SIZE)
+                transaction.on_commit(bump_version)
+        return results
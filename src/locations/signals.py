@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from locations.models import Districts
+from locations.models import Provinces
+from locations.models import Wards
+from locations.reference_data import bump_version
+
+
+@receiver(post_save, sender=Provinces)
+@receiver(post_save, sender=Districts)
+@receiver(post_save, sender=Wards)
+@receiver(post_delete, sender=Provinces)
+@receiver(post_delete, sender=Districts)
+@receiver(post_delete, sender=Wards)
+def bump_location_version(sender, instance, **kwargs):
+    transaction.on_commit(bump_version)
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from locations.enums import DistrictType
+from locations.enums import WardType
+from locations.models import Districts
+from locations.models import Provinces
+from locations.models import Wards
+from locations.services.carrier_sync import VTPOST
+from locations.services.carrier_sync import CarrierLocationSync
+from locations.services.carrier_sync import canonical
+
+pytestmark = pytest.mark.django_db
+
+
+def create_locations(ward_count=2):
+    province = Provinces.objects.create(code="79", name="Hồ Chí Minh", slug="ho-chi-minh", label="Thành phố Hồ Chí Minh")
+    district = Districts.objects.create(code="760", name="1", slug="1", label="Quận 1", type=DistrictType.DISTRICT, province=province)
+    wards = [
+        Wards.objects.create(code=f"2673{index}", name=f"Phố {index}", slug=f"pho-{index}", type=WardType.WARD, district=district)
+        for index in range(ward_count)
+    ]
+    return province, district, wards
+
+
+def vtpost_payloads(ward_count=2):
+    return {
+        "province": [{"PROVINCE_ID": 2, "PROVINCE_NAME": "Hồ Chí Minh"}, {"PROVINCE_ID": 1, "PROVINCE_NAME": "Hà Nội"}],
+        "district": [
+            {"DISTRICT_ID": 43, "DISTRICT_NAME": "QUẬN 1", "PROVINCE_ID": 2},
+            # Cùng tên nhưng khác tỉnh: không được khớp
+            {"DISTRICT_ID": 99, "DISTRICT_NAME": "Quận 1", "PROVINCE_ID": 1},
+        ],
+        "ward": [{"WARDS_ID": 500 + index, "WARDS_NAME": f"Phường Phố {index}", "DISTRICT_ID": 43} for index in range(ward_count)],
+    }
+
+
+def test_canonical_strips_accents_case_and_punctuation():
+    assert canonical("Thành phố Hồ Chí Minh") == "thanhphohochiminh"
+    assert canonical("Phường 1-A") == "phuong1a"
+    assert canonical(None) == ""
+
+
+def test_sync_matches_each_level_by_parent():
+    province, district, wards = create_locations()
+
+    results = CarrierLocationSync(VTPOST, vtpost_payloads()).run()
+
+    assert [result.summary() for result in results] == [
+        {"level": "province", "total": 1, "matched": 1, "unmatched": 0, "unused_provider_rows": 1},
+        {"level": "district", "total": 1, "matched": 1, "unmatched": 0, "unused_provider_rows": 1},
+        {"level": "ward", "total": 2, "matched": 2, "unmatched": 0, "unused_provider_rows": 0},
+    ]
+    province.refresh_from_db()
+    district.refresh_from_db()
+    assert province.vtpost_province_id == "2"
+    assert (district.vtpost_district_id, district.vtpost_province_id) == ("43", "2")
+    assert [(ward.vtpost_ward_id, ward.vtpost_district_id, ward.vtpost_province_id) for ward in Wards.objects.order_by("code")] == [
+        ("500", "43", "2"),
+        ("501", "43", "2"),
+    ]
+
+
+def test_sync_reports_unmatched_and_applies_overrides():
+    create_locations()
+    Districts.objects.create(code="318", name="Không có", slug="khong-co", label="Huyện Không Có")
+    Wards.objects.create(code="06616", name="Không có", slug="khong-co", type=WardType.COMMUNE)
+    Wards.objects.create(code="99999", name="Lạ", slug="la", type=WardType.COMMUNE)
+
+    results = {result.level: result for result in CarrierLocationSync(VTPOST, vtpost_payloads()).run()}
+
+    assert Districts.objects.get(code="318").vtpost_district_id == "60"
+    assert Wards.objects.get(code="06616").vtpost_ward_id == "4158"
+    assert results["ward"].unmatched == [{"code": "99999", "label": "Lạ"}]
+
+
+def test_dry_run_does_not_write():
+    province, _, _ = create_locations()
+
+    results = CarrierLocationSync(VTPOST, vtpost_payloads()).run(commit=False)
+
+    assert results[0].matched[0].vtpost_province_id == 2
+    province.refresh_from_db()
+    assert province.vtpost_province_id is None
+
+
+def test_sync_query_count_does_not_grow_with_rows():
+    def count_queries(ward_count):
+        Wards.objects.all().delete()
+        Districts.objects.all().delete()
+        Provinces.objects.all().delete()
+        create_locations(ward_count)
+        with CaptureQueriesContext(connection) as queries:
+            CarrierLocationSync(VTPOST, vtpost_payloads(ward_count)).run()
+        return len(queries)
+
+    assert count_queries(2) == count_queries(20)
+    assert Wards.objects.filter(vtpost_ward_id__isnull=False).count() == 20
+
+
+def test_command_reads_payloads_from_json_files(tmp_path, capsys):
+    create_locations()
+    paths = {}
+    for level, rows in vtpost_payloads().items():
+        paths[level] = tmp_path / f"{level}.json"
+        # File có thể là response của API (dữ liệu trong key `data`)
+        paths[level].write_text(json.dumps({"data": rows}), encoding="utf-8")
+
+    call_command(
+        "sync_carrier_locations",
+        "vtpost",
+        "--provinces",
+        str(paths["province"]),
+        "--districts",
+        str(paths["district"]),
+        "--wards",
+        str(paths["ward"]),
+    )
+
+    assert "'matched': 2" in capsys.readouterr().out
+    assert Wards.objects.filter(vtpost_ward_id__isnull=False).count() == 2
@@ -0,0 +1,100 @@
+import gzip
+import json
+
+import pytest
+from django.core.cache import cache
+
+from locations import reference_data
+from locations.enums import DistrictType
+from locations.enums import WardType
+from locations.models import Districts
+from locations.models import Provinces
+from locations.models import Wards
+
+pytestmark = pytest.mark.django_db
+
+TREE_URL = "/api/locations/tree/"
+PROVINCES_URL = "/api/locations/provinces/"
+
+
+@pytest.fixture(autouse=True)
+def clear_reference_cache():
+    cache.clear()
+    reference_data._local.clear()
+    yield
+    cache.clear()
+    reference_data._local.clear()
+
+
+@pytest.fixture
+def locations(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        province = Provinces.objects.create(code="79", name="Hồ Chí Minh", slug="ho-chi-minh", label="Thành phố Hồ Chí Minh")
+        district = Districts.objects.create(code="760", name="1", slug="1", label="Quận 1", type=DistrictType.DISTRICT, province=province)
+        Wards.objects.create(code="26734", name="Bến Nghé", slug="ben-nghe", type=WardType.WARD, district=district)
+    return province
+
+
+@pytest.fixture
+def client(api_client, user):
+    api_client.force_authenticate(user)
+    return api_client
+
+
+def test_tree_nests_wards_under_districts_under_provinces(client, locations):
+    response = client.get(TREE_URL)
+
+    assert response.status_code == 200
+    tree = json.loads(response.content)
+    assert [province["code"] for province in tree] == ["79"]
+    assert [district["code"] for district in tree[0]["districts"]] == ["760"]
+    assert [ward["code"] for ward in tree[0]["districts"][0]["wards"]] == ["26734"]
+    assert response["ETag"]
+    assert "Accept-Encoding" in response["Vary"]
+
+
+def test_tree_returns_304_for_matching_etag_and_gzip_when_accepted(client, locations):
+    etag = client.get(TREE_URL)["ETag"]
+
+    assert client.get(TREE_URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    response = client.get(TREE_URL, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.content))[0]["code"] == "79"
+
+
+def test_location_write_bumps_version_and_invalidates_etags(client, locations, django_capture_on_commit_callbacks):
+    tree_etag = client.get(TREE_URL)["ETag"]
+    list_etag = client.get(PROVINCES_URL)["ETag"]
+    assert client.get(PROVINCES_URL, HTTP_IF_NONE_MATCH=list_etag).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        locations.label = "TP. Hồ Chí Minh"
+        locations.save()
+
+    response = client.get(TREE_URL, HTTP_IF_NONE_MATCH=tree_etag)
+    assert response.status_code == 200
+    assert json.loads(response.content)[0]["label"] == "TP. Hồ Chí Minh"
+    assert client.get(PROVINCES_URL, HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+
+def test_list_is_served_from_cache_until_version_changes(client, locations):
+    first = client.get(PROVINCES_URL)
+    # Chỉ Provinces.objects.update() (không qua signal) nên version không đổi, danh sách vẫn lấy từ cache
+    Provinces.objects.filter(pk=locations.pk).update(label="Đổi tên")
+
+    second = client.get(PROVINCES_URL)
+
+    assert second.data == first.data
+    reference_data.bump_version()
+    assert client.get(PROVINCES_URL).data != first.data
+
+
+def test_version_expires_when_cache_is_process_local(monkeypatch):
+    calls = []
+    monkeypatch.setattr(reference_data.cache, "set", lambda key, value, timeout: calls.append((key, timeout)))
+
+    reference_data.bump_version()
+
+    # Bộ test chạy với LocMemCache: version phải có hạn để các tiến trình khác nhận thay đổi
+    assert calls == [(reference_data.VERSION_CACHE_KEY, reference_data.LOCAL_VERSION_TIMEOUT)]
@@ -16,13 +16,14 @@ from products.models import Products
 from products.models import ProductsVariants
 from users.models import Department
 from users.models import User
+from utils.filters import LocalDateRangeFilter
 
 
 class OrdersFilterset(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
-    completed_from = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="gte")
-    completed_to = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    completed_from = LocalDateRangeFilter(field_name="complete_time", lookup_expr="gte")
+    completed_to = LocalDateRangeFilter(field_name="complete_time", lookup_expr="lte")
     variant = django_filters.ModelMultipleChoiceFilter(field_name="line_items__variant", queryset=ProductsVariants.objects.all())
     status = django_filters.MultipleChoiceFilter(choices=OrderStatus.choices())
     shipping_isnull = django_filters.BooleanFilter(field_name="shipping", lookup_expr="isnull")
@@ -60,10 +61,10 @@ class OrdersFilterset(django_filters.FilterSet):
 
 
 class OrdersMobileFilterset(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
-    completed_from = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="gte")
-    completed_to = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    completed_from = LocalDateRangeFilter(field_name="complete_time", lookup_expr="gte")
+    completed_to = LocalDateRangeFilter(field_name="complete_time", lookup_expr="lte")
     variant = django_filters.ModelMultipleChoiceFilter(field_name="line_items__variant", queryset=ProductsVariants.objects.all())
     status = django_filters.MultipleChoiceFilter(choices=OrderStatus.choices())
 
@@ -78,10 +79,10 @@ class OrdersMobileFilterset(django_filters.FilterSet):
 
 
 class OrdersReportsFilterset(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
-    complete_time_from = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="gte")
-    complete_time_to = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    complete_time_from = LocalDateRangeFilter(field_name="complete_time", lookup_expr="gte")
+    complete_time_to = LocalDateRangeFilter(field_name="complete_time", lookup_expr="lte")
     user_id = django_filters.ModelMultipleChoiceFilter(field_name="modified_by", queryset=User.objects.all())
 
     class Meta:
@@ -91,8 +92,8 @@ class OrdersReportsFilterset(django_filters.FilterSet):
 
 
 class OrdersReportByProductFilterset(django_filters.FilterSet):
-    complete_time_from = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="gte")
-    complete_time_to = django_filters.DateFilter(field_name="complete_time__date", lookup_expr="lte")
+    complete_time_from = LocalDateRangeFilter(field_name="complete_time", lookup_expr="gte")
+    complete_time_to = LocalDateRangeFilter(field_name="complete_time", lookup_expr="lte")
 
     province = django_filters.ModelMultipleChoiceFilter(
         field_name="address_shipping__ward__district__province__label", queryset=Provinces.objects.all(), label="province"
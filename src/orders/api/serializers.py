@@ -31,12 +31,13 @@ from products.api.serializers import ProductVariantRetrieveSerializer
 from products.enums import ProductVariantStatus
 from products.enums import ProductVariantType
 from products.models import ProductsVariants
+from promotions.api.serializers.fields import PromotionOrderCatalogueField
+from promotions.api.serializers.fields import PromotionVariantCatalogueField
 from promotions.api.serializers.promotion_orders import PromotionOrderReadOneSerializer
 from promotions.api.serializers.promotion_variants import PromotionVariantReadOnceSerializer
-from promotions.enums import PromotionStatus
+from promotions.catalogue import CataloguePromotionOrder
+from promotions.catalogue import CataloguePromotionVariant
 from promotions.enums import PromotionVariantType
-from promotions.models import PromotionOrder
-from promotions.models import PromotionVariant
 from users.api.serializers import UserReadBaseInfoSerializer
 from utils.reports import BindingExprEnum
 from warehouses.models import WarehouseSheetImportExport
@@ -135,9 +136,7 @@ class OrdersPromotionSerializer(serializers.ModelSerializer):
 
 
 class OrdersPromotionCreateSerializer(serializers.ModelSerializer):
-    promotion_order_id = serializers.PrimaryKeyRelatedField(
-        queryset=PromotionOrder.objects.filter(is_soft_delete=False, status=PromotionStatus.IN_PROGRESS.value), required=True
-    )
+    promotion_order_id = PromotionOrderCatalogueField(required=True)
 
     class Meta:
         model = OrdersPromotion
@@ -211,9 +210,7 @@ class OrdersVariantsPromotionReadDetailSerializer(serializers.ModelSerializer):
 
 class OrdersVariantsPromotionsCreateSerializer(serializers.ModelSerializer):
     items_promotion = OrdersItemsPromotionCreateSerializer(many=True, required=False)
-    promotion_variant_id = serializers.PrimaryKeyRelatedField(
-        queryset=PromotionVariant.objects.filter(status=PromotionStatus.IN_PROGRESS.value, is_soft_delete=False)
-    )
+    promotion_variant_id = PromotionVariantCatalogueField()
 
     class Meta:
         model = OrderVariantsPromotion
@@ -306,12 +303,13 @@ class OrdersItemsCreateSerializer(serializers.ModelSerializer):
         quantity: int = attrs.get("quantity")
         total_price_promotion = 0
         promotion_variant_ids = []
+        now = timezone.now()
         # Cho phép tổng giá bán nhập vào nhỏ hơn giá bán của sản phẩm
         if (not attrs["is_promo_sale"]) and (attrs.get("price_total") < (variant.sale_price or 0) * quantity):
             raise serializers.ValidationError({"variant_id": variant.id, "message": "Tổng giá của line item chưa đúng"})
         # Áp dụng khuyến mãi
         for promotion in attrs.get("promotions", []):
-            promotion_variant = promotion.get("promotion_variant_id")
+            promotion_variant: CataloguePromotionVariant = promotion.get("promotion_variant_id")
             # Khuyến mãi sử dụng nhiều lần
             if promotion_variant.id in promotion_variant_ids:
                 raise serializers.ValidationError(
@@ -324,8 +322,13 @@ class OrdersItemsCreateSerializer(serializers.ModelSerializer):
                         ]
                     }
                 )
+            # Khuyến mãi đã hết hạn
+            if promotion_variant.is_expired(now):
+                raise serializers.ValidationError(
+                    {"promotions": [{"promotion_variant_id": promotion_variant.id, "message": "Khuyến mãi đã hết hạn"}]}
+                )
             # Khuyến mãi không phải của variant
-            if promotion_variant.variant.id != variant.id:
+            if promotion_variant.variant_id != variant.id:
                 raise serializers.ValidationError(
                     {
                         "promotions": [
@@ -391,9 +394,7 @@ class OrdersItemsCreateSerializer(serializers.ModelSerializer):
                     )
                 # Các sản phẩm được tặng
                 for item in items_promotion:
-                    promotion_variant_other = promotion_variant.promotion_variant_other_variant.filter(
-                        variant_id=item.get("variant_id")
-                    ).first()
+                    promotion_variant_other = promotion_variant.gift(item.get("variant_id").id)
                     # Sản phẩm tặng đã chọn không nằm trong danh sách khuyến mãi
                     if not promotion_variant_other:
                         raise serializers.ValidationError(
@@ -406,7 +407,9 @@ class OrdersItemsCreateSerializer(serializers.ModelSerializer):
                                 ]
                             }
                         )
-                    if item.get("quantity") > promotion_variant_other.requirement_max_quantity:
+                    if promotion_variant_other.requirement_max_quantity is not None and (
+                        item.get("quantity") > promotion_variant_other.requirement_max_quantity
+                    ):
                         raise serializers.ValidationError(
                             {
                                 "promotions": [
@@ -572,8 +575,12 @@ class OrdersCreateSerializer(serializers.ModelSerializer):
     def validate_promotions(self, promotions):
         price_total_variant_actual = self.initial_data.get("price_total_variant_actual")
         promotion_ids = []
+        now = timezone.now()
         for promotion in promotions:
-            promotion_order = promotion.get("promotion_order_id")
+            promotion_order: CataloguePromotionOrder = promotion.get("promotion_order_id")
+            # Khuyến mãi đã hết hạn
+            if promotion_order.is_expired(now):
+                raise serializers.ValidationError({"promotion_id": promotion_order.id, "message": "Khuyến mãi đã hết hạn"})
             rq_min_total_order_apply = promotion_order.requirement_min_total_order_apply
             # Giá trị đơn hàng tối thiểu để sử dụng khuyến mãi
             if rq_min_total_order_apply and rq_min_total_order_apply > price_total_variant_actual:
@@ -921,6 +928,8 @@ class ConfirmationLogSerializer(serializers.ModelSerializer):
         return representation
 
     def get_order_id(self, obj):
+        if hasattr(obj, "order_uuid"):
+            return str(obj.order_uuid) if obj.order_uuid else None
         order = Orders.objects.filter(order_key=obj.order_key).first()
 
         if not order:
@@ -6,6 +6,9 @@ import pandas as pd
 from django.core.files.base import ContentFile
 from django.db import transaction
 from django.db.models import Count
+from django.db.models import Min
+from django.db.models import OuterRef
+from django.db.models import Subquery
 from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
@@ -24,6 +27,8 @@ from rest_framework.views import APIView
 from rest_framework.views import Response
 
 from core.pagination import ReportWithTotalValuePagination
+from core.views import ExportMixin
+from core.views import ReplicaReadMixin
 from customers.api.views import update_customer_rank
 from files.models import Images
 from files.models import ImageTypes
@@ -75,8 +80,11 @@ from products.enums import ProductVariantType
 from users.activity_log import ActivityLogMixin
 from users.api.serializers import UserReadBaseInfoSerializer
 from users.models import User
-from utils.basic import data_sortby
+from utils.dates import local_day_end
+from utils.dates import local_day_start
 from utils.enums import SequenceType
+from utils.export import iter_queryset_chunks
+from utils.report_result import ReportResult
 from utils.reports import PivotReportCompare
 from utils.serializers import PassSerializer
 from warehouses.models import SequenceIdentity
@@ -368,7 +376,7 @@ class OrdersViewset(
         return variant_items_promotion
 
 
-class OrdersMobileViewset(mixins.ListModelMixin, viewsets.GenericViewSet):
+class OrdersMobileViewset(ReplicaReadMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     http_method_names = ("get",)
     queryset = Orders.objects.prefetch_related("line_items", "line_items__variant", "line_items__variant__images").all()
     filter_backends = (filters.SearchFilter, filters.OrderingFilter, django_filters.DjangoFilterBackend)
@@ -394,7 +402,7 @@ class OrderHistoryList(viewsets.generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class OrdersPivotReportAPIView(viewsets.generics.ListAPIView):
+class OrdersPivotReportAPIView(ReplicaReadMixin, viewsets.generics.ListAPIView):
     http_method_names = ("get",)
     queryset = Orders.objects.all()
     filter_backends = (django_filters.DjangoFilterBackend,)
@@ -404,17 +412,20 @@ class OrdersPivotReportAPIView(viewsets.generics.ListAPIView):
 
     @swagger_auto_schema(operation_summary="Báo cáo tổng hợp đơn hàng", query_serializer=OrdersReportPivotParams)
     def get(self, request, *args, **kwargs):
-        params = OrdersReportPivotParams(data=request.query_params)
+        return response.Response(data=self.get_report_data())
+
+    def get_report_data(self):
+        params = OrdersReportPivotParams(data=self.request.query_params)
         params.is_valid(raise_exception=True)
         queryset = self.filter_queryset(self.get_queryset())
         try:
             pivot_table = OrdersReportPivot(queryset=queryset, **params.validated_data)
         except (ValueError, Exception) as err:
             raise serializers.ValidationError(str(err))
-        return response.Response(data={"count": len(pivot_table.result), "results": pivot_table.result})
+        return {"count": len(pivot_table.result), "results": pivot_table.result}
 
 
-class OrdersPivotReportCompareAPIView(views.APIView):
+class OrdersPivotReportCompareAPIView(ReplicaReadMixin, views.APIView):
     http_method_names = ("get",)
 
     @swagger_auto_schema(
@@ -423,28 +434,27 @@ class OrdersPivotReportCompareAPIView(views.APIView):
         responses={200: OrdersReportPivotCompareResponse},
     )
     def get(self, request, *args, **kwargs):
-        srl = OrdersReportPivotCompareParams(data=request.query_params)
+        return response.Response(data=self.get_report_data())
+
+    def get_report_data(self):
+        srl = OrdersReportPivotCompareParams(data=self.request.query_params)
         srl.is_valid(raise_exception=True)
         srl_data = srl.validated_data
-        first_pivot_report = OrdersReportPivot(
-            queryset=Orders.objects.filter(created__date__gte=srl_data.get("created_from"), created__date__lte=srl_data.get("created_to")),
-            **srl_data,
-        )
-        second_pivot_report = OrdersReportPivot(
-            queryset=Orders.objects.filter(
-                created__date__gte=srl_data.get("created_from_cp"), created__date__lte=srl_data.get("created_to_cp")
+        compare_inst = PivotReportCompare.from_querysets(
+            OrdersReportPivot,
+            first_queryset=Orders.objects.filter(
+                created__gte=local_day_start(srl_data.get("created_from")), created__lt=local_day_end(srl_data.get("created_to"))
+            ),
+            second_queryset=Orders.objects.filter(
+                created__gte=local_day_start(srl_data.get("created_from_cp")),
+                created__lt=local_day_end(srl_data.get("created_to_cp")),
             ),
-            **srl_data,
-        )
-        compare_inst = PivotReportCompare(
             first_created_date=[srl_data.get("created_from"), srl_data.get("created_to")],
             second_created_date=[srl_data.get("created_from_cp"), srl_data.get("created_to_cp")],
-            first_inst=first_pivot_report,
-            second_inst=second_pivot_report,
-            dimensions=first_pivot_report._get_dimension_names(),
+            **srl_data,
         )
         compare_result = compare_inst.map_compare()
-        return response.Response(data={"count": len(compare_result), "results": compare_result})
+        return {"count": len(compare_result), "results": compare_result}
 
 
 class OrdersPaymentsViewset(mixins.UpdateModelMixin, viewsets.GenericViewSet):
@@ -546,7 +556,7 @@ class PaymentsAuditUploadView(views.APIView):
         return response.Response(data={"status": "success", "msg": f"Updated {last_row} payments"}, status=200)
 
 
-class OrderItemDetailReportListView(generics.GenericAPIView):
+class OrderItemDetailReportListView(ReplicaReadMixin, ExportMixin, generics.GenericAPIView):
     serializer_class = OrderItemDetailReportSerializer
     filterset_class = OrdersFilterset
     filter_backends = [
@@ -565,14 +575,24 @@ class OrderItemDetailReportListView(generics.GenericAPIView):
     ]
     queryset = Orders.objects.all()
 
-    def get(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        data = order_detail.list_order_item(queryset, **self.request.query_params)
-        page = self.paginate_queryset(data)
+    export_file_name = "order_item_detail"
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_report_data())
         return self.get_paginated_response(page)
 
+    def get_report_data(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        return order_detail.list_order_item(queryset, **self.request.query_params)
 
-class OrderDetailReportListView(generics.GenericAPIView):
+    def get_export_rows(self):
+        # Báo cáo được tính theo từng đơn nên có thể tính lần lượt trên từng nhóm đơn hàng
+        queryset = self.filter_queryset(self.get_queryset())
+        for orders in iter_queryset_chunks(queryset, chunk_size=self.export_chunk_size):
+            yield from order_detail.list_order_item(orders, **self.request.query_params)
+
+
+class OrderDetailReportListView(ReplicaReadMixin, ExportMixin, generics.GenericAPIView):
     serializer_class = OrderDetailReportSerializer
     filterset_class = OrdersFilterset
     filter_backends = [
@@ -591,14 +611,21 @@ class OrderDetailReportListView(generics.GenericAPIView):
     ]
     queryset = Orders.objects.all()
 
-    def get(self, request, *args, **kwargs):
+    export_file_name = "order_detail"
+
+    def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        data = order_detail.list_order(queryset, **self.request.query_params)
-        page = self.paginate_queryset(data)
+        # Sắp xếp (OrderingFilter) và phân trang chạy trong SQL, chỉ dựng báo cáo cho các đơn hàng của trang
+        page = self.paginate_queryset(order_detail.order_report(queryset))
         return self.get_paginated_response(page)
 
+    def get_export_rows(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        for orders in iter_queryset_chunks(queryset, chunk_size=self.export_chunk_size):
+            yield from order_detail.list_order(orders, **self.request.query_params)
+
 
-class OrderKPIReportListView(generics.ListAPIView):
+class OrderKPIReportListView(ReplicaReadMixin, ExportMixin, generics.ListAPIView):
     filterset_class = OrdersFilterset
     filter_backends = [
         filters.SearchFilter,
@@ -609,6 +636,7 @@ class OrderKPIReportListView(generics.ListAPIView):
     ordering_fields = ["created", "modified", "total_actual", "total_variant_actual", "appointment_date", "order_key"]
     queryset = Orders.objects.select_related("created_by", "shipping", "source").prefetch_related("tags").all()
     serializer_class = OrderKPIReportSerializer
+    export_file_name = "order_kpi"
 
 
 class ConfirmationLogTurnRetrieveView(generics.RetrieveAPIView):
@@ -755,6 +783,7 @@ class OrderSheetConfirmAPIView(ActivityLogMixin, APIView):
                         change_reason=_export_sheet.change_reason,
                         type=_export_sheet.type,
                         sheet_code=_export_sheet.code,
+                        sheet=_export_sheet,
                     )
 
                 self.create_confirm_sheet_log(
@@ -801,6 +830,7 @@ class OrderSheetConfirmAPIView(ActivityLogMixin, APIView):
                             change_reason=sheet_created.change_reason,
                             type=sheet_created.type,
                             sheet_code=sheet_created.code,
+                            sheet=sheet_created,
                         )
                         sheet_created.warehouse_sheet_import_export_detail_sheet.create(
                             created_by=scan_by,
@@ -867,6 +897,7 @@ class OrderSheetConfirmAPIView(ActivityLogMixin, APIView):
 
 class TurnListView(generics.ListAPIView):
     serializer_class = PassSerializer
+    query_budget = 4
     queryset = ConfirmationSheetLog.objects.all()
     permission_classes = [IsAuthenticated]
 
@@ -894,23 +925,26 @@ class TurnListView(generics.ListAPIView):
             self.filter_queryset(self.get_queryset())
             .values("turn_number", "scan_by", "type")
             .order_by("-turn_number")
-            .prefetch_related("scan_by")
             .annotate(count=Count("turn_number"))
         )
-        for obj in data:
-            obj["scan_by"] = UserReadBaseInfoSerializer(User.objects.get(pk=obj["scan_by"])).data
-            try:
-                log = ConfirmationSheetLog.objects.filter(turn_number=obj["turn_number"]).all()
-            except Exception:
-                log = None
-            if log:
-                obj["scan_at"] = log[0].scan_at
-            else:
-                obj["scan_at"] = None
+        # Chỉ lấy người quét / thời gian quét cho các lượt của trang hiện tại, mỗi loại một truy vấn
+        results = list(data[start:end])
+        users = User.objects.in_bulk({obj["scan_by"] for obj in results} - {None})
+        scan_at = dict(
+            ConfirmationSheetLog.objects.filter(turn_number__in={obj["turn_number"] for obj in results})
+            .order_by()
+            .values("turn_number")
+            .annotate(scan_at=Min("scan_at"))
+            .values_list("turn_number", "scan_at")
+        )
+        for obj in results:
+            user = users.get(obj["scan_by"])
+            obj["scan_by"] = UserReadBaseInfoSerializer(user).data if user else None
+            obj["scan_at"] = scan_at.get(obj["turn_number"])
 
         res = {
-            "count": len(data),
-            "results": data[start:end],
+            "count": data.count(),
+            "results": results,
         }
 
         return Response(res)
@@ -918,7 +952,10 @@ class TurnListView(generics.ListAPIView):
 
 class ConfirmationLogListView(generics.ListAPIView):
     serializer_class = ConfirmationLogSerializer
-    queryset = ConfirmationSheetLog.objects.all()
+    queryset = ConfirmationSheetLog.objects.select_related("scan_by").annotate(
+        order_uuid=Subquery(Orders.objects.filter(order_key=OuterRef("order_key")).values("id")[:1])
+    )
+    query_budget = 2
     permission_classes = [IsAuthenticated]
 
     filter_backends = [
@@ -931,7 +968,7 @@ class ConfirmationLogListView(generics.ListAPIView):
     search_fields = ["turn_number", "order_key"]
 
 
-class OrderRevenueReportDashboardView(generics.GenericAPIView):
+class OrderRevenueReportDashboardView(ReplicaReadMixin, generics.GenericAPIView):
     queryset = Orders.objects.select_related("shipping", "customer").filter(status=OrderStatus.COMPLETED).exclude(complete_time=None)
     serializer_class = PassSerializer
     filter_backends = [django_filters.DjangoFilterBackend]
@@ -950,7 +987,7 @@ class OrderRevenueReportDashboardView(generics.GenericAPIView):
         return self.get_paginated_response(page)
 
 
-class OrderRevenueRatioView(generics.GenericAPIView):
+class OrderRevenueRatioView(ReplicaReadMixin, generics.GenericAPIView):
     queryset = Orders.objects.filter(status=OrderStatus.COMPLETED)
     serializer_class = PassSerializer
     filter_backends = [django_filters.DjangoFilterBackend]
@@ -964,7 +1001,7 @@ class OrderRevenueRatioView(generics.GenericAPIView):
         return Response(data={"data": data}, status=status.HTTP_200_OK)
 
 
-class OrderRevenueByProductReportView(generics.GenericAPIView):
+class OrderRevenueByProductReportView(ReplicaReadMixin, generics.GenericAPIView):
     queryset = Orders.objects.prefetch_related(
         "line_items",
         "line_items__variant",
@@ -981,12 +1018,12 @@ class OrderRevenueByProductReportView(generics.GenericAPIView):
         queryset = self.filter_queryset(self.queryset)
         data, total = report.get_revenue_by_product_variant(queryset)
 
-        result = data_sortby(data, request.GET.get("ordering", None))
+        result = ReportResult.from_records(data).order_by(request.GET.get("ordering", None))
         page = self.paginate_queryset(result), total
         return self.get_paginated_response(page)
 
 
-class OrderRevenueBySaleReportView(generics.GenericAPIView):
+class OrderRevenueBySaleReportView(ReplicaReadMixin, generics.GenericAPIView):
     queryset = Orders.objects.select_related("customer", "customer__customer_care_staff", "modified_by", "source").filter(
         status=OrderStatus.COMPLETED
     ).exclude(complete_time=None)
@@ -999,7 +1036,7 @@ class OrderRevenueBySaleReportView(generics.GenericAPIView):
         queryset = self.filter_queryset(self.queryset)
         data, total = report.get_revenue_by_sale(queryset)
 
-        result = data_sortby(data, request.GET.get("ordering", None))
+        result = ReportResult.from_records(data).order_by(request.GET.get("ordering", None))
         page = self.paginate_queryset(result), total
         return self.get_paginated_response(page)
 
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from orders.models import VariantDailySales
+
+
+class Command(BaseCommand):
+    help = "Dựng lại bảng tổng hợp doanh số theo ngày của variant (tbl_Variant_Daily_Sales)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-from", type=parse_date, help="YYYY-MM-DD")
+        parser.add_argument("--date-to", type=parse_date, help="YYYY-MM-DD")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = VariantDailySales.rebuild(options["date_from"], options["date_to"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Đã tạo {total} dòng tổng hợp"))
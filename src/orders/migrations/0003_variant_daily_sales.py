@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-19 14:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_initial'),
+        ('leads', '0002_initial'),
+        ('orders', '0002_initial'),
+        ('products', '0003_alter_products_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VariantDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('price_total', models.BigIntegerField(default=0)),
+                ('price_total_input', models.BigIntegerField(default=0)),
+                ('price_total_neo', models.BigIntegerField(default=0)),
+                ('discount', models.BigIntegerField(default=0)),
+                ('revenue', models.BigIntegerField(default=0)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('customer', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='variant_daily_sales', to='customers.customer')),
+                ('source', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='variant_daily_sales', to='leads.leadchannel')),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.productsvariants')),
+            ],
+            options={
+                'db_table': 'tbl_Variant_Daily_Sales',
+                'indexes': [models.Index(fields=['variant', 'date'], name='variant_daily_sales_var_date'), models.Index(fields=['date'], name='variant_daily_sales_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from utils.partitioning import convert_to_partitioned
+
+HISTORY_MODELS = ("HistoricalOrders", "HistoricalOrdersPayments", "HistoricalTransportationCare")
+
+
+def partition_history_tables(apps, schema_editor):
+    for model_name in HISTORY_MODELS:
+        convert_to_partitioned(schema_editor, apps.get_model("orders", model_name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_variant_daily_sales"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_history_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-19 14:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_date_range_indexes'),
+        ('leads', '0002_initial'),
+        ('locations', '0002_initial'),
+        ('orders', '0004_partition_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orders',
+            index=models.Index(fields=['created'], name='orders_created'),
+        ),
+        migrations.AddIndex(
+            model_name='orders',
+            index=models.Index(fields=['complete_time'], name='orders_complete_time'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-19 15:09
+
+from django.db import migrations, models
+
+
+def copy_quantity(apps, schema_editor):
+    # Giá trị tạm cho các dòng đã có, chạy `rebuild_variant_daily_sales` để trừ các đơn đã hoàn hàng
+    apps.get_model("orders", "VariantDailySales").objects.update(actual_quantity=models.F("quantity"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_date_range_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='variantdailysales',
+            name='actual_quantity',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(copy_quantity, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,12 @@
 import uuid
 
 from django.db import models
+from django.db import transaction
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.functions import TruncDate
 from model_utils.models import TimeStampedModel
 from model_utils.models import UUIDModel
 from simple_history.models import HistoricalRecords
@@ -132,47 +138,16 @@ class Orders(TimeStampedModel):
 
     def items_list(self) -> (list[object]):
         """Lấy toàn bộ sản phẩm và số lượng có trong đơn hàng(line items, items combo, items gift)"""
-        keys_obj_item = ("url", "code", "name", "price", "quantity")
-        items = {}
-
-        def add_update_quantity_item(variant_id, item):
-            if items.get(variant_id):
-                items[variant_id].update({"quantity": items[variant_id]["quantity"] + item["quantity"]})
-            else:
-                items[variant_id] = item
-
-        line_items: list[OrdersItems] = self.line_items.all()
-        for line_item in line_items:
-            quantity = line_item.quantity
-            # line item
-            if line_item.variant.type != ProductVariantType.SIMPLE:
-                items_combo = line_item.items_combo.all()
-                for item_combo in items_combo:
-                    variant = item_combo.variant
-                    quantity_in_combo = item_combo.quantity
-                    add_update_quantity_item(
-                        str(variant.id),
-                        dict(zip(keys_obj_item, ("", str(variant.id), variant.name, variant.sale_price, quantity * quantity_in_combo))),
-                    )
-            else:
-                variant: ProductsVariants = line_item.variant
-                add_update_quantity_item(
-                    str(variant.id), dict(zip(keys_obj_item, ("", str(variant.id), variant.name, variant.sale_price, quantity)))
-                )
-            # promotions type == other_variant
-            promotions_variant = line_item.variant_promotions_used.filter(promotion_variant__type=PromotionVariantType.OTHER_VARIANT)
-            for promotion in promotions_variant:
-                items_promotion = promotion.items_promotion.all()
-                for item in items_promotion:
-                    variant = item.variant
-                    add_update_quantity_item(
-                        str(variant.id), dict(zip(keys_obj_item, ("", str(variant.id), variant.name, variant.sale_price, item.quantity)))
-                    )
-        return len(line_items), list(items.values())
+        return expand_orders_items([self])[self.pk]
 
     class Meta:
         db_table = "tbl_Orders"
         ordering = ["-order_key"]
+        # Lọc theo khoảng ngày (LocalDateRangeFilter) là range scan trên các cột timestamptz
+        indexes = [
+            models.Index(fields=["created"], name="orders_created"),
+            models.Index(fields=["complete_time"], name="orders_complete_time"),
+        ]
 
 
 class OrdersPayments(TimeStampedModel):
@@ -285,6 +260,63 @@ class OrdersItemsCombo(TimeStampedModel, UUIDModel):
         ordering = ["-created"]
 
 
+def expand_orders_items(orders) -> dict:
+    """
+    Lấy sản phẩm và số lượng (line items, items combo, items gift) của nhiều đơn hàng bằng 3 truy vấn.
+    Trả về {order id: (số line item, [{"url", "code", "name", "price", "quantity"}])} giống `Orders.items_list`.
+    """
+    order_ids = [order.pk for order in orders]
+    line_items = list(OrdersItems.objects.filter(order_id__in=order_ids).select_related("variant"))
+    line_item_ids = [line_item.pk for line_item in line_items]
+
+    # Thành phần combo và quà tặng (promotion other variant) gom theo line item, giữ thứ tự như khi đọc từng line item
+    items_combo = {}
+    combo_line_item_ids = [
+        line_item.pk for line_item in line_items if line_item.variant and line_item.variant.type != ProductVariantType.SIMPLE
+    ]
+    for item_combo in OrdersItemsCombo.objects.filter(line_item_id__in=combo_line_item_ids).select_related("variant"):
+        items_combo.setdefault(item_combo.line_item_id, []).append(item_combo)
+
+    items_gift = {}
+    gifts = (
+        OrdersItemsPromotion.objects.filter(
+            order_variant_promotion__line_item_id__in=line_item_ids,
+            order_variant_promotion__promotion_variant__type=PromotionVariantType.OTHER_VARIANT,
+        )
+        .select_related("variant", "order_variant_promotion")
+        .order_by("-order_variant_promotion__created", "order_variant_promotion_id", "-created")
+    )
+    for item in gifts:
+        items_gift.setdefault(item.order_variant_promotion.line_item_id, []).append(item)
+
+    keys_obj_item = ("url", "code", "name", "price", "quantity")
+    result = {order_id: (0, {}) for order_id in order_ids}
+
+    def add_update_quantity_item(items, variant, quantity):
+        if variant is None:
+            return
+        variant_id = str(variant.id)
+        if items.get(variant_id):
+            items[variant_id]["quantity"] += quantity
+        else:
+            items[variant_id] = dict(zip(keys_obj_item, ("", variant_id, variant.name, variant.sale_price, quantity)))
+
+    for line_item in line_items:
+        length, items = result[line_item.order_id]
+        result[line_item.order_id] = (length + 1, items)
+        if line_item.variant is None:
+            continue
+        if line_item.variant.type != ProductVariantType.SIMPLE:
+            for item_combo in items_combo.get(line_item.pk, []):
+                add_update_quantity_item(items, item_combo.variant, line_item.quantity * item_combo.quantity)
+        else:
+            add_update_quantity_item(items, line_item.variant, line_item.quantity)
+        for item in items_gift.get(line_item.pk, []):
+            add_update_quantity_item(items, item.variant, item.quantity)
+
+    return {order_id: (length, list(items.values())) for order_id, (length, items) in result.items()}
+
+
 class ConfirmationSheetLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     turn_number = models.IntegerField()
@@ -406,3 +438,156 @@ class TransportationCare(TimeStampedModel):
     class Meta:
         db_table = "tbl_Transportation_Care"
         ordering = ["-created"]
+
+
+class VariantDailySalesQuerySet(models.QuerySet):
+    def in_range(self, date_from=None, date_to=None, customer=None):
+        queryset = self
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+        if customer:
+            queryset = queryset.filter(customer=customer)
+        return queryset
+
+    def total_per_variant(self, field, outer_ref="pk"):
+        """Subquery tổng `field` của từng variant, dùng để annotate lên ProductsVariants"""
+        subquery = (
+            self.filter(variant=OuterRef(outer_ref)).order_by().values("variant").annotate(total=models.Sum(field)).values("total")[:1]
+        )
+        return Coalesce(Subquery(subquery), Value(0), output_field=models.BigIntegerField())
+
+
+class VariantDailySales(models.Model):
+    """
+    Bảng tổng hợp doanh số theo ngày hoàn thành đơn (giờ địa phương) / variant / khách hàng / nguồn
+    của các đơn hàng đã hoàn thành, dùng cho báo cáo doanh thu sản phẩm.
+    """
+
+    date = models.DateField()
+    variant = models.ForeignKey(ProductsVariants, on_delete=models.CASCADE, related_name="daily_sales")
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, null=True, related_name="variant_daily_sales")
+    source = models.ForeignKey(LeadChannel, on_delete=models.SET_NULL, null=True, related_name="variant_daily_sales")
+    quantity = models.BigIntegerField(default=0)
+    # Số lượng không tính các đơn đã hoàn hàng (TransportationCare.returned_created)
+    actual_quantity = models.BigIntegerField(default=0)
+    price_total = models.BigIntegerField(default=0)
+    price_total_input = models.BigIntegerField(default=0)
+    price_total_neo = models.BigIntegerField(default=0)
+    discount = models.BigIntegerField(default=0)
+    # Doanh thu thực tế: price_total_input nếu > 0, ngược lại price_total (tính theo từng line item)
+    revenue = models.BigIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    objects = VariantDailySalesQuerySet.as_manager()
+
+    class Meta:
+        db_table = "tbl_Variant_Daily_Sales"
+        indexes = [
+            models.Index(fields=["variant", "date"], name="variant_daily_sales_var_date"),
+            models.Index(fields=["date"], name="variant_daily_sales_date"),
+        ]
+
+    @staticmethod
+    def aggregate_order_items(date_from=None, date_to=None, **filters):
+        """Tổng hợp line item của các đơn đã hoàn thành theo khoá của bảng"""
+        queryset = OrdersItems.objects.filter(
+            order__status=OrderStatus.COMPLETED,
+            order__complete_time__isnull=False,
+            variant__isnull=False,
+        ).annotate(sale_date=TruncDate("order__complete_time"))
+        if date_from:
+            queryset = queryset.filter(sale_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(sale_date__lte=date_to)
+        return (
+            queryset.filter(**filters)
+            .order_by()
+            .values("sale_date", "variant_id", "order__customer_id", "order__source_id")
+            .annotate(
+                sum_quantity=models.Sum("quantity"),
+                sum_actual_quantity=models.Sum("quantity", filter=models.Q(order__transportation_care__returned_created__isnull=True)),
+                sum_price_total=models.Sum("price_total"),
+                sum_price_total_input=models.Sum(Coalesce("price_total_input", Value(0))),
+                sum_price_total_neo=models.Sum(Coalesce("price_total_neo", Value(0))),
+                sum_discount=models.Sum("discount"),
+                sum_revenue=models.Sum(
+                    models.Case(
+                        models.When(price_total_input__gt=0, then=models.F("price_total_input")),
+                        default=models.F("price_total"),
+                    )
+                ),
+                count_order=models.Count("order_id", distinct=True),
+            )
+        )
+
+    @classmethod
+    def build_rows(cls, aggregated):
+        for row in aggregated:
+            yield cls(
+                date=row["sale_date"],
+                variant_id=row["variant_id"],
+                customer_id=row["order__customer_id"],
+                source_id=row["order__source_id"],
+                quantity=row["sum_quantity"] or 0,
+                actual_quantity=row["sum_actual_quantity"] or 0,
+                price_total=row["sum_price_total"] or 0,
+                price_total_input=row["sum_price_total_input"] or 0,
+                price_total_neo=row["sum_price_total_neo"] or 0,
+                discount=row["sum_discount"] or 0,
+                revenue=row["sum_revenue"] or 0,
+                order_count=row["count_order"] or 0,
+            )
+
+    @classmethod
+    @transaction.atomic
+    def refresh_for_orders(cls, order_ids, variant_ids=(), dates=()):
+        """
+        Tính lại các dòng (ngày, variant) mà các đơn hàng truyền vào có tham gia, cộng thêm `variant_ids`
+        (variant đã bị xoá / đổi khỏi line item của các đơn) và `dates` (ngày hoàn thành cũ của các đơn).
+        Gọi khi đơn hoàn thành / rời trạng thái hoàn thành, hoặc line item của đơn đã hoàn thành thay đổi.
+        """
+        dates = set(dates)
+        dates.update(
+            complete_time
+            for complete_time in Orders.objects.filter(id__in=order_ids, complete_time__isnull=False)
+            .annotate(sale_date=TruncDate("complete_time"))
+            .values_list("sale_date", flat=True)
+        )
+        variant_ids = set(variant_ids)
+        variant_ids.update(
+            OrdersItems.objects.filter(order_id__in=order_ids, variant__isnull=False)
+            .order_by()
+            .values_list("variant_id", flat=True)
+            .distinct()
+        )
+        if not dates or not variant_ids:
+            return
+
+        # Khoá các variant (theo thứ tự id để tránh deadlock): các lần tính lại cùng variant chạy lần lượt,
+        # lần sau xoá và tính lại từ dữ liệu đã commit của lần trước nên không bị cộng trùng
+        list(ProductsVariants.objects.filter(id__in=variant_ids).order_by("id").select_for_update().values_list("id", flat=True))
+        cls.objects.filter(date__in=dates, variant_id__in=variant_ids).delete()
+        aggregated = cls.aggregate_order_items(variant_id__in=variant_ids, sale_date__in=dates)
+        cls.objects.bulk_create(cls.build_rows(aggregated), batch_size=2000)
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls, date_from=None, date_to=None, batch_size=2000) -> int:
+        """Xoá và dựng lại toàn bộ bảng (hoặc một khoảng ngày) từ dữ liệu đơn hàng"""
+        cls.objects.in_range(date_from, date_to).delete()
+        aggregated = cls.aggregate_order_items(date_from, date_to)
+
+        total = 0
+        batch = []
+        for row in cls.build_rows(aggregated.iterator(chunk_size=batch_size)):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cls.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cls.objects.bulk_create(batch)
+            total += len(batch)
+        return total
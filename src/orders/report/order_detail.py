@@ -13,6 +13,7 @@ from core.settings import TIME_ZONE
 from orders.enums import OrderPaymentType
 from orders.enums import WarehouseSheetType
 from orders.models import Orders
+from utils.report_result import QueryReportResult
 
 
 def utc_to_local(dt: datetime.datetime):
@@ -247,46 +248,64 @@ def list_order_item(queryset: QuerySet[Orders], *args, **kwargs):  # pylint: dis
     return result
 
 
+ORDER_FIELDS = [
+    # order
+    "order_key",
+    "created",
+    "created_by__name",
+    "status",
+    "complete_time",
+    "modified_by__name",
+    "is_print",
+    "printed_at",
+    "printed_by__name",
+    "source__name",
+    "price_delivery_input",
+    "price_addition_input",
+    "price_total_discount_order_promotion",
+    "price_discount_input",
+    "payments__note",
+    "price_total_variant_all",
+    "price_total_variant_actual",
+    "price_total_order_actual",
+    "price_total_variant_actual_input",
+    "sale_note",
+    "phone_shipping",
+    "name_shipping",
+    # delivery
+    "shipping__created",
+    "shipping__tracking_number",
+    "shipping__carrier_status",
+    "shipping__modified",
+    "shipping__note",
+    "shipping__return_full_address",
+    "shipping__return_name",
+    "shipping__delivery_company_name",
+    "address_shipping__address",
+    "address_shipping__ward__label",
+    "address_shipping__ward__district__label",
+    "address_shipping__ward__district__province__label",
+    # tags_list=ArrayAgg('tags__name', default=Value([]))
+]
+
+
 def list_order(queryset: QuerySet[Orders], *args, **kwargs):
-    orders = queryset.values(
-        # order
-        "order_key",
-        "created",
-        "created_by__name",
-        "status",
-        "complete_time",
-        "modified_by__name",
-        "is_print",
-        "printed_at",
-        "printed_by__name",
-        "source__name",
-        "price_delivery_input",
-        "price_addition_input",
-        "price_total_discount_order_promotion",
-        "price_discount_input",
-        "payments__note",
-        "price_total_variant_all",
-        "price_total_variant_actual",
-        "price_total_order_actual",
-        "price_total_variant_actual_input",
-        "sale_note",
-        "phone_shipping",
-        "name_shipping",
-        # delivery
-        "shipping__created",
-        "shipping__tracking_number",
-        "shipping__carrier_status",
-        "shipping__modified",
-        "shipping__note",
-        "shipping__return_full_address",
-        "shipping__return_name",
-        "shipping__delivery_company_name",
-        "address_shipping__address",
-        "address_shipping__ward__label",
-        "address_shipping__ward__district__label",
-        "address_shipping__ward__district__province__label",
-        # tags_list=ArrayAgg('tags__name', default=Value([]))
-    )
+    return order_records(list(queryset.values(*ORDER_FIELDS)), queryset)
+
+
+def order_report(queryset: QuerySet[Orders]) -> QueryReportResult:
+    """Báo cáo đơn hàng theo trang: chỉ các dòng của trang được lấy và ghép thanh toán / phiếu kho / tag / khuyến mãi"""
+
+    def to_records(orders: list[dict]) -> list[dict]:
+        return order_records(orders, queryset.filter(order_key__in={order["order_key"] for order in orders}))
+
+    return QueryReportResult(queryset.values(*ORDER_FIELDS), to_records)
+
+
+def order_records(orders: list[dict], queryset: QuerySet[Orders]) -> list[dict]:
+    """`orders`: các dòng `ORDER_FIELDS` của đơn hàng, `queryset`: các đơn hàng đó (lấy dữ liệu liên quan)"""
+    if not orders:
+        return []
     df = pd.DataFrame.from_records(orders)
     df["created"] = df["created"].apply(lambda x: utc_to_local(x) if not pd.isna(x) else None)
     df["shipping__created"] = df["shipping__created"].apply(lambda x: utc_to_local(x) if not pd.isna(x) else None)
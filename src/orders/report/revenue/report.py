@@ -14,6 +14,8 @@ from django.db.models.query import QuerySet
 from core.settings import IMAGE_BASE_URL
 from customers.models import Customer
 from orders.models import Orders
+from utils.dates import local_day_end
+from utils.dates import local_day_start
 
 
 def get_dashboard(queryset: QuerySet[Orders], date_from, date_to):
@@ -357,7 +359,7 @@ def get_ratio_order_pre_and_current_month(queryset: QuerySet[Orders]):
     )
 
     today_query = (
-        queryset.filter(created__date=today.date())
+        queryset.filter(created__gte=local_day_start(today.date()), created__lt=local_day_end(today.date()))
         .values('created__date')
         .annotate(
             order_count=Count("id"),
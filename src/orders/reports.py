@@ -4,6 +4,9 @@ from django.db.models import Subquery
 from django.db.models import Sum
 from django.db.models import Value
 
+from leads.models.attributes import LeadChannel
+from users.models import User
+from utils.reports import DimensionLookup
 from utils.reports import Dimensions
 from utils.reports import ExprsFilterEnum as ExprD
 from utils.reports import Filter
@@ -20,15 +23,24 @@ class OrdersReportPivot(PivotReportBase):
         # Ngày tạo đơn hàng
         "created_date": Dimensions(fields=["created__date"], rename={"created__date": "created_date"}),
         # Kênh bán hàng
-        "source": Dimensions(fields=["source__id", "source__name"]),
+        "source": Dimensions(
+            fields=["source__id", "source__name"],
+            lookup=DimensionLookup(key="source__id", model=LeadChannel, fields={"source__name": "name"}),
+        ),
         # Trạng thái vận đơn
         "shipping_status": Dimensions(fields=["shipping__carrier_status"], rename={"shipping__carrier_status": "shipping_status"}),
         # Trạng thái đơn hàng
         "status": Dimensions(fields=["status"]),
         # Người tạo đơn
-        "created_by": Dimensions(fields=["created_by__id", "created_by__name"]),
+        "created_by": Dimensions(
+            fields=["created_by__id", "created_by__name"],
+            lookup=DimensionLookup(key="created_by__id", model=User, fields={"created_by__name": "name"}),
+        ),
         # Người xác nhận đơn
-        "complete_by": Dimensions(fields=["complete_by__id", "complete_by__name"]),
+        "complete_by": Dimensions(
+            fields=["complete_by__id", "complete_by__name"],
+            lookup=DimensionLookup(key="complete_by__id", model=User, fields={"complete_by__name": "name"}),
+        ),
         # Ngày xác nhân đơn
         "complete_date": Dimensions(fields=["complete_time__date"], rename={"complete_time__date": "complete_date"}),
         # Ngày tạo vận đơn
@@ -114,22 +126,25 @@ class OrdersReportPivot(PivotReportBase):
             value_types=[str, int, list],
         ),
         "created_date": Filter(
-            field="created__date",
+            field="created",
             _in=InType.query,
             exprs=[ExprD.IS, ExprD.IWITHIN, ExprD.IBF, ExprD.IOOBF, ExprD.IAT, ExprD.IOOAF, ExprD.IEP],
             value_types=[list, str, int],
+            local_date=True,
         ),
         "complete_date": Filter(
-            field="complete_time__date",
+            field="complete_time",
             _in=InType.query,
             exprs=[ExprD.IS, ExprD.IWITHIN, ExprD.IBF, ExprD.IOOBF, ExprD.IAT, ExprD.IOOAF, ExprD.IEP],
             value_types=[list, str, int],
+            local_date=True,
         ),
         "shipping_date": Filter(
-            field="shipping__created__date",
+            field="shipping__created",
             _in=InType.query,
             exprs=[ExprD.IS, ExprD.IWITHIN, ExprD.IBF, ExprD.IOOBF, ExprD.IAT, ExprD.IOOAF, ExprD.IEP],
             value_types=[list, str, int],
+            local_date=True,
         ),
         "warehouse_exdate": Filter(
             field="warehouse_exdate",
@@ -1,7 +1,12 @@
+import threading
 from datetime import datetime
 
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 from orders.enums import OrderStatus
 from orders.models import Orders
@@ -9,6 +14,8 @@ from orders.models import OrdersItems
 from orders.models import OrdersItemsCombo
 from orders.models import OrdersItemsPromotion
 from orders.models import OrderVariantsPromotion
+from orders.models import TransportationCare
+from orders.models import VariantDailySales
 from products.enums import ProductVariantType
 from promotions.enums import PromotionVariantType
 from warehouses.models import WarehouseInventoryAvailable
@@ -70,6 +77,8 @@ def calculate_warehouse_inventory(instance, created_by, confirm_exp=None, non_co
 @receiver(pre_save, sender=Orders)
 def update_inventory_available(sender, instance, **kwargs):
     old_instance = Orders.objects.filter(id=instance.id).first()
+    instance._previous_status = old_instance.status if old_instance else None
+    instance._previous_complete_time = old_instance.complete_time if old_instance else None
     user = None
     confirm_exp = None
     non_confirm_exp = None
@@ -100,3 +109,85 @@ def update_inventory_available(sender, instance, **kwargs):
 
     calculate_warehouse_inventory(instance, user, confirm_exp, non_confirm_exp, instance.order_key)
     print("Signal update inventory available done.")
+
+
+# Đơn / variant cần tính lại VariantDailySales sau khi commit, theo thread (mỗi thread một kết nối DB)
+_daily_sales_pending = threading.local()
+
+
+def refresh_variant_daily_sales_on_commit(order_id, variant_id=None, sale_date=None):
+    """
+    Tính lại VariantDailySales của đơn sau khi commit (đợi line item của đơn đã có trong DB).
+    Các đơn thay đổi trong cùng transaction được gộp lại: callback đầu tiên chạy sau commit tính cho tất cả.
+    `sale_date`: ngày cũ cần tính lại thêm (vd: complete_time của đơn bị đổi sang ngày khác).
+    """
+    if not hasattr(_daily_sales_pending, "order_ids"):
+        _daily_sales_pending.order_ids = set()
+        _daily_sales_pending.variant_ids = set()
+        _daily_sales_pending.dates = set()
+    _daily_sales_pending.order_ids.add(order_id)
+    if variant_id:
+        _daily_sales_pending.variant_ids.add(variant_id)
+    if sale_date:
+        _daily_sales_pending.dates.add(sale_date)
+    transaction.on_commit(_refresh_pending_variant_daily_sales)
+
+
+def _refresh_pending_variant_daily_sales():
+    order_ids, variant_ids, dates = _daily_sales_pending.order_ids, _daily_sales_pending.variant_ids, _daily_sales_pending.dates
+    if not order_ids:
+        return
+    # Lấy ra trước khi tính (transaction bị rollback thì các id còn lại được tính ở lần commit sau, không sai kết quả)
+    _daily_sales_pending.order_ids, _daily_sales_pending.variant_ids, _daily_sales_pending.dates = set(), set(), set()
+    VariantDailySales.refresh_for_orders(order_ids, variant_ids, dates)
+
+
+def _local_date(value):
+    """Ngày theo giờ địa phương, giống TruncDate("complete_time") của bảng tổng hợp"""
+    return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+
+def _is_order_completed(order_id):
+    return Orders.objects.filter(pk=order_id, status=OrderStatus.COMPLETED).exists()
+
+
+@receiver(post_save, sender=Orders)
+def update_variant_daily_sales(sender, instance, **kwargs):
+    previous_status = getattr(instance, "_previous_status", None)
+    # Đơn vào / rời trạng thái hoàn thành, hoặc đơn đã hoàn thành được sửa (khách hàng, nguồn...)
+    if OrderStatus.COMPLETED not in (previous_status, instance.status):
+        return
+    previous_complete_time = getattr(instance, "_previous_complete_time", None)
+    previous_date = None
+    if previous_complete_time and previous_complete_time != instance.complete_time:
+        # complete_time bị đổi: dòng của ngày cũ cũng phải tính lại
+        previous_date = _local_date(previous_complete_time)
+    refresh_variant_daily_sales_on_commit(instance.pk, sale_date=previous_date)
+
+
+@receiver(pre_save, sender=OrdersItems)
+def track_order_item_variant(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_variant_id = OrdersItems.objects.filter(pk=instance.pk).values_list("variant_id", flat=True).first()
+
+
+@receiver(post_save, sender=OrdersItems)
+def update_variant_daily_sales_on_item_save(sender, instance, **kwargs):
+    # Chỉ đơn đã hoàn thành có trong bảng tổng hợp (đơn chuyển sang hoàn thành được tính ở signal của Orders)
+    if not _is_order_completed(instance.order_id):
+        return
+    refresh_variant_daily_sales_on_commit(instance.order_id, getattr(instance, "_previous_variant_id", None))
+
+
+@receiver(post_delete, sender=OrdersItems)
+def update_variant_daily_sales_on_item_delete(sender, instance, **kwargs):
+    if not _is_order_completed(instance.order_id):
+        return
+    refresh_variant_daily_sales_on_commit(instance.order_id, instance.variant_id)
+
+
+@receiver(post_save, sender=TransportationCare)
+def update_variant_daily_sales_on_return(sender, instance, **kwargs):
+    # actual_quantity không tính các đơn đã hoàn hàng (returned_created)
+    if instance.order_id:
+        refresh_variant_daily_sales_on_commit(instance.order_id)
@@ -0,0 +1,83 @@
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from orders.enums import OrderStatus
+from orders.models import Orders
+from orders.models import OrdersItems
+from orders.models import VariantDailySales
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def variant():
+    category = ProductCategory.objects.create(name="Danh mục")
+    product = Products.objects.create(name="Sản phẩm", category=category, SKU_code="P")
+    return ProductsVariants.objects.create(name="Biến thể", SKU_code="V", product=product)
+
+
+@pytest.fixture
+def refresh_calls(monkeypatch):
+    calls = []
+    original = VariantDailySales.refresh_for_orders
+
+    def record(order_ids, variant_ids=(), dates=()):
+        calls.append((set(order_ids), set(variant_ids), set(dates)))
+        return original(order_ids, variant_ids, dates)
+
+    monkeypatch.setattr(VariantDailySales, "refresh_for_orders", record)
+    return calls
+
+
+def create_order(status, number, variant, quantity=2):
+    order = Orders.objects.create(status=status, order_number=number, order_key=f"KEY{number}")
+    OrdersItems.objects.create(order=order, variant=variant, quantity=quantity, price_variant_logs=10, price_total=10 * quantity)
+    return order
+
+
+def test_item_changes_on_non_completed_orders_do_not_refresh(variant, refresh_calls, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        order = create_order(OrderStatus.DRAFT, 1, variant)
+    with django_capture_on_commit_callbacks(execute=True):
+        item = order.line_items.get()
+        item.quantity = 5
+        item.save()
+        item.delete()
+
+    assert refresh_calls == []
+    assert not VariantDailySales.objects.exists()
+
+
+def test_item_changes_on_completed_orders_refresh(variant, refresh_calls, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        order = create_order(OrderStatus.COMPLETED, 2, variant)
+    assert VariantDailySales.objects.get().quantity == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        item = order.line_items.get()
+        item.quantity = 5
+        item.save()
+
+    assert VariantDailySales.objects.get().quantity == 5
+    assert refresh_calls[-1][0] == {order.pk}
+
+
+def test_moving_complete_time_refreshes_previous_and_new_date(variant, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        order = create_order(OrderStatus.COMPLETED, 2, variant)
+    order.refresh_from_db()
+    previous_date = timezone.localtime(order.complete_time).date() if timezone.is_aware(order.complete_time) else order.complete_time.date()
+    assert list(VariantDailySales.objects.values_list("date", flat=True)) == [previous_date]
+
+    new_complete_time = timezone.make_aware(datetime.combine(previous_date - timedelta(days=3), datetime.min.time()) + timedelta(hours=10))
+    with django_capture_on_commit_callbacks(execute=True):
+        order.complete_time = new_complete_time
+        order.save()
+
+    assert list(VariantDailySales.objects.values_list("date", "quantity")) == [(new_complete_time.date(), 2)]
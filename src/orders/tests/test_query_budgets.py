@@ -0,0 +1,48 @@
+import pytest
+
+from orders.enums import OrderStatus
+from orders.models import ConfirmationSheetLog
+from orders.models import Orders
+from users.models import User
+from utils.instrumentation import assert_endpoint_budget
+
+pytestmark = pytest.mark.django_db
+
+TURNS_URL = "/api/orders/confirm/logs/turn/all"
+LOGS_URL = "/api/orders/confirm/logs/all"
+
+
+@pytest.fixture
+def confirmation_logs(user):
+    scanners = [user] + [User.objects.create_user(email=f"scanner{index}@example.com") for index in range(4)]
+    orders = [Orders.objects.create(status=OrderStatus.DRAFT, order_number=index, order_key=f"KEY{index}") for index in range(10)]
+    return ConfirmationSheetLog.objects.bulk_create(
+        ConfirmationSheetLog(turn_number=index % 5, scan_by=scanners[index % 5], order_key=order.order_key, order_number=index)
+        for index, order in enumerate(orders)
+    )
+
+
+def test_turn_list_stays_within_budget(api_client, confirmation_logs):
+    response = assert_endpoint_budget(api_client, "get", TURNS_URL)
+
+    assert response.status_code == 200
+    assert response.data["count"] == 5
+    assert [turn["turn_number"] for turn in response.data["results"]] == [4, 3, 2, 1, 0]
+    assert all(turn["scan_by"]["email"] and turn["scan_at"] for turn in response.data["results"])
+
+
+def test_confirmation_log_list_stays_within_budget(api_client, confirmation_logs):
+    response = assert_endpoint_budget(api_client, "get", LOGS_URL)
+
+    assert response.status_code == 200
+    orders = dict(Orders.objects.values_list("order_key", "id"))
+    assert {log["order_id"] for log in response.data["results"]} == {str(orders[log.order_key]) for log in confirmation_logs}
+
+
+def test_server_timing_header_only_for_staff(api_client, user, confirmation_logs, settings):
+    settings.DEBUG = False
+    assert "Server-Timing" not in api_client.get(TURNS_URL)
+
+    user.is_staff = True
+    user.save()
+    assert "queries" in api_client.get(TURNS_URL)["Server-Timing"]
@@ -0,0 +1,73 @@
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from orders.enums import OrderStatus
+from orders.models import Orders
+from orders.reports import OrdersReportPivot
+from utils.dates import local_day_end
+from utils.dates import local_day_start
+from utils.reports import ExprsDjangoFilter
+
+pytestmark = pytest.mark.django_db
+
+DAY = date(2024, 5, 10)
+
+
+@pytest.fixture
+def orders():
+    # Sát hai mốc 00:00 giờ địa phương của ngày DAY
+    moments = {
+        "before": local_day_start(DAY) - timedelta(seconds=1),
+        "start": local_day_start(DAY),
+        "late": local_day_end(DAY) - timedelta(seconds=1),
+        "next": local_day_end(DAY),
+    }
+    orders = {}
+    for index, (name, moment) in enumerate(moments.items()):
+        order = Orders.objects.create(status=OrderStatus.DRAFT, order_number=index, order_key=name)
+        Orders.objects.filter(pk=order.pk).update(created=moment, complete_time=moment)
+        orders[name] = order
+    return orders
+
+
+def filtered_keys(filters):
+    report = OrdersReportPivot(Orders.objects.all(), ["status"], ["total_order_quantity"], filters=filters, evaluate=False)
+    # Điều kiện lọc của truy vấn ngoài (annotate warehouse_exdate có subquery riêng)
+    where = str(report.queryset.query).rsplit(" WHERE ", 1)[1]
+    return set(report.queryset.values_list("order_key", flat=True)), where
+
+
+@pytest.mark.parametrize(
+    "expr, value, expected",
+    [
+        ("is", [DAY.isoformat(), DAY.isoformat()], {"start", "late"}),
+        ("iswithin", [(DAY - timedelta(days=1)).isoformat(), (DAY + timedelta(days=1)).isoformat()], {"start", "late"}),
+        ("isbefore", DAY.isoformat(), {"before"}),
+        ("isonorbefore", DAY.isoformat(), {"before", "start", "late"}),
+        ("isafter", DAY.isoformat(), {"next"}),
+        ("isonorafter", DAY.isoformat(), {"start", "late", "next"}),
+    ],
+)
+@pytest.mark.parametrize("name", ["created_date", "complete_date"])
+def test_date_filters_use_half_open_local_day_ranges(orders, name, expr, value, expected):
+    keys, where = filtered_keys([[name, expr, value]])
+
+    assert keys == expected
+    # Không ép kiểu cột timestamp sang date (Postgres dùng được index của cột)
+    assert "django_datetime_cast_date" not in where
+
+
+def test_local_date_filter_bounds():
+    q = ExprsDjangoFilter.q_local_date("created", "is", ["2024-05-10", "2024-05-12"])
+
+    assert dict(q.children) == {"created__gte": local_day_start(date(2024, 5, 10)), "created__lt": local_day_end(date(2024, 5, 12))}
+    assert timezone.localtime(dict(q.children)["created__gte"]).replace(tzinfo=None) == datetime(2024, 5, 10)
+
+
+def test_local_date_filter_rejects_invalid_dates():
+    with pytest.raises(ValueError):
+        ExprsDjangoFilter.q_local_date("created", "isbefore", "not a date")
@@ -13,6 +13,7 @@ from products.models import ProductsMaterials
 from products.models import ProductsVariants
 from products.models import ProductsVariantsBatches
 from products.models import ProductsVariantsMaterials
+from utils.filters import LocalDateRangeFilter
 
 
 class ProductFilterset(django_filters.FilterSet):
@@ -144,12 +145,19 @@ class ProductVariantBatchFilterset(django_filters.FilterSet):
 
 
 class ProductReportsFilterset(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    # distinct=False: queryset còn được `.values()` để pivot, DISTINCT sẽ gộp các dòng trùng giá trị
+    category = django_filters.ModelMultipleChoiceFilter(
+        field_name="product__category_id", queryset=ProductCategory.objects.all(), to_field_name="id", distinct=False
+    )
+    variant = django_filters.ModelMultipleChoiceFilter(
+        field_name="id", queryset=ProductsVariants.objects.all(), to_field_name="id", distinct=False
+    )
 
     class Meta:
         model = ProductsVariants
-        fields = "created_from", "created_to"
+        fields = "created_from", "created_to", "category", "variant"
 
 
 class ProductCategoryFilterset(django_filters.FilterSet):
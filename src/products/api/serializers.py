@@ -261,20 +261,8 @@ class ProductVariantRetrieveSerializer(serializers.ModelSerializer):
         exclude = ("tags",)
 
     def get_total_inventory(self, obj):
-        try:
-            return obj.total_inventory
-        except Exception:
-            batches = getattr(obj, "batches")
-            total_quantity = 0
-            if batches:
-                for batch in batches.all():
-                    if hasattr(batch, "warehouse_inventory_product_variant_batch"):
-                        quantity = sum(
-                            i.quantity
-                            for i in batch.warehouse_inventory_product_variant_batch.all()
-                        )
-                        total_quantity += quantity
-            return total_quantity
+        # Cột total_inventory là Decimal, API trả về số nguyên như trước
+        return int(obj.total_inventory or 0)
 
     def get_total_weight(self, obj):
         try:
@@ -298,6 +286,13 @@ class ProductVariantRetrieveSerializer(serializers.ModelSerializer):
         return ret
 
 
+class ProductVariantInventorySerializer(ProductVariantRetrieveSerializer):
+    """Dùng với queryset `with_inventory_available()`"""
+
+    inventory_available_confirmed = serializers.IntegerField(read_only=True)
+    inventory_available_non_confirm = serializers.IntegerField(read_only=True)
+
+
 # ... (Giữ nguyên phần còn lại của file) ...
 class ProductMaterialReadVariantBaseSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(source="product_variant.id")
@@ -501,6 +496,14 @@ class ProductReportPivotParams(serializers.Serializer):
     b_expr_metrics = serializers.ChoiceField(
         choices=BindingExprEnum.choices(), default=BindingExprEnum.AND, required=False
     )
+    complete_time_from = serializers.DateField(required=False, help_text="Lọc metric doanh số theo ngày hoàn thành đơn")
+    complete_time_to = serializers.DateField(required=False, help_text="Lọc metric doanh số theo ngày hoàn thành đơn")
+    warehouse_id = serializers.ListField(
+        child=serializers.UUIDField(),
+        source="warehouse_ids",
+        required=False,
+        help_text="Lọc tồn kho / phiếu theo kho",
+    )
 
     def validate_dimensions(self, value):
         try:
@@ -644,7 +647,7 @@ class ProductVariantRevenueSerializer(serializers.ModelSerializer):
         )
 
     def get_inventory_quantity(self, obj):
-        return obj.inventory_quantity
+        return int(obj.inventory_quantity or 0)
 
     def get_sold_quantity(self, obj):
         return obj.sold_quantity
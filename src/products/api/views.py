@@ -1,28 +1,12 @@
 import time
-from io import BytesIO
-import traceback
 
 import django_filters.rest_framework as django_filters
-import pandas as pd
 from django.db import transaction
 from django.db.models import Count
 from django.db.models import F
-from django.db.models import Q
 from django.db.models import Prefetch
-from django.db.models import Sum
-from django.db.models import IntegerField
-from django.db.models import Value
-from django.db.models import Subquery
-from django.db.models import OuterRef
-from django.db.models import Case
-from django.db.models import When
-from django.db.models import FloatField
-from django.db.models.functions import Coalesce
 from django.http import FileResponse
 from drf_yasg.utils import swagger_auto_schema
-from openpyxl import Workbook
-from openpyxl.styles import Alignment
-from openpyxl.utils.dataframe import dataframe_to_rows
 from rest_framework import decorators
 from rest_framework import filters
 from rest_framework import generics
@@ -30,14 +14,14 @@ from rest_framework import mixins
 from rest_framework import status
 from rest_framework import viewsets
 from rest_framework.exceptions import ValidationError
-from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from core.views import CustomModelViewSet
-from orders.enums import OrderStatus
+from core.views import ExportMixin
+from core.views import ReplicaReadMixin
 from orders.enums import WarehouseSheetType
-from orders.models import OrdersItems
+from orders.models import VariantDailySales
 from products.api.filters import ProductCategoryFilterset
 from products.api.filters import ProductFilterset
 from products.api.filters import ProductMaterialFilterset
@@ -62,6 +46,7 @@ from products.api.serializers import ProductVariantBatchSerializer
 from products.api.serializers import ProductVariantBatchUpdateSerializer
 from products.api.serializers import ProductVariantBulkCreateSerializer
 from products.api.serializers import ProductVariantCreateSingleSerializer
+from products.api.serializers import ProductVariantInventorySerializer
 from products.api.serializers import ProductVariantMappingSerializer
 from products.api.serializers import ProductVariantRetrieveSerializer
 from products.api.serializers import ProductVariantsSerializer
@@ -71,6 +56,8 @@ from products.api.serializers import SupplierSerializer
 from products.api.serializers import TagSerializer
 from products.api.serializers import ProductVariantRevenueSerializer
 from products.enums import ProductVariantType
+from products.importers import ProductVariantImporter
+from products.importers import ProductVariantPriceUpdater
 from products.models import ProductCategory
 from products.models import Products
 from products.models import ProductsMaterials
@@ -83,10 +70,11 @@ from products.models import ProductsVariantsMaterials
 from products.models import ProductTag
 from products.reports import ProductReportPivot
 from users.activity_log import ActivityLogMixin
+from utils.bulk_import import read_rows
+from utils.export import XLSX_CONTENT_TYPE
 from warehouses.api.serializers.warehouse_sheet_import_export import WarehouseSheetImportExportCreateSerializer
 from warehouses.api.views import WarehouseSheetImportExportViewSet
 from warehouses.models import Warehouse
-from warehouses.models import WarehouseInventory
 
 
 class CategoryViewset(
@@ -99,18 +87,7 @@ class CategoryViewset(
     serializer_class = CategorySerializer
 
     queryset = (
-        ProductCategory.objects.annotate(
-            total_products=Count("products", distinct=True),
-            total_inventory=Coalesce(
-                Sum(
-                    F(
-                        "products__variants__batches__warehouse_inventory_product_variant_batch__quantity"
-                    )
-                ),
-                Value(0),
-                output_field=FloatField(),
-            ),
-        )
+        ProductCategory.objects.annotate(total_products=Count("products"))
         .order_by("-total_inventory")
         .values()
     )
@@ -241,20 +218,9 @@ class ProductViewset(
             "variants",
             # "variants__tags",
             "variants__images",
-            "variants__batches",
-            "variants__batches__warehouse_inventory_product_variant_batch",
             "variants__materials",
         )
-        .annotate(
-            total_variants=Count("variants__id", distinct=True),
-            total_inventory=Coalesce(
-                Sum(
-                    "variants__batches__warehouse_inventory_product_variant_batch__quantity"
-                ),
-                Value(0),
-                output_field=FloatField(),
-            ),
-        )
+        .annotate(total_variants=Count("variants"))
         .all()
     )
     filter_backends = (
@@ -361,9 +327,9 @@ class ProductVariantViewset(CustomModelViewSet):
     http_method_names = ("get", "post", "patch", "delete")
     serializer_class = ProductVariantsSerializer
     serializer_classes = {
-        "list": ProductVariantRetrieveSerializer,
+        "list": ProductVariantInventorySerializer,
         "create": ProductVariantCreateSingleSerializer,
-        "retrieve": ProductVariantRetrieveSerializer,
+        "retrieve": ProductVariantInventorySerializer,
         "partial_update": ProductVariantUpdateSerializer,
         "bulk_create": ProductVariantBulkCreateSerializer,
     }
@@ -372,14 +338,7 @@ class ProductVariantViewset(CustomModelViewSet):
             "images",
             "materials",
             "materials__product_material",
-            "batches",
-            "batches__warehouse_inventory_product_variant_batch",
         ).annotate(
-            total_inventory=Coalesce(
-                Sum("batches__warehouse_inventory_product_variant_batch__quantity"), 
-                Value(0), 
-                output_field=IntegerField()
-            ),
             category_name=F("product__category__name"),
         ).all()
     )
@@ -391,6 +350,14 @@ class ProductVariantViewset(CustomModelViewSet):
     filterset_class = ProductVariantFilterset
     search_fields = ("name", "SKU_code", "bar_code", "note", "product__SKU_code")
     ordering_fields = "__all__"
+    # count + trang + prefetch (images, materials, materials__product_material)
+    query_budget = {"list": 5, "retrieve": 4}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.with_inventory_available()
+        return queryset
 
     def get_serializer_class(self):
         return self.serializer_classes.get(self.action, self.serializer_class)
@@ -624,13 +591,9 @@ class ProductVariantBatchViewset(
         return super().partial_update(request, *args, **kwargs)
 
 
-class ProductReportListAPIView(generics.ListAPIView):
+class ProductReportListAPIView(ReplicaReadMixin, generics.ListAPIView):
     http_method_names = ("get",)
     queryset = ProductsVariants.objects.prefetch_related(
-        Prefetch(
-            "orders_items",
-            queryset=OrdersItems.objects.select_related("order__shipping"),
-        ),
         Prefetch(
             "batches",
             queryset=ProductsVariantsBatches.objects.prefetch_related(
@@ -649,390 +612,114 @@ class ProductReportListAPIView(generics.ListAPIView):
         query_serializer=ProductReportPivotParams,
     )
     def get(self, request, *args, **kwargs):
-        params = ProductReportPivotParams(data=request.query_params)
+        return Response(data=self.get_report_data())
+
+    def get_report_data(self):
+        params = ProductReportPivotParams(data=self.request.query_params)
         params.is_valid(raise_exception=True)
         queryset = self.filter_queryset(self.get_queryset())
         pivot_table = ProductReportPivot(queryset=queryset, **params.validated_data)
-        return Response(data={"count": len(pivot_table.result), "results": pivot_table.result})
+        return {"count": len(pivot_table.result), "results": pivot_table.result}
 
-class ProductVariantRevenueView(generics.ListAPIView):
+class ProductVariantRevenueView(ReplicaReadMixin, ExportMixin, generics.ListAPIView):
     serializer_class = ProductVariantRevenueSerializer
     queryset = (
         ProductsVariants.objects.prefetch_related("images")
-        .annotate(
-            inventory_quantity=Coalesce(
-                Sum("batches__warehouse_inventory_product_variant_batch__quantity", distinct=True),
-                Value(0),
-                output_field=IntegerField()
-            )
-        )
+        .annotate(inventory_quantity=F("total_inventory"))
         .all()
     )
     filter_backends = (filters.SearchFilter, filters.OrderingFilter, django_filters.DjangoFilterBackend)
     filterset_class = ProductVariantRevenueFilterset
     search_fields = ("name", "SKU_code", "bar_code")
     ordering_fields = "__all__"
+    export_file_name = "product_variant_revenue"
+    export_columns = (
+        "SKU_code",
+        "bar_code",
+        "name",
+        "inventory_quantity",
+        "sold_quantity",
+        "revenue",
+        "sale_price",
+        "neo_price",
+    )
 
     def get_queryset(self):
-        queryset = self.queryset
-        query = self.get_query_by_date_range()
-        exclude = Q()
-        query.add(Q(orders_items__order__status=OrderStatus.COMPLETED), Q.AND)
-        query.add(~Q(orders_items__order__complete_time=None), Q.AND)
-        if self.request.query_params.get("customer"):
-            customer_query = Q(orders_items__order__customer=self.request.query_params.get("customer"))
-            query.add(customer_query, Q.AND)
-            queryset = queryset.filter(customer_query)
-            exclude = Q(sold_quantity=0)
-        
-        sold_quantity_subquery = self.get_sold_quantity_subquery(query)
-        revenue_subquery = self.get_revenue_subquery(query)
-
-        return queryset.annotate(
-            sold_quantity=Coalesce(Subquery(sold_quantity_subquery), Value(0), output_field=IntegerField()),
-            revenue=Coalesce(Subquery(revenue_subquery), Value(0), output_field=IntegerField())
-        ).exclude(exclude)
+        params = self.request.query_params
+        customer = params.get("customer")
+        sales = VariantDailySales.objects.in_range(
+            date_from=params.get("complete_time_from") if params.get("complete_time_to") else None,
+            date_to=params.get("complete_time_to") if params.get("complete_time_from") else None,
+            customer=customer,
+        )
+        queryset = self.queryset.annotate(
+            sold_quantity=sales.total_per_variant("quantity"),
+            revenue=sales.total_per_variant("revenue"),
+        )
+        if customer:
+            queryset = queryset.exclude(sold_quantity=0)
+        return queryset
 
     @swagger_auto_schema(operation_summary="Danh sách doanh thu sản phẩm biến thể")
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
-    def get_query_by_date_range(self):
-        complete_time_from = self.request.query_params.get("complete_time_from")
-        complete_time_to = self.request.query_params.get("complete_time_to")
 
-        if complete_time_from and complete_time_to:
-            return Q(
-                orders_items__order__complete_time__date__gte=complete_time_from, 
-                orders_items__order__complete_time__date__lte=complete_time_to
-            )
-        
-        return Q() 
+class BulkImportViewMixin:
+    """
+    Nhận dữ liệu dạng list JSON hoặc file CSV / XLSX (field `file`), xử lý theo chunk bằng `importer_class`.
+    Có lỗi thì rollback toàn bộ và trả về file lỗi (206).
+    """
 
-    def get_sold_quantity_subquery(self, query):
-        return ProductsVariants.objects.filter(
-            id=OuterRef('pk')
-        ).annotate(
-            sold_quantity=Coalesce(
-                Sum('orders_items__quantity', filter=query),
-                Value(0),
-                output_field=IntegerField()
-            )
-        ).values('sold_quantity')[:1]
+    importer_class = None
+    error_file_prefix = "import"
 
-    def get_revenue_subquery(self, query):
-        return ProductsVariants.objects.filter(
-            id=OuterRef('pk')
-        ).annotate(
-            revenue=Coalesce(
-                Sum(
-                    Case(
-                        When(orders_items__price_total_input__gt=0, then=F('orders_items__price_total_input')),
-                        default=F('orders_items__price_total')
-                    ),
-                    filter=query
-                ),
-                Value(0),
-                output_field=IntegerField()
+    def get_rows(self):
+        file = self.request.FILES.get("file")
+        if file:
+            return read_rows(file, self.importer_class.columns)
+        if not isinstance(self.request.data, list):
+            raise ValidationError({"file": "Vui lòng gửi file CSV / XLSX hoặc danh sách dữ liệu"})
+        return self.request.data
+
+    def run_import(self, success_status):
+        result = self.importer_class(user=self.request.user).run(self.get_rows())
+        if result.success:
+            return Response(
+                data={
+                    "success": True,
+                    "data": [{"id": pk} for pk in result.ids]
+                }, status=success_status
             )
-        ).values('revenue')[:1]
+
+        file_name = f"{self.request.user}_{self.error_file_prefix}_error_{str(int(time.time()))}.xlsx"
+        response = FileResponse(
+            result.error_file,
+            as_attachment=True,
+            filename=file_name,
+            content_type=XLSX_CONTENT_TYPE,
+        )
+        response.status_code = status.HTTP_206_PARTIAL_CONTENT
+        return response
 
 
-class ImportProductVariantsView(ActivityLogMixin, generics.CreateAPIView):
+class ImportProductVariantsView(BulkImportViewMixin, ActivityLogMixin, generics.CreateAPIView):
     serializer_class = ImportProductVariantSerializer
     queryset = ProductsVariants.objects.all()
+    importer_class = ProductVariantImporter
+    error_file_prefix = "import_variants"
 
     @swagger_auto_schema(operation_summary="Nhập nhiều biến thể từ file")
     def create(self, request, *args, **kwargs):
-        try:
-            with transaction.atomic():
-                existing_sku = set(
-                    self.get_queryset().values_list("SKU_code", flat=True)
-                )
-                existing_categories = {
-                    category.name: category
-                    for category in ProductCategory.objects.all()
-                }
-                existing_products = {
-                    product.SKU_code: product for product in Products.objects.all()
-                }
-                self.process_existing_category(existing_categories)
-                self.process_existing_product(existing_categories, existing_products)
-
-                serializer = self.get_serializer(
-                    data=request.data,
-                    many=True,
-                    context={
-                        "existing_sku": existing_sku,
-                        "existing_products": existing_products,
-                    },
-                )
-                if serializer.is_valid():
-                    validated_data = serializer.validated_data
-                    inventory_quantity = {
-                        item["SKU_code"]: item.pop("batches")[
-                            "warehouse_inventory_product_variant_batch"
-                        ]["quantity"]
-                        for item in validated_data
-                    }
-                    new_variants = [
-                        ProductsVariants(created_by=request.user, **item)
-                        for item in validated_data
-                    ]
-                    ProductsVariants.objects.bulk_create(new_variants)
-                    self.save_inventory(new_variants, inventory_quantity)
-                    return Response(
-                        data={
-                            "success": True,
-                            "data": [{"id": obj.id} for obj in new_variants]
-                        }, status=status.HTTP_201_CREATED
-                    )
-                # return Response(
-                #     data=serializer.errors, status=status.HTTP_400_BAD_REQUEST
-                # )
-                raise ValidationError("Validation failed")
-        except ValidationError:
-            transaction.rollback()
-
-            df = self.process_errors(serializer)
-            buffer = self.process_file(df)
-            file_name = f"{self.request.user}_import_variants_error_{str(int(time.time()))}.xlsx"
-            response = FileResponse(
-                buffer,
-                as_attachment=True,
-                filename=file_name,
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-            response.status_code = status.HTTP_206_PARTIAL_CONTENT
-            return response
-        except Exception as e:
-            transaction.rollback()
-            raise APIException(e)
-
-    def process_existing_category(self, existing_categories: dict):
-        new_category = {}
-        for data in self.request.data:
-            category_name = data.get("product_category")
-            if category_name not in existing_categories:
-                new_category[f"{category_name}"] = ProductCategory(name=category_name)
-        ProductCategory.objects.bulk_create(new_category.values())
-        # existing_categories.update({key: value for key, value in new_category.items()})
-        existing_categories.update(new_category)
-
-    def process_existing_product(
-        self, existing_categories: dict, existing_products: dict
-    ):
-        new_product = {}
-        for data in self.request.data:
-            product_SKU_code = data.get("product_SKU_code")
-            product_name = data.get("product_name")
-            category_name = data.get("product_category")
-            if product_SKU_code not in existing_products:
-                category = existing_categories.get(category_name)
-                new_product[f"{product_SKU_code}"] = Products(
-                    SKU_code=product_SKU_code,
-                    name=product_name,
-                    category=category,
-                    created_by=self.request.user,
-                )
-        Products.objects.bulk_create(new_product.values())
-        # existing_products.update({key: value for key, value in new_product.items()})
-        existing_products.update(new_product)
-
-    def save_inventory(
-        self, variants: list[ProductsVariants], inventory_quantity: dict
-    ):
-        default_warehouse = Warehouse.objects.filter(
-            is_default=True
-        ).first()
-        if not default_warehouse:
-            raise ValidationError({"error": "Kho mặc định chưa tồn tại"})
-        new_batch, new_inventory = [], []
-        for variant in variants:
-            batch = ProductsVariantsBatches(name=variant.name, product_variant=variant)
-            new_batch.append(batch)
-            new_inventory.append(
-                WarehouseInventory(
-                    created_by=self.request.user,
-                    warehouse=default_warehouse,
-                    product_variant_batch=batch,
-                    quantity=inventory_quantity.get(variant.SKU_code, 0),
-                )
-            )
+        return self.run_import(status.HTTP_201_CREATED)
 
-        ProductsVariantsBatches.objects.bulk_create(new_batch)
-        WarehouseInventory.objects.bulk_create(new_inventory)
-
-    def process_errors(self, serializer: ImportProductVariantSerializer):
-        column_rename_dict = {
-            "product_name": "*Tên sản phẩm",
-            "product_SKU_code": "*SKU code",
-            "product_category": "*Danh mục",
-            "name": "*Tên biến thể",
-            "SKU_code": "*SKU biến thể",
-            "sale_price": "*Giá bán",
-            "neo_price": "*Giá niêm yết",
-            "note": "*Ghi chú",
-            "errors": "Lỗi",
-            "inventory_quantity": "*Tồn kho",
-        }
-
-        df_errors = pd.DataFrame(serializer.errors)
-        df_errors.rename(columns=column_rename_dict, inplace=True)
-
-        def drop_na_columns(row):
-            return row.dropna().to_dict()
-
-        filtered_rows = df_errors.apply(drop_na_columns, axis=1)
-        errors_rename = filtered_rows.tolist()
-        error_data = []
-        for i, data in enumerate(self.request.data):
-            error_row = data.copy()
-            if i < len(errors_rename):
-                errors = errors_rename[i]
-                error_row["errors"] = ", ".join(
-                    f"{key}: {msg[0] if isinstance(msg, list) else msg}"
-                    for key, msg in errors.items()
-                )
-            else:
-                error_row["errors"] = ""
-            error_data.append(error_row)
-
-        df = pd.DataFrame(error_data)
-        df.rename(columns=column_rename_dict, inplace=True)
-        return df
-
-    def process_file(self, df: pd.DataFrame):
-        buffer = BytesIO()
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Lỗi"
-
-        for r in dataframe_to_rows(df, index=False, header=True):
-            ws.append(r)
-
-        for column_cells in ws.columns:
-            length = max(len(str(cell.value)) for cell in column_cells)
-            ws.column_dimensions[column_cells[0].column_letter].width = length + 2
-            for cell in column_cells:
-                cell.alignment = Alignment(horizontal="center")
-
-        wb.save(buffer)
-        buffer.seek(0)
-        return buffer
 
-
-class BulkUpdateProductVariantsView(ActivityLogMixin, generics.UpdateAPIView):
+class BulkUpdateProductVariantsView(BulkImportViewMixin, ActivityLogMixin, generics.UpdateAPIView):
     serializer_class = BulkUpdateProductVariantSerializer
     queryset = ProductsVariants.objects.all()
+    importer_class = ProductVariantPriceUpdater
+    error_file_prefix = "bulk_update_variants"
 
     @swagger_auto_schema(operation_summary="Cập nhật nhiều biến thể từ file")
     def update(self, request, *args, **kwargs):
-        try:
-            with transaction.atomic():
-                variants_db = self.get_queryset()
-                existing_sku = set()
-                existing_variants = {}
-                for variant in variants_db:
-                    existing_sku.add(variant.SKU_code)
-                    existing_variants[variant.SKU_code] = variant
-
-                serializer = self.get_serializer(
-                    data=request.data,
-                    many=True,
-                    context={
-                        "existing_sku": existing_sku,
-                    },
-                )
-                if serializer.is_valid():
-                    validated_data = serializer.validated_data
-                    update_variants = []
-                    for item in validated_data:
-                        variant = existing_variants.get(f"{item.get('SKU_code')}")
-                        for attr, value in item.items():
-                            if value is not None:
-                                setattr(variant, attr, value)
-                        update_variants.append(variant)
-
-                    ProductsVariants.objects.bulk_update(
-                        update_variants, 
-                        ["sale_price", "neo_price"]
-                    )
-                    return Response(
-                        data={
-                            "success": True,
-                            "data": [{"id": obj.id} for obj in update_variants]
-                        }, status=status.HTTP_200_OK
-                    )
-                raise ValidationError("Validation failed")
-        except ValidationError:
-            transaction.rollback()
-
-            df = self.process_errors(serializer)
-            buffer = self.process_file(df)
-            file_name = f"{self.request.user}_bulk_update_variants_error_{str(int(time.time()))}.xlsx"
-            response = FileResponse(
-                buffer,
-                as_attachment=True,
-                filename=file_name,
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-            response.status_code = status.HTTP_206_PARTIAL_CONTENT
-            return response
-        except Exception as e:
-            transaction.rollback()
-            traceback.print_exc()
-            raise APIException(e)
-      
-
-    def process_errors(self, serializer: ImportProductVariantSerializer):
-        column_rename_dict = {
-            "SKU_code": "*SKU biến thể",
-            "sale_price": "*Giá bán",
-            "neo_price": "*Giá niêm yết",
-            "errors": "Lỗi",
-        }
-
-        df_errors = pd.DataFrame(serializer.errors)
-        df_errors.rename(columns=column_rename_dict, inplace=True)
-
-        def drop_na_columns(row):
-            return row.dropna().to_dict()
-
-        filtered_rows = df_errors.apply(drop_na_columns, axis=1)
-        errors_rename = filtered_rows.tolist()
-        error_data = []
-        for i, data in enumerate(self.request.data):
-            error_row = data.copy()
-            if i < len(errors_rename):
-                errors = errors_rename[i]
-                error_row["errors"] = ", ".join(
-                    f"{key}: {msg[0] if isinstance(msg, list) else msg}"
-                    for key, msg in errors.items()
-                )
-            else:
-                error_row["errors"] = ""
-            error_data.append(error_row)
-
-        df = pd.DataFrame(error_data)
-        df.rename(columns=column_rename_dict, inplace=True)
-        return df
-
-    def process_file(self, df: pd.DataFrame):
-        buffer = BytesIO()
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Lỗi"
-
-        for r in dataframe_to_rows(df, index=False, header=True):
-            ws.append(r)
-
-        for column_cells in ws.columns:
-            length = max(len(str(cell.value)) for cell in column_cells)
-            ws.column_dimensions[column_cells[0].column_letter].width = length + 2
-            for cell in column_cells:
-                cell.alignment = Alignment(horizontal="center")
-
-        wb.save(buffer)
-        buffer.seek(0)
-        return buffer
+        return self.run_import(status.HTTP_200_OK)
@@ -0,0 +1,149 @@
+from rest_framework.exceptions import ValidationError
+
+from products.api.serializers import BulkUpdateProductVariantSerializer
+from products.api.serializers import ImportProductVariantSerializer
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from products.models import ProductsVariantsBatches
+from utils.bulk_import import BulkImporter
+from warehouses.models import Warehouse
+from warehouses.models import WarehouseInventory
+
+
+def _key(value):
+    return str(value).strip() if value not in (None, "") else None
+
+
+class ProductVariantImporter(BulkImporter):
+    """Import biến thể sản phẩm (kèm sản phẩm, danh mục và tồn kho ban đầu ở kho mặc định)"""
+
+    columns = {
+        "product_name": "*Tên sản phẩm",
+        "product_SKU_code": "*SKU code",
+        "product_category": "*Danh mục",
+        "name": "*Tên biến thể",
+        "SKU_code": "*SKU biến thể",
+        "sale_price": "*Giá bán",
+        "neo_price": "*Giá niêm yết",
+        "note": "*Ghi chú",
+        "inventory_quantity": "*Tồn kho",
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # SKU biến thể đã có trong DB hoặc đã gặp ở các dòng trước của file (ImportProductVariantSerializer
+        # thêm SKU của từng dòng đã validate vào set), dùng để báo trùng lặp kể cả giữa các chunk
+        self.known_sku = set()
+        self.default_warehouse = Warehouse.objects.filter(is_default=True).first()
+        if not self.default_warehouse:
+            raise ValidationError({"error": "Kho mặc định chưa tồn tại"})
+
+    def get_categories(self, rows) -> dict:
+        names = {_key(row.get("product_category")) for row in rows} - {None}
+        categories = {}
+        for category in ProductCategory.objects.filter(name__in=names):
+            categories.setdefault(category.name, category)
+        # Tên danh mục không unique nên không upsert được, chỉ tạo các danh mục còn thiếu
+        new_categories = [ProductCategory(name=name) for name in names - categories.keys()]
+        ProductCategory.objects.bulk_create(new_categories)
+        categories.update({category.name: category for category in new_categories})
+        return categories
+
+    def get_products(self, rows, categories: dict) -> dict:
+        new_products = {}
+        for row in rows:
+            sku = _key(row.get("product_SKU_code"))
+            if sku and sku not in new_products:
+                new_products[sku] = Products(
+                    SKU_code=sku,
+                    name=row.get("product_name"),
+                    category=categories.get(_key(row.get("product_category"))),
+                    created_by=self.user,
+                )
+        # Sản phẩm đã tồn tại được dùng lại, giữ nguyên thông tin (như khi import không theo chunk)
+        Products.objects.bulk_create(new_products.values(), ignore_conflicts=True)
+        return {
+            product.SKU_code: product for product in Products.objects.filter(SKU_code__in=new_products.keys()).select_related("category")
+        }
+
+    def process_chunk(self, rows, write):
+        categories = self.get_categories(rows)
+        products = self.get_products(rows, categories)
+        skus = {_key(row.get("SKU_code")) for row in rows} - {None}
+        self.known_sku.update(ProductsVariants.objects.filter(SKU_code__in=skus).values_list("SKU_code", flat=True))
+
+        serializer = ImportProductVariantSerializer(
+            data=rows,
+            many=True,
+            context={"existing_sku": self.known_sku, "existing_products": products},
+        )
+        if not serializer.is_valid():
+            return serializer.errors, []
+        if not write:
+            return [None] * len(rows), []
+
+        inventory_quantity = {}
+        new_variants = []
+        for item in serializer.validated_data:
+            inventory_quantity[item["SKU_code"]] = item.pop("batches")["warehouse_inventory_product_variant_batch"]["quantity"]
+            new_variants.append(ProductsVariants(created_by=self.user, **item))
+        ProductsVariants.objects.bulk_create(new_variants)
+        self.save_inventory(new_variants, inventory_quantity)
+        return [None] * len(rows), new_variants
+
+    def save_inventory(self, variants: list[ProductsVariants], inventory_quantity: dict):
+        new_batch, new_inventory = [], []
+        for variant in variants:
+            batch = ProductsVariantsBatches(name=variant.name, product_variant=variant)
+            new_batch.append(batch)
+            new_inventory.append(
+                WarehouseInventory(
+                    created_by=self.user,
+                    warehouse=self.default_warehouse,
+                    product_variant_batch=batch,
+                    quantity=inventory_quantity.get(variant.SKU_code, 0),
+                )
+            )
+
+        ProductsVariantsBatches.objects.bulk_create(new_batch)
+        # WarehouseInventory.objects.bulk_create tự cộng tổng tồn của variant / sản phẩm / danh mục
+        WarehouseInventory.objects.bulk_create(new_inventory)
+
+
+class ProductVariantPriceUpdater(BulkImporter):
+    """Cập nhật giá bán / giá niêm yết của biến thể theo SKU"""
+
+    columns = {
+        "SKU_code": "*SKU biến thể",
+        "sale_price": "*Giá bán",
+        "neo_price": "*Giá niêm yết",
+    }
+    update_fields = ["sale_price", "neo_price"]
+
+    def process_chunk(self, rows, write):
+        skus = {_key(row.get("SKU_code")) for row in rows} - {None}
+        variants = {
+            variant.SKU_code: variant
+            for variant in ProductsVariants.objects.filter(SKU_code__in=skus).only("id", "SKU_code", *self.update_fields)
+        }
+
+        serializer = BulkUpdateProductVariantSerializer(
+            data=rows,
+            many=True,
+            context={"existing_sku": set(variants.keys())},
+        )
+        if not serializer.is_valid():
+            return serializer.errors, []
+        if not write:
+            return [None] * len(rows), []
+
+        update_variants = []
+        for item in serializer.validated_data:
+            variant = variants[item["SKU_code"]]
+            for attr, value in item.items():
+                if value is not None:
+                    setattr(variant, attr, value)
+            update_variants.append(variant)
+        ProductsVariants.objects.bulk_update(update_variants, self.update_fields)
+        return [None] * len(rows), update_variants
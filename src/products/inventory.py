@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import Case
+from django.db.models import F
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Coalesce
+
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from products.models import ProductsVariantsBatches
+from warehouses.models import WarehouseInventory
+
+TOTAL_FIELD = models.DecimalField(max_digits=15, decimal_places=4)
+
+
+def _increment(model, deltas: dict):
+    deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+    if not deltas:
+        return
+    # Cộng dồn bằng F() để an toàn khi nhiều transaction cùng cập nhật một dòng
+    model.objects.filter(pk__in=deltas.keys()).update(
+        total_inventory=F("total_inventory")
+        + Case(*[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()], output_field=TOTAL_FIELD)
+    )
+
+
+def apply_inventory_deltas(batch_deltas: dict):
+    """
+    Cộng chênh lệch tồn kho {batch_id: delta} vào tổng tồn của variant, sản phẩm và danh mục.
+    Phải được gọi trong cùng transaction với thay đổi của WarehouseInventory.
+    """
+    batch_deltas = {batch_id: Decimal(str(delta)) for batch_id, delta in batch_deltas.items() if batch_id and delta}
+    if not batch_deltas:
+        return
+
+    variant_deltas, product_deltas, category_deltas = {}, {}, {}
+    rows = ProductsVariantsBatches.objects.filter(pk__in=batch_deltas.keys(), product_variant__isnull=False).values_list(
+        "pk", "product_variant_id", "product_variant__product_id", "product_variant__product__category_id"
+    )
+    for batch_id, variant_id, product_id, category_id in rows:
+        delta = batch_deltas[batch_id]
+        variant_deltas[variant_id] = variant_deltas.get(variant_id, 0) + delta
+        product_deltas[product_id] = product_deltas.get(product_id, 0) + delta
+        category_deltas[category_id] = category_deltas.get(category_id, 0) + delta
+
+    _increment(ProductsVariants, variant_deltas)
+    _increment(Products, product_deltas)
+    _increment(ProductCategory, category_deltas)
+
+
+def _sum_subquery(queryset, group_by, field):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(total=Sum(field)).values("total")[:1]),
+        Value(0),
+        output_field=TOTAL_FIELD,
+    )
+
+
+def recompute_inventory_totals():
+    """Tính lại toàn bộ tổng tồn từ WarehouseInventory (dùng khi khởi tạo hoặc đối soát)"""
+    ProductsVariants.objects.update(
+        total_inventory=_sum_subquery(
+            WarehouseInventory.objects.filter(product_variant_batch__product_variant=OuterRef("pk")),
+            "product_variant_batch__product_variant",
+            "quantity",
+        )
+    )
+    Products.objects.update(
+        total_inventory=_sum_subquery(ProductsVariants.objects.filter(product=OuterRef("pk")), "product", "total_inventory")
+    )
+    ProductCategory.objects.update(
+        total_inventory=_sum_subquery(Products.objects.filter(category=OuterRef("pk")), "category", "total_inventory")
+    )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from products.inventory import recompute_inventory_totals
+
+
+class Command(BaseCommand):
+    help = "Tính lại tổng tồn kho của variant / sản phẩm / danh mục từ WarehouseInventory"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recompute_inventory_totals()
+        self.stdout.write(self.style.SUCCESS("Đã tính lại tổng tồn kho"))
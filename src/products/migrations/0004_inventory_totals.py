@@ -0,0 +1,61 @@
+# Generated by Django 5.0 on 2026-10-19 14:08
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _sum_subquery(queryset, group_by, field):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(total=Sum(field)).values("total")[:1]),
+        Value(0),
+        output_field=models.DecimalField(max_digits=15, decimal_places=4),
+    )
+
+
+def backfill_inventory_totals(apps, schema_editor):
+    WarehouseInventory = apps.get_model("warehouses", "WarehouseInventory")
+    ProductsVariants = apps.get_model("products", "ProductsVariants")
+    Products = apps.get_model("products", "Products")
+    ProductCategory = apps.get_model("products", "ProductCategory")
+
+    ProductsVariants.objects.update(
+        total_inventory=_sum_subquery(
+            WarehouseInventory.objects.filter(product_variant_batch__product_variant=OuterRef("pk")),
+            "product_variant_batch__product_variant",
+            "quantity",
+        )
+    )
+    Products.objects.update(
+        total_inventory=_sum_subquery(ProductsVariants.objects.filter(product=OuterRef("pk")), "product", "total_inventory")
+    )
+    ProductCategory.objects.update(
+        total_inventory=_sum_subquery(Products.objects.filter(category=OuterRef("pk")), "category", "total_inventory")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_alter_products_options'),
+        ('warehouses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productcategory',
+            name='total_inventory',
+            field=models.DecimalField(db_index=True, decimal_places=4, default=0, editable=False, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='total_inventory',
+            field=models.DecimalField(db_index=True, decimal_places=4, default=0, editable=False, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='productsvariants',
+            name='total_inventory',
+            field=models.DecimalField(db_index=True, decimal_places=4, default=0, editable=False, max_digits=15),
+        ),
+        migrations.RunPython(backfill_inventory_totals, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
+from django.apps import apps
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.db.models.functions import JSONObject
 from model_utils.models import TimeStampedModel
 from model_utils.models import UUIDModel
 
@@ -16,6 +19,8 @@ from users.models import User
 class ProductCategory(TimeStampedModel, UUIDModel):
     name = models.CharField(blank=True, max_length=64)
     code = models.CharField(null=True, max_length=32, unique=True)
+    # Tổng tồn kho, được cập nhật cùng transaction với WarehouseInventory (xem products.inventory)
+    total_inventory = models.DecimalField(max_digits=15, decimal_places=4, default=0, db_index=True, editable=False)
 
     def __str__(self):
         return self.code
@@ -63,6 +68,8 @@ class Products(TimeStampedModel, UUIDModel):
     category = models.ForeignKey(ProductCategory, on_delete=models.CASCADE, related_name="products")
     supplier = models.ForeignKey(ProductSupplier, on_delete=models.SET_NULL, related_name="products", null=True)
     SKU_code = models.CharField(max_length=255, null=True, unique=True)
+    # Tổng tồn kho, được cập nhật cùng transaction với WarehouseInventory (xem products.inventory)
+    total_inventory = models.DecimalField(max_digits=15, decimal_places=4, default=0, db_index=True, editable=False)
 
     class Meta:
         db_table = "tbl_Products"
@@ -72,6 +79,50 @@ class Products(TimeStampedModel, UUIDModel):
         ]
 
 
+# (annotation, model order, lookup tới trạng thái đơn hàng) của các nguồn trừ tồn: sản phẩm, combo, quà tặng
+INVENTORY_AVAILABLE_SOURCES = (
+    ("inventory_order_items", "OrdersItems", "order__status"),
+    ("inventory_order_items_combo", "OrdersItemsCombo", "line_item__order__status"),
+    ("inventory_order_items_promotion", "OrdersItemsPromotion", "order_variant_promotion__line_item__order__status"),
+)
+# key trong JSON của mỗi nguồn -> trạng thái đơn hàng tương ứng
+INVENTORY_AVAILABLE_STATUSES = {"confirmed": OrderStatus.COMPLETED, "non_confirm": OrderStatus.DRAFT}
+
+
+def _inventory_available_subquery(model_name, status_lookup):
+    """
+    Một subquery gom nhóm theo variant (outer ref) cho mỗi nguồn, trả về JSON
+    {"confirmed": ..., "non_confirm": ...} tính bằng Sum có điều kiện theo trạng thái đơn
+    """
+    quantities = {
+        key: Coalesce(models.Sum("quantity", filter=models.Q(**{status_lookup: status})), 0)
+        for key, status in INVENTORY_AVAILABLE_STATUSES.items()
+    }
+    queryset = (
+        apps.get_model("orders", model_name)
+        .objects.filter(variant_id=models.OuterRef("pk"), **{f"{status_lookup}__in": list(INVENTORY_AVAILABLE_STATUSES.values())})
+        .order_by()
+        .values("variant_id")
+        .annotate(quantities=JSONObject(**quantities))
+        .values("quantities")
+    )
+    return models.Subquery(queryset, output_field=models.JSONField())
+
+
+class ProductsVariantsQuerySet(models.QuerySet):
+    def with_inventory_available(self):
+        """
+        Annotate số lượng đã trừ tồn theo từng nguồn (sản phẩm, combo, quà tặng): mỗi nguồn chỉ một subquery
+        trả về cả số lượng đơn completed lẫn đơn draft, model cộng lại trong inventory_available_*
+        """
+        return self.annotate(
+            **{
+                annotation: _inventory_available_subquery(model_name, status_lookup)
+                for annotation, model_name, status_lookup in INVENTORY_AVAILABLE_SOURCES
+            }
+        )
+
+
 class ProductsVariants(TimeStampedModel, UUIDModel):
     created_by = models.ForeignKey(
         User,
@@ -111,6 +162,10 @@ class ProductsVariants(TimeStampedModel, UUIDModel):
     tags = models.ManyToManyField(ProductTag, related_name="product_variant_tags", blank=True)
     commission = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     commission_percent = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    # Tổng tồn kho, được cập nhật cùng transaction với WarehouseInventory (xem products.inventory)
+    total_inventory = models.DecimalField(max_digits=15, decimal_places=4, default=0, db_index=True, editable=False)
+
+    objects = ProductsVariantsQuerySet.as_manager()
 
     def save(self, *args, **kwargs):
 
@@ -122,54 +177,20 @@ class ProductsVariants(TimeStampedModel, UUIDModel):
             self.bar_code = self.product.SKU_code
         return super().save(*args, **kwargs)
 
+    def _get_inventory_available(self, key):
+        if self.type != ProductVariantType.SIMPLE:
+            return 0
+        annotations = [annotation for annotation, _, _ in INVENTORY_AVAILABLE_SOURCES]
+        if not hasattr(self, annotations[0]):
+            # Không được annotate (vd: lấy riêng một variant): tính cho riêng variant này
+            self.__dict__.update(ProductsVariants.objects.with_inventory_available().filter(pk=self.pk).values(*annotations).get())
+        return sum((getattr(self, annotation) or {}).get(key, 0) for annotation in annotations)
+
     def inventory_available_confirmed(self):
-        if self.type == ProductVariantType.SIMPLE:
-            c_quantity_order_items = (
-                self.orders_items.filter(order__status=OrderStatus.COMPLETED, order__shipping__isnull=True)
-                .aggregate(models.Sum("quantity"))
-                .get("quantity__sum")
-                or 0
-            )
-            c_quantity_items_combo = (
-                self.order_item_combos.filter(
-                    line_item__order__status=OrderStatus.COMPLETED,
-                    line_item__order__shipping__isnull=True,
-                )
-                .aggregate(models.Sum("quantity"))
-                .get("quantity__sum")
-                or 0
-            )
-            c_quantity_items_promotion = (
-                self.line_items_promotions.filter(
-                    order_variant_promotion__line_item__order__status=OrderStatus.COMPLETED,
-                    order_variant_promotion__line_item__order__shipping__isnull=True,
-                )
-                .aggregate(models.Sum("quantity"))
-                .get("quantity__sum")
-                or 0
-            )
-            return c_quantity_order_items + c_quantity_items_combo + c_quantity_items_promotion
-        return 0
+        return self._get_inventory_available("confirmed")
 
     def inventory_available_non_confirm(self):
-        if self.type == ProductVariantType.SIMPLE:
-            c_quantity_order_items = (
-                self.orders_items.filter(order__status=OrderStatus.DRAFT).aggregate(models.Sum("quantity")).get("quantity__sum") or 0
-            )
-            c_quantity_items_combo = (
-                self.order_item_combos.filter(line_item__order__status=OrderStatus.DRAFT)
-                .aggregate(models.Sum("quantity"))
-                .get("quantity__sum")
-                or 0
-            )
-            c_quantity_items_promotion = (
-                self.line_items_promotions.filter(order_variant_promotion__line_item__order__status=OrderStatus.DRAFT)
-                .aggregate(models.Sum("quantity"))
-                .get("quantity__sum")
-                or 0
-            )
-            return c_quantity_order_items + c_quantity_items_combo + c_quantity_items_promotion
-        return 0
+        return self._get_inventory_available("non_confirm")
 
     class Meta:
         db_table = "tbl_Products_Variants"
@@ -214,7 +235,7 @@ class ProductsVariantsBatches(TimeStampedModel, UUIDModel):
     product_variant = models.ForeignKey(ProductsVariants, on_delete=models.CASCADE, related_name="batches", null=True)
     product_material = models.ForeignKey(ProductsMaterials, on_delete=models.CASCADE, related_name="batches", null=True)
     expire_date = models.DateField(blank=True, null=True)
-    is_default = models.BooleanField(default=False) # Unique every obj
+    is_default = models.BooleanField(default=False)  # Unique every obj
 
     def clean(self):
         if self.type == ProductType.VARIANT.value and self.product_variant is None:
@@ -1,12 +1,15 @@
+import operator
+from functools import reduce
+
 import pandas as pd
-from django.db.models import Count
+from django.db.models import Exists
 from django.db.models import F
+from django.db.models import OuterRef
 from django.db.models import Q
 from django.db.models import Sum
 from django.db.models import Value
 
-from orders.enums import OrderItemDataFlowType
-from products.models import ProductsVariants
+from orders.models import VariantDailySales
 from utils.reports import BindingExprEnum
 from utils.reports import Dimensions
 from utils.reports import ExprsFilterEnum as ExprD
@@ -17,6 +20,10 @@ from utils.reports import MetricExprs
 from utils.reports import PivotReportBase
 from warehouses.enums import SheetImportExportType
 from warehouses.enums import WarehouseBaseType
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseSheetCheckDetail
+from warehouses.models import WarehouseSheetImportExportDetail
+from warehouses.models import WarehouseSheetTransferDetail
 
 
 class ProductReportPivot(PivotReportBase):
@@ -28,7 +35,14 @@ class ProductReportPivot(PivotReportBase):
         filters=None,
         b_expr_dims: BindingExprEnum = BindingExprEnum.AND,
         b_expr_metrics: BindingExprEnum = BindingExprEnum.AND,
+        complete_time_from=None,
+        complete_time_to=None,
+        warehouse_ids=None,
     ):
+        # Khoảng ngày hoàn thành đơn áp dụng cho các metric doanh số (đọc từ VariantDailySales)
+        self.sales = VariantDailySales.objects.in_range(complete_time_from, complete_time_to)
+        # Kho áp dụng cho tồn kho / kho của sản phẩm và số lượng theo loại phiếu
+        self.warehouse_ids = warehouse_ids or []
         self.dimensions: dict = self._dimensions(dimensions)
 
         self.metrics: dict = self._metrics(metrics)
@@ -47,8 +61,8 @@ class ProductReportPivot(PivotReportBase):
                 self.dimensions.update(self.DIMS_DEFAULT)
             sheet_type = self.dimensions.pop("sheet_type")
             self.df: pd.DataFrame = self._data_frame()
-            df_merge = self._get_df_dims_sheet_type()
-            self.df = pd.merge(self.df, df_merge, how="inner", on="SKU_code")
+            if not self.df.empty:
+                self.df = pd.merge(self.df, self._get_df_dims_sheet_type(), how="inner", on="SKU_code")
 
             # set dimension and metric for sheet type
             self.dimensions["sheet_type"] = sheet_type
@@ -107,6 +121,22 @@ class ProductReportPivot(PivotReportBase):
         # "quantity": Metric(expr=MetricExprs.MEAN, field="quantity", _in=InType.query)
     }
 
+    # metric -> field tương ứng trong VariantDailySales
+    SALES_METRICS_FIELD = {
+        # 1. Revenue: The selling value of the product before discounts
+        "total_revenue": "price_total_neo",
+        # 2. Actual Revenue: Total value of goods sold after subtracting discounts
+        "total_actual_revenue": "price_total",
+        # 3. Total Promotion Amount: Total amount of promotion for the corresponding product
+        "total_promotion_amount": "discount",
+        # 4. Quantity Sold
+        "quantity_sold": "quantity",
+        # 5. Actual Quantity Sold: không tính các đơn đã hoàn hàng
+        "actual_quantity_sold": "actual_quantity",
+        # 6. Number of Orders: Number of orders containing the product
+        "number_of_orders": "order_count",
+    }
+
     FILTERS_AVB = {
         "total_revenue": Filter(
             field="total_revenue",
@@ -165,27 +195,31 @@ class ProductReportPivot(PivotReportBase):
     }
 
     def _queryset(self, queryset):
-        # 1. Revenue: The selling value of the product before discounts
-        if "total_revenue" in self.metrics:
-            queryset = queryset.annotate(total_revenue=Sum("orders_items__price_total_neo"))
-
-        # 2. Actual Revenue: Total value of goods sold after subtracting discounts
-        if "total_actual_revenue" in self.metrics:
-            queryset = queryset.annotate(total_actual_revenue=Sum("orders_items__price_total"))
-
-        # 3. Total Promotion Amount: Total amount of promotion for the corresponding product
-        if "total_promotion_amount" in self.metrics:
-            queryset = queryset.annotate(total_promotion_amount=Sum("orders_items__discount"))
-
-        # 4.1 Quantity Sold: Quantity of products that appear in successfully delivered orders
+        inventory_in_warehouses = Q()
+        if self.warehouse_ids:
+            # Exists không join bảng tồn kho (quan hệ nhiều dòng) nên không nhân số dòng / các metric của sản phẩm
+            queryset = queryset.filter(
+                Exists(
+                    WarehouseInventory.objects.filter(
+                        product_variant_batch__product_variant=OuterRef("pk"), warehouse_id__in=self.warehouse_ids
+                    )
+                )
+            )
+            inventory_in_warehouses = Q(batches__warehouse_inventory_product_variant_batch__warehouse_id__in=self.warehouse_ids)
+            # Dimension kho: mỗi dòng là một kho của sản phẩm, chỉ giữ các kho được chọn
+            if "warehouse" in self.dimensions:
+                queryset = queryset.filter(inventory_in_warehouses)
 
-        # 6. Number of Orders: Number of orders containing the product
-        if "number_of_orders" in self.metrics:
-            queryset = queryset.annotate(number_of_orders=Count("orders_items__order__order_key", distinct=True))
+        # Các metric doanh số được tính từ bảng tổng hợp VariantDailySales (đơn đã hoàn thành)
+        for metric, field in self.SALES_METRICS_FIELD.items():
+            if metric in self.metrics:
+                queryset = queryset.annotate(**{metric: self.sales.total_per_variant(field)})
 
         # 7. Inventory Quantity
         if "inventory_quantity" in self.metrics:
-            queryset = queryset.annotate(inventory_quantity=Sum("batches__warehouse_inventory_product_variant_batch__quantity"))
+            queryset = queryset.annotate(
+                inventory_quantity=Sum("batches__warehouse_inventory_product_variant_batch__quantity", filter=inventory_in_warehouses)
+            )
 
         # 8. Quantity import
         if "quantity_import" in self.metrics:  # match tới bảng WarehouseSheetImportExportDetail
@@ -202,50 +236,47 @@ class ProductReportPivot(PivotReportBase):
 
         return queryset
 
-    @staticmethod
-    def _get_df_dims_sheet_type():
-        import_query = (
-            ProductsVariants.objects.prefetch_related("batches__warehouse_sheet_import_export_detail_product_variant_batch")
-            .filter(
-                batches__warehouse_sheet_import_export_detail_product_variant_batch__sheet__type=WarehouseBaseType.IMPORT,
-                batches__warehouse_sheet_import_export_detail_product_variant_batch__id__isnull=False,
-            )
-            .annotate(
-                sheet_type=Value(WarehouseBaseType.IMPORT),
-                quantity_in_sheet=F("batches__warehouse_sheet_import_export_detail_product_variant_batch__quantity"),
-            )
-        )
+    # Loại phiếu -> (chi tiết phiếu, điều kiện, trường số lượng, các trường kho của phiếu)
+    SHEET_TYPE_SOURCES = {
+        WarehouseBaseType.IMPORT: (
+            WarehouseSheetImportExportDetail,
+            Q(sheet__type=SheetImportExportType.IMPORT.value),
+            "quantity",
+            ["sheet__warehouse_id"],
+        ),
+        WarehouseBaseType.EXPORT: (
+            WarehouseSheetImportExportDetail,
+            Q(sheet__type=SheetImportExportType.EXPORT.value),
+            "quantity",
+            ["sheet__warehouse_id"],
+        ),
+        WarehouseBaseType.TRANSFER: (WarehouseSheetTransferDetail, Q(), "quantity", ["sheet__warehouse_from_id", "sheet__warehouse_to_id"]),
+        WarehouseBaseType.CHECK: (WarehouseSheetCheckDetail, Q(), "quantity_actual", ["sheet__warehouse_id"]),
+    }
 
-        export_query = (
-            ProductsVariants.objects.prefetch_related("batches__warehouse_sheet_import_export_detail_product_variant_batch")
-            .filter(
-                batches__warehouse_sheet_import_export_detail_product_variant_batch__sheet__type=WarehouseBaseType.EXPORT,
-                batches__warehouse_sheet_import_export_detail_product_variant_batch__id__isnull=False,
-            )
-            .annotate(
-                sheet_type=Value(WarehouseBaseType.EXPORT),
-                quantity_in_sheet=F("batches__warehouse_sheet_import_export_detail_product_variant_batch__quantity"),
-            )
-        )
-
-        transfer_query = (
-            ProductsVariants.objects.prefetch_related("batches__warehouse_sheet_transfer_detail_product_variant_batch")
-            .filter(batches__warehouse_sheet_transfer_detail_product_variant_batch__id__isnull=False)
-            .annotate(
-                sheet_type=Value(WarehouseBaseType.TRANSFER),
-                quantity_in_sheet=F("batches__warehouse_sheet_transfer_detail_product_variant_batch__quantity"),
-            )
-        )
-
-        check_query = (
-            ProductsVariants.objects.prefetch_related("batches__warehouse_sheet_check_detail_product_variant_batch")
-            .filter(batches__warehouse_sheet_check_detail_product_variant_batch__id__isnull=False)
-            .annotate(
-                sheet_type=Value(WarehouseBaseType.CHECK),
-                quantity_in_sheet=F("batches__warehouse_sheet_check_detail_product_variant_batch__quantity_actual"),
+    def _get_df_dims_sheet_type(self):
+        """
+        Số lượng theo loại phiếu, chỉ lấy cho các sản phẩm có trong kết quả (`self.df`, đã qua bộ lọc ngày / danh mục / sản phẩm),
+        bộ lọc kho được áp dụng trong từng nhánh của union
+        """
+        sku_codes = list(self.df["SKU_code"].dropna().unique())
+        if not sku_codes:
+            return pd.DataFrame(columns=["SKU_code", "sheet_type", "quantity_in_sheet"])
+
+        querysets = []
+        for sheet_type, (model, condition, quantity_field, warehouse_fields) in self.SHEET_TYPE_SOURCES.items():
+            condition &= Q(product_variant_batch__product_variant__SKU_code__in=sku_codes)
+            if self.warehouse_ids:
+                condition &= reduce(operator.or_, [Q(**{f"{field}__in": self.warehouse_ids}) for field in warehouse_fields])
+            querysets.append(
+                model.objects.filter(condition)
+                .order_by()
+                .values(
+                    SKU_code=F("product_variant_batch__product_variant__SKU_code"),
+                    sheet_type=Value(sheet_type.value),
+                    quantity_in_sheet=F(quantity_field),
+                )
             )
-        )
 
-        queryset = import_query.union(export_query, transfer_query, check_query).values("SKU_code", "sheet_type", "quantity_in_sheet")
-        df = pd.DataFrame.from_dict(queryset)
-        return df
+        queryset = querysets[0].union(*querysets[1:])
+        return pd.DataFrame.from_records(queryset, columns=["SKU_code", "sheet_type", "quantity_in_sheet"])
@@ -0,0 +1,78 @@
+import csv
+import io
+
+import pytest
+from django.http import StreamingHttpResponse
+from openpyxl import load_workbook
+
+from products.api.views import ProductVariantRevenueView
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from utils import export
+
+pytestmark = pytest.mark.django_db
+
+REVENUE_URL = "/api/products/variants/revenue"
+
+
+@pytest.fixture
+def variants():
+    category = ProductCategory.objects.create(name="Danh mục")
+    product = Products.objects.create(name="Sản phẩm", category=category, SKU_code="P")
+    return [
+        ProductsVariants.objects.create(name=f"Biến thể {index}", SKU_code=f"V{index}", product=product, sale_price=index * 1000)
+        for index in range(30)
+    ]
+
+
+@pytest.fixture
+def export_client(api_client, user):
+    user.is_exportdata = True
+    user.save()
+    return api_client
+
+
+def streamed_content(response):
+    assert isinstance(response, StreamingHttpResponse)
+    blocks = list(response.streaming_content)
+    return blocks, b"".join(blocks)
+
+
+def test_csv_export_streams_every_row_in_blocks(export_client, variants, monkeypatch):
+    monkeypatch.setattr(export, "STREAM_BLOCK_SIZE", 256)
+
+    response = export_client.get(REVENUE_URL, {"export": "csv", "ordering": "SKU_code"})
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == export.CSV_CONTENT_TYPE
+    assert response["Content-Disposition"].startswith('attachment; filename="product_variant_revenue_')
+    blocks, content = streamed_content(response)
+    assert len(blocks) > 1
+    rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+    assert rows[0] == list(ProductVariantRevenueView.export_columns)
+    assert [row[0] for row in rows[1:]] == sorted(variant.SKU_code for variant in variants)
+    assert rows[1][2] == "Biến thể 0"
+
+
+def test_xlsx_export_contains_header_and_rows(export_client, variants):
+    response = export_client.get(REVENUE_URL, {"export": "xlsx", "search": "V1"})
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == export.XLSX_CONTENT_TYPE
+    _, content = streamed_content(response)
+    sheet = load_workbook(io.BytesIO(content), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][:3] == ("SKU_code", "bar_code", "name")
+    # search=V1: V1 và V10..V19
+    assert sorted(row[0] for row in rows[1:]) == sorted(variant.SKU_code for variant in variants if variant.SKU_code.startswith("V1"))
+
+
+def test_export_requires_permission_and_known_format(api_client, export_client, user, variants):
+    user.is_exportdata = False
+    user.save()
+    assert api_client.get(REVENUE_URL, {"export": "csv"}).status_code == 403
+
+    user.is_exportdata = True
+    user.save()
+    assert export_client.get(REVENUE_URL, {"export": "pdf"}).status_code == 400
@@ -0,0 +1,90 @@
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from products.importers import ProductVariantImporter
+from products.models import Products
+from products.models import ProductsVariants
+from utils.bulk_import import read_rows
+from warehouses.models import Warehouse
+from warehouses.models import WarehouseInventory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def default_warehouse():
+    return Warehouse.objects.create(name="Kho mặc định", is_default=True)
+
+
+def make_row(index, product="P1", category="Danh mục", **overrides):
+    return {
+        "product_name": f"Sản phẩm {product}",
+        "product_SKU_code": product,
+        "product_category": category,
+        "name": f"Biến thể {index}",
+        "SKU_code": f"V{index}",
+        "sale_price": 1000,
+        "neo_price": 1200,
+        "note": "",
+        "inventory_quantity": index,
+        **overrides,
+    }
+
+
+def read_error_file(result):
+    rows = list(load_workbook(result.error_file, read_only=True).active.iter_rows(values_only=True))
+    return rows[0], rows[1:]
+
+
+def test_valid_rows_are_written_chunk_by_chunk(user, default_warehouse, django_assert_max_num_queries):
+    rows = [make_row(index, product="P1" if index < 3 else "P2") for index in range(1, 6)]
+
+    result = ProductVariantImporter(user=user, chunk_size=2).run(iter(rows))
+
+    assert result.success and result.error_file is None
+    assert result.total == 5
+    variants = ProductsVariants.objects.filter(pk__in=result.ids)
+    assert sorted(variants.values_list("SKU_code", flat=True)) == ["V1", "V2", "V3", "V4", "V5"]
+    assert dict(Products.objects.values_list("SKU_code", "total_inventory")) == {"P1": 3, "P2": 12}
+    assert WarehouseInventory.objects.filter(warehouse=default_warehouse).count() == 5
+
+
+def test_error_in_any_chunk_rolls_back_every_chunk(user, default_warehouse):
+    # V2 bị trùng ở chunk thứ hai: các chunk trước đã ghi cũng phải rollback
+    rows = [make_row(1), make_row(2), make_row(3), make_row(4, SKU_code="V2"), make_row(5)]
+
+    result = ProductVariantImporter(user=user, chunk_size=2).run(iter(rows))
+
+    assert not result.success
+    assert result.error_count == 1 and result.total == 5
+    assert result.ids == []
+    assert not ProductsVariants.objects.exists()
+    assert not Products.objects.exists()
+    assert not WarehouseInventory.objects.exists()
+
+
+def test_error_workbook_contains_every_row_with_its_errors(user, default_warehouse):
+    rows = [make_row(1), make_row(2, SKU_code="V1"), make_row(3), make_row(4, product="P1", category="Danh mục khác")]
+
+    result = ProductVariantImporter(user=user, chunk_size=2).run(iter(rows))
+
+    header, data = read_error_file(result)
+    assert header == (*ProductVariantImporter.columns.values(), "Lỗi")
+    assert [row[4] for row in data] == ["V1", "V1", "V3", "V4"]
+    errors = [row[-1] for row in data]
+    assert errors[0] is None and errors[2] is None
+    assert "V1" in errors[1] and errors[1].startswith("SKU_code")
+    assert errors[3].startswith("product_category")
+    assert result.error_count == 2
+
+
+def test_read_rows_maps_display_headers_and_skips_blank_rows():
+    content = "*SKU biến thể,*Giá bán\nV1,1000\n,\nV2,\n".encode("utf-8-sig")
+    file = io.BytesIO(content)
+    file.name = "variants.csv"
+
+    rows = list(read_rows(file, ProductVariantImporter.columns))
+
+    assert rows == [{"SKU_code": "V1", "sale_price": "1000"}, {"SKU_code": "V2"}]
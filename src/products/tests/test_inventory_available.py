@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.db import models
+from django.test.utils import CaptureQueriesContext
+
+from orders.enums import OrderStatus
+from orders.models import Orders
+from orders.models import OrdersItems
+from orders.models import OrdersItemsCombo
+from orders.models import OrdersItemsPromotion
+from orders.models import OrderVariantsPromotion
+from products.enums import ProductVariantType
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+
+pytestmark = pytest.mark.django_db
+
+
+def legacy_inventory_available(variant, status):
+    """Cách tính cũ của model (mỗi nguồn một aggregate), dùng để đối chiếu"""
+    if variant.type != ProductVariantType.SIMPLE:
+        return 0
+    sources = (
+        (variant.orders_items, "order__status"),
+        (variant.order_item_combos, "line_item__order__status"),
+        (variant.line_items_promotions, "order_variant_promotion__line_item__order__status"),
+    )
+    return sum(manager.filter(**{lookup: status}).aggregate(models.Sum("quantity"))["quantity__sum"] or 0 for manager, lookup in sources)
+
+
+@pytest.fixture
+def variants():
+    category = ProductCategory.objects.create(name="Danh mục")
+    product = Products.objects.create(name="Sản phẩm", category=category, SKU_code="P")
+    simple, gift, combo, unused = [
+        ProductsVariants.objects.create(name=name, SKU_code=name, product=product) for name in ("simple", "gift", "combo", "unused")
+    ]
+    combo.type = ProductVariantType.COMBO
+    combo.save()
+
+    for index, (status, quantity) in enumerate(((OrderStatus.COMPLETED, 3), (OrderStatus.DRAFT, 2), (OrderStatus.CANCEL, 7))):
+        order = Orders.objects.create(status=status, order_number=str(index), order_key=f"K{index}")
+        # Nhiều dòng cùng variant trong một đơn
+        line_item = OrdersItems.objects.create(order=order, variant=simple, quantity=quantity, price_variant_logs=1, price_total=1)
+        OrdersItems.objects.create(order=order, variant=simple, quantity=1, price_variant_logs=1, price_total=1)
+        combo_item = OrdersItems.objects.create(order=order, variant=combo, quantity=1, price_variant_logs=1, price_total=1)
+        OrdersItemsCombo.objects.create(line_item=combo_item, variant=simple, quantity=quantity * 10, price=1, total=1)
+        OrdersItemsCombo.objects.create(line_item=combo_item, variant=gift, quantity=quantity, price=1, total=1)
+        promotion = OrderVariantsPromotion.objects.create(line_item=line_item, price=0)
+        OrdersItemsPromotion.objects.create(order_variant_promotion=promotion, variant=gift, quantity=quantity * 100, price=0, total=0)
+        OrdersItemsPromotion.objects.create(order_variant_promotion=promotion, variant=simple, quantity=quantity * 1000, price=0, total=0)
+    return [simple, gift, combo, unused]
+
+
+def test_annotations_match_legacy_model_methods(variants):
+    for variant in ProductsVariants.objects.with_inventory_available().filter(pk__in=[variant.pk for variant in variants]):
+        assert variant.inventory_available_confirmed() == legacy_inventory_available(variant, OrderStatus.COMPLETED)
+        assert variant.inventory_available_non_confirm() == legacy_inventory_available(variant, OrderStatus.DRAFT)
+
+    annotated = {variant.SKU_code: variant for variant in ProductsVariants.objects.with_inventory_available()}
+    assert annotated["simple"].inventory_available_confirmed() == 3 + 1 + 30 + 3000
+    assert annotated["simple"].inventory_available_non_confirm() == 2 + 1 + 20 + 2000
+    assert annotated["gift"].inventory_available_confirmed() == 3 + 300
+    assert annotated["combo"].inventory_available_confirmed() == 0
+    assert annotated["unused"].inventory_available_non_confirm() == 0
+
+
+def test_annotations_use_one_query_and_one_subquery_per_source(variants):
+    with CaptureQueriesContext(connection) as context:
+        values = [
+            (variant.inventory_available_confirmed(), variant.inventory_available_non_confirm())
+            for variant in ProductsVariants.objects.with_inventory_available()
+        ]
+
+    assert len(values) == len(variants)
+    assert len(context.captured_queries) == 1
+    sql = context.captured_queries[0]["sql"]
+    for table in ("tbl_Orders_Items", "tbl_Orders_Items_Combo", "tbl_Orders_Items_Promotion"):
+        assert sql.count(f'FROM "{table}"') == 1
+
+
+def test_unannotated_variant_computes_its_own_quantities(variants):
+    variant = ProductsVariants.objects.get(SKU_code="simple")
+
+    assert variant.inventory_available_confirmed() == legacy_inventory_available(variant, OrderStatus.COMPLETED)
+    assert variant.inventory_available_non_confirm() == legacy_inventory_available(variant, OrderStatus.DRAFT)
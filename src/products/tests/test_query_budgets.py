@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+
+from orders.enums import OrderStatus
+from orders.models import Orders
+from orders.models import OrdersItems
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsMaterials
+from products.models import ProductsVariants
+from products.models import ProductsVariantsMaterials
+from utils.instrumentation import assert_endpoint_budget
+
+pytestmark = pytest.mark.django_db
+
+VARIANTS_URL = "/api/products/variants/"
+
+
+@pytest.fixture
+def variants():
+    # Backend sqlite dò hỗ trợ JSON bằng một truy vấn ở lần dùng đầu tiên, chạy trước để không tính vào budget
+    connection.features.supports_json_field
+    category = ProductCategory.objects.create(name="Danh mục")
+    product = Products.objects.create(name="Sản phẩm", category=category, SKU_code="P")
+    material = ProductsMaterials.objects.create(name="Nguyên liệu", SKU_code="M")
+    variants = [ProductsVariants.objects.create(name=f"Biến thể {index}", SKU_code=f"V{index}", product=product) for index in range(5)]
+    for index, variant in enumerate(variants):
+        ProductsVariantsMaterials.objects.create(product_variant=variant, product_material=material, quantity=1)
+        for status, quantity in ((OrderStatus.COMPLETED, 3), (OrderStatus.DRAFT, 2)):
+            order = Orders.objects.create(status=status, order_number=f"{index}{quantity}", order_key=f"{variant.SKU_code}-{status}")
+            OrdersItems.objects.create(order=order, variant=variant, quantity=quantity, price_variant_logs=1, price_total=1)
+    return variants
+
+
+def test_variant_list_stays_within_budget(api_client, variants):
+    response = assert_endpoint_budget(api_client, "get", VARIANTS_URL)
+
+    assert response.status_code == 200
+    assert response.data["count"] == len(variants)
+    for variant in response.data["results"]:
+        assert variant["inventory_available_confirmed"] == 3
+        assert variant["inventory_available_non_confirm"] == 2
+        assert variant["total_material_quantity"] == 1
+
+
+def test_variant_retrieve_stays_within_budget(api_client, variants):
+    response = assert_endpoint_budget(api_client, "get", f"{VARIANTS_URL}{variants[0].pk}/")
+
+    assert response.status_code == 200
+    assert response.data["inventory_available_confirmed"] == 3
@@ -0,0 +1,165 @@
+import pytest
+from django.utils import timezone
+
+from orders.models import VariantDailySales
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from products.models import ProductsVariantsBatches
+from warehouses.enums import SheetCheckType
+from warehouses.enums import SheetImportExportType
+from warehouses.enums import SheetTransferType
+from warehouses.enums import WarehouseBaseType
+from warehouses.models import Warehouse
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseInventoryReason
+from warehouses.models import WarehouseSheetCheck
+from warehouses.models import WarehouseSheetImportExport
+from warehouses.models import WarehouseSheetTransfer
+
+pytestmark = pytest.mark.django_db
+
+PIVOT_URL = "/api/products/report/pivot"
+
+
+@pytest.fixture
+def warehouses():
+    return Warehouse.objects.create(name="Kho 1"), Warehouse.objects.create(name="Kho 2")
+
+
+@pytest.fixture
+def variants():
+    """Sản phẩm P1 (danh mục C1) có 2 lô, sản phẩm P2 (danh mục C2) có 1 lô"""
+    result = []
+    for code in ("P1", "P2"):
+        category = ProductCategory.objects.create(name=f"Danh mục {code}", code=f"C-{code}")
+        product = Products.objects.create(name=code, SKU_code=code, category=category)
+        result.append(ProductsVariants.objects.create(product=product, name=f"{code} - Loại 1", SKU_code=f"{code}-V1"))
+    return result
+
+
+@pytest.fixture
+def batches(variants):
+    first, second = variants
+    return [
+        ProductsVariantsBatches.objects.create(product_variant=first, name="Lô 1", is_default=True),
+        ProductsVariantsBatches.objects.create(product_variant=first, name="Lô 2"),
+        ProductsVariantsBatches.objects.create(product_variant=second, name="Lô 1", is_default=True),
+    ]
+
+
+@pytest.fixture
+def stock(warehouses, variants, batches):
+    """P1: 2 lô trong kho 1 (5 + 7) và 1 lô trong kho 2 (100), P2 chỉ có tồn ở kho 2, mỗi sản phẩm bán được 3"""
+    first_warehouse, second_warehouse = warehouses
+    for warehouse, batch, quantity in (
+        (first_warehouse, batches[0], 5),
+        (first_warehouse, batches[1], 7),
+        (second_warehouse, batches[0], 100),
+        (second_warehouse, batches[2], 50),
+    ):
+        WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=quantity)
+    for variant in variants:
+        VariantDailySales.objects.create(date=timezone.localdate(), variant=variant, quantity=3, price_total=300, order_count=1)
+
+
+def get_report(api_client, dimensions, metrics, **params):
+    response = api_client.get(PIVOT_URL, {"dimensions": str(dimensions), "metrics": str(metrics), **params})
+    assert response.status_code == 200, response.data
+    return response.data["results"]
+
+
+def test_warehouse_filter_does_not_multiply_metrics(api_client, warehouses, variants, stock):
+    results = get_report(
+        api_client,
+        ["product_variants"],
+        ["quantity_sold", "total_actual_revenue", "inventory_quantity"],
+        warehouse_id=str(warehouses[0].pk),
+    )
+
+    # P1 có 2 lô trong kho 1 nhưng doanh số vẫn tính một lần, tồn kho chỉ tính kho 1, P2 không có tồn ở kho 1
+    assert [(row["SKU_code"], row["quantity_sold"], row["total_actual_revenue"], row["inventory_quantity"]) for row in results] == [
+        ("P1-V1", 3, 300, 12)
+    ]
+
+
+def test_warehouse_filter_does_not_duplicate_sales_rows(api_client, warehouses, stock):
+    """Không có metric tổng hợp nên mỗi dòng join tới tồn kho là một dòng của data frame trước khi pivot"""
+    results = get_report(api_client, ["product_variants"], ["quantity_sold", "number_of_orders"], warehouse_id=str(warehouses[0].pk))
+
+    assert [(row["SKU_code"], row["quantity_sold"], row["number_of_orders"]) for row in results] == [("P1-V1", 3, 1)]
+
+
+def test_report_without_warehouse_filter_counts_all_warehouses(api_client, stock):
+    results = get_report(api_client, ["product_variants"], ["quantity_sold", "inventory_quantity"])
+
+    assert sorted((row["SKU_code"], row["quantity_sold"], row["inventory_quantity"]) for row in results) == [
+        ("P1-V1", 3, 112),
+        ("P2-V1", 3, 50),
+    ]
+
+
+def test_warehouse_dimension_keeps_only_selected_warehouses(api_client, warehouses, stock):
+    results = get_report(api_client, ["product_variants", "warehouse"], ["inventory_quantity"], warehouse_id=str(warehouses[0].pk))
+
+    assert [(row["SKU_code"], row["warehouse_name"], row["inventory_quantity"]) for row in results] == [("P1-V1", "Kho 1", 12)]
+
+
+@pytest.fixture
+def sheets(user, warehouses, batches):
+    """Phiếu nhập ở cả hai kho, phiếu chuyển kho 2 -> kho 1, phiếu kiểm kho 2, cho lô 1 của P1 và của P2"""
+    first_warehouse, second_warehouse = warehouses
+    reasons = {
+        reason_type: WarehouseInventoryReason.objects.create(type=reason_type, name=reason_type.name) for reason_type in WarehouseBaseType
+    }
+    for index, batch in enumerate((batches[0], batches[2])):
+        for warehouse, quantity in ((first_warehouse, 4), (second_warehouse, 9)):
+            sheet = WarehouseSheetImportExport.objects.create(
+                code=f"IP{index}{quantity}",
+                type=SheetImportExportType.IMPORT,
+                warehouse=warehouse,
+                change_reason=reasons[WarehouseBaseType.IMPORT],
+                created_by=user,
+            )
+            sheet.warehouse_sheet_import_export_detail_sheet.create(product_variant_batch=batch, quantity=quantity, created_by=user)
+        transfer = WarehouseSheetTransfer.objects.create(
+            code=f"TF{index}",
+            type=SheetTransferType.TRANSFER,
+            warehouse_from=second_warehouse,
+            warehouse_to=first_warehouse,
+            change_reason=reasons[WarehouseBaseType.TRANSFER],
+            created_by=user,
+        )
+        transfer.warehouse_sheet_transfer_detail_sheet.create(product_variant_batch=batch, quantity=2, created_by=user)
+        check = WarehouseSheetCheck.objects.create(
+            code=f"CK{index}",
+            type=SheetCheckType.CHECK,
+            warehouse=second_warehouse,
+            change_reason=reasons[WarehouseBaseType.CHECK],
+            created_by=user,
+        )
+        check.warehouse_sheet_check_detail_sheet.create(product_variant_batch=batch, quantity_system=0, quantity_actual=1, created_by=user)
+
+
+def sheet_rows(results):
+    return sorted((row["SKU_code"], row["sheet_type"], row["quantity_in_sheet"]) for row in results)
+
+
+def test_sheet_type_dimension_applies_warehouse_filter_in_each_branch(api_client, warehouses, stock, sheets):
+    results = get_report(api_client, ["product_variants", "sheet_type"], ["quantity_sold"], warehouse_id=str(warehouses[0].pk))
+
+    # Chỉ P1 có tồn ở kho 1: phiếu nhập của kho 1, phiếu chuyển kho có kho đến là kho 1, không có phiếu kiểm của kho 1
+    assert sheet_rows(results) == [("P1-V1", "IP", 4), ("P1-V1", "TF", 2)]
+
+
+def test_sheet_type_dimension_is_limited_to_filtered_variants(api_client, variants, batches, sheets):
+    category_id = variants[0].product.category_id
+
+    results = get_report(api_client, ["product_variants", "sheet_type"], ["quantity_sold"], category=str(category_id))
+
+    # Phiếu nhập ở hai kho (4 và 9) lấy trung bình
+    assert sheet_rows(results) == [("P1-V1", "CK", 1), ("P1-V1", "IP", 6.5), ("P1-V1", "TF", 2)]
+
+    results = get_report(api_client, ["product_variants", "sheet_type"], ["quantity_sold"], variant=str(variants[1].pk))
+
+    assert {row["SKU_code"] for row in results} == {"P2-V1"}
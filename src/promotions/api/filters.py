@@ -8,14 +8,15 @@ from promotions.enums import PromotionStatus
 from promotions.enums import PromotionVariantType
 from promotions.models import PromotionOrder
 from promotions.models import PromotionVariant
+from utils.filters import LocalDateRangeFilter
 
 
 class PromotionOrderFilterset(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
     status = django_filters.MultipleChoiceFilter(choices=PromotionStatus.choices())
     type = django_filters.MultipleChoiceFilter(choices=PromotionOrderType.choices())
-    active_to_date = django_filters.DateFilter(field_name="requirement_time_expire__date", lookup_expr="lte")
+    active_to_date = LocalDateRangeFilter(field_name="requirement_time_expire", lookup_expr="lte")
 
     class Meta:
         model = PromotionOrder
@@ -41,11 +42,11 @@ class PromotionOrderFilterset(django_filters.FilterSet):
 
 
 class PromotionVariantFilterset(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
     status = django_filters.MultipleChoiceFilter(choices=PromotionStatus.choices())
     type = django_filters.MultipleChoiceFilter(choices=PromotionVariantType.choices())
-    active_to_date = django_filters.DateFilter(field_name="requirement_time_expire__date", lookup_expr="lte")
+    active_to_date = LocalDateRangeFilter(field_name="requirement_time_expire", lookup_expr="lte")
 
     class Meta:
         model = PromotionVariant
@@ -0,0 +1,34 @@
+import uuid
+
+from rest_framework import serializers
+
+from promotions.catalogue import get_promotion_catalogue
+from promotions.enums import PromotionStatus
+from promotions.models import PromotionOrder
+from promotions.models import PromotionVariant
+
+
+class PromotionCatalogueField(serializers.PrimaryKeyRelatedField):
+    """Khuyến mãi đang chạy, tra trong `PromotionCatalogue` (bộ nhớ) thay vì truy vấn database cho từng khuyến mãi"""
+
+    catalogue_lookup = None
+
+    def to_internal_value(self, data):
+        try:
+            pk = data if isinstance(data, uuid.UUID) else uuid.UUID(str(data))
+        except ValueError:
+            self.fail("does_not_exist", pk_value=data)
+        promotion = getattr(get_promotion_catalogue(), self.catalogue_lookup)(pk)
+        if promotion is None:
+            self.fail("does_not_exist", pk_value=data)
+        return promotion
+
+
+class PromotionVariantCatalogueField(PromotionCatalogueField):
+    queryset = PromotionVariant.objects.filter(status=PromotionStatus.IN_PROGRESS.value, is_soft_delete=False)
+    catalogue_lookup = "promotion_variant"
+
+
+class PromotionOrderCatalogueField(PromotionCatalogueField):
+    queryset = PromotionOrder.objects.filter(status=PromotionStatus.IN_PROGRESS.value, is_soft_delete=False)
+    catalogue_lookup = "promotion_order"
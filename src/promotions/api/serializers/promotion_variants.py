@@ -66,3 +66,17 @@ class PromotionVariantCreateSerializer(PromotionVariantBaseWriteOnceSerializer):
             raise serializers.ValidationError({"type, other_variants": "'type' và 'other_variants' phải tương ứng nhau."})
 
         return data
+
+
+class PromotionVariantBulkWriteSerializer(serializers.ModelSerializer):
+    """Một dòng của API ghi hàng loạt: có `id` là cập nhật khuyến mãi đã có, không có là tạo mới"""
+
+    id = serializers.UUIDField(required=False)
+    # Sự tồn tại của variant được kiểm tra theo lô khi lưu
+    variant = serializers.UUIDField(source="variant_id", required=False, allow_null=True)
+    price_value = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    percent_value = serializers.IntegerField(min_value=1, max_value=100, required=False, allow_null=True)
+
+    class Meta:
+        model = models.PromotionVariant
+        exclude = ["modified_by", "created_by", "created", "modified"]
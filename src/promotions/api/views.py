@@ -1,7 +1,13 @@
 import django_filters.rest_framework as django_filters
 from django.db import transaction
+from django.db.models import prefetch_related_objects
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import decorators
 from rest_framework import filters
 from rest_framework import permissions
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
 from core.views import CustomModelViewSet
 from promotions import models
@@ -10,6 +16,8 @@ from promotions.api.filters import PromotionVariantFilterset
 from promotions.api.serializers import promotion_orders
 from promotions.api.serializers import promotion_variants
 from promotions.api.serializers import promotion_vouchers
+from promotions.bulk import bulk_create_other_variants
+from promotions.bulk import bulk_save_promotions
 
 
 class PromotionOrderViewSet(CustomModelViewSet):
@@ -81,6 +89,7 @@ class PromotionVariantViewSet(CustomModelViewSet):
         "partial_update": promotion_variants.PromotionVariantUpdateSerializer,
         "list": promotion_variants.PromotionVariantReadListSerializer,
         "retrieve": promotion_variants.PromotionVariantReadOnceSerializer,
+        "bulk": promotion_variants.PromotionVariantBulkWriteSerializer,
     }
 
     def get_serializer_class(self):
@@ -94,11 +103,47 @@ class PromotionVariantViewSet(CustomModelViewSet):
         with transaction.atomic():
             promotion_variant = serializer.save()
             if other_variants:
-                for variant in other_variants:
-                    variant["created_by"] = current_user
-                    variant["promotion_variant"] = promotion_variant
-                    models.PromotionVariantsOtherVariant.objects.create(**variant)
+                bulk_create_other_variants(
+                    [
+                        models.PromotionVariantsOtherVariant(created_by=current_user, promotion_variant=promotion_variant, **variant)
+                        for variant in other_variants
+                    ]
+                )
 
     def perform_update(self, serializer):
         serializer.validated_data["modified_by"] = self.request.user
         return super().perform_update(serializer)
+
+    @swagger_auto_schema(operation_summary="Tạo / cập nhật nhiều khuyến mãi sản phẩm")
+    @decorators.action(methods=["post"], detail=False, url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        rows = serializer.validated_data
+        existing = models.PromotionVariant.objects.in_bulk([row["id"] for row in rows if row.get("id")])
+        missing = {
+            index: {"id": "Không tìm thấy khuyến mãi."} for index, row in enumerate(rows) if row.get("id") and row["id"] not in existing
+        }
+        if missing:
+            raise ValidationError(missing)
+        # Trạng thái trước khi cập nhật để kiểm tra chuyển trạng thái
+        old_statuses = {pk: promotion.status for pk, promotion in existing.items()}
+
+        promotions = []
+        for row in rows:
+            promotion = existing.get(row.pop("id", None))
+            if promotion is None:
+                promotion = models.PromotionVariant(created_by=request.user, **row)
+            else:
+                for attr, value in row.items():
+                    setattr(promotion, attr, value)
+                promotion.modified_by = request.user
+            promotions.append(promotion)
+
+        bulk_save_promotions(promotions, old_statuses=old_statuses)
+        prefetch_related_objects(promotions, "promotion_variant_other_variant")
+        # Trả về dạng {"data": [...]} để ActivityLogMixin ghi log cho từng khuyến mãi
+        return Response(
+            data={"data": promotion_variants.PromotionVariantReadListSerializer(promotions, many=True).data}, status=status.HTTP_200_OK
+        )
@@ -0,0 +1,145 @@
+"""
+Ghi nhiều khuyến mãi bằng bulk_create / bulk_update với cùng các kiểm tra như `save()` (full_clean) của từng bản ghi:
+trạng thái cũ / loại khuyến mãi / loại sản phẩm được lấy cho cả danh sách bằng một truy vấn
+thay vì mỗi bản ghi một truy vấn.
+
+Bulk không gửi signal nên catalogue khuyến mãi được làm mới sau khi commit.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from products.models import ProductsVariants
+from promotions.catalogue import invalidate_promotion_catalogue
+from promotions.enums import PromotionOrderType
+from promotions.enums import PromotionVariantType
+from promotions.enums import PromotionVoucherType
+from promotions.models import PromotionOrder
+from promotions.models import PromotionVariant
+from promotions.models import PromotionVariantsOtherVariant
+from promotions.models import PromotionVoucher
+from promotions.validation import base_promotion_type_validate
+from promotions.validation import other_variant_validate
+from promotions.validation import status_transition_validate
+
+PROMOTION_TYPE_ENUMS = {
+    PromotionOrder: PromotionOrderType,
+    PromotionVoucher: PromotionVoucherType,
+    PromotionVariant: PromotionVariantType,
+}
+
+
+def _is_unsaved_relation(field, instance) -> bool:
+    related = field.get_cached_value(instance, default=None)
+    return related is not None and related._state.adding
+
+
+def _missing_foreign_keys(instances) -> dict:
+    """Khóa ngoại không tồn tại của cả danh sách, mỗi trường khóa ngoại một truy vấn: {vị trí: {trường: lỗi}}"""
+    errors = {}
+    for field in type(instances[0])._meta.concrete_fields:
+        if not field.is_relation:
+            continue
+        # Bỏ qua bản ghi liên kết tới object chưa lưu (tạo cùng lúc)
+        values = {
+            index: getattr(instance, field.attname)
+            for index, instance in enumerate(instances)
+            if getattr(instance, field.attname) is not None and not _is_unsaved_relation(field, instance)
+        }
+        if not values:
+            continue
+        existing = set(field.related_model._base_manager.filter(pk__in=set(values.values())).values_list("pk", flat=True))
+        for index, value in values.items():
+            if value not in existing:
+                errors.setdefault(index, {})[field.name] = [f"{field.related_model._meta.verbose_name} {value} không tồn tại."]
+    return errors
+
+
+def _validate_each(instances, validate):
+    """Chạy `validate` cho từng bản ghi, gom lỗi theo vị trí trong danh sách"""
+    errors = _missing_foreign_keys(instances)
+    foreign_keys = [field.name for field in type(instances[0])._meta.concrete_fields if field.is_relation]
+    for index, instance in enumerate(instances):
+        if index in errors:
+            continue
+        try:
+            # Khóa ngoại đã kiểm tra theo lô ở trên. Không gọi validate_unique: khóa chính là uuid sinh mới,
+            # model không có trường unique khác
+            instance.clean_fields(exclude=foreign_keys)
+            validate(instance)
+        except DjangoValidationError as err:
+            errors[index] = err.message_dict
+        except ValidationError as err:
+            errors[index] = err.detail
+    if errors:
+        raise ValidationError(errors)
+
+
+def validate_promotions(model, instances: list, old_statuses: dict = None) -> dict:
+    """
+    Kiểm tra danh sách khuyến mãi cùng loại giống `clean()`: chuyển trạng thái, loại / giá trị khuyến mãi.
+    `old_statuses` ({pk: status} của các bản ghi đã có) được lấy bằng một truy vấn nếu không truyền vào.
+    """
+    if old_statuses is None:
+        old_statuses = dict(model.objects.filter(pk__in=[instance.pk for instance in instances]).values_list("pk", "status"))
+    type_enum = PROMOTION_TYPE_ENUMS[model]
+    seen = set()
+
+    def validate(instance):
+        if instance.pk in seen:
+            raise ValidationError({"id": "Khuyến mãi bị lặp lại trong danh sách."})
+        seen.add(instance.pk)
+        if instance.pk in old_statuses:
+            status_transition_validate(old_statuses[instance.pk], instance.status)
+        base_promotion_type_validate(instance, type_enum)
+
+    _validate_each(instances, validate)
+    return old_statuses
+
+
+def validate_other_variants(items: list):
+    """Kiểm tra quà tặng giống `PromotionVariantsOtherVariant.clean()`, lấy loại khuyến mãi / sản phẩm bằng 2 truy vấn"""
+    promotion_types = dict(
+        PromotionVariant.objects.filter(pk__in={item.promotion_variant_id for item in items}).values_list("pk", "type")
+    )
+    variant_types = dict(ProductsVariants.objects.filter(pk__in={item.variant_id for item in items}).values_list("pk", "type"))
+
+    def validate(item):
+        # Khuyến mãi có thể là bản ghi mới tạo cùng lúc (chưa có trong database)
+        if PromotionVariantsOtherVariant.promotion_variant.is_cached(item) and item.promotion_variant is not None:
+            promotion_type = item.promotion_variant.type
+        else:
+            promotion_type = promotion_types.get(item.promotion_variant_id)
+        other_variant_validate(promotion_type, variant_types.get(item.variant_id))
+
+    _validate_each(items, validate)
+
+
+def bulk_save_promotions(instances: list, old_statuses: dict = None, batch_size=500) -> list:
+    """Lưu nhiều khuyến mãi cùng loại: bản ghi mới dùng bulk_create, bản ghi đã có dùng bulk_update"""
+    if not instances:
+        return instances
+    model = type(instances[0])
+    old_statuses = validate_promotions(model, instances, old_statuses)
+
+    new_instances = [instance for instance in instances if instance.pk not in old_statuses]
+    old_instances = [instance for instance in instances if instance.pk in old_statuses]
+    now = timezone.now()
+    for instance in old_instances:
+        instance.modified = now
+    update_fields = [field.name for field in model._meta.concrete_fields if not field.primary_key and field.name != "created"]
+
+    with transaction.atomic():
+        model.objects.bulk_create(new_instances, batch_size=batch_size)
+        model.objects.bulk_update(old_instances, update_fields, batch_size=batch_size)
+        transaction.on_commit(invalidate_promotion_catalogue)
+    return instances
+
+
+def bulk_create_other_variants(items: list, batch_size=500) -> list:
+    validate_other_variants(items)
+    with transaction.atomic():
+        PromotionVariantsOtherVariant.objects.bulk_create(items, batch_size=batch_size)
+        transaction.on_commit(invalidate_promotion_catalogue)
+    return items
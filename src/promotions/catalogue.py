@@ -0,0 +1,140 @@
+"""
+Catalogue các khuyến mãi đang chạy (khuyến mãi sản phẩm kèm quà tặng, khuyến mãi đơn hàng) giữ trong bộ nhớ của từng process,
+dùng để kiểm tra khuyến mãi khi tạo đơn mà không truy vấn từng khuyến mãi / quà tặng.
+
+Catalogue được nạp lại (3 truy vấn) khi version trong cache dùng chung thay đổi. Version được đổi sau khi transaction
+lưu / xóa model khuyến mãi commit (signals), code ghi hàng loạt phải tự gọi `invalidate_promotion_catalogue`.
+"""
+import threading
+import uuid
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import fields
+from datetime import datetime
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from promotions.enums import PromotionStatus
+from promotions.models import PromotionOrder
+from promotions.models import PromotionVariant
+from promotions.models import PromotionVariantsOtherVariant
+
+CATALOGUE_VERSION_CACHE_KEY = "promotions:catalogue:version"
+
+
+@dataclass(frozen=True)
+class GiftOption:
+    variant_id: uuid.UUID
+    quantity: int = None
+    requirement_max_quantity: int = None
+    price: int = None
+
+
+@dataclass(frozen=True)
+class CataloguePromotion:
+    id: uuid.UUID
+    type: str
+    price_value: int = None
+    percent_value: int = None
+    requirement_maximum_value_discount: int = None
+    requirement_time_expire: datetime = None
+
+    @property
+    def pk(self):
+        return self.id
+
+    def is_expired(self, now: datetime = None) -> bool:
+        return self.requirement_time_expire is not None and self.requirement_time_expire <= (now or timezone.now())
+
+
+@dataclass(frozen=True)
+class CataloguePromotionVariant(CataloguePromotion):
+    variant_id: uuid.UUID = None
+    requirement_min_total_quantity_variant_apply: int = None
+    requirement_max_total_quantity_variant: int = None
+    # Quà tặng (khuyến mãi tặng kèm sản phẩm) theo variant id
+    gifts: dict[uuid.UUID, GiftOption] = field(default_factory=dict)
+
+    def gift(self, variant_id) -> GiftOption | None:
+        return self.gifts.get(variant_id)
+
+
+@dataclass(frozen=True)
+class CataloguePromotionOrder(CataloguePromotion):
+    requirement_min_total_order_apply: int = None
+
+
+def _model_fields(entry_class) -> list[str]:
+    return [entry_field.name for entry_field in fields(entry_class) if entry_field.name != "gifts"]
+
+
+class PromotionCatalogue:
+    def __init__(self, version, promotion_variants: dict, promotion_orders: dict):
+        self.version = version
+        self.promotion_variants: dict[uuid.UUID, CataloguePromotionVariant] = promotion_variants
+        self.promotion_orders: dict[uuid.UUID, CataloguePromotionOrder] = promotion_orders
+
+    @classmethod
+    def load(cls, version=None) -> "PromotionCatalogue":
+        active = {"status": PromotionStatus.IN_PROGRESS.value, "is_soft_delete": False}
+
+        gifts = {}
+        # Cùng một variant quà tặng khai báo nhiều lần thì lấy bản ghi mới nhất (giống `.first()` theo `-created`)
+        for row in (
+            PromotionVariantsOtherVariant.objects.filter(
+                promotion_variant__status=active["status"], promotion_variant__is_soft_delete=False, variant__isnull=False
+            )
+            .order_by("created")
+            .values("promotion_variant_id", *_model_fields(GiftOption))
+        ):
+            promotion_variant_id = row.pop("promotion_variant_id")
+            gifts.setdefault(promotion_variant_id, {})[row["variant_id"]] = GiftOption(**row)
+
+        promotion_variants = {
+            row["id"]: CataloguePromotionVariant(**row, gifts=gifts.get(row["id"], {}))
+            for row in PromotionVariant.objects.filter(**active).values(*_model_fields(CataloguePromotionVariant))
+        }
+        promotion_orders = {
+            row["id"]: CataloguePromotionOrder(**row)
+            for row in PromotionOrder.objects.filter(**active).values(*_model_fields(CataloguePromotionOrder))
+        }
+        return cls(version, promotion_variants, promotion_orders)
+
+    def promotion_variant(self, pk) -> CataloguePromotionVariant | None:
+        return self.promotion_variants.get(pk)
+
+    def promotion_order(self, pk) -> CataloguePromotionOrder | None:
+        return self.promotion_orders.get(pk)
+
+
+_catalogue: PromotionCatalogue = None
+_lock = threading.Lock()
+
+
+def catalogue_version():
+    """Version hiện tại trong cache (None nếu cache không dùng được, khi đó catalogue luôn được nạp lại)"""
+    version = cache.get(CATALOGUE_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(CATALOGUE_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CATALOGUE_VERSION_CACHE_KEY)
+    return version
+
+
+def get_promotion_catalogue() -> PromotionCatalogue:
+    global _catalogue  # pylint: disable=W0603
+    version = catalogue_version()
+    catalogue = _catalogue
+    if catalogue is not None and version is not None and catalogue.version == version:
+        return catalogue
+    with _lock:
+        if _catalogue is None or version is None or _catalogue.version != version:
+            _catalogue = PromotionCatalogue.load(version)
+        return _catalogue
+
+
+def invalidate_promotion_catalogue():
+    """Đổi version để mọi process nạp lại catalogue ở lần dùng tiếp theo"""
+    global _catalogue  # pylint: disable=W0603
+    cache.set(CATALOGUE_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+    _catalogue = None
@@ -2,15 +2,14 @@ import uuid
 
 from django.db import models
 from model_utils.models import TimeStampedModel
-from rest_framework.exceptions import ValidationError
 
-from products.enums import ProductVariantType
 from products.models import ProductsVariants
 from promotions.enums import PromotionOrderType
 from promotions.enums import PromotionStatus
 from promotions.enums import PromotionVariantType
 from promotions.enums import PromotionVoucherType
 from promotions.validation import base_promotion_type_validate
+from promotions.validation import other_variant_validate
 from promotions.validation import promotion_status_validate
 from users.models import User
 
@@ -130,12 +129,7 @@ class PromotionVariantsOtherVariant(TimeStampedModel):
         db_table = "tbl_Promotions_Variants_OtherVariant"
 
     def clean(self, *args, **kwargs):
-        if self.promotion_variant.type != PromotionVariantType.OTHER_VARIANT:
-            raise ValidationError({"type, other_variant": "'type'và 'other_variant' phải tương ứng nhau."})
-
-        if self.variant.type != ProductVariantType.SIMPLE:
-            raise ValidationError({"variant_type": "Phải là sản phẩm loại 'simple'."})
-
+        other_variant_validate(self.promotion_variant.type, self.variant.type)
         return super().clean()
 
     def save(self, *args, **kwargs):
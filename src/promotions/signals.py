@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from promotions.catalogue import invalidate_promotion_catalogue
+from promotions.models import PromotionOrder
+from promotions.models import PromotionVariant
+from promotions.models import PromotionVariantsOtherVariant
+
+
+@receiver(post_save, sender=PromotionOrder)
+@receiver(post_save, sender=PromotionVariant)
+@receiver(post_save, sender=PromotionVariantsOtherVariant)
+@receiver(post_delete, sender=PromotionOrder)
+@receiver(post_delete, sender=PromotionVariant)
+@receiver(post_delete, sender=PromotionVariantsOtherVariant)
+def invalidate_catalogue(sender, **kwargs):
+    # Đổi version sau khi commit để process khác không nạp lại dữ liệu chưa commit
+    transaction.on_commit(invalidate_promotion_catalogue)
@@ -0,0 +1,180 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from products.enums import ProductVariantType
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from promotions.bulk import bulk_create_other_variants
+from promotions.bulk import bulk_save_promotions
+from promotions.enums import PromotionStatus
+from promotions.enums import PromotionVariantType
+from promotions.models import PromotionVariant
+from promotions.models import PromotionVariantsOtherVariant
+from users.models import CREATE
+from users.models import UserActionLog
+
+pytestmark = pytest.mark.django_db
+
+BULK_URL = "/api/promotions/promotion-variant/bulk/"
+
+
+@pytest.fixture
+def variants():
+    category = ProductCategory.objects.create(name="Danh mục", code="C1")
+    product = Products.objects.create(name="Sản phẩm", SKU_code="P1", category=category)
+    return {
+        variant_type: ProductsVariants.objects.create(
+            product=product,
+            name=f"Sản phẩm - {variant_type.value}",
+            SKU_code=f"P1-{variant_type.value}",
+            type=variant_type,
+            sale_price=1000,
+        )
+        for variant_type in (ProductVariantType.SIMPLE, ProductVariantType.COMBO)
+    }
+
+
+@pytest.fixture
+def variant(variants):
+    return variants[ProductVariantType.SIMPLE]
+
+
+def price_row(variant, **kwargs):
+    return {"type": PromotionVariantType.PRICE.value, "price_value": 1000, "variant": str(variant.pk), **kwargs}
+
+
+def post_bulk(api_client, rows):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(BULK_URL, rows, format="json")
+    return response, len(queries)
+
+
+def test_bulk_creates_and_updates(api_client, variant):
+    promotion = PromotionVariant.objects.create(type=PromotionVariantType.PRICE, price_value=500, variant=variant)
+
+    response, _ = post_bulk(
+        api_client,
+        [
+            price_row(variant, name="Mới"),
+            price_row(variant, id=str(promotion.pk), price_value=700, status=PromotionStatus.IN_PROGRESS.value),
+        ],
+    )
+
+    assert response.status_code == 200
+    assert PromotionVariant.objects.count() == 2
+    promotion.refresh_from_db()
+    assert (promotion.price_value, promotion.status) == (700, PromotionStatus.IN_PROGRESS)
+    assert PromotionVariant.objects.get(name="Mới").created_by.email == "user@example.com"
+
+
+def test_bulk_writes_action_log_per_promotion(api_client, user, variant):
+    promotion = PromotionVariant.objects.create(type=PromotionVariantType.PRICE, price_value=500, variant=variant)
+
+    response, _ = post_bulk(api_client, [price_row(variant, name="Mới"), price_row(variant, id=str(promotion.pk), price_value=700)])
+
+    assert response.status_code == 200
+    assert {row["id"] for row in response.data["data"]} == {str(pk) for pk in PromotionVariant.objects.values_list("pk", flat=True)}
+    logs = UserActionLog.objects.filter(user=user)
+    assert {log.object_id for log in logs} == set(PromotionVariant.objects.values_list("pk", flat=True))
+    assert {(log.action_type, log.content_type.model) for log in logs} == {(CREATE, "promotionvariant")}
+
+
+def test_bulk_query_count_does_not_grow_with_rows(api_client, variant):
+    _, few_queries = post_bulk(api_client, [price_row(variant) for _ in range(2)])
+    _, many_queries = post_bulk(api_client, [price_row(variant) for _ in range(20)])
+
+    assert PromotionVariant.objects.count() == 22
+    assert many_queries == few_queries
+
+
+@pytest.mark.parametrize(
+    "row, field",
+    [
+        ({"type": PromotionVariantType.PRICE.value, "percent_value": 10}, "type, price_value"),
+        ({"type": PromotionVariantType.PERCENT.value, "price_value": 1000}, "type, price_value"),
+        ({"type": PromotionVariantType.PERCENT.value}, "type, percent_value"),
+        ({"type": PromotionVariantType.PRICE.value, "price_value": 1000, "variant": str(uuid.uuid4())}, "variant"),
+    ],
+)
+def test_bulk_rejects_invalid_rows_by_index(api_client, variant, row, field):
+    response, _ = post_bulk(api_client, [price_row(variant), row])
+
+    assert response.status_code == 400
+    assert list(response.data) == [1]
+    assert field in response.data[1]
+    assert not PromotionVariant.objects.exists()
+
+
+@pytest.mark.parametrize(
+    "old_status, new_status",
+    [(PromotionStatus.IN_PROGRESS, PromotionStatus.PENDING), (PromotionStatus.CANCEL, PromotionStatus.IN_PROGRESS)],
+)
+def test_bulk_rejects_status_transition(api_client, variant, old_status, new_status):
+    promotion = PromotionVariant.objects.create(type=PromotionVariantType.PRICE, price_value=500, status=old_status)
+
+    response, _ = post_bulk(api_client, [price_row(variant, id=str(promotion.pk), status=new_status.value)])
+
+    assert response.status_code == 400
+    assert "status" in response.data[0]
+    promotion.refresh_from_db()
+    assert promotion.status == old_status
+
+
+def test_bulk_rejects_unknown_and_repeated_ids(api_client, variant):
+    promotion = PromotionVariant.objects.create(type=PromotionVariantType.PRICE, price_value=500)
+
+    response, _ = post_bulk(api_client, [price_row(variant, id=str(uuid.uuid4()))])
+    assert response.status_code == 400
+    assert "id" in response.data[0]
+
+    response, _ = post_bulk(api_client, [price_row(variant, id=str(promotion.pk)), price_row(variant, id=str(promotion.pk))])
+    assert response.status_code == 400
+    assert list(response.data) == [1]
+
+
+def test_bulk_save_matches_instance_clean(variant):
+    """Bản ghi hợp lệ / không hợp lệ với bulk cũng hợp lệ / không hợp lệ với `save()` từng bản ghi"""
+    rows = [
+        {"type": PromotionVariantType.PRICE, "price_value": 1000},
+        {"type": PromotionVariantType.PERCENT, "percent_value": 10},
+        {"type": PromotionVariantType.PRICE, "percent_value": 10},
+        {"type": PromotionVariantType.OTHER_VARIANT},
+    ]
+    for row in rows:
+        try:
+            PromotionVariant(**row).save()
+            instance_error = False
+        except ValidationError:
+            instance_error = True
+        try:
+            bulk_save_promotions([PromotionVariant(**row)])
+            bulk_error = False
+        except ValidationError:
+            bulk_error = True
+        assert bulk_error == instance_error, row
+
+
+def test_bulk_create_other_variants_validates_types(variants):
+    simple, combo = variants[ProductVariantType.SIMPLE], variants[ProductVariantType.COMBO]
+    gift_promotion = PromotionVariant.objects.create(type=PromotionVariantType.OTHER_VARIANT)
+    price_promotion = PromotionVariant.objects.create(type=PromotionVariantType.PRICE, price_value=500)
+
+    with pytest.raises(ValidationError) as err:
+        bulk_create_other_variants(
+            [
+                PromotionVariantsOtherVariant(promotion_variant=gift_promotion, variant=simple, quantity=1),
+                PromotionVariantsOtherVariant(promotion_variant=gift_promotion, variant=combo, quantity=1),
+                PromotionVariantsOtherVariant(promotion_variant=price_promotion, variant=simple, quantity=1),
+            ]
+        )
+    assert "variant_type" in err.value.detail[1]
+    assert "type, other_variant" in err.value.detail[2]
+    assert not PromotionVariantsOtherVariant.objects.exists()
+
+    bulk_create_other_variants([PromotionVariantsOtherVariant(promotion_variant=gift_promotion, variant=simple, quantity=1)])
+    assert PromotionVariantsOtherVariant.objects.get().variant == simple
@@ -0,0 +1,155 @@
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from orders.api.serializers import OrdersItemsCreateSerializer
+from orders.api.serializers import OrdersPromotionCreateSerializer
+from orders.api.views import OrdersViewset
+from orders.models import Orders
+from orders.models import OrdersItems
+from orders.models import OrdersPromotion
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from promotions.catalogue import CataloguePromotionOrder
+from promotions.catalogue import get_promotion_catalogue
+from promotions.catalogue import invalidate_promotion_catalogue
+from promotions.enums import PromotionOrderType
+from promotions.enums import PromotionStatus
+from promotions.enums import PromotionVariantType
+from promotions.models import PromotionOrder
+from promotions.models import PromotionVariant
+from promotions.models import PromotionVariantsOtherVariant
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalogue():
+    invalidate_promotion_catalogue()
+    yield
+    invalidate_promotion_catalogue()
+
+
+@pytest.fixture
+def variants():
+    category = ProductCategory.objects.create(name="Danh mục", code="C1")
+    product = Products.objects.create(name="Sản phẩm", SKU_code="P1", category=category)
+    return [ProductsVariants.objects.create(product=product, name=f"Biến thể {index}", SKU_code=f"P1-{index}") for index in range(2)]
+
+
+@pytest.fixture
+def gift_promotion(variants):
+    variant, gift = variants
+    promotion = PromotionVariant.objects.create(
+        type=PromotionVariantType.OTHER_VARIANT.value, status=PromotionStatus.IN_PROGRESS.value, variant=variant, price_value=0
+    )
+    PromotionVariantsOtherVariant.objects.create(promotion_variant=promotion, variant=gift, quantity=1, requirement_max_quantity=2)
+    return promotion
+
+
+@pytest.fixture
+def order(user):
+    return Orders.objects.create(created_by=user, order_number=1, order_key="DH-1")
+
+
+def line_item_data(variant, promotion, gift, gift_quantity=1):
+    return {
+        "variant_id": str(variant.pk),
+        "quantity": 1,
+        "price_variant_logs": 0,
+        "price_total": 0,
+        "discount": 0,
+        "price_total_neo": 0,
+        "promotions": [
+            {
+                "promotion_variant_id": str(promotion.pk),
+                "price": 0,
+                "items_promotion": [{"variant_id": str(gift.pk), "quantity": gift_quantity, "price": 0, "total": 0}],
+            }
+        ],
+    }
+
+
+def test_order_promotion_is_saved_by_foreign_key_from_catalogue(user, order):
+    promotion = PromotionOrder.objects.create(
+        type=PromotionOrderType.PRICE.value, status=PromotionStatus.IN_PROGRESS.value, price_value=100
+    )
+    get_promotion_catalogue()
+
+    serializer = OrdersPromotionCreateSerializer(data={"promotion_order_id": str(promotion.pk), "price": 100})
+    with CaptureQueriesContext(connection) as queries:
+        assert serializer.is_valid(), serializer.errors
+    assert len(queries) == 0
+    assert isinstance(serializer.validated_data["promotion_order_id"], CataloguePromotionOrder)
+
+    # Luồng tạo đơn dùng `serializer.data`: field trả về pk của khuyến mãi, ghi vào cột khóa ngoại
+    OrdersViewset().create_order_promotions(SimpleNamespace(user=user), order, [serializer.data])
+
+    order_promotion = OrdersPromotion.objects.get(order=order)
+    assert order_promotion.promotion_order == promotion
+    assert order_promotion.price == 100
+
+
+def test_line_item_promotion_and_gift_are_saved_by_foreign_key_from_catalogue(user, order, variants, gift_promotion):
+    variant, gift = variants
+    get_promotion_catalogue()
+
+    serializer = OrdersItemsCreateSerializer(data=line_item_data(variant, gift_promotion, gift))
+    with CaptureQueriesContext(connection) as queries:
+        assert serializer.is_valid(), serializer.errors
+    # Chỉ truy vấn các variant, khuyến mãi và quà tặng lấy từ catalogue (không truy vấn bảng khuyến mãi)
+    assert not [query for query in queries if "tbl_Promotion" in query["sql"]]
+
+    OrdersViewset().create_line_items(SimpleNamespace(user=user), order, [serializer.data])
+
+    line_item = OrdersItems.objects.get(order=order)
+    line_item_promotion = line_item.variant_promotions_used.get()
+    assert line_item_promotion.promotion_variant == gift_promotion
+    assert [(item.variant, item.quantity) for item in line_item_promotion.items_promotion.all()] == [(gift, 1)]
+
+
+@pytest.mark.parametrize(
+    "promotion_kwargs",
+    [{"status": PromotionStatus.PENDING.value}, {"status": PromotionStatus.IN_PROGRESS.value, "is_soft_delete": True}],
+)
+def test_inactive_promotion_is_rejected(promotion_kwargs):
+    promotion = PromotionOrder.objects.create(type=PromotionOrderType.PRICE.value, price_value=100, **promotion_kwargs)
+
+    for promotion_id in (str(promotion.pk), str(uuid.uuid4()), "khong-phai-uuid"):
+        serializer = OrdersPromotionCreateSerializer(data={"promotion_order_id": promotion_id, "price": 100})
+        assert not serializer.is_valid()
+        assert "promotion_order_id" in serializer.errors
+
+
+def test_gift_quantity_and_expiry_are_checked_in_memory(variants, gift_promotion):
+    variant, gift = variants
+
+    serializer = OrdersItemsCreateSerializer(data=line_item_data(variant, gift_promotion, gift, gift_quantity=3))
+    assert not serializer.is_valid()
+    assert serializer.errors["promotions"][0]["message"] == "Sản phẩm tặng kèm vượt quá số lượng tối đa"
+
+    PromotionVariant.objects.filter(pk=gift_promotion.pk).update(requirement_time_expire=timezone.now() - timedelta(minutes=1))
+    invalidate_promotion_catalogue()
+    serializer = OrdersItemsCreateSerializer(data=line_item_data(variant, gift_promotion, gift))
+    assert not serializer.is_valid()
+    assert serializer.errors["promotions"][0]["message"] == "Khuyến mãi đã hết hạn"
+
+
+def test_saving_promotion_reloads_catalogue_after_commit(django_capture_on_commit_callbacks, variants):
+    catalogue = get_promotion_catalogue()
+    assert get_promotion_catalogue() is catalogue
+
+    with django_capture_on_commit_callbacks(execute=True):
+        promotion = PromotionVariant.objects.create(
+            type=PromotionVariantType.PRICE.value, status=PromotionStatus.IN_PROGRESS.value, variant=variants[0], price_value=100
+        )
+
+    reloaded = get_promotion_catalogue()
+    assert reloaded is not catalogue
+    assert reloaded.promotion_variant(promotion.pk).variant_id == variants[0].pk
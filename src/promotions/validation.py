@@ -1,19 +1,23 @@
 from rest_framework.exceptions import ValidationError
 
+from products.enums import ProductVariantType
 from promotions.enums import PromotionStatus
+from promotions.enums import PromotionVariantType
 
 
-def promotion_status_validate(instance):
-    old_instance = instance.__class__.objects.filter(pk=instance.pk).first()
-    if old_instance:
-        # For update
-        new_instance = instance
+def status_transition_validate(old_status, new_status):
+    if old_status == PromotionStatus.IN_PROGRESS and new_status == PromotionStatus.PENDING:
+        raise ValidationError({"status": "Khuyến mãi trạng thái 'đang' không thể quay lại trạng thái 'chờ'."})
 
-        if old_instance.status == PromotionStatus.IN_PROGRESS and new_instance.status == PromotionStatus.PENDING:
-            raise ValidationError({"status": "Khuyến mãi trạng thái 'đang' không thể quay lại trạng thái 'chờ'."})
+    if old_status == PromotionStatus.CANCEL:
+        raise ValidationError({"status": "Trạng thái khuyến mãi hiện tại là 'Cancel' nên không thể update được nữa."})
 
-        if old_instance.status == PromotionStatus.CANCEL:
-            raise ValidationError({"status": "Trạng thái khuyến mãi hiện tại là 'Cancel' nên không thể update được nữa."})
+
+def promotion_status_validate(instance):
+    old_status = instance.__class__.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+    if old_status:
+        # For update
+        status_transition_validate(old_status, instance.status)
 
 
 def base_promotion_type_validate(instance, enum_promotion_type):
@@ -26,3 +30,11 @@ def base_promotion_type_validate(instance, enum_promotion_type):
         instance.type == enum_promotion_type.PERCENT and not instance.percent_value
     ):
         raise ValidationError({"type, percent_value": "'type'và 'percent_value' phải tương ứng nhau."})
+
+
+def other_variant_validate(promotion_type, variant_type):
+    if promotion_type != PromotionVariantType.OTHER_VARIANT:
+        raise ValidationError({"type, other_variant": "'type'và 'other_variant' phải tương ứng nhau."})
+
+    if variant_type != ProductVariantType.SIMPLE:
+        raise ValidationError({"variant_type": "Phải là sản phẩm loại 'simple'."})
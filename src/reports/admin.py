@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from reports.models import ReportJob
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "report_type", "status", "row_count", "created", "finished_at", "created_by")
+    list_filter = ("report_type", "status")
@@ -0,0 +1,32 @@
+from rest_framework import serializers
+
+from reports.models import ReportJob
+from reports.registry import REPORTS
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportJob
+        fields = (
+            "id",
+            "report_type",
+            "params",
+            "status",
+            "row_count",
+            "error",
+            "created",
+            "started_at",
+            "finished_at",
+            "expires_at",
+            "created_by",
+        )
+        read_only_fields = fields
+
+
+class ReportJobCreateSerializer(serializers.Serializer):
+    report_type = serializers.ChoiceField(choices=tuple(REPORTS))
+    params = serializers.DictField(
+        required=False,
+        default=dict,
+        help_text="Query params giống API báo cáo đồng bộ, vd: {\"warehouse_id\": [\"...\"], \"date_from\": \"...\"}",
+    )
@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from reports.api import views
+
+router = DefaultRouter()
+router.register("jobs", views.ReportJobViewset, basename="report-jobs")
+
+urlpatterns = [*router.urls]
@@ -0,0 +1,58 @@
+from django.http import FileResponse
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import decorators
+from rest_framework import mixins
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from reports.api.serializers import ReportJobCreateSerializer
+from reports.api.serializers import ReportJobSerializer
+from reports.enums import ReportJobStatus
+from reports.models import ReportJob
+
+
+class ReportJobViewset(mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    permission_classes = (permissions.IsAuthenticated,)
+    serializer_class = ReportJobSerializer
+    queryset = ReportJob.objects.all()
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ReportJob.objects.none()
+        # Mỗi người chỉ xem / tải được các job của mình
+        return super().get_queryset().filter(created_by=self.request.user)
+
+    @swagger_auto_schema(operation_summary="Danh sách báo cáo chạy nền của tôi")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(operation_summary="Trạng thái báo cáo chạy nền")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary="Tạo báo cáo chạy nền",
+        request_body=ReportJobCreateSerializer,
+        responses={202: ReportJobSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = ReportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, _ = ReportJob.submit(user=request.user, **serializer.validated_data)
+        return Response(ReportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @swagger_auto_schema(operation_summary="Tải kết quả báo cáo chạy nền (JSON gzip)")
+    @decorators.action(detail=True, methods=["get"])
+    def download(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != ReportJobStatus.SUCCESS or not job.result_file:
+            raise ValidationError({"status": f"Báo cáo chưa có kết quả ({job.status})"})
+        return FileResponse(
+            job.result_file.open("rb"),
+            as_attachment=True,
+            filename=f"{job.report_type}_{job.pk}.json.gz",
+            content_type="application/gzip",
+        )
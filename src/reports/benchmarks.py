@@ -0,0 +1,161 @@
+"""
+Bộ benchmark các endpoint / hàm báo cáo chạy nhiều nhất, ghi lại độ trễ và số truy vấn để theo dõi qua thời gian.
+
+Mỗi kịch bản chạy trong một transaction bị rollback nên không làm thay đổi dữ liệu (kể cả tạo đơn hàng).
+Nên chạy trên dữ liệu sinh bởi `generate_synthetic_data`.
+"""
+import logging
+import statistics
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from orders.enums import OrderStatus
+from orders.models import Orders
+from products.enums import ProductVariantStatus
+from products.enums import ProductVariantType
+from products.models import ProductsVariants
+from utils.instrumentation import QueryRecorder
+from warehouses.reports import ReportWarehouse
+
+logger = logging.getLogger(__name__)
+
+REPORT_DAYS = 30
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    runs: int
+    min_ms: float = None
+    median_ms: float = None
+    p95_ms: float = None
+    max_ms: float = None
+    queries: int = None
+    status: int = None
+    error: str = None
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class Benchmarks:
+    """Các kịch bản benchmark: mỗi method `bench_<tên>` trả về status code (nếu là request API) hoặc None"""
+
+    def __init__(self, user):
+        self.user = user
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.date_to = timezone.localdate()
+        self.date_from = self.date_to - timedelta(days=REPORT_DAYS)
+
+    @classmethod
+    def names(cls) -> list[str]:
+        return [name.removeprefix("bench_") for name in dir(cls) if name.startswith("bench_")]
+
+    def get(self, path, **params):
+        return self.client.get(path, params).status_code
+
+    def order_payload(self) -> dict:
+        customer = Customer.objects.order_by("created").first()
+        variants = ProductsVariants.objects.filter(
+            type=ProductVariantType.SIMPLE, status=ProductVariantStatus.ACTIVE, sale_price__isnull=False
+        ).order_by("created")[:3]
+        line_items = [
+            {
+                "variant_id": str(variant.pk),
+                "quantity": 1,
+                "discount": 0,
+                "price_variant_logs": variant.sale_price,
+                "price_total": variant.sale_price,
+                "price_total_input": variant.sale_price,
+                "price_total_neo": variant.neo_price or variant.sale_price,
+            }
+            for variant in variants
+        ]
+        total = sum(item["price_total"] for item in line_items)
+        return {
+            "customer": str(customer.pk),
+            "status": OrderStatus.DRAFT.value,
+            "name_shipping": customer.name,
+            "line_items": line_items,
+            "payments": [{"type": "COD", "price_from_order": total}],
+            "price_total_variant_all": total,
+            "price_total_variant_actual": total,
+            "price_total_variant_actual_input": total,
+            "price_total_discount_order_promotion": 0,
+            "price_discount_input": 0,
+            "price_addition_input": 0,
+            "price_total_order_actual": total,
+            "price_pre_paid": 0,
+            "price_after_paid": total,
+        }
+
+    def bench_order_create(self):
+        return self.client.post("/api/orders/", self._order_payload, format="json").status_code
+
+    def bench_order_list(self):
+        return self.get("/api/orders/", page=1, page_size=30)
+
+    def bench_order_search(self):
+        return self.get("/api/orders/", search=self._search_phone, page=1, page_size=30)
+
+    def bench_orders_pivot(self):
+        return self.get(
+            "/api/orders/reports/pivot",
+            dimensions="['created_date', 'source']",
+            metrics="['revenue', 'total_order_quantity']",
+            created_from=self.date_from,
+            created_to=self.date_to,
+        )
+
+    def bench_order_item_detail_report(self):
+        return self.get("/api/orders/reports/detail/order-item/", created_from=self.date_from, created_to=self.date_to)
+
+    def bench_report_warehouse(self):
+        # Giống ReportWarehouseView: ngày lọc được parse thành datetime UTC
+        date_from, date_to = (datetime.combine(day, datetime.min.time(), dt_timezone.utc) for day in (self.date_from, self.date_to))
+        ReportWarehouse(warehouse_ids=[], date_from=date_from, date_to=date_to, search=None).reports()
+
+    def setup(self):
+        self._order_payload = self.order_payload()
+        order = Orders.objects.exclude(phone_shipping=None).order_by("-created").first()
+        self._search_phone = order.phone_shipping[:6] if order else "09"
+
+    def run(self, name, repeat=5, warmup=1) -> BenchmarkResult:
+        bench = getattr(self, f"bench_{name}")
+        durations, queries, status = [], [], None
+        for index in range(warmup + repeat):
+            with transaction.atomic():
+                with QueryRecorder() as recorder:
+                    start = time.perf_counter()
+                    try:
+                        status = bench()
+                    except Exception as err:  # pylint: disable=W0718
+                        logger.exception("Benchmark %s failed", name)
+                        return BenchmarkResult(name=name, runs=0, error=f"{type(err).__name__}: {err}")
+                    duration = (time.perf_counter() - start) * 1000
+                transaction.set_rollback(True)
+            if index >= warmup:
+                durations.append(duration)
+                queries.append(recorder.count)
+
+        durations.sort()
+        return BenchmarkResult(
+            name=name,
+            runs=repeat,
+            min_ms=round(durations[0], 1),
+            median_ms=round(statistics.median(durations), 1),
+            p95_ms=round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 1),
+            max_ms=round(durations[-1], 1),
+            queries=int(statistics.median(queries)),
+            status=status,
+        )
@@ -0,0 +1,13 @@
+from utils.enums import EnumBase
+
+
+class ReportJobStatus(EnumBase):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+    FAILED = "FAILED"
+    EXPIRED = "EXPIRED"
+
+    @classmethod
+    def in_flight(cls):
+        return [cls.PENDING.value, cls.RUNNING.value]
@@ -0,0 +1,47 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
+
+from utils.dates import add_months
+from utils.dates import month_start
+from utils.partitioning import PARTITIONED_HISTORY_MODELS
+from utils.partitioning import archive_partition
+from utils.partitioning import list_partitions
+from utils.partitioning import partition_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Tách các partition lịch sử cũ hơn --keep-months tháng ra khỏi bảng chính: "
+        "chuyển sang schema lưu trữ, hoặc xuất CSV gzip lên storage rồi xoá (--export)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-months", type=int, default=12, help="Số tháng gần nhất được giữ lại")
+        parser.add_argument("--models", nargs="+", default=PARTITIONED_HISTORY_MODELS, help="vd: orders.HistoricalOrders")
+        parser.add_argument("--export", action="store_true", help="Xuất ra storage rồi xoá partition")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Chỉ hỗ trợ PostgreSQL")
+        if options["keep_months"] < 1:
+            raise CommandError("--keep-months phải lớn hơn 0")
+
+        cutoff = add_months(month_start(timezone.localdate()), -options["keep_months"])
+        for label in options["models"]:
+            table = apps.get_model(label)._meta.db_table
+            with connection.cursor() as cursor:
+                partitions = [name for name in list_partitions(cursor, table) if (partition_month(name) or cutoff) < cutoff]
+
+            for partition in partitions:
+                if options["dry_run"]:
+                    self.stdout.write(f"[dry-run] {table}: {partition}")
+                    continue
+                # Mỗi partition một transaction để lỗi giữa chừng không ảnh hưởng các partition đã xử lý
+                with transaction.atomic(), connection.cursor() as cursor:
+                    target = archive_partition(cursor, table, partition, export=options["export"])
+                self.stdout.write(self.style.SUCCESS(f"{table}: {partition} -> {target}"))
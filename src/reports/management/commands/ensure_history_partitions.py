@@ -0,0 +1,30 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction
+
+from utils.partitioning import PARTITION_MONTHS_AHEAD
+from utils.partitioning import PARTITIONED_HISTORY_MODELS
+from utils.partitioning import ensure_partitions
+from utils.partitioning import is_partitioned
+
+
+class Command(BaseCommand):
+    help = "Tạo trước partition theo tháng cho các bảng lịch sử (tbl_*_Historical)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING("Chỉ hỗ trợ PostgreSQL"))
+            return
+
+        for label in PARTITIONED_HISTORY_MODELS:
+            table = apps.get_model(label)._meta.db_table
+            with transaction.atomic(), connection.cursor() as cursor:
+                if not is_partitioned(cursor, table):
+                    self.stdout.write(self.style.WARNING(f"{table}: chưa được partition, bỏ qua"))
+                    continue
+                created = ensure_partitions(cursor, table, options["months_ahead"])
+            self.stdout.write(f"{table}: tạo {len(created)} partition {', '.join(created)}")
@@ -0,0 +1,32 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from reports.synthetic_data import SyntheticDataGenerator
+from reports.synthetic_data import SyntheticDataSize
+
+
+class Command(BaseCommand):
+    help = (
+        "Sinh dữ liệu giả lập (khách hàng, sản phẩm, đơn hàng, phiếu kho, lịch sử...) theo seed để đo hiệu năng ở local. "
+        "Không chạy trên production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", help="Tiền tố của mã dữ liệu sinh ra, mặc định SYN<seed>")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        for size_field in fields(SyntheticDataSize):
+            parser.add_argument(f"--{size_field.name.replace('_', '-')}", type=size_field.type, default=size_field.default)
+
+    def handle(self, *args, **options):
+        size = SyntheticDataSize(**{size_field.name: options[size_field.name] for size_field in fields(SyntheticDataSize)})
+        generator = SyntheticDataGenerator(
+            size, seed=options["seed"], prefix=options["prefix"], batch_size=options["batch_size"], stdout=self.stdout
+        )
+        try:
+            generator.run()
+        except ValueError as err:
+            raise CommandError(str(err)) from err
+        self.stdout.write(self.style.SUCCESS(f"Đã sinh dữ liệu giả lập với tiền tố {generator.prefix}"))
@@ -0,0 +1,56 @@
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from reports.benchmarks import Benchmarks
+from users.models import User
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Đo độ trễ và số truy vấn của các endpoint / báo cáo chính, ghi kết quả (JSON lines) để so sánh giữa các lần chạy"
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help=f"Kịch bản cần chạy: {', '.join(Benchmarks.names())}")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--user", help="Email user chạy benchmark, mặc định superuser đầu tiên")
+        parser.add_argument("--output", default="benchmarks.jsonl", help="File JSON lines lưu kết quả")
+
+    def handle(self, *args, **options):
+        names = options["names"] or Benchmarks.names()
+        unknown = set(names) - set(Benchmarks.names())
+        if unknown:
+            raise CommandError(f"Không có kịch bản: {', '.join(sorted(unknown))}")
+
+        users = User.objects.filter(email=options["user"]) if options["user"] else User.objects.filter(is_superuser=True)
+        user = users.order_by("created").first()
+        if user is None:
+            raise CommandError("Không tìm thấy user chạy benchmark")
+
+        benchmarks = Benchmarks(user)
+        benchmarks.setup()
+        run = {"time": timezone.now().isoformat(), "revision": git_revision(), "results": []}
+        for name in names:
+            result = benchmarks.run(name, repeat=options["repeat"], warmup=options["warmup"])
+            run["results"].append(result.as_dict())
+            if result.error:
+                self.stdout.write(self.style.ERROR(f"{name:<32} {result.error}"))
+                continue
+            self.stdout.write(
+                f"{name:<32} median {result.median_ms:>9.1f}ms  p95 {result.p95_ms:>9.1f}ms  "
+                f"{result.queries:>5} queries  status {result.status or '-'}"
+            )
+
+        with open(options["output"], "a", encoding="utf-8") as output:
+            output.write(json.dumps(run) + "\n")
+        self.stdout.write(self.style.SUCCESS(f"Đã ghi kết quả vào {options['output']}"))
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+
+from django.db import IntegrityError
+from django.db import models
+from django.db import transaction
+from model_utils.models import TimeStampedModel
+from model_utils.models import UUIDModel
+
+from reports.enums import ReportJobStatus
+from reports.registry import REPORTS
+from reports.registry import normalize_params
+
+
+# Số lần thử tạo job khi bị trùng với job vừa được tạo bởi request khác
+SUBMIT_ATTEMPTS = 3
+
+
+def report_result_path(instance, filename):
+    ext = filename.split(".")[-1]
+    return os.path.join("reports/results", instance.report_type, f"{instance.id}.{ext}")
+
+
+class ReportJob(UUIDModel, TimeStampedModel):
+    report_type = models.CharField(max_length=64, choices=tuple((key, key) for key in REPORTS))
+    params = models.JSONField(default=dict, blank=True)
+    # sha256 của (report_type, params, người tạo) dùng để gộp các job giống nhau đang chạy của cùng một người
+    params_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(
+        max_length=16, choices=ReportJobStatus.choices(), default=ReportJobStatus.PENDING, db_index=True
+    )
+    result_file = models.FileField(upload_to=report_result_path, null=True, blank=True)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    created_by = models.ForeignKey(
+        "users.User", null=True, blank=True, on_delete=models.SET_NULL, related_name="report_jobs"
+    )
+
+    class Meta:
+        db_table = "tbl_Report_Jobs"
+        ordering = ["-created"]
+        constraints = [
+            # Tại một thời điểm mỗi người chỉ có một job cho mỗi bộ (report_type, params) đang chờ / đang chạy
+            models.UniqueConstraint(
+                fields=["params_hash"],
+                condition=models.Q(status__in=ReportJobStatus.in_flight()),
+                name="uniq_report_job_in_flight",
+            ),
+        ]
+
+    @staticmethod
+    def make_hash(report_type: str, params: dict, user_id=None) -> str:
+        raw = json.dumps([report_type, params, str(user_id) if user_id else None], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def submit(cls, report_type: str, params, user=None) -> tuple["ReportJob", bool]:
+        """
+        Tạo job và đưa vào hàng đợi sau khi commit.
+        Nếu người dùng đã có job giống hệt đang chờ / đang chạy thì trả về job đó: (job, False).
+        """
+        from reports.tasks import run_report_job
+
+        params = normalize_params(params)
+        params_hash = cls.make_hash(report_type, params, user.pk if user else None)
+        in_flight = cls.objects.filter(params_hash=params_hash, created_by=user, status__in=ReportJobStatus.in_flight())
+
+        for attempt in range(SUBMIT_ATTEMPTS):
+            job = in_flight.first()
+            if job:
+                return job, False
+            try:
+                with transaction.atomic():
+                    job = cls.objects.create(
+                        report_type=report_type, params=params, params_hash=params_hash, created_by=user
+                    )
+                break
+            except IntegrityError:
+                # Request khác vừa tạo job giống hệt: lấy job đó ở vòng sau (hoặc tạo lại nếu job đó đã chạy xong)
+                if attempt == SUBMIT_ATTEMPTS - 1:
+                    raise
+
+        transaction.on_commit(lambda: run_report_job.delay(str(job.pk)))
+        return job, True
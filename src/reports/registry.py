@@ -0,0 +1,41 @@
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+# Báo cáo có thể chạy nền: tên -> view đồng bộ tương ứng.
+# View phải có `get_report_data()` trả về toàn bộ kết quả (không phân trang) của request hiện tại.
+REPORTS = {
+    "order-item-detail": "orders.api.views.OrderItemDetailReportListView",
+    "orders-pivot": "orders.api.views.OrdersPivotReportAPIView",
+    "orders-pivot-compare": "orders.api.views.OrdersPivotReportCompareAPIView",
+    "products-pivot": "products.api.views.ProductReportListAPIView",
+    "warehouse": "warehouses.api.views.ReportWarehouseView",
+    "warehouse-category": "warehouses.api.views.ReportWarehouseCategoryView",
+}
+
+# Tham số phân trang bị bỏ qua: job luôn trả về toàn bộ kết quả
+IGNORED_PARAMS = ("page", "page_size", "limit", "offset")
+
+
+def normalize_params(params) -> dict:
+    """Chuẩn hoá query params (QueryDict hoặc dict) về dạng {key: [values]} đã sắp xếp theo key"""
+    items = params.lists() if hasattr(params, "lists") else params.items()
+    normalized = {}
+    for key, values in items:
+        if key in IGNORED_PARAMS:
+            continue
+        values = values if isinstance(values, (list, tuple)) else [values]
+        normalized[key] = [str(value) for value in values]
+    return dict(sorted(normalized.items()))
+
+
+def run_report(report_type: str, params: dict, user):
+    """Dựng lại request GET với `params` của `user` rồi chạy view báo cáo ngoài vòng request/response"""
+    view_class = import_string(REPORTS[report_type])
+    http_request = RequestFactory().get("/", params)
+    view = view_class()
+    view.setup(http_request)
+    view.format_kwarg = None
+    view.request = view.initialize_request(http_request)
+    view.request.user = user
+    view.check_permissions(view.request)
+    return view.get_report_data()
@@ -0,0 +1,642 @@
+"""
+Sinh dữ liệu giả lập với khối lượng tương đương production để đo hiệu năng ở môi trường local.
+
+Dữ liệu được sinh theo `seed` (cùng seed + cùng kích thước cho ra cùng dữ liệu) và ghi bằng `bulk_create`
+theo từng batch (không gửi signal), các bảng tổng hợp (tổng tồn, tồn khả dụng, doanh số theo ngày)
+được tính lại sau cùng. Mọi mã (SKU, email, tên kho...) có tiền tố `prefix` để tách khỏi dữ liệu thật.
+"""
+import logging
+import random
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from customers.models import Customer
+from customers.models import CustomerPhone
+from leads.models.attributes import LeadChannel
+from orders.enums import OrderItemDataFlowType
+from orders.enums import OrderPaymentType
+from orders.enums import OrderStatus
+from orders.models import Orders
+from orders.models import OrdersItems
+from orders.models import OrdersItemsCombo
+from orders.models import OrdersItemsPromotion
+from orders.models import OrdersPayments
+from orders.models import OrderVariantsPromotion
+from orders.models import VariantDailySales
+from products.enums import ProductVariantType
+from products.inventory import recompute_inventory_totals
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from products.models import ProductsVariantsBatches
+from products.models import ProductsVariantsComboDetail
+from promotions.enums import PromotionStatus
+from promotions.enums import PromotionVariantType
+from promotions.models import PromotionVariant
+from promotions.models import PromotionVariantsOtherVariant
+from users.models import User
+from utils.enums import SequenceType
+from warehouses.enums import SheetCheckType
+from warehouses.enums import SheetImportExportType
+from warehouses.enums import WarehouseBaseType
+from warehouses.models import SequenceIdentity
+from warehouses.models import Warehouse
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseInventoryAvailable
+from warehouses.models import WarehouseInventoryLog
+from warehouses.models import WarehouseInventoryReason
+from warehouses.models import WarehouseSheetCheck
+from warehouses.models import WarehouseSheetCheckDetail
+from warehouses.models import WarehouseSheetImportExport
+from warehouses.models import WarehouseSheetImportExportDetail
+
+logger = logging.getLogger(__name__)
+
+ORDER_STATUS_WEIGHTS = {OrderStatus.COMPLETED: 60, OrderStatus.DRAFT: 25, OrderStatus.CANCEL: 15}
+LAST_NAMES = ("Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ")
+MIDDLE_NAMES = ("Văn", "Thị", "Minh", "Ngọc", "Thanh", "Quốc", "Hoài", "Gia")
+FIRST_NAMES = ("An", "Bình", "Chi", "Dũng", "Hà", "Hải", "Hương", "Khánh", "Lan", "Long", "Mai", "Nam", "Phúc", "Trang")
+PHONE_PREFIXES = ("032", "033", "034", "035", "036", "037", "038", "039", "086", "090", "091", "093", "096", "097", "098")
+CHANNELS = ("Facebook", "Zalo", "Website", "Shopee", "Tiktok", "Hotline")
+
+
+@dataclass
+class SyntheticDataSize:
+    users: int = 20
+    customers: int = 5000
+    categories: int = 20
+    products: int = 500
+    variants_per_product: int = 3
+    combo_ratio: float = 0.05
+    # Tỉ lệ biến thể có khuyến mãi tặng kèm sản phẩm
+    gift_ratio: float = 0.1
+    warehouses: int = 3
+    orders: int = 20000
+    days: int = 180
+    check_sheets: int = 20
+
+
+class SyntheticDataGenerator:
+    def __init__(self, size: SyntheticDataSize, seed: int = 0, prefix: str = None, batch_size: int = 2000, stdout=None):
+        self.size = size
+        self.seed = seed
+        self.prefix = prefix or f"SYN{seed}"
+        self.batch_size = batch_size
+        self.stdout = stdout
+        # UUID cũng sinh từ rng nên seed gồm cả prefix để các lần sinh khác prefix không trùng khoá
+        self.rng = random.Random(f"{seed}:{self.prefix}")
+        self.now = timezone.now().replace(microsecond=0)
+        self.start = self.now - timedelta(days=size.days)
+        # Tồn kho theo (kho, lô) và diễn biến để sinh lịch sử
+        self.inventory = defaultdict(Decimal)
+        self.inventory_events = []
+        self.check_details = []
+
+    def log(self, message):
+        logger.info(message)
+        if self.stdout:
+            self.stdout.write(message)
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def random_time(self, start=None, end=None):
+        start, end = start or self.start, end or self.now
+        return start + timedelta(seconds=self.rng.randint(0, max(int((end - start).total_seconds()), 0)))
+
+    def bulk_create(self, model, objs, history=False):
+        objs = list(objs)
+        for index in range(0, len(objs), self.batch_size):
+            batch = objs[index : index + self.batch_size]
+            model.objects.bulk_create(batch)
+            if history:
+                # Lịch sử được ghi tại thời điểm tạo của bản ghi thay vì thời điểm chạy lệnh
+                for obj in batch:
+                    obj._history_date = obj.created
+                model.history.bulk_history_create(batch, batch_size=self.batch_size)
+        return objs
+
+    def reserve_codes(self, sequence_type: SequenceType, count: int) -> list[tuple[int, str]]:
+        """Cấp trước `count` mã liên tiếp của SequenceIdentity, trả về list (số thứ tự, mã)"""
+        seq = SequenceIdentity.get_code_by_type(sequence_type.value)
+        first = seq.value + 1
+        seq.value += count
+        seq.save(update_fields=["value"])
+        return [(value, f"{seq.type}{value:06d}") for value in range(first, first + count)]
+
+    def person_name(self):
+        return f"{self.rng.choice(LAST_NAMES)} {self.rng.choice(MIDDLE_NAMES)} {self.rng.choice(FIRST_NAMES)}"
+
+    def run(self):
+        if Products.objects.filter(SKU_code__startswith=f"{self.prefix}-").exists():
+            raise ValueError(f"Dữ liệu với tiền tố {self.prefix} đã tồn tại, hãy dùng seed hoặc prefix khác")
+
+        with transaction.atomic():
+            self.create_users()
+            self.create_references()
+            self.create_products()
+            self.create_promotions()
+            self.create_customers()
+            self.create_import_sheets()
+            self.create_orders()
+            self.create_check_sheets()
+            self.create_inventory()
+        self.refresh_aggregates()
+
+    def create_users(self):
+        self.users = self.bulk_create(
+            User,
+            (
+                User(
+                    id=self.uuid(),
+                    name=self.person_name(),
+                    email=f"{self.prefix.lower()}.sale{index}@example.com",
+                    phone=f"0900{index:06d}",
+                    password=make_password(None),
+                )
+                for index in range(self.size.users)
+            ),
+        )
+        self.log(f"Users: {len(self.users)}")
+
+    def create_references(self):
+        self.channels = [LeadChannel.objects.get_or_create(name=name)[0] for name in CHANNELS]
+        self.warehouses = [
+            Warehouse.objects.get_or_create(name=f"{self.prefix} Kho {index + 1}", defaults={"is_sales": index == 0})[0]
+            for index in range(self.size.warehouses)
+        ]
+        self.reasons = {
+            reason_type: WarehouseInventoryReason.objects.get_or_create(type=reason_type, name=f"{self.prefix} {name}")[0]
+            for reason_type, name in (
+                (WarehouseBaseType.IMPORT, "Nhập hàng"),
+                (WarehouseBaseType.EXPORT, "Xuất bán"),
+                (WarehouseBaseType.CHECK, "Kiểm kho"),
+            )
+        }
+
+    def create_products(self):
+        categories = self.bulk_create(
+            ProductCategory,
+            (
+                ProductCategory(id=self.uuid(), name=f"Danh mục {index + 1}", code=f"{self.prefix}-C{index + 1:03d}")
+                for index in range(self.size.categories)
+            ),
+        )
+        products, variants, batches, combo_details = [], [], [], []
+        simple_variants = []
+        for index in range(self.size.products):
+            product = Products(
+                id=self.uuid(),
+                name=f"Sản phẩm {index + 1}",
+                SKU_code=f"{self.prefix}-P{index + 1:06d}",
+                category=self.rng.choice(categories),
+                created_by=self.rng.choice(self.users),
+                created=self.random_time(end=self.start),
+            )
+            products.append(product)
+            for number in range(self.rng.randint(1, self.size.variants_per_product)):
+                price = self.rng.randrange(50_000, 2_000_000, 1000)
+                variant = ProductsVariants(
+                    id=self.uuid(),
+                    product=product,
+                    name=f"{product.name} - Loại {number + 1}",
+                    SKU_code=f"{product.SKU_code}-V{number + 1}",
+                    bar_code=product.SKU_code,
+                    sale_price=price,
+                    neo_price=int(price * 1.2),
+                    purchare_price=int(price * 0.6),
+                    created=product.created,
+                )
+                variants.append(variant)
+                simple_variants.append(variant)
+                for batch_number in range(self.rng.randint(1, 2)):
+                    batches.append(
+                        ProductsVariantsBatches(
+                            id=self.uuid(),
+                            product_variant=variant,
+                            name=f"Lô {batch_number + 1}",
+                            is_default=batch_number == 0,
+                        )
+                    )
+
+        # Combo gồm 2-3 biến thể đơn
+        combo_count = int(len(simple_variants) * self.size.combo_ratio)
+        for index in range(combo_count):
+            components = self.rng.sample(simple_variants, k=min(len(simple_variants), self.rng.randint(2, 3)))
+            price = sum(component.sale_price for component in components)
+            combo = ProductsVariants(
+                id=self.uuid(),
+                product=components[0].product,
+                name=f"Combo {index + 1}",
+                SKU_code=f"{self.prefix}-CB{index + 1:05d}",
+                type=ProductVariantType.COMBO,
+                sale_price=int(price * 0.9),
+                neo_price=price,
+                created=components[0].created,
+            )
+            variants.append(combo)
+            combo_details.extend(
+                ProductsVariantsComboDetail(
+                    id=self.uuid(),
+                    origin_variant=combo,
+                    detail_variant=component,
+                    price_detail_variant=component.sale_price,
+                    quantity=1,
+                )
+                for component in components
+            )
+
+        self.bulk_create(Products, products)
+        self.bulk_create(ProductsVariants, variants)
+        self.bulk_create(ProductsVariantsBatches, batches)
+        self.bulk_create(ProductsVariantsComboDetail, combo_details)
+
+        self.simple_variants = simple_variants
+        self.combo_variants = [variant for variant in variants if variant.type == ProductVariantType.COMBO]
+        self.combo_components = defaultdict(list)
+        for detail in combo_details:
+            self.combo_components[detail.origin_variant_id].append(detail)
+        self.variant_batches = defaultdict(list)
+        for batch in batches:
+            self.variant_batches[batch.product_variant_id].append(batch)
+        self.log(f"Products: {len(products)}, variants: {len(variants)}, batches: {len(batches)}")
+
+    def create_promotions(self):
+        promotions, gifts = [], []
+        count = max(1, int(len(self.simple_variants) * self.size.gift_ratio))
+        for variant in self.rng.sample(self.simple_variants, k=count):
+            promotion = PromotionVariant(
+                id=self.uuid(),
+                name=f"Tặng kèm {variant.SKU_code}",
+                type=PromotionVariantType.OTHER_VARIANT,
+                status=PromotionStatus.IN_PROGRESS,
+                variant=variant,
+                requirement_min_total_quantity_variant_apply=1,
+            )
+            promotions.append(promotion)
+            gifts.append(
+                PromotionVariantsOtherVariant(
+                    id=self.uuid(),
+                    promotion_variant=promotion,
+                    variant=self.rng.choice(self.simple_variants),
+                    quantity=1,
+                    price=0,
+                )
+            )
+        self.bulk_create(PromotionVariant, promotions)
+        self.bulk_create(PromotionVariantsOtherVariant, gifts)
+        self.gift_promotions = {promotion.variant_id: (promotion, gift) for promotion, gift in zip(promotions, gifts)}
+
+    def create_customers(self):
+        customers, phones = [], []
+        used_phones = set()
+        for _ in range(self.size.customers):
+            customer = Customer(
+                id=self.uuid(),
+                name=self.person_name(),
+                created=self.random_time(),
+                created_by=self.rng.choice(self.users),
+                customer_care_staff=self.rng.choice(self.users),
+            )
+            customers.append(customer)
+            for _ in range(1 if self.rng.random() < 0.85 else 2):
+                phone = f"{self.rng.choice(PHONE_PREFIXES)}{self.rng.randint(0, 9_999_999):07d}"
+                if phone in used_phones:
+                    continue
+                used_phones.add(phone)
+                phones.append(CustomerPhone(id=self.uuid(), customer=customer, phone=phone, created=customer.created))
+
+        existing = set(CustomerPhone.objects.filter(phone__in=used_phones).values_list("phone", flat=True))
+        self.bulk_create(Customer, customers, history=True)
+        self.bulk_create(CustomerPhone, (phone for phone in phones if phone.phone not in existing))
+        self.customers = customers
+        self.customer_phones = {phone.customer_id: phone.phone for phone in phones if phone.phone not in existing}
+        self.log(f"Customers: {len(customers)}, phones: {len(phones) - len(existing)}")
+
+    def create_import_sheets(self):
+        """Phiếu nhập tồn đầu kỳ cho mọi lô ở từng kho"""
+        codes = self.reserve_codes(SequenceType.IMPORT, len(self.warehouses))
+        sheets, details = [], []
+        for warehouse, (_, code) in zip(self.warehouses, codes):
+            sheet = WarehouseSheetImportExport(
+                id=self.uuid(),
+                code=code,
+                type=SheetImportExportType.IMPORT,
+                warehouse=warehouse,
+                change_reason=self.reasons[WarehouseBaseType.IMPORT],
+                is_confirm=True,
+                created=self.start,
+                confirm_date=self.start,
+                created_by=self.users[0],
+                confirm_by=self.users[0],
+            )
+            sheets.append(sheet)
+            for variant in self.simple_variants:
+                for batch in self.variant_batches[variant.pk]:
+                    quantity = Decimal(self.rng.randint(500, 5000))
+                    details.append(
+                        WarehouseSheetImportExportDetail(
+                            id=self.uuid(), sheet=sheet, product_variant_batch=batch, quantity=quantity, created=self.start
+                        )
+                    )
+                    self.add_inventory_event(sheet, WarehouseBaseType.IMPORT, warehouse, batch, quantity, self.start)
+        self.bulk_create(WarehouseSheetImportExport, sheets)
+        self.bulk_create(WarehouseSheetImportExportDetail, details)
+
+    def add_inventory_event(self, sheet, event_type, warehouse, batch, quantity, date, check_detail=None):
+        self.inventory_events.append(
+            (date, sheet, event_type, sheet.change_reason, warehouse, batch, quantity, check_detail)
+        )
+
+    def order_line(self, order, variant, quantity):
+        """Sinh line item (kèm item combo / quà tặng), trả về danh sách (variant, số lượng) cần xuất kho"""
+        price_total = variant.sale_price * quantity
+        is_combo = variant.type == ProductVariantType.COMBO
+        line_item = OrdersItems(
+            id=self.uuid(),
+            order=order,
+            variant=variant,
+            quantity=quantity,
+            price_variant_logs=variant.sale_price,
+            price_total=price_total,
+            price_total_input=price_total,
+            price_total_neo=(variant.neo_price or variant.sale_price) * quantity,
+            type_data_flow=OrderItemDataFlowType.COMBO if is_combo else OrderItemDataFlowType.SIMPLE,
+            created=order.created,
+            created_by=order.created_by,
+        )
+        self.line_items.append(line_item)
+
+        items = []
+        if is_combo:
+            for detail in self.combo_components[variant.pk]:
+                item_quantity = quantity * (detail.quantity or 1)
+                self.items_combo.append(
+                    OrdersItemsCombo(
+                        id=self.uuid(),
+                        line_item=line_item,
+                        variant=detail.detail_variant,
+                        quantity=item_quantity,
+                        price=detail.price_detail_variant or 0,
+                        total=(detail.price_detail_variant or 0) * item_quantity,
+                        created=order.created,
+                    )
+                )
+                items.append((detail.detail_variant, item_quantity))
+        else:
+            items.append((variant, quantity))
+
+        gift = self.gift_promotions.get(variant.pk)
+        if gift:
+            promotion, promotion_gift = gift
+            variant_promotion = OrderVariantsPromotion(
+                id=self.uuid(), line_item=line_item, promotion_variant=promotion, price=0, created=order.created
+            )
+            self.variant_promotions.append(variant_promotion)
+            self.items_promotion.append(
+                OrdersItemsPromotion(
+                    id=self.uuid(),
+                    order_variant_promotion=variant_promotion,
+                    variant=promotion_gift.variant,
+                    quantity=promotion_gift.quantity,
+                    price=0,
+                    total=0,
+                    created=order.created,
+                )
+            )
+            items.append((promotion_gift.variant, promotion_gift.quantity))
+        return price_total, items
+
+    def create_orders(self):
+        statuses = list(ORDER_STATUS_WEIGHTS)
+        weights = list(ORDER_STATUS_WEIGHTS.values())
+        sellable = self.simple_variants + self.combo_variants
+        codes = self.reserve_codes(SequenceType.ORDER, self.size.orders)
+        self.customer_stats = defaultdict(lambda: {"total_order": 0, "total_spent": 0, "last_order_time": None})
+        self.exports = []
+
+        for start in range(0, self.size.orders, self.batch_size):
+            self.line_items, self.items_combo, self.variant_promotions, self.items_promotion = [], [], [], []
+            orders, payments = [], []
+            for index in range(start, min(start + self.batch_size, self.size.orders)):
+                customer = self.rng.choice(self.customers)
+                created = self.random_time(start=max(self.start, customer.created))
+                status = self.rng.choices(statuses, weights)[0]
+                order = Orders(
+                    id=self.uuid(),
+                    order_number=codes[index][0],
+                    order_key=codes[index][1],
+                    status=status,
+                    customer=customer,
+                    name_shipping=customer.name,
+                    phone_shipping=self.customer_phones.get(customer.pk),
+                    source=self.rng.choice(self.channels),
+                    created=created,
+                    created_by=self.rng.choice(self.users),
+                )
+                if status == OrderStatus.COMPLETED:
+                    order.complete_time = min(created + timedelta(minutes=self.rng.randint(5, 600)), self.now)
+                    order.complete_by = self.rng.choice(self.users)
+
+                total, exported = 0, []
+                for variant in self.rng.sample(sellable, k=min(len(sellable), self.rng.randint(1, 4))):
+                    line_total, items = self.order_line(order, variant, self.rng.randint(1, 3))
+                    total += line_total
+                    exported.extend(items)
+
+                delivery = self.rng.choice((0, 20_000, 30_000))
+                order.price_total_variant_all = total
+                order.price_total_variant_actual = total
+                order.price_total_variant_actual_input = total
+                order.price_delivery_input = delivery
+                order.price_total_order_actual = total + delivery
+                order.price_after_paid = total + delivery
+                orders.append(order)
+                payments.append(
+                    OrdersPayments(
+                        id=self.uuid(),
+                        order=order,
+                        type=self.rng.choice((OrderPaymentType.COD, OrderPaymentType.COD, OrderPaymentType.DIRECT_TRANSFER)),
+                        price_from_order=order.price_total_order_actual,
+                        is_confirm=status == OrderStatus.COMPLETED,
+                        date_confirm=order.complete_time,
+                        created=created,
+                    )
+                )
+                if status == OrderStatus.COMPLETED:
+                    stats = self.customer_stats[customer.pk]
+                    stats["total_order"] += 1
+                    stats["total_spent"] += order.price_total_order_actual
+                    stats["last_order_time"] = max(filter(None, (stats["last_order_time"], order.complete_time)))
+                    self.exports.append((order, exported))
+
+            self.bulk_create(Orders, orders, history=True)
+            self.bulk_create(OrdersPayments, payments, history=True)
+            self.bulk_create(OrdersItems, self.line_items)
+            self.bulk_create(OrdersItemsCombo, self.items_combo)
+            self.bulk_create(OrderVariantsPromotion, self.variant_promotions)
+            self.bulk_create(OrdersItemsPromotion, self.items_promotion)
+            self.log(f"Orders: {start + len(orders)}/{self.size.orders}")
+
+        self.update_customers()
+        self.create_export_sheets()
+
+    def update_customers(self):
+        customers = []
+        for customer in self.customers:
+            stats = self.customer_stats.get(customer.pk)
+            if stats:
+                customer.total_order = stats["total_order"]
+                customer.total_spent = stats["total_spent"]
+                customer.last_order_time = stats["last_order_time"]
+                customers.append(customer)
+        Customer.objects.bulk_update(
+            customers, ["total_order", "total_spent", "last_order_time"], batch_size=self.batch_size
+        )
+
+    def create_export_sheets(self):
+        """Phiếu xuất kho cho mỗi đơn hoàn thành (xuất từ lô mặc định tại kho bán hàng)"""
+        warehouse = self.warehouses[0]
+        codes = self.reserve_codes(SequenceType.EXPORT, len(self.exports))
+        sheets, details = [], []
+        for (order, items), (_, code) in zip(self.exports, codes):
+            sheet = WarehouseSheetImportExport(
+                id=self.uuid(),
+                code=code,
+                type=SheetImportExportType.EXPORT,
+                warehouse=warehouse,
+                order=order,
+                change_reason=self.reasons[WarehouseBaseType.EXPORT],
+                is_confirm=True,
+                created=order.complete_time,
+                confirm_date=order.complete_time,
+                created_by=order.complete_by,
+                confirm_by=order.complete_by,
+            )
+            sheets.append(sheet)
+            for variant, quantity in items:
+                batch = self.variant_batches[variant.pk][0]
+                details.append(
+                    WarehouseSheetImportExportDetail(
+                        id=self.uuid(),
+                        sheet=sheet,
+                        product_variant_batch=batch,
+                        quantity=Decimal(quantity),
+                        created=order.complete_time,
+                    )
+                )
+                self.add_inventory_event(
+                    sheet, WarehouseBaseType.EXPORT, warehouse, batch, -Decimal(quantity), order.complete_time
+                )
+        self.bulk_create(WarehouseSheetImportExport, sheets)
+        self.bulk_create(WarehouseSheetImportExportDetail, details)
+        self.log(f"Export sheets: {len(sheets)}")
+
+    def create_check_sheets(self):
+        """Phiếu kiểm kho lệch ±5 cho một số lô ngẫu nhiên"""
+        codes = self.reserve_codes(SequenceType.CHECK, self.size.check_sheets)
+        batches = [batch for batch_list in self.variant_batches.values() for batch in batch_list]
+        sheets = []
+        for _, code in codes:
+            warehouse = self.rng.choice(self.warehouses)
+            confirm_date = self.random_time()
+            sheet = WarehouseSheetCheck(
+                id=self.uuid(),
+                code=code,
+                type=SheetCheckType.CHECK,
+                warehouse=warehouse,
+                change_reason=self.reasons[WarehouseBaseType.CHECK],
+                is_confirm=True,
+                created=confirm_date,
+                confirm_date=confirm_date,
+                created_by=self.users[0],
+                confirm_by=self.users[0],
+            )
+            sheets.append(sheet)
+            for batch in self.rng.sample(batches, k=min(len(batches), 20)):
+                detail = WarehouseSheetCheckDetail(
+                    id=self.uuid(), sheet=sheet, product_variant_batch=batch, created=confirm_date
+                )
+                self.check_details.append(detail)
+                difference = Decimal(self.rng.randint(-5, 5))
+                self.add_inventory_event(sheet, WarehouseBaseType.CHECK, warehouse, batch, difference, confirm_date, detail)
+        self.bulk_create(WarehouseSheetCheck, sheets)
+
+    def create_inventory(self):
+        """Log tồn kho, tồn kho hiện tại và lịch sử tồn kho (theo thứ tự thời gian của các phiếu)"""
+        self.inventory_events.sort(key=lambda event: event[0])
+        inventories, logs, histories = {}, [], []
+        for date, sheet, event_type, reason, warehouse, batch, quantity, check_detail in self.inventory_events:
+            key = (warehouse.pk, batch.pk)
+            if check_detail is not None:
+                # Số lượng hệ thống của phiếu kiểm là tồn tại thời điểm kiểm
+                check_detail.quantity_system = self.inventory[key]
+                check_detail.quantity_actual = self.inventory[key] + quantity
+            self.inventory[key] += quantity
+            inventory = inventories.get(key)
+            is_new = inventory is None
+            if is_new:
+                inventory = inventories[key] = WarehouseInventory(
+                    id=self.uuid(), warehouse=warehouse, product_variant_batch=batch, created=date
+                )
+            inventory.quantity = self.inventory[key]
+            histories.append(
+                WarehouseInventory.history.model(
+                    history_id=self.uuid(),
+                    history_date=date,
+                    history_type="+" if is_new else "~",
+                    id=inventory.id,
+                    warehouse_id=warehouse.pk,
+                    product_variant_batch_id=batch.pk,
+                    quantity=inventory.quantity,
+                    created=inventory.created,
+                    modified=date,
+                )
+            )
+            logs.append(
+                WarehouseInventoryLog(
+                    id=self.uuid(),
+                    warehouse=warehouse,
+                    product_variant_batch=batch,
+                    quantity=quantity,
+                    change_reason=reason,
+                    type=event_type,
+                    sheet_code=sheet.code,
+                    sheet=sheet,
+                    created=date,
+                )
+            )
+        self.bulk_create(WarehouseInventory, inventories.values())
+        self.bulk_create(WarehouseInventory.history.model, histories)
+        self.bulk_create(WarehouseInventoryLog, logs)
+        self.bulk_create(WarehouseSheetCheckDetail, self.check_details)
+        self.log(f"Inventories: {len(inventories)}, logs: {len(logs)}")
+
+        available = defaultdict(lambda: {"quantity_confirm": 0, "quantity_non_confirm": 0})
+        for order, items in self.exports:
+            for variant, quantity in items:
+                available[variant.pk]["quantity_confirm"] += quantity
+        for line_item in OrdersItems.objects.filter(
+            order__status=OrderStatus.DRAFT, variant__SKU_code__startswith=f"{self.prefix}-"
+        ).values("variant_id", "quantity"):
+            available[line_item["variant_id"]]["quantity_non_confirm"] += line_item["quantity"]
+        self.bulk_create(
+            WarehouseInventoryAvailable,
+            (
+                WarehouseInventoryAvailable(id=self.uuid(), product_variant_id=variant_id, quantity_export=0, **values)
+                for variant_id, values in available.items()
+            ),
+        )
+
+    def refresh_aggregates(self):
+        with transaction.atomic():
+            recompute_inventory_totals()
+        rows = VariantDailySales.rebuild(self.start.date(), self.now.date(), batch_size=self.batch_size)
+        self.log(f"Variant daily sales rows: {rows}")
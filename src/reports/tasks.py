@@ -0,0 +1,77 @@
+import gzip
+import json
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.management import call_command
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.db_router import use_replica
+from reports.enums import ReportJobStatus
+from reports.models import ReportJob
+from reports.registry import run_report
+
+logger = logging.getLogger(__name__)
+
+
+def dump_result(data) -> bytes:
+    if not isinstance(data, dict):
+        data = {"count": len(data), "results": data}
+    # JSONEncoder của DRF xử lý được Decimal, datetime, UUID và kiểu numpy (kết quả pivot)
+    content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+    return gzip.compress(content.encode("utf-8"))
+
+
+@shared_task(acks_late=True, ignore_result=True)
+def run_report_job(job_id):
+    started_at = timezone.now()
+    # Chỉ một worker nhận được job (trường hợp message bị giao lại)
+    updated = ReportJob.objects.filter(pk=job_id, status=ReportJobStatus.PENDING).update(
+        status=ReportJobStatus.RUNNING, started_at=started_at
+    )
+    if not updated:
+        return
+    job = ReportJob.objects.select_related("created_by").get(pk=job_id)
+
+    try:
+        # Báo cáo chỉ đọc nên chạy trên replica (nếu có) để không tranh tài nguyên với primary
+        with use_replica():
+            data = run_report(job.report_type, job.params, job.created_by)
+        job.result_file.save(f"{job.pk}.json.gz", ContentFile(dump_result(data)), save=False)
+    except Exception as err:  # pylint: disable=W0718
+        logger.exception("Report job %s (%s) failed", job.pk, job.report_type)
+        job.status = ReportJobStatus.FAILED
+        job.error = str(err)
+    else:
+        job.status = ReportJobStatus.SUCCESS
+        job.row_count = data.get("count") if isinstance(data, dict) else len(data)
+        job.expires_at = timezone.now() + timedelta(seconds=settings.REPORT_JOB_RESULT_TTL)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "result_file", "row_count", "expires_at", "finished_at", "modified"])
+
+
+@shared_task(ignore_result=True)
+def expire_report_jobs():
+    """Xoá file kết quả đã hết hạn và giải phóng các job bị treo (worker chết giữa chừng)"""
+    now = timezone.now()
+    for job in ReportJob.objects.filter(status=ReportJobStatus.SUCCESS, expires_at__lte=now).iterator():
+        if job.result_file:
+            job.result_file.delete(save=False)
+        job.status = ReportJobStatus.EXPIRED
+        job.save(update_fields=["status", "result_file", "modified"])
+
+    stuck_before = now - timedelta(seconds=settings.REPORT_JOB_TIMEOUT)
+    ReportJob.objects.filter(
+        Q(status=ReportJobStatus.RUNNING, started_at__lte=stuck_before)
+        | Q(status=ReportJobStatus.PENDING, created__lte=stuck_before)
+    ).update(status=ReportJobStatus.FAILED, error="Timeout", finished_at=now)
+
+
+@shared_task(ignore_result=True)
+def ensure_history_partitions():
+    call_command("ensure_history_partitions")
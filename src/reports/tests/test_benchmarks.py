@@ -0,0 +1,54 @@
+import pytest
+from django.core.exceptions import FieldDoesNotExist
+
+from orders.models import Orders
+from reports.benchmarks import Benchmarks
+from reports.synthetic_data import SyntheticDataGenerator
+from reports.synthetic_data import SyntheticDataSize
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+# Số truy vấn tối đa của từng kịch bản benchmark trên bộ dữ liệu nhỏ bên dưới
+QUERY_BUDGETS = {
+    "order_create": 80,
+    "order_list": 30,
+    "order_search": 15,
+    "orders_pivot": 3,
+    "report_warehouse": 4,
+    "order_item_detail_report": 10,
+}
+
+
+def has_shipping_relation():
+    try:
+        Orders._meta.get_field("shipping")
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+@pytest.fixture
+def benchmarks():
+    size = SyntheticDataSize(users=2, customers=20, categories=2, products=5, orders=60, days=30, check_sheets=1)
+    SyntheticDataGenerator(size, seed=1).run()
+    benchmarks = Benchmarks(User.objects.create_superuser(email="benchmark@example.com"))
+    benchmarks.setup()
+    return benchmarks
+
+
+def test_every_benchmark_has_a_query_budget():
+    assert set(Benchmarks.names()) == set(QUERY_BUDGETS)
+
+
+@pytest.mark.parametrize("name", sorted(QUERY_BUDGETS))
+def test_benchmark_runs_within_query_budget(benchmarks, name):
+    if name == "order_item_detail_report" and not has_shipping_relation():
+        pytest.skip("Báo cáo chi tiết đơn hàng cần quan hệ Orders.shipping (app delivery)")
+
+    result = benchmarks.run(name, repeat=2, warmup=0)
+
+    assert result.error is None
+    assert result.status in (None, 200, 201)
+    assert result.queries <= QUERY_BUDGETS[name]
+    assert result.min_ms <= result.median_ms <= result.max_ms
@@ -0,0 +1,61 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.db import models
+
+from orders.models import Orders
+from utils.partitioning import PARTITION_KEY
+from utils.partitioning import convert_to_partitioned
+from utils.partitioning import history_indexes
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+HistoricalOrders = Orders.history.model
+
+
+def index_columns(index, model):
+    return [model._meta.get_field(name).column for name in index.fields]
+
+
+def test_history_indexes_cover_field_meta_and_id_date_indexes():
+    declared = models.Index(fields=[PARTITION_KEY, "id"], name="hist_orders_date_id_idx")
+    with mock.patch.object(HistoricalOrders._meta, "indexes", [declared]):
+        indexes = history_indexes(HistoricalOrders)
+
+    columns = [index_columns(index, HistoricalOrders) for index in indexes]
+    assert [PARTITION_KEY] in columns
+    assert ["history_user_id"] in columns
+    assert declared in indexes
+    assert ["id", PARTITION_KEY] in columns
+    names = [index.name for index in indexes]
+    assert len(names) == len(set(names))
+    # Giới hạn độ dài tên của PostgreSQL
+    assert all(len(name) <= 63 for name in names)
+
+
+def test_history_indexes_are_created_with_public_schema_editor_api():
+    table = HistoricalOrders._meta.db_table
+    before = set(connection.introspection.get_constraints(connection.cursor(), table))
+    indexes = [index for index in history_indexes(HistoricalOrders) if index.name not in before]
+
+    with connection.schema_editor() as schema_editor:
+        for index in indexes:
+            schema_editor.add_index(HistoricalOrders, index)
+    try:
+        constraints = connection.introspection.get_constraints(connection.cursor(), table)
+        for index in indexes:
+            assert constraints[index.name]["columns"] == index_columns(index, HistoricalOrders)
+    finally:
+        with connection.schema_editor() as schema_editor:
+            for index in indexes:
+                schema_editor.remove_index(HistoricalOrders, index)
+
+
+def test_convert_to_partitioned_skips_other_databases():
+    schema_editor = mock.Mock(connection=connection)
+
+    convert_to_partitioned(schema_editor, HistoricalOrders)
+
+    schema_editor.add_index.assert_not_called()
+    schema_editor.execute.assert_not_called()
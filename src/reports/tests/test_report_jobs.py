@@ -0,0 +1,86 @@
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError
+
+from reports.enums import ReportJobStatus
+from reports.models import ReportJob
+
+pytestmark = pytest.mark.django_db
+
+JOBS_URL = "/api/reports/jobs/"
+PARAMS = {"warehouse_id": ["1"], "date_from": "2024-01-01"}
+
+
+def submit(user, params=None):
+    return ReportJob.submit("warehouse", params or PARAMS, user=user)
+
+
+def test_submit_reuses_in_flight_job_of_same_user(user, django_capture_on_commit_callbacks):
+    with mock.patch("reports.tasks.run_report_job.delay") as delay:
+        with django_capture_on_commit_callbacks(execute=True):
+            job, created = submit(user)
+            same_job, same_created = submit(user, {"date_from": "2024-01-01", "warehouse_id": "1", "page": "2"})
+
+    assert created and not same_created
+    assert same_job.pk == job.pk
+    delay.assert_called_once_with(str(job.pk))
+
+
+def test_submit_does_not_share_jobs_between_users(user, other_user):
+    job, _ = submit(user)
+    other_job, created = submit(other_user)
+
+    assert created
+    assert other_job.pk != job.pk
+    assert other_job.created_by == other_user
+
+
+def test_submit_creates_new_job_after_previous_finished(user):
+    job, _ = submit(user)
+    ReportJob.objects.filter(pk=job.pk).update(status=ReportJobStatus.SUCCESS)
+
+    new_job, created = submit(user)
+
+    assert created
+    assert new_job.pk != job.pk
+
+
+def test_submit_retries_when_conflicting_job_finished(user):
+    create = ReportJob.objects.create
+    calls = []
+
+    def create_after_conflict(**kwargs):
+        # Lần đầu: job trùng của request khác vừa được tạo rồi chạy xong trước khi đọc lại
+        if not calls:
+            calls.append(kwargs)
+            raise IntegrityError("uniq_report_job_in_flight")
+        return create(**kwargs)
+
+    with mock.patch.object(ReportJob.objects, "create", side_effect=create_after_conflict):
+        job, created = submit(user)
+
+    assert created
+    assert job.created_by == user
+
+
+def test_api_scopes_jobs_to_current_user(api_client, user, other_user):
+    own_job, _ = submit(user)
+    other_job, _ = submit(other_user)
+
+    response = api_client.get(JOBS_URL)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.data["results"]] == [str(own_job.pk)]
+
+    assert api_client.get(f"{JOBS_URL}{own_job.pk}/").status_code == 200
+    assert api_client.get(f"{JOBS_URL}{other_job.pk}/").status_code == 404
+    assert api_client.get(f"{JOBS_URL}{other_job.pk}/download/").status_code == 404
+
+
+def test_api_create_returns_existing_job_for_same_user(api_client, user):
+    job, _ = submit(user)
+
+    response = api_client.post(JOBS_URL, {"report_type": "warehouse", "params": PARAMS}, format="json")
+
+    assert response.status_code == 202
+    assert response.data["id"] == str(job.pk)
@@ -0,0 +1,122 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
+from django.db import transaction
+
+from utils.reports import _run_in_worker
+from utils.reports import run_report_queries
+
+request_alias = contextvars.ContextVar("request_alias", default=None)
+
+
+def run_in_pool(executor, func):
+    return executor.submit(_run_in_worker, contextvars.copy_context(), func).result(timeout=10)
+
+
+def query():
+    """Chạy một truy vấn, trả về thread và connection (DatabaseWrapper) của thread"""
+    wrapper = connections[DEFAULT_DB_ALIAS]
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return threading.get_ident(), wrapper
+
+
+@pytest.fixture
+def closed(monkeypatch):
+    """(thread, alias) của mỗi lần đóng connection"""
+    calls = []
+    close = type(connections[DEFAULT_DB_ALIAS]).close
+
+    def spy(wrapper):
+        calls.append((threading.get_ident(), wrapper.alias))
+        return close(wrapper)
+
+    monkeypatch.setattr(type(connections[DEFAULT_DB_ALIAS]), "close", spy)
+    return calls
+
+
+@pytest.fixture
+def conn_max_age(monkeypatch):
+    def set_conn_max_age(value):
+        # Connection mới của thread worker đọc CONN_MAX_AGE từ settings dùng chung
+        monkeypatch.setitem(connections.settings[DEFAULT_DB_ALIAS], "CONN_MAX_AGE", value)
+
+    return set_conn_max_age
+
+
+def test_queries_run_concurrently_and_keep_order():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fetch(value):
+        # Chạy tuần tự thì tác vụ đầu chờ barrier mãi
+        barrier.wait()
+        return value, threading.current_thread().name
+
+    results = run_report_queries([lambda: fetch(1), lambda: fetch(2)])
+
+    assert [value for value, _ in results] == [1, 2]
+    assert all(name.startswith("report-query") for _, name in results)
+    assert results[0][1] != results[1][1]
+
+
+def test_queries_run_in_caller_context():
+    token = request_alias.set("replica")
+    try:
+        results = run_report_queries([request_alias.get, request_alias.get])
+    finally:
+        request_alias.reset(token)
+
+    assert results == ["replica", "replica"]
+
+
+@pytest.mark.django_db
+def test_queries_run_sequentially_inside_transaction():
+    with transaction.atomic():
+        results = run_report_queries([threading.get_ident, threading.get_ident])
+
+    assert results == [threading.get_ident()] * 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_keeps_its_connection_between_tasks(closed, conn_max_age):
+    conn_max_age(60)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first_thread, first_connection = run_in_pool(executor, query)
+        second_thread, second_connection = run_in_pool(executor, query)
+
+        assert first_thread == second_thread
+        assert first_connection is second_connection
+        assert closed == []
+    # Thread worker kết thúc: đóng connection của chính thread đó
+    assert closed == [(first_thread, DEFAULT_DB_ALIAS)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_closes_only_its_own_connection(closed, conn_max_age):
+    conn_max_age(0)
+    started, release = threading.Barrier(2, timeout=5), threading.Event()
+
+    def long_query():
+        thread, wrapper = query()
+        started.wait()
+        # Thread khác kết thúc tác vụ trong lúc connection này còn đang dùng
+        assert release.wait(timeout=5)
+        assert (thread, DEFAULT_DB_ALIAS) not in closed
+        assert query() == (thread, wrapper)
+        return thread, wrapper
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        long_future = executor.submit(_run_in_worker, contextvars.copy_context(), long_query)
+        started.wait()
+        short_thread, _ = run_in_pool(executor, query)
+        release.set()
+        long_thread, _ = long_future.result(timeout=10)
+
+    assert short_thread != long_thread
+    # CONN_MAX_AGE = 0: mỗi worker đóng connection của mình sau tác vụ, không đóng connection của thread khác
+    assert {thread for thread, _ in closed} == {short_thread, long_thread}
+    assert threading.get_ident() not in {thread for thread, _ in closed}
@@ -0,0 +1,132 @@
+import random
+from datetime import date
+
+import pandas as pd
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from utils.basic import data_multi_sortby
+from utils.basic import data_sortby
+from utils.report_result import ReportResult
+
+
+def legacy_multi_sortby(data_result, sortby):
+    """`data_multi_sortby` trước khi chuyển sang `ReportResult`"""
+    sort_keys = [(key[1:], True) if key.startswith("-") else (key, False) for key in sortby]
+    null_data, data = [], []
+    for item in data_result:
+        if any(item[key] is None for key, _ in sort_keys):
+            null_data.append(item)
+        else:
+            data.append(item)
+    for sort_key, des in reversed(sort_keys):
+        data = sorted(data, key=lambda x: x[sort_key], reverse=des)
+    return data + null_data if sort_keys[-1][1] else null_data + data
+
+
+def legacy_sortby(data_result, sortby):
+    """`data_sortby` trước khi chuyển sang `ReportResult`"""
+    if len(sortby.split(",")) > 1:
+        return legacy_multi_sortby(data_result, sortby.split(","))
+    sort_key, des = (sortby, False) if sortby[0] != "-" else (sortby[1:], True)
+    null_data = [x for x in data_result if x[sort_key] is None]
+    data = [x for x in data_result if x[sort_key] is not None]
+    sorted_data = sorted(data, key=lambda x: x[sort_key], reverse=des)
+    return sorted_data + null_data if des else null_data + sorted_data
+
+
+ROWS = [
+    {"id": 1, "name": "b", "revenue": 300, "created": date(2024, 1, 2)},
+    {"id": 2, "name": "a", "revenue": None, "created": date(2024, 1, 1)},
+    {"id": 3, "name": "b", "revenue": 100, "created": None},
+    {"id": 4, "name": "a", "revenue": 300, "created": date(2024, 1, 3)},
+    {"id": 5, "name": "c", "revenue": 100, "created": date(2024, 1, 1)},
+]
+
+
+def ids(records):
+    return [record["id"] for record in records]
+
+
+@pytest.mark.parametrize(
+    "ordering, expected",
+    [
+        # Tăng dần: null đứng đầu, các dòng bằng nhau giữ thứ tự ban đầu
+        ("revenue", [2, 3, 5, 1, 4]),
+        # Giảm dần: null đứng cuối
+        ("-revenue", [1, 4, 3, 5, 2]),
+        ("name", [2, 4, 1, 3, 5]),
+        ("-created", [4, 1, 2, 5, 3]),
+    ],
+)
+def test_single_key_ordering(ordering, expected):
+    assert ids(data_sortby(ROWS, ordering)) == expected
+    assert ids(ReportResult.from_records(ROWS).order_by(ordering)) == expected
+    assert ids(legacy_sortby(ROWS, ordering)) == expected
+
+
+@pytest.mark.parametrize(
+    "ordering, expected",
+    [
+        ("name,revenue", [2, 4, 3, 1, 5]),
+        ("name,-revenue", [4, 1, 3, 5, 2]),
+        ("-revenue,name", [2, 4, 1, 3, 5]),
+        ("-revenue,-created", [4, 1, 5, 2, 3]),
+    ],
+)
+def test_multi_key_ordering_with_mixed_directions(ordering, expected):
+    # Dòng có null ở một trong các khóa: đứng đầu / cuối theo chiều của khóa cuối cùng
+    assert ids(data_sortby(ROWS, ordering)) == expected
+    assert ids(data_multi_sortby(ROWS, ordering.split(","))) == expected
+    assert ids(ReportResult.from_records(ROWS).order_by(ordering.split(","))) == expected
+    assert ids(legacy_sortby(ROWS, ordering)) == expected
+
+
+def test_ordering_keeps_original_records_and_pages():
+    result = ReportResult.from_records(ROWS).order_by("-revenue,name")
+
+    assert result.count() == len(result) == 5
+    assert result[1:3] == [ROWS[3], ROWS[0]]
+    assert all(record is ROWS[index] for record, index in zip(result.records(), (1, 3, 0, 2, 4)))
+
+
+def test_columnar_result_orders_frame():
+    frame = pd.DataFrame({"sku": ["A", "B", "C", "D"], "quantity": [2, None, 2, 5], "revenue": [10, 20, 30, 40]})
+
+    result = ReportResult(frame).order_by("-quantity,-revenue")
+
+    assert [record["sku"] for record in result[:3]] == ["D", "C", "A"]
+    assert [record["sku"] for record in result] == ["D", "C", "A", "B"]
+
+
+def test_empty_ordering_and_data_are_unchanged():
+    assert data_sortby(ROWS, None) is ROWS
+    assert data_sortby([], "-revenue") == []
+    assert ids(ReportResult.from_records(ROWS).order_by("")) == [1, 2, 3, 4, 5]
+    assert ReportResult(pd.DataFrame()).order_by("revenue").records() == []
+
+
+@pytest.mark.parametrize("ordering", ["unknown", "-unknown", "name,-unknown"])
+def test_invalid_key_raises_validation_error(ordering):
+    with pytest.raises(ValidationError, match="unknown is an invalid key"):
+        data_sortby(ROWS, ordering)
+    with pytest.raises(ValidationError):
+        ReportResult(pd.DataFrame.from_records(ROWS)).order_by(ordering)
+
+
+def test_matches_legacy_sort_on_random_data():
+    rng = random.Random(0)
+    for _ in range(200):
+        rows = [
+            {
+                "id": index,
+                "group": rng.choice(["a", "b", "c", None]),
+                "quantity": rng.choice([1, 2, 3, None]),
+                "revenue": rng.randint(0, 5),
+            }
+            for index in range(rng.randint(1, 30))
+        ]
+        keys = rng.sample(["group", "quantity", "revenue"], rng.randint(1, 3))
+        ordering = ",".join(key if rng.random() < 0.5 else f"-{key}" for key in keys)
+
+        assert ids(data_sortby(rows, ordering)) == ids(legacy_sortby(rows, ordering)), ordering
@@ -76,6 +76,7 @@ class ActivityLogMixin:
             # else:
             #     objs = [self.instance]
 
+            logs = []
             for obj in objs:
                 message = create_message(action_type, model.__name__, obj)
 
@@ -91,7 +92,9 @@ class ActivityLogMixin:
                     pass
                 data["message"] = message
 
-                UserActionLog.objects.create(**data)  # send memphis here
+                logs.append(UserActionLog(**data))
+            # Ghi log của nhiều object (API ghi hàng loạt) trong một truy vấn
+            UserActionLog.objects.bulk_create(logs)  # send memphis here
 
     def finalize_response(self, request, *args, **kwargs):
         response = super().finalize_response(request, *args, **kwargs)
@@ -94,9 +94,8 @@ class ProfileAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        # Sửa lỗi: Lấy lại thông tin user từ database để đảm bảo có đủ dữ liệu
-        user_from_db = User.objects.get(pk=request.user.pk)
-        return Response(serializers.UserReadOneSerializer(user_from_db).data, status=status.HTTP_200_OK)
+        # request.user đã có đủ role / department từ CachedJWTAuthentication, không cần truy vấn lại
+        return Response(serializers.UserReadOneSerializer(request.user).data, status=status.HTTP_200_OK)
 
 
 class UserRoleViewSet(CustomModelViewSet):
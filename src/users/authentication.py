@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import Department
+from users.models import Role
+from users.models import User
+
+USER_CACHE_KEY = "users:auth:user:{}"
+ROLE_CACHE_KEY = "users:auth:role:{}"
+DEPARTMENT_CACHE_KEY = "users:auth:department:{}"
+AUTH_USER_CACHE_TIMEOUT = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60 * 5)
+
+# Không cache mật khẩu, trường này được để deferred và chỉ load khi thực sự cần
+USER_EXCLUDED_FIELDS = ("password",)
+
+
+def _serialize(instance, exclude=()):
+    return {field.attname: field.value_from_object(instance) for field in instance._meta.concrete_fields if field.attname not in exclude}
+
+
+def _build(model, data):
+    """Dựng lại instance từ dữ liệu cache mà không truy vấn DB (các field thiếu sẽ là deferred)"""
+    return model.from_db(DEFAULT_DB_ALIAS, list(data.keys()), list(data.values()))
+
+
+def invalidate_user_cache(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def invalidate_role_cache(role_id):
+    cache.delete(ROLE_CACHE_KEY.format(role_id))
+
+
+def invalidate_department_cache(department_id):
+    cache.delete(DEPARTMENT_CACHE_KEY.format(department_id))
+
+
+def _get_related(model, cache_key, pk):
+    if pk is None:
+        return None
+    data = cache.get(cache_key)
+    if data is None:
+        instance = model.objects.filter(pk=pk).first()
+        if instance is None:
+            return None
+        cache.set(cache_key, _serialize(instance), AUTH_USER_CACHE_TIMEOUT)
+        return instance
+    return _build(model, data)
+
+
+def get_cached_user(user_id):
+    """
+    Lấy user kèm role và department từ cache, chỉ truy vấn DB khi cache miss.
+    Trả về `None` nếu user không tồn tại.
+    """
+    user_key = USER_CACHE_KEY.format(user_id)
+    data = cache.get(user_key)
+    if data is None:
+        user = User.objects.select_related("role", "department").filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(user_key, _serialize(user, exclude=USER_EXCLUDED_FIELDS), AUTH_USER_CACHE_TIMEOUT)
+        if user.role_id:
+            cache.set(ROLE_CACHE_KEY.format(user.role_id), _serialize(user.role), AUTH_USER_CACHE_TIMEOUT)
+        if user.department_id:
+            cache.set(
+                DEPARTMENT_CACHE_KEY.format(user.department_id),
+                _serialize(user.department),
+                AUTH_USER_CACHE_TIMEOUT,
+            )
+        return user
+
+    user = _build(User, data)
+    user.role = _get_related(Role, ROLE_CACHE_KEY.format(user.role_id), user.role_id)
+    user.department = _get_related(Department, DEPARTMENT_CACHE_KEY.format(user.department_id), user.department_id)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication không truy vấn bảng user ở mỗi request: user (kèm role, department)
+    được dựng lại từ cache TTL ngắn, cache bị xoá khi User / Role / Department thay đổi.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Cần so khớp hash mật khẩu nên không dùng được dữ liệu cache
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -6,6 +6,7 @@ from django_filters.filterset import remote_queryset
 from users.models import ACTION_TYPES
 from users.models import User
 from users.models import UserActionLog
+from utils.filters import LocalDateRangeFilter
 
 
 class UserFilter(django_filters.FilterSet):
@@ -55,8 +56,8 @@ class UserActionLogFilter(django_filters.FilterSet):
         ("EXPORT_FILE", "Xuất file"),
         ("IMPORT_FILE", "Nhập file"),
     ]
-    action_time_from = django_filters.DateFilter(field_name="action_time__date", lookup_expr="gte")
-    action_time_to = django_filters.DateFilter(field_name="action_time__date", lookup_expr="lte")
+    action_time_from = LocalDateRangeFilter(field_name="action_time", lookup_expr="gte")
+    action_time_to = LocalDateRangeFilter(field_name="action_time", lookup_expr="lte")
     action_name = django_filters.MultipleChoiceFilter(field_name="action_name", choices=ACTION_NAME_CHOICES)
     action_type = django_filters.MultipleChoiceFilter(field_name="action_type", choices=ACTION_TYPES)
     instance_name = django_filters.CharFilter(method="filter_instance_name")
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('users', '0002_role_permissions_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='useractionlog',
+            index=models.Index(fields=['action_time'], name='user_action_log_time'),
+        ),
+    ]
@@ -7,10 +7,14 @@ from django.contrib.auth.models import UserManager
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import F
+from django.utils.functional import cached_property
 from model_utils.models import TimeStampedModel
 from model_utils.models import UUIDModel
 from simple_history.models import HistoricalRecords
 
+from users.permissions import get_user_permissions
+
 
 class Department(UUIDModel):
     name = models.CharField(max_length=255, unique=True)
@@ -24,19 +28,69 @@ class Department(UUIDModel):
         db_table = "tbl_User_Department"
 
 
+class RoleQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        `update()` (và `bulk_update()`, được Django thực hiện bằng `update()`) không gọi `save()` và không gửi signal:
+        tăng version quyền trong cùng câu UPDATE và xoá cache auth của các role bị cập nhật
+        """
+        # Tránh import vòng: users.authentication import các model của module này
+        from users.authentication import invalidate_role_cache
+        from users.permissions import clear_role_permissions
+
+        role_ids = list(self.values_list("pk", flat=True))
+        kwargs.setdefault("permissions_version", F("permissions_version") + 1)
+        rows = super().update(**kwargs)
+        for role_id in role_ids:
+            invalidate_role_cache(role_id)
+            clear_role_permissions(role_id)
+        return rows
+
+
 class Role(UUIDModel):
     name = models.CharField(max_length=255, unique=True)
     data = models.JSONField(max_length=255)
     default_router = models.CharField(max_length=255, null=True)
+    permissions_version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = RoleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Tăng version để các cache quyền cũ tự hết hiệu lực. Khi cập nhật, tăng bằng F() trong câu UPDATE
+        # để hai lần lưu đồng thời luôn cho hai version khác nhau
+        adding = self._state.adding
+        if adding:
+            self.permissions_version = (self.permissions_version or 0) + 1
+        else:
+            self.permissions_version = F("permissions_version") + 1
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "permissions_version"}
+        super().save(*args, **kwargs)
+        if not adding:
+            self.refresh_from_db(fields=["permissions_version"])
+
     class Meta:
         db_table = "tbl_User_Role"
 
 
-class CustomUserManager(UserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """Xoá cache auth của các user bị cập nhật (đổi role, khóa tài khoản...) vì `update()` / `bulk_update()` không gửi signal"""
+        # Tránh import vòng: users.authentication import các model của module này
+        from users.authentication import invalidate_user_cache
+
+        user_ids = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+        for user_id in user_ids:
+            invalidate_user_cache(user_id)
+        return rows
+
+
+class CustomUserManager(UserManager.from_queryset(UserQuerySet)):
     def _create_user(self, email, password, name=None, **extra_fields):
         if not email:
             raise ValueError("The given username must be set")
@@ -95,6 +149,11 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampedModel):
     def __str__(self):
         return self.name
 
+    @cached_property
+    def custom_permissions(self) -> frozenset:
+        """Tập codename quyền đã biên dịch từ role, dùng cho `has_custom_permission`"""
+        return get_user_permissions(self)
+
     class Meta:
         ordering = ["-created"]
         db_table = "tbl_User"
@@ -132,6 +191,10 @@ class UserActionLog(models.Model):
     class Meta:
         ordering = ["-action_time"]
         db_table = "tbl_User_Action_Log"
+        # Lọc theo khoảng ngày (LocalDateRangeFilter) là range scan trên các cột timestamptz
+        indexes = [
+            models.Index(fields=["action_time"], name="user_action_log_time"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.action_type} by {self.user} on {self.action_time}"
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+
+ROLE_PERMISSIONS_CACHE_KEY = "users:role_permissions:{role_id}:{version}"
+ROLE_PERMISSIONS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Cache trong tiến trình: {role_id: (version, frozenset codename)}
+_role_permissions: dict[str, tuple[int, frozenset]] = {}
+
+
+def compile_role_permissions(role_data) -> frozenset:
+    """Gom toàn bộ codename trong `Role.data` thành một frozenset"""
+    codenames = set()
+    if isinstance(role_data, dict):
+        for perms in role_data.values():
+            if isinstance(perms, dict):
+                codenames.update(perms.keys())
+    return frozenset(codenames)
+
+
+def get_role_permissions(role_id, version, role_data=None) -> frozenset:
+    """
+    Lấy tập quyền đã biên dịch của role theo thứ tự: cache tiến trình -> redis -> `role_data`.
+    `role_data` có thể là một callable để chỉ đọc dữ liệu role khi cả hai cache đều miss.
+    """
+    if role_id is None:
+        return frozenset()
+    role_id = str(role_id)
+    version = version or 0
+
+    cached = _role_permissions.get(role_id)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    cache_key = ROLE_PERMISSIONS_CACHE_KEY.format(role_id=role_id, version=version)
+    codenames = cache.get(cache_key)
+    if codenames is None:
+        if callable(role_data):
+            role_data = role_data()
+        codenames = compile_role_permissions(role_data)
+        cache.set(cache_key, codenames, ROLE_PERMISSIONS_CACHE_TIMEOUT)
+
+    _role_permissions[role_id] = (version, codenames)
+    return codenames
+
+
+def get_user_permissions(user) -> frozenset:
+    role = getattr(user, "role", None)
+    if role is None:
+        return frozenset()
+    return get_role_permissions(role.id, role.permissions_version, lambda: role.data)
+
+
+def clear_role_permissions(role_id):
+    _role_permissions.pop(str(role_id), None)
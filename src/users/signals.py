@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from users.authentication import invalidate_department_cache
+from users.authentication import invalidate_role_cache
+from users.authentication import invalidate_user_cache
+from users.models import Department
+from users.models import Role
+from users.models import User
+from users.permissions import clear_role_permissions
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def clear_user_auth_cache(sender, instance, **kwargs):
+    invalidate_user_cache(instance.pk)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def clear_role_auth_cache(sender, instance, **kwargs):
+    invalidate_role_cache(instance.pk)
+    clear_role_permissions(instance.pk)
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def clear_department_auth_cache(sender, instance, **kwargs):
+    invalidate_department_cache(instance.pk)
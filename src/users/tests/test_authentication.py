@@ -0,0 +1,87 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.authentication import get_cached_user
+from users.models import Role
+from users.models import User
+from users.utils import has_custom_permission
+
+pytestmark = pytest.mark.django_db
+
+VIEW_IMAGE = "products.view_variant_image"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def roles():
+    return [Role.objects.create(name=f"Role {index}", data={"products": {VIEW_IMAGE: True}}) for index in range(2)]
+
+
+@pytest.fixture
+def role_user(user, roles):
+    user.role = roles[0]
+    user.save()
+    return user
+
+
+def test_cached_user_is_served_without_queries(role_user):
+    get_cached_user(role_user.pk)
+
+    with CaptureQueriesContext(connection) as queries:
+        cached = get_cached_user(role_user.pk)
+
+    assert len(queries) == 0
+    assert cached.role_id == role_user.role_id
+    assert has_custom_permission(cached, VIEW_IMAGE)
+
+
+def test_role_queryset_update_bumps_version_and_invalidates(role_user, roles):
+    version = roles[0].permissions_version
+    get_cached_user(role_user.pk)
+
+    Role.objects.filter(pk=roles[0].pk).update(data={"products": {}})
+
+    assert Role.objects.get(pk=roles[0].pk).permissions_version == version + 1
+    assert not has_custom_permission(get_cached_user(role_user.pk), VIEW_IMAGE)
+
+
+def test_role_bulk_update_bumps_version_and_invalidates(role_user, roles):
+    versions = [role.permissions_version for role in roles]
+    get_cached_user(role_user.pk)
+    for role in roles:
+        role.data = {"products": {}}
+
+    Role.objects.bulk_update(roles, ["data"])
+
+    assert [role.permissions_version for role in Role.objects.order_by("name")] == [version + 1 for version in versions]
+    assert not has_custom_permission(get_cached_user(role_user.pk), VIEW_IMAGE)
+
+
+def test_user_queryset_update_invalidates(role_user, roles):
+    roles[1].data = {"orders": {"orders.view": True}}
+    roles[1].save()
+    get_cached_user(role_user.pk)
+
+    User.objects.filter(pk=role_user.pk).update(role=roles[1], is_active=False)
+
+    cached = get_cached_user(role_user.pk)
+    assert cached.role_id == roles[1].pk
+    assert cached.is_active is False
+    assert has_custom_permission(cached, "orders.view")
+
+
+def test_user_bulk_update_invalidates(role_user, roles):
+    get_cached_user(role_user.pk)
+    role_user.role = roles[1]
+
+    User.objects.bulk_update([role_user], ["role"])
+
+    assert get_cached_user(role_user.pk).role_id == roles[1].pk
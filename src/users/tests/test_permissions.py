@@ -0,0 +1,52 @@
+import pytest
+
+from users.models import Role
+from users.models import User
+from users.permissions import get_user_permissions
+from users.utils import has_custom_permission
+
+pytestmark = pytest.mark.django_db
+
+VIEW_IMAGE = "products.view_variant_image"
+
+
+@pytest.fixture
+def role():
+    return Role.objects.create(name="Sale", data={"products": {VIEW_IMAGE: True}})
+
+
+def test_role_edit_invalidates_cached_permissions(user, role):
+    user.role = role
+    user.save()
+    assert has_custom_permission(User.objects.select_related("role").get(pk=user.pk), VIEW_IMAGE)
+
+    role.data = {"products": {}}
+    role.save()
+
+    # Cache tiến trình / redis vẫn giữ tập quyền của version cũ, user đọc lại từ DB dùng version mới
+    assert not has_custom_permission(User.objects.select_related("role").get(pk=user.pk), VIEW_IMAGE)
+
+
+def test_concurrent_role_saves_get_distinct_versions(role):
+    first, second = Role.objects.get(pk=role.pk), Role.objects.get(pk=role.pk)
+
+    first.save()
+    second.save()
+
+    assert (first.permissions_version, second.permissions_version) == (role.permissions_version + 1, role.permissions_version + 2)
+    assert Role.objects.get(pk=role.pk).permissions_version == second.permissions_version
+
+
+def test_permissions_built_between_saves_are_not_reused(role):
+    stale = Role.objects.get(pk=role.pk)
+    role.data = {"products": {}}
+    role.save()
+    # Tập quyền được cache theo version sau lần lưu thứ nhất
+    assert get_user_permissions(User(role=role)) == frozenset()
+
+    # Lần lưu thứ hai từ một instance đọc trước đó không được ghi lại cùng version
+    stale.data = {"products": {"orders.view": True}}
+    stale.save()
+
+    assert stale.permissions_version == role.permissions_version + 1
+    assert get_user_permissions(User(role=Role.objects.get(pk=role.pk))) == frozenset({"orders.view"})
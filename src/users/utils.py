@@ -147,7 +147,7 @@ def get_action_name(app_label):
 # =================================================================
 def has_custom_permission(user, perm_codename):
     """
-    Kiểm tra quyền của người dùng dựa trên trường JSON `data` của Role.
+    Kiểm tra quyền của người dùng dựa trên tập codename đã biên dịch từ `Role.data`.
     """
     if not user.is_authenticated:
         return False
@@ -155,23 +155,8 @@ def has_custom_permission(user, perm_codename):
     if user.is_superuser:
         return True
 
-    if not hasattr(user, 'role') or user.role is None or not isinstance(user.role.data, dict):
+    permissions = getattr(user, "custom_permissions", None)
+    if permissions is None:
         return False
 
-    role_data = user.role.data
-    
-    # Tách codename thành app_label và action, vd: "products.view_variant_image"
-    # perm_parts = perm_codename.split('.')
-    # if len(perm_parts) != 2:
-    #     return False
-    # app_label, action = perm_parts
-
-    # if app_label in role_data and isinstance(role_data[app_label], dict):
-    #     if action in role_data[app_label]:
-    #         return True
-
-    for group, perms in role_data.items():
-      if isinstance(perms, dict) and perm_codename in perms:
-        return True
-
-    return False
\ No newline at end of file
+    return perm_codename in permissions
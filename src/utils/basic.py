@@ -3,7 +3,8 @@ from urllib.parse import parse_qs
 from urllib.parse import urlsplit
 
 import numpy as np
-from rest_framework.exceptions import ValidationError
+
+from utils.report_result import ReportResult
 
 PHONE_REGEX = r"(?<!\d)(0|84|\+84)([1-9][0-9])([0-9]{7})(?!\d)"
 
@@ -73,43 +74,11 @@ def validate_phone(phone: str) -> bool:
     return False
 
 def data_multi_sortby(data_result: list[dict], sortby: list[str]):
+    return data_sortby(data_result, sortby)
+
+
+def data_sortby(data_result: list[dict], sortby: str | list[str]):
+    """Sắp xếp danh sách bản ghi theo `sortby` (`"a,-b"`), xem `ReportResult.order_by`"""
     if not sortby or len(data_result) == 0:
         return data_result
-    
-    sort_keys = [(key[1:], True) if key.startswith('-') else (key, False) for key in sortby]
-
-    for sort_key, _ in sort_keys:
-        if sort_key not in data_result[0]:
-            raise ValidationError(f"{sort_key} is an invalid key")
-    
-    # Separate data with null values for sorting later
-    null_data = []
-    data = []
-    for item in data_result:
-        if any(item[key] is None for key, _ in sort_keys):
-            null_data.append(item)
-        else:
-            data.append(item)
-
-    # Sort data based on multiple keys
-    for sort_key, des in reversed(sort_keys):
-        data = sorted(data, key=lambda x: x[sort_key], reverse=des)
-    
-    result = data + null_data if sort_keys[-1][1] else null_data + data
-    
-    return result
-
-
-def data_sortby(data_result: list[dict], sortby: str):
-    if sortby is None or len(data_result) == 0:
-        return data_result
-    if len(sortby.split(",")) > 1:
-        return data_multi_sortby(data_result, sortby.split(","))
-    sort_key, des = (sortby, False) if sortby[0] != "-" else (sortby[1:], True)
-    if sort_key not in data_result[0]:
-        raise ValidationError(f"{sort_key} is invalid key")
-    null_data = [x for x in data_result if x[sort_key] is None]
-    data = [x for x in data_result if x[sort_key] is not None]
-    sorted_data = sorted(data, key=lambda x: x[sort_key], reverse=des)
-    result = sorted_data + null_data if des else null_data + sorted_data
-    return result
+    return ReportResult.from_records(data_result).order_by(sortby).records()
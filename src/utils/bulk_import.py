@@ -0,0 +1,134 @@
+import csv
+import io
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from dataclasses import field
+from itertools import islice
+
+from django.db import transaction
+from openpyxl import load_workbook
+
+from utils.export import XlsxStreamWriter
+
+logger = logging.getLogger(__name__)
+
+# File lỗi nhỏ được giữ trong RAM, lớn hơn sẽ được ghi ra đĩa
+ERROR_FILE_MAX_MEMORY = 10 * 1024 * 1024
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _normalize_header(header):
+    return str(header or "").strip().lstrip("*").strip().lower()
+
+
+def read_rows(file, columns: dict = None):
+    """
+    Đọc lần lượt từng dòng của file CSV / XLSX thành dict mà không load toàn bộ file.
+    `columns` ({key: header}) cho phép file dùng header hiển thị (vd: "*SKU biến thể") thay cho key.
+    """
+    header_map = {}
+    for key, header in (columns or {}).items():
+        header_map[_normalize_header(key)] = key
+        header_map[_normalize_header(header)] = key
+
+    name = getattr(file, "name", "") or ""
+    if os.path.splitext(name)[1].lower() == ".csv":
+        reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    else:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        reader = workbook.active.iter_rows(values_only=True)
+
+    keys = None
+    for values in reader:
+        if keys is None:
+            keys = [header_map.get(_normalize_header(header), header) for header in values]
+            continue
+        if not any(value not in (None, "") for value in values):
+            continue
+        yield {key: value for key, value in zip(keys, values) if key and value not in (None, "")}
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    error_count: int = 0
+    # Chỉ giữ id của các object đã ghi (không giữ instance của mọi chunk)
+    ids: list = field(default_factory=list)
+    error_file: object = None
+
+    @property
+    def success(self) -> bool:
+        return self.error_count == 0
+
+
+class BulkImporter:
+    """
+    Engine import hàng loạt theo từng chunk cố định, chạy trong một transaction (lỗi ở bất kỳ dòng nào
+    sẽ rollback toàn bộ như trước đây). Mỗi chunk chỉ truy vấn các khoá có trong chunk bằng `IN`,
+    mọi dòng được ghi lần lượt vào file lỗi xlsx (constant_memory) kèm cột lỗi.
+
+    Lớp con định nghĩa `columns` ({key: header trong file lỗi}) và `process_chunk`.
+    """
+
+    chunk_size = 1000
+    columns: dict = {}
+    error_column = ("errors", "Lỗi")
+    error_sheet_name = "Lỗi"
+
+    def __init__(self, user=None, chunk_size=None):
+        self.user = user
+        self.chunk_size = chunk_size or self.chunk_size
+
+    def process_chunk(self, rows: list[dict], write: bool) -> tuple[list, list]:
+        """
+        Validate (và ghi nếu `write`) một chunk.
+        Trả về (danh sách lỗi theo từng dòng - None nếu hợp lệ, danh sách object đã ghi).
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def format_errors(errors) -> str:
+        if not errors:
+            return ""
+        if isinstance(errors, dict):
+            return ", ".join(f"{key}: {msg[0] if isinstance(msg, list) else msg}" for key, msg in errors.items())
+        return str(errors)
+
+    def run(self, rows) -> ImportResult:
+        result = ImportResult()
+        error_file = tempfile.SpooledTemporaryFile(max_size=ERROR_FILE_MAX_MEMORY)
+        writer = XlsxStreamWriter(
+            error_file, [*self.columns.items(), self.error_column], sheet_name=self.error_sheet_name
+        )
+
+        with transaction.atomic():
+            for chunk in chunked(rows, self.chunk_size):
+                # Đã có lỗi thì toàn bộ sẽ bị rollback: chỉ validate các chunk còn lại để báo lỗi
+                errors, objects = self.process_chunk(chunk, write=result.success)
+                for row, row_errors in zip(chunk, errors):
+                    writer.write_row({**row, self.error_column[0]: self.format_errors(row_errors)})
+                    if row_errors:
+                        result.error_count += 1
+                if result.success:
+                    result.ids.extend(obj.pk for obj in objects)
+                result.total += len(chunk)
+                logger.info("%s: processed %s rows, %s errors", type(self).__name__, result.total, result.error_count)
+
+            if not result.success:
+                transaction.set_rollback(True)
+
+        writer.close()
+        if result.success:
+            error_file.close()
+        else:
+            error_file.seek(0)
+            result.error_file = error_file
+            result.ids = []
+        return result
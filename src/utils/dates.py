@@ -0,0 +1,25 @@
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+def local_day_start(day: date) -> datetime:
+    """Thời điểm 00:00 của ngày `day` theo TIME_ZONE (aware), dùng làm cận cho cột timestamptz"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def local_day_end(day: date) -> datetime:
+    """Cận trên (không bao gồm) của ngày `day`: 00:00 ngày hôm sau"""
+    return local_day_start(day + timedelta(days=1))
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
@@ -0,0 +1,171 @@
+import csv
+import io
+import tempfile
+from itertools import chain
+from itertools import islice
+
+import xlsxwriter
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+EXPORT_FORMATS = ("xlsx", "csv")
+
+COLUMN_WIDTH_MIN = 8
+COLUMN_WIDTH_MAX = 60
+# Kích thước mỗi block gửi về client
+STREAM_BLOCK_SIZE = 64 * 1024
+# File xlsx nhỏ được giữ trong RAM, lớn hơn sẽ được ghi ra đĩa
+XLSX_MAX_MEMORY = 10 * 1024 * 1024
+
+
+def format_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(str(item) for item in value)
+    if isinstance(value, (dict, bool)) or not isinstance(value, (int, float, str)):
+        return str(value)
+    return value
+
+
+class XlsxStreamWriter:
+    """
+    Ghi file xlsx theo từng dòng bằng XlsxWriter `constant_memory`: bộ nhớ không tăng theo số dòng.
+    Độ rộng cột được tính từ `sample_size` dòng đầu thay vì duyệt lại toàn bộ ô.
+
+    `columns` là list (key, header); `output` là đường dẫn hoặc file object có thể seek.
+    """
+
+    def __init__(self, output, columns, sheet_name="Sheet1", sample_size=200):
+        self.columns = list(columns)
+        self.sample_size = sample_size
+        self.workbook = xlsxwriter.Workbook(
+            output, {"constant_memory": True, "strings_to_urls": False, "nan_inf_to_errors": True}
+        )
+        self.worksheet = self.workbook.add_worksheet(sheet_name[:31])
+        self.header_format = self.workbook.add_format({"bold": True, "align": "center"})
+        self._samples = []
+        self._row = 1
+        self.rows_written = 0
+
+    def write_row(self, row: dict):
+        values = [format_cell(row.get(key)) for key, _ in self.columns]
+        if self._samples is not None:
+            self._samples.append(values)
+            if len(self._samples) >= self.sample_size:
+                self._flush_samples()
+        else:
+            self._write(values)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def _write(self, values):
+        self.worksheet.write_row(self._row, 0, values)
+        self._row += 1
+        self.rows_written += 1
+
+    def _flush_samples(self):
+        # constant_memory chỉ cho phép ghi tuần tự theo dòng nên header + độ rộng cột được ghi trước các dòng mẫu
+        for index, (_, header) in enumerate(self.columns):
+            lengths = [len(str(header))] + [len(str(values[index])) for values in self._samples]
+            width = min(max(max(lengths) + 2, COLUMN_WIDTH_MIN), COLUMN_WIDTH_MAX)
+            self.worksheet.set_column(index, index, width)
+        self.worksheet.write_row(0, 0, [header for _, header in self.columns], self.header_format)
+        samples, self._samples = self._samples, None
+        for values in samples:
+            self._write(values)
+
+    def close(self):
+        if self._samples is not None:
+            self._flush_samples()
+        self.workbook.close()
+
+
+def resolve_columns(rows, columns=None):
+    """
+    Trả về (columns, rows). Không truyền `columns` thì lấy các key của dòng đầu tiên làm cột
+    (dòng đầu được đọc trước rồi ghép lại vào iterator).
+    """
+    rows = iter(rows)
+    if columns:
+        return [column if isinstance(column, tuple) else (column, column) for column in columns], rows
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    return [(key, key) for key in first], chain([first], rows)
+
+
+def iter_csv(rows, columns):
+    """Sinh nội dung CSV theo từng block bytes (có BOM để Excel đọc đúng UTF-8)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow([header for _, header in columns])
+    for row in rows:
+        writer.writerow([format_cell(row.get(key)) for key, _ in columns])
+        if buffer.tell() >= STREAM_BLOCK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def iter_xlsx(rows, columns, sheet_name="Sheet1"):
+    """
+    Ghi xlsx ra file tạm (constant_memory) rồi sinh nội dung theo từng block.
+    Định dạng zip của xlsx cần ghi xong toàn bộ trước khi gửi byte đầu tiên.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_MAX_MEMORY) as output:
+        writer = XlsxStreamWriter(output, columns, sheet_name=sheet_name)
+        writer.write_rows(rows)
+        writer.close()
+        output.seek(0)
+        while block := output.read(STREAM_BLOCK_SIZE):
+            yield block
+
+
+def iter_queryset(queryset, chunk_size=2000):
+    """Duyệt queryset bằng server-side cursor, prefetch_related được áp dụng theo từng chunk"""
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def iter_queryset_chunks(queryset, chunk_size=2000):
+    """
+    Chia queryset thành các queryset con theo từng nhóm pk (giữ nguyên thứ tự), dùng cho các báo cáo
+    tính trên DataFrame để mỗi lần chỉ xử lý `chunk_size` bản ghi.
+    """
+    pks = queryset.values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(pks, chunk_size)):
+        yield queryset.filter(pk__in=chunk)
+
+
+async def _aiter(iterator):
+    # Dưới ASGI, iterator đồng bộ sẽ bị Django đọc hết vào bộ nhớ: lấy từng block qua sync_to_async
+    iterator = iter(iterator)
+    sentinel = object()
+    next_block = sync_to_async(next, thread_sensitive=True)
+    while (block := await next_block(iterator, sentinel)) is not sentinel:
+        yield block
+
+
+def export_response(request, rows, file_name, file_format="xlsx", columns=None, sheet_name="Sheet1"):
+    """
+    StreamingHttpResponse xuất `rows` (iterable các dict) ra xlsx / csv với bộ nhớ không đổi theo số dòng.
+    `columns` là list key hoặc (key, header); mặc định lấy theo dòng đầu tiên.
+    """
+    columns, rows = resolve_columns(rows, columns)
+    if file_format == "csv":
+        content, content_type = iter_csv(rows, columns), CSV_CONTENT_TYPE
+    else:
+        content, content_type = iter_xlsx(rows, columns, sheet_name), XLSX_CONTENT_TYPE
+
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        content = _aiter(content)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{file_name}.{file_format}"'
+    return response
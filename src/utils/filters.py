@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import django_filters.rest_framework as django_filters
+from django import forms
+from django.utils import timezone
+
+from utils.dates import local_day_end
+from utils.dates import local_day_start
+
+
+class LocalDateField(forms.DateField):
+    """Nhận ngày (YYYY-MM-DD) hoặc thời điểm; thời điểm được quy về ngày theo TIME_ZONE"""
+
+    def to_python(self, value):
+        if isinstance(value, datetime):
+            return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+        try:
+            return super().to_python(value)
+        except forms.ValidationError:
+            value = forms.DateTimeField().to_python(value)
+            return self.to_python(value) if value else None
+
+
+class LocalDateRangeFilter(django_filters.DateFilter):
+    """
+    Lọc cột timestamptz theo ngày địa phương (Asia/Ho_Chi_Minh) mà không ép kiểu cột (`created__date`):
+    ngày được đổi thành khoảng nửa mở [00:00 ngày đó, 00:00 ngày hôm sau) để Postgres dùng được index B-tree.
+
+        created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+        created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    """
+
+    field_class = LocalDateField
+
+    def filter(self, qs, value):
+        if value in ([], (), {}, "", None):
+            return qs
+        if self.distinct:
+            qs = qs.distinct()
+
+        start, end = local_day_start(value), local_day_end(value)
+        lookups = {
+            "gte": {"gte": start},
+            "gt": {"gte": end},
+            "lte": {"lt": end},
+            "lt": {"lt": start},
+            "exact": {"gte": start, "lt": end},
+        }[self.lookup_expr]
+        return self.get_method(qs)(**{f"{self.field_name}__{lookup}": bound for lookup, bound in lookups.items()})
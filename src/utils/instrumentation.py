@@ -0,0 +1,118 @@
+"""
+Đo số truy vấn / thời gian SQL của một đoạn code và kiểm tra "query budget" của từng endpoint.
+
+Budget được khai báo trên view bằng `query_budget` (int cho mọi action hoặc dict {action: int}),
+không khai báo thì dùng `QUERY_BUDGET_DEFAULT`. Middleware `QueryInstrumentationMiddleware` cảnh báo
+khi request vượt budget, test dùng `assert_endpoint_budget` để CI báo lỗi khi endpoint tăng số truy vấn.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+
+from django.conf import settings
+from django.db import connections
+from django.urls import resolve
+
+# Gom các truy vấn chỉ khác tham số (dấu hiệu N+1)
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+@dataclass
+class QueryRecord:
+    alias: str
+    sql: str
+    duration: float
+
+
+@dataclass
+class QueryRecorder:
+    """Ghi lại các truy vấn chạy trên mọi database alias trong khối `with recorder:`"""
+
+    max_records: int = 500
+    count: int = 0
+    duration: float = 0
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._stack = None
+
+    def _wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = time.perf_counter() - start
+                self.count += 1
+                self.duration += duration
+                if len(self.queries) < self.max_records:
+                    self.queries.append(QueryRecord(alias, sql, duration))
+
+        return wrapper
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._wrapper(alias)))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+    def slowest(self, limit=5) -> list[QueryRecord]:
+        return sorted(self.queries, key=lambda query: query.duration, reverse=True)[:limit]
+
+    def repeated(self, min_count=5) -> list[tuple[str, int]]:
+        """Các câu SQL (bỏ tham số) lặp lại từ `min_count` lần"""
+        counter = Counter(SQL_LITERALS.sub("?", query.sql) for query in self.queries)
+        return [(sql, count) for sql, count in counter.most_common() if count >= min_count]
+
+    def summary(self, limit=5) -> str:
+        lines = [f"{self.count} queries, {self.duration * 1000:.1f}ms"]
+        lines += [f"  x{count}: {sql}" for sql, count in self.repeated()[:limit]]
+        lines += [f"  {query.duration * 1000:.1f}ms [{query.alias}]: {query.sql}" for query in self.slowest(limit)]
+        return "\n".join(lines)
+
+
+def endpoint_name(view_class, action: str = None) -> str:
+    return f"{view_class.__module__}.{view_class.__name__}" + (f".{action}" if action else "")
+
+
+def view_action(view_func, method: str):
+    """(class view, action) của view function do DRF / Django tạo ra"""
+    view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    actions = getattr(view_func, "actions", None) or {}
+    return view_class, actions.get(method.lower())
+
+
+def get_query_budget(view_class, action: str = None) -> int | None:
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        budget = budget.get(action)
+    return budget if budget is not None else settings.QUERY_BUDGET_DEFAULT
+
+
+@contextmanager
+def assert_max_queries(budget: int, label: str = ""):
+    """Báo lỗi khi khối lệnh chạy quá `budget` truy vấn (kèm danh sách truy vấn lặp / chậm nhất)"""
+    with QueryRecorder() as recorder:
+        yield recorder
+    if budget is not None and recorder.count > budget:
+        raise AssertionError(f"{label or 'Block'} exceeded query budget {budget}: {recorder.summary()}")
+
+
+def assert_endpoint_budget(client, method: str, path: str, budget: int = None, **kwargs):
+    """
+    Gọi endpoint bằng test client và kiểm tra số truy vấn không vượt budget của view
+    (hoặc `budget` truyền vào). Trả về response.
+    """
+    view_class, action = view_action(resolve(path.split("?")[0]).func, method)
+    if budget is None:
+        budget = get_query_budget(view_class, action)
+    with assert_max_queries(budget, label=f"{method.upper()} {path} ({endpoint_name(view_class, action)})"):
+        return getattr(client, method.lower())(path, **kwargs)
@@ -0,0 +1,190 @@
+"""
+Partition theo tháng (RANGE trên `history_date`) cho các bảng lịch sử của simple_history.
+Chỉ áp dụng cho PostgreSQL, các database khác bỏ qua.
+"""
+import gzip
+import logging
+import re
+import tempfile
+from datetime import date
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import models
+from django.utils import timezone
+
+from utils.dates import add_months
+from utils.dates import local_day_start
+from utils.dates import month_start
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEY = "history_date"
+PARTITIONED_HISTORY_MODELS = (
+    "orders.HistoricalOrders",
+    "orders.HistoricalOrdersPayments",
+    "orders.HistoricalTransportationCare",
+    "warehouses.HistoricalWarehouseInventory",
+    "warehouses.HistoricalWarehouseInventoryAvailable",
+    "customers.HistoricalCustomer",
+)
+PARTITION_MONTHS_AHEAD = 3
+ARCHIVE_SCHEMA = "history_archive"
+ARCHIVE_STORAGE_PATH = "archive/history"
+
+PARTITION_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def partition_month(name: str) -> date | None:
+    match = PARTITION_SUFFIX.search(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _bound(month: date) -> str:
+    # Cận partition là 00:00 đầu tháng theo giờ địa phương để khớp với báo cáo theo ngày / tháng
+    return local_day_start(month).isoformat()
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [f'"{table}"'])
+    row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(cursor, table: str) -> list[str]:
+    cursor.execute(
+        """
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname
+        """,
+        [f'"{table}"'],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def create_month_partition(cursor, table: str, month: date):
+    """
+    Tạo partition cho tháng `month` nếu chưa có.
+    Dữ liệu của tháng đó đang nằm trong partition default (nếu có) được chuyển sang partition mới.
+    """
+    name = partition_name(table, month)
+    if name in list_partitions(cursor, table):
+        return False
+
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    default = default_partition_name(table)
+    has_default = default in list_partitions(cursor, table)
+    if has_default:
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"')
+
+    cursor.execute(f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)', [lower, upper])
+
+    if has_default:
+        condition = f'"{PARTITION_KEY}" >= %s AND "{PARTITION_KEY}" < %s'
+        cursor.execute(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {condition}', [lower, upper])
+        cursor.execute(f'DELETE FROM "{default}" WHERE {condition}', [lower, upper])
+        cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT')
+    return True
+
+
+def ensure_partitions(cursor, table: str, months_ahead: int = PARTITION_MONTHS_AHEAD, start: date = None) -> list[str]:
+    """Đảm bảo có partition từ `start` (mặc định tháng hiện tại) tới `months_ahead` tháng sau"""
+    current = month_start(timezone.localdate())
+    month = month_start(start) if start else current
+    created = []
+    while month <= add_months(current, months_ahead):
+        if create_month_partition(cursor, table, month):
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return created
+
+
+def convert_to_partitioned(schema_editor, model, months_ahead: int = PARTITION_MONTHS_AHEAD):
+    """
+    Chuyển bảng lịch sử thường thành bảng partition theo tháng của `history_date`:
+    đổi tên bảng cũ, tạo bảng partition cùng cấu trúc, chép dữ liệu, tạo lại index / FK rồi xoá bảng cũ.
+    Khoá chính đổi thành (history_id, history_date) vì Postgres yêu cầu khoá unique chứa cột partition.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    table = model._meta.db_table
+    legacy = f"{table}_legacy"
+    pk_column = model._meta.pk.column
+    with schema_editor.connection.cursor() as cursor:
+        if is_partitioned(cursor, table):
+            return
+
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [f'"{legacy}"'],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) ' f'PARTITION BY RANGE ("{PARTITION_KEY}")'
+        )
+        cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("{pk_column}", "{PARTITION_KEY}")')
+
+        cursor.execute(f'SELECT min("{PARTITION_KEY}") FROM "{legacy}"')
+        first_date = cursor.fetchone()[0]
+        start = timezone.localtime(first_date).date() if first_date else None
+        ensure_partitions(cursor, table, months_ahead, start=start)
+        cursor.execute(f'CREATE TABLE "{default_partition_name(table)}" PARTITION OF "{table}" DEFAULT')
+
+        cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+        cursor.execute(f'DROP TABLE "{legacy}"')
+
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+    # Tạo lại index sau khi đã chép dữ liệu (LIKE không kèm INCLUDING INDEXES)
+    for index in history_indexes(model):
+        schema_editor.add_index(model, index)
+
+
+def history_indexes(model) -> list[models.Index]:
+    """
+    Index cần có trên bảng lịch sử đã partition: index của các field `db_index`, `Meta.indexes`
+    do simple_history khai báo (vd: SIMPLE_HISTORY_DATE_INDEX = "composite") và (id, history_date)
+    cho danh sách lịch sử của một bản ghi (WHERE id = ... ORDER BY history_date).
+    """
+    indexes = []
+    for field in model._meta.local_fields:
+        if field.db_index and not field.primary_key and not field.unique:
+            index = models.Index(fields=[field.name])
+            index.set_name_with_model(model)
+            indexes.append(index)
+    indexes.extend(model._meta.indexes)
+    indexes.append(models.Index(fields=["id", PARTITION_KEY], name=f"{model._meta.db_table[:40]}_id_hdate_idx"))
+    return indexes
+
+
+def archive_partition(cursor, table: str, partition: str, export: bool = False) -> str:
+    """
+    Tách partition khỏi bảng lịch sử.
+    `export=True`: ghi dữ liệu ra storage (CSV gzip) rồi xoá partition, ngược lại chuyển sang schema lưu trữ.
+    """
+    cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{partition}"')
+    logger.info("Detached history partition %s from %s", partition, table)
+    if not export:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{ARCHIVE_SCHEMA}"')
+        cursor.execute(f'ALTER TABLE "{partition}" SET SCHEMA "{ARCHIVE_SCHEMA}"')
+        return f"{ARCHIVE_SCHEMA}.{partition}"
+
+    with tempfile.TemporaryFile() as output:
+        with gzip.GzipFile(fileobj=output, mode="wb") as gzip_file:
+            cursor.copy_expert(f'COPY "{partition}" TO STDOUT WITH (FORMAT csv, HEADER)', gzip_file)
+        output.seek(0)
+        path = default_storage.save(f"{ARCHIVE_STORAGE_PATH}/{table}/{partition}.csv.gz", File(output))
+    cursor.execute(f'DROP TABLE "{partition}"')
+    return path
@@ -0,0 +1,105 @@
+"""
+Kết quả báo cáo dùng cho sắp xếp / phân trang mà không dựng toàn bộ danh sách dict.
+
+- `ReportResult`: dữ liệu dạng cột (DataFrame), sắp xếp nhiều khóa bằng pandas, chỉ chuyển các dòng của trang thành dict.
+- `QueryReportResult`: báo cáo lấy từ queryset, sắp xếp / giới hạn số dòng được đẩy xuống SQL.
+
+Cả hai dùng trực tiếp được với paginator của DRF (`count()` + cắt theo slice trả về list dict).
+Giá trị null: tăng dần thì null đứng đầu, giảm dần thì null đứng cuối.
+"""
+from typing import Callable
+
+import pandas as pd
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+
+
+def parse_ordering(ordering) -> (list[tuple[str, bool]]):
+    """`"a,-b"` hoặc `["a", "-b"]` -> [("a", False), ("b", True)] (True: giảm dần)"""
+    if not ordering:
+        return []
+    if isinstance(ordering, str):
+        ordering = ordering.split(",")
+    return [(key[1:], True) if key.startswith("-") else (key, False) for key in ordering]
+
+
+def _frame_records(frame: pd.DataFrame) -> (list[dict]):
+    return frame.to_dict(orient="records")
+
+
+class ReportResult:
+    def __init__(self, frame: pd.DataFrame, to_records: Callable[[pd.DataFrame], list[dict]] = None):
+        self.frame = frame
+        self.to_records = to_records or _frame_records
+
+    @classmethod
+    def from_records(cls, records: list[dict]):
+        """Giữ nguyên các dict ban đầu: frame chỉ dùng để sắp xếp, index của frame là vị trí của bản ghi"""
+        return cls(pd.DataFrame.from_records(records), lambda frame: [records[index] for index in frame.index])
+
+    def order_by(self, ordering):
+        sort_keys = parse_ordering(ordering)
+        if not sort_keys or self.frame.empty:
+            return self
+        columns = [key for key, _ in sort_keys]
+        for key in columns:
+            if key not in self.frame.columns:
+                raise ValidationError(f"{key} is an invalid key")
+
+        # Dòng có null ở một trong các khóa được tách riêng, giữ thứ tự ban đầu
+        is_null = self.frame[columns].isna().any(axis=1)
+        data = self.frame[~is_null].sort_values(columns, ascending=[not des for _, des in sort_keys], kind="stable")
+        null_data = self.frame[is_null]
+        frame = pd.concat([data, null_data]) if sort_keys[-1][1] else pd.concat([null_data, data])
+        return ReportResult(frame, self.to_records)
+
+    def count(self) -> (int):
+        return len(self.frame)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key: slice) -> (list[dict]):
+        return self.to_records(self.frame.iloc[key])
+
+    def __iter__(self):
+        return iter(self.records())
+
+    def records(self) -> (list[dict]):
+        return self.to_records(self.frame)
+
+
+class QueryReportResult:
+    """
+    `queryset`: values queryset, mỗi dòng là một dòng báo cáo. `to_records` dựng các dòng báo cáo
+    từ các dòng của queryset (vd: ghép thêm dữ liệu liên quan chỉ cho các dòng của trang)
+    """
+
+    def __init__(self, queryset, to_records: Callable[[list[dict]], list[dict]] = None):
+        self.queryset = queryset
+        self.to_records = to_records or list
+
+    def order_by(self, ordering):
+        sort_keys = parse_ordering(ordering)
+        if not sort_keys:
+            return self
+        for key, _ in sort_keys:
+            if key not in self.queryset.query.values_select and key not in self.queryset.query.annotations:
+                raise ValidationError(f"{key} is an invalid key")
+        order_by = [F(key).desc(nulls_last=True) if des else F(key).asc(nulls_first=True) for key, des in sort_keys]
+        return QueryReportResult(self.queryset.order_by(*order_by), self.to_records)
+
+    def count(self) -> (int):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key: slice) -> (list[dict]):
+        return self.to_records(list(self.queryset[key]))
+
+    def __iter__(self):
+        return iter(self.records())
+
+    def records(self) -> (list[dict]):
+        return self.to_records(list(self.queryset))
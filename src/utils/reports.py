@@ -1,11 +1,21 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
 from enum import Enum
 
 import pandas as pd
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
 from django.db.models import Q
 
+from utils.dates import local_day_end
+from utils.dates import local_day_start
+from utils.filters import LocalDateField
+
 
 class InType(str, Enum):
     query = 0
@@ -34,10 +44,23 @@ class MetricExprs(str, Enum):
     QUANTILE = "quantile"
 
 
+@dataclass
+class DimensionLookup:
+    """
+    Thuộc tính của dimension được lấy theo khóa sau khi có dữ liệu (một truy vấn cho tất cả khóa),
+    thay vì join trong truy vấn báo cáo. `fields`: {cột báo cáo: trường của `model`}
+    """
+
+    key: str
+    model: type
+    fields: dict
+
+
 @dataclass
 class Dimensions:
     fields: list[str]
     rename: dict = None
+    lookup: DimensionLookup = None
 
 
 @dataclass
@@ -53,6 +76,8 @@ class Filter:
     exprs: str
     _in: InType
     value_types: list[object]
+    # `field` là cột timestamp và giá trị lọc là ngày địa phương: lọc bằng khoảng nửa mở thay vì `field__date`
+    local_date: bool = False
 
 
 class ExprsFilterEnum(str, Enum):
@@ -149,6 +174,30 @@ class ExprsDjangoFilter:
             q_expr = f_expr(field, value) if f_expr else Q()
         return q_expr
 
+    @classmethod
+    def q_local_date(cls, field, expr, value) -> (Q):
+        """
+        Như `q_object` nhưng giá trị là ngày địa phương và `field` là cột timestamp: mỗi ngày được đổi thành
+        khoảng nửa mở [00:00 ngày đó, 00:00 ngày hôm sau) để Postgres dùng được index của cột
+        """
+        cls.validate(field, expr, value)
+        if expr == EFE.IEP:
+            return cls.q_IEP(field, value)
+        try:
+            days = [LocalDateField().clean(str(item)) for item in (value if isinstance(value, list) else [value])]
+        except ValidationError as e:
+            raise ValueError(f"Filters: {field} {expr} {value} - Value must be a date") from e
+        first, last = days[0], days[-1]
+        bounds = {
+            EFE.IS: {"gte": local_day_start(first), "lt": local_day_end(last)},
+            EFE.IWITHIN: {"gte": local_day_end(first), "lt": local_day_start(last)},
+            EFE.IBF: {"lt": local_day_start(first)},
+            EFE.IOOBF: {"lt": local_day_end(first)},
+            EFE.IAT: {"gte": local_day_end(first)},
+            EFE.IOOAF: {"gte": local_day_start(first)},
+        }[EFE(expr)]
+        return Q(**{f"{field}__{lookup}": bound for lookup, bound in bounds.items()})
+
     @classmethod
     def q_EQ(cls, field, value):
         return Q(**{f"{field}": value})
@@ -243,6 +292,7 @@ class PivotReportBase:
         filters=None,
         b_expr_dims: BindingExprEnum = BindingExprEnum.AND,
         b_expr_metrics: BindingExprEnum = BindingExprEnum.AND,
+        evaluate: bool = True,
         *args,
         **kwargs,
     ):
@@ -258,11 +308,19 @@ class PivotReportBase:
         self.queryset = self._queryset(queryset)
         self._excute_filterset()
 
-        self.df: pd.DataFrame = self._data_frame()
+        self.df: pd.DataFrame = None
+        self.pivot_table: pd.DataFrame = None
+        self.result: list[dict] = None
+        # evaluate=False: chỉ chuẩn bị queryset, dữ liệu được lấy sau (vd: `PivotReportCompare` lấy nhiều kỳ song song)
+        if evaluate:
+            self.evaluate()
+
+    def evaluate(self) -> (list[dict]):
+        self.df = self._data_frame()
         self.pivot_table = self._pivot()
         self._excute_df_filterset()
-
         self.result = self._output()
+        return self.result
 
     def _parse_filter(self, filters=None) -> (dict):
         if not filters:
@@ -272,7 +330,9 @@ class PivotReportBase:
             _filter: Filter = self.FILTERS_AVB.get(name)
             if (not _filter) or (expr not in _filter.exprs) or (type(value) not in _filter.value_types):
                 raise ValueError(f"Filters: `['{name}', {expr}, {value}]` invalid")
-            if _filter._in == InType.query:
+            if _filter._in == InType.query and _filter.local_date:
+                self.filterset.add(ExprsDjangoFilter.q_local_date(_filter.field, expr, value), self.b_expr_dims)
+            elif _filter._in == InType.query:
                 self._update_filterset(_filter.field, expr, value)
             else:
                 self._update_df_filterset(_filter.field, expr, value)
@@ -289,9 +349,12 @@ class PivotReportBase:
             self.queryset = self.queryset.filter(self.filterset)
 
     def _excute_df_filterset(self):
+        self._filter_pivot_table(self.pivot_table)
+
+    def _filter_pivot_table(self, pivot_table: pd.DataFrame):
         if self.df_filterset:
             query_expr = f" {self.b_expr_metrics.lower()} ".join(self.df_filterset)
-            self.pivot_table.query(query_expr, inplace=True)
+            pivot_table.query(query_expr, inplace=True)
 
     def _queryset(self, queryset):
         return queryset
@@ -310,6 +373,9 @@ class PivotReportBase:
             dimension_fields.extend(dims.fields)
         return dimension_fields
 
+    def _get_lookup_fields(self) -> (list):
+        return [field for dims in self.dimensions.values() if dims.lookup for field in dims.lookup.fields]
+
     def _get_dimension_names(self) -> (list[str]):
         dimension_names = []
         for v in self.dimensions.values():
@@ -349,6 +415,35 @@ class PivotReportBase:
         fields = dims_fields + fields_metrics
         return pd.DataFrame.from_dict(self.queryset.values(*fields))
 
+    def _fetch_data_frame(self, defer_lookups=False) -> (pd.DataFrame):
+        """
+        Dữ liệu báo cáo bằng một truy vấn. `defer_lookups=True` bỏ các cột lấy bằng `DimensionLookup`
+        (gọi `_resolve_lookups` sau, có thể dùng chung cho nhiều data frame)
+        """
+        deferred = self._get_lookup_fields() if defer_lookups else []
+        dims_fields = [field for field in self._get_dimension_fields() if field not in deferred]
+        fields = dims_fields + self._get_metric_fields(_in=InType.query)
+        return pd.DataFrame.from_records(list(self.queryset.values(*fields)), columns=fields)
+
+    def _resolve_lookups(self, df: pd.DataFrame) -> (pd.DataFrame):
+        """Điền các cột của `DimensionLookup`, mỗi model một truy vấn (vd: người tạo / người xác nhận dùng chung bảng user)"""
+        lookups_by_model = {}
+        for dims in self.dimensions.values():
+            if dims.lookup:
+                lookups_by_model.setdefault(dims.lookup.model, []).append(dims.lookup)
+        for model, lookups in lookups_by_model.items():
+            keys = set()
+            for lookup in lookups:
+                keys.update(df[lookup.key].dropna())
+            attrs = list(dict.fromkeys(attr for lookup in lookups for attr in lookup.fields.values()))
+            rows = pd.DataFrame.from_records(
+                list(model._base_manager.filter(pk__in=keys).values_list("pk", *attrs)) if keys else [], columns=["pk", *attrs]
+            ).set_index("pk")
+            for lookup in lookups:
+                for column, attr in lookup.fields.items():
+                    df[column] = df[lookup.key].map(rows[attr])
+        return df
+
     def _rename_pivot_table(self, pivot_table: pd.DataFrame) -> (pd.DataFrame):
         metrics_name = {value.field: key for key, value in self.metrics.items()}
         dims_name = {}
@@ -365,10 +460,14 @@ class PivotReportBase:
         return pivot_table
 
     def _pivot(self):
-        if self.df.empty:
+        return self._pivot_data_frame(self.df)
+
+    def _pivot_data_frame(self, df: pd.DataFrame, index: list[str] = None) -> (pd.DataFrame):
+        """`index`: các cột gom nhóm thêm ngoài dimensions (vd: kỳ báo cáo khi so sánh)"""
+        if df.empty:
             return pd.DataFrame()
-        pivot_table = self.df.pivot_table(
-            index=self._get_dimension_fields(),
+        pivot_table = df.pivot_table(
+            index=self._get_dimension_fields() + (index or []),
             values=self._get_metric_fields(),
             aggfunc=self._get_metric_exprs(),
             dropna=True,
@@ -404,8 +503,76 @@ class PivotReportBase:
         """
 
 
+_report_executor: ThreadPoolExecutor = None
+_report_executor_lock = threading.Lock()
+
+
+def _get_report_executor() -> (ThreadPoolExecutor):
+    global _report_executor
+    with _report_executor_lock:
+        if _report_executor is None:
+            _report_executor = ThreadPoolExecutor(max_workers=settings.REPORT_QUERY_WORKERS, thread_name_prefix="report-query")
+    return _report_executor
+
+
+class _WorkerConnections:
+    """
+    Các connection database đã mở trong một thread worker. Object nằm trong thread-local của worker
+    nên được giải phóng (và đóng các connection) trên chính thread đó khi thread kết thúc
+    """
+
+    def __init__(self):
+        self.wrappers = {}
+
+    def track(self):
+        for wrapper in connections.all(initialized_only=True):
+            self.wrappers[wrapper.alias] = wrapper
+
+    def close_obsolete(self):
+        # Giống đầu / cuối mỗi request: chỉ đóng connection hỏng hoặc quá CONN_MAX_AGE,
+        # connection còn dùng được giữ lại cho tác vụ sau của thread
+        for wrapper in self.wrappers.values():
+            wrapper.close_if_unusable_or_obsolete()
+
+    def __del__(self):
+        for wrapper in self.wrappers.values():
+            wrapper.close()
+
+
+_worker_state = threading.local()
+
+
+def _run_in_worker(context: contextvars.Context, func):
+    worker_connections = getattr(_worker_state, "connections", None)
+    if worker_connections is None:
+        worker_connections = _worker_state.connections = _WorkerConnections()
+    worker_connections.close_obsolete()
+    try:
+        # Chạy trong context của request (alias database đọc của `core.db_router`)
+        return context.run(func)
+    finally:
+        # Connection là thread-local: chỉ đụng tới connection của chính thread worker này
+        worker_connections.track()
+        worker_connections.close_obsolete()
+
+
+def run_report_queries(funcs: list) -> (list):
+    """
+    Chạy các truy vấn báo cáo song song, mỗi truy vấn trên connection riêng của thread trong pool dùng chung
+    (tối đa `REPORT_QUERY_WORKERS` connection). Kết quả theo thứ tự `funcs`.
+    Chạy tuần tự khi đang trong transaction: connection khác không thấy dữ liệu chưa commit.
+    """
+    in_transaction = any(connections[alias].in_atomic_block for alias in connections)
+    if len(funcs) < 2 or settings.REPORT_QUERY_WORKERS < 2 or in_transaction:
+        return [func() for func in funcs]
+    executor = _get_report_executor()
+    futures = [executor.submit(_run_in_worker, contextvars.copy_context(), func) for func in funcs]
+    return [future.result() for future in futures]
+
+
 class PivotReportCompare:
     CREATED_DATE_F = "created_date"
+    PERIOD_F = "_period"
 
     def __init__(
         self,
@@ -423,41 +590,79 @@ class PivotReportCompare:
         self.dates: dict[datetime:datetime] = self._map_dates()
         self._dates_reverted = self._map_dates_reverted()
 
+    @classmethod
+    def from_querysets(
+        cls,
+        report_class: type[PivotReportBase],
+        first_queryset,
+        second_queryset,
+        first_created_date: list[datetime],
+        second_created_date: list[datetime],
+        **params,
+    ):
+        """Hai kỳ báo cáo chưa lấy dữ liệu, dữ liệu được lấy song song khi gọi `map_compare`"""
+        first_inst = report_class(queryset=first_queryset, evaluate=False, **params)
+        second_inst = report_class(queryset=second_queryset, evaluate=False, **params)
+        return cls(first_created_date, second_created_date, first_inst, second_inst, first_inst._get_dimension_names())
+
     def map_compare(self) -> (list[dict]):
-        first_output = self.first_inst.result
-        second_output = self._process_output_compare_object(self.second_inst.result)
+        first_output, second_output = self._pivot_periods()
+        first_output = first_output.reset_index(drop=True)
+        second_output = second_output.reset_index(drop=True)
+
+        # Khóa của kỳ so sánh quy về ngày tương ứng của kỳ đầu
+        second_keys = second_output[self.dimensions].copy()
+        if self.CREATED_DATE_F in self.dimensions:
+            second_keys[self.CREATED_DATE_F] = second_keys[self.CREATED_DATE_F].map(self._dates_reverted)
+        matches = first_output[self.dimensions].merge(
+            second_keys.rename_axis("_compare_index").reset_index(), how="left", on=self.dimensions, sort=False
+        )["_compare_index"]
+
+        first_records = first_output.to_dict(orient="records")
+        second_records = second_output.to_dict(orient="records")
+        matched = set()
         results = []
-
         # Join các record của table compare
-        for record in first_output:
-            record_date = record.get(self.CREATED_DATE_F)
-            date_map = self.dates.get(record_date)
-            obj_compare = second_output.pop(self._gen_unique_key_w_dim(record, created_date=date_map), {})
-            if not obj_compare:
+        for record, compare_index in zip(first_records, matches):
+            if pd.isna(compare_index):
                 obj_compare = self._get_default_record_values(data=record)
-                obj_compare.update({self.CREATED_DATE_F: date_map})
+                obj_compare.update({self.CREATED_DATE_F: self.dates.get(record.get(self.CREATED_DATE_F))})
+            else:
+                obj_compare = second_records[int(compare_index)]
+                matched.add(int(compare_index))
             results.append({**record, "compare": obj_compare})
         # Thêm các record mới cho trường hợp chỉ có ở table compare
-        for s_record in second_output.values():
-            s_record_date = s_record.get(self.CREATED_DATE_F)
+        for index, s_record in enumerate(second_records):
+            if index in matched:
+                continue
             obj_first = self._get_default_record_values(s_record)
-            obj_first.update({self.CREATED_DATE_F: self._dates_reverted.get(s_record_date)})
+            obj_first.update({self.CREATED_DATE_F: self._dates_reverted.get(s_record.get(self.CREATED_DATE_F))})
             results.append({**obj_first, "compare": s_record})
 
         return results
 
-    def _process_output_compare_object(self, data: dict) -> (dict):
-        output = {self._gen_unique_key_w_dim(re): re for re in data}
-        return output
+    def _pivot_periods(self) -> (tuple[pd.DataFrame, pd.DataFrame]):
+        """
+        Lấy dữ liệu hai kỳ song song, điền các cột lookup dùng chung cho cả hai kỳ
+        và pivot một lần theo dimensions + kỳ
+        """
+        frames = run_report_queries(
+            [lambda: self.first_inst._fetch_data_frame(defer_lookups=True), lambda: self.second_inst._fetch_data_frame(defer_lookups=True)]
+        )
+        df = pd.concat([frame.assign(**{self.PERIOD_F: period}) for period, frame in enumerate(frames)], ignore_index=True)
+        df = self.first_inst._resolve_lookups(df)
+        pivot_table = self.first_inst._pivot_data_frame(df, index=[self.PERIOD_F])
+        if pivot_table.empty:
+            empty = pd.DataFrame(columns=self.dimensions)
+            return empty, empty
+        self.first_inst._filter_pivot_table(pivot_table)
+        pivot_table = pivot_table.reset_index()
+        periods = pivot_table.pop(self.PERIOD_F)
+        return pivot_table[periods == 0], pivot_table[periods == 1]
 
     def _get_default_record_values(self, data: dict) -> (dict):
         return {dim: data.get(dim) for dim in self.dimensions}
 
-    def _gen_unique_key_w_dim(self, _data: dict, *args, **kwargs) -> (str):
-        values = {dim: str(_data.get(dim)) for dim in self.dimensions}
-        values.update(kwargs)
-        return "".join([str(v) for v in values.values()])
-
     def _map_dates(self) -> (dict[datetime:datetime]):
         dates = self._split_dates(*self.first_created_date)
         dates_cp = self._split_dates(*self.second_created_date)
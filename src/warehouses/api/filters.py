@@ -7,6 +7,7 @@ from products.models import ProductCategory
 from products.models import ProductsMaterials
 from products.models import ProductsVariants
 from products.models import ProductsVariantsBatches
+from utils.filters import LocalDateRangeFilter
 from warehouses.enums import SheetImportExportType
 from warehouses.enums import WarehouseBaseType
 from warehouses.models import Warehouse
@@ -20,8 +21,8 @@ from warehouses.models import WarehouseSheetTransfer
 
 
 class WarehouseFilterset(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
 
     class Meta:
         model = Warehouse
@@ -40,8 +41,8 @@ class WarehouseFilterset(django_filters.FilterSet):
 
 class WarehouseInventoryFilterSet(django_filters.FilterSet):
     warehouse_id = django_filters.ModelMultipleChoiceFilter(field_name="warehouse", queryset=Warehouse.objects.all())
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
     variant_id = django_filters.ModelMultipleChoiceFilter(field_name="product_variant_batch__product_variant", queryset=ProductsVariants.objects.all())
     material_id = django_filters.ModelMultipleChoiceFilter(field_name="product_variant_batch__product_material", queryset=ProductsMaterials.objects.all())
 
@@ -103,12 +104,12 @@ class WarehouseInventoryReasonFilterSet(django_filters.FilterSet):
 
 class WarehouseSheetImportExportFilterSet(django_filters.FilterSet):
     type = django_filters.MultipleChoiceFilter(choices=SheetImportExportType.choices())
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
-    modified_from = django_filters.DateFilter(field_name="modified__date", lookup_expr="gte")
-    modified_to = django_filters.DateFilter(field_name="modified__date", lookup_expr="lte")
-    confirm_date_from = django_filters.DateFilter(field_name="confirm_date__date", lookup_expr="gte")
-    confirm_date_to = django_filters.DateFilter(field_name="confirm_date__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    modified_from = LocalDateRangeFilter(field_name="modified", lookup_expr="gte")
+    modified_to = LocalDateRangeFilter(field_name="modified", lookup_expr="lte")
+    confirm_date_from = LocalDateRangeFilter(field_name="confirm_date", lookup_expr="gte")
+    confirm_date_to = LocalDateRangeFilter(field_name="confirm_date", lookup_expr="lte")
     order_id = django_filters.UUIDFilter(field_name="order_id")
 
     class Meta:
@@ -142,12 +143,12 @@ class WarehouseSheetImportExportFilterSet(django_filters.FilterSet):
 
 
 class WarehouseSheetCheckFilterSet(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
-    modified_from = django_filters.DateFilter(field_name="modified__date", lookup_expr="gte")
-    modified_to = django_filters.DateFilter(field_name="modified__date", lookup_expr="lte")
-    confirm_date_from = django_filters.DateFilter(field_name="confirm_date__date", lookup_expr="gte")
-    confirm_date_to = django_filters.DateFilter(field_name="confirm_date__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    modified_from = LocalDateRangeFilter(field_name="modified", lookup_expr="gte")
+    modified_to = LocalDateRangeFilter(field_name="modified", lookup_expr="lte")
+    confirm_date_from = LocalDateRangeFilter(field_name="confirm_date", lookup_expr="gte")
+    confirm_date_to = LocalDateRangeFilter(field_name="confirm_date", lookup_expr="lte")
 
     class Meta:
         model = WarehouseSheetCheck
@@ -179,12 +180,12 @@ class WarehouseSheetCheckFilterSet(django_filters.FilterSet):
 
 
 class WarehouseSheetTransferFilterSet(django_filters.FilterSet):
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
-    modified_from = django_filters.DateFilter(field_name="modified__date", lookup_expr="gte")
-    modified_to = django_filters.DateFilter(field_name="modified__date", lookup_expr="lte")
-    confirm_date_from = django_filters.DateFilter(field_name="confirm_date__date", lookup_expr="gte")
-    confirm_date_to = django_filters.DateFilter(field_name="confirm_date__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
+    modified_from = LocalDateRangeFilter(field_name="modified", lookup_expr="gte")
+    modified_to = LocalDateRangeFilter(field_name="modified", lookup_expr="lte")
+    confirm_date_from = LocalDateRangeFilter(field_name="confirm_date", lookup_expr="gte")
+    confirm_date_to = LocalDateRangeFilter(field_name="confirm_date", lookup_expr="lte")
 
     class Meta:
         model = WarehouseSheetTransfer
@@ -218,8 +219,8 @@ class WarehouseSheetTransferFilterSet(django_filters.FilterSet):
 
 class WarehouseInventoryLogFilterSet(django_filters.FilterSet):
     type = django_filters.MultipleChoiceFilter(choices=WarehouseBaseType.choices())
-    created_from = django_filters.DateFilter(field_name="created__date", lookup_expr="gte")
-    created_to = django_filters.DateFilter(field_name="created__date", lookup_expr="lte")
+    created_from = LocalDateRangeFilter(field_name="created", lookup_expr="gte")
+    created_to = LocalDateRangeFilter(field_name="created", lookup_expr="lte")
     variant = django_filters.ModelMultipleChoiceFilter(
         field_name="product_variant_batch__product_variant", queryset=ProductsVariants.objects.all()
     )
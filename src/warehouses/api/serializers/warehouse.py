@@ -43,4 +43,4 @@ class WarehouseSheetDataBulkUpdateSerializer(serializers.Serializer):
 
 
 class WarehouseSheetBulkUpdateSerializer(serializers.Serializer):
-    sheets = serializers.ListSerializer(child=WarehouseSheetDataBulkUpdateSerializer(), max_length=100, min_length=1)
+    sheets = serializers.ListSerializer(child=WarehouseSheetDataBulkUpdateSerializer(), max_length=500, min_length=1)
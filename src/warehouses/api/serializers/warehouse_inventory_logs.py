@@ -4,27 +4,27 @@ from products.api.serializers import ProductVariantBatchSerializer
 from warehouses import models
 from warehouses.api.serializers.warehouse import WarehouseReadOneSerializer
 from warehouses.api.serializers.warehouse_inventory_reason import WarehouseInventoryReasonReadOneSerializer
-from warehouses.enums import WarehouseBaseType
+
+
+class WarehouseInventoryLogSheetSerializer(serializers.Serializer):
+    """Thông tin phiếu (nhập / xuất, chuyển kho, kiểm kho) của log"""
+
+    id = serializers.UUIDField()
+    is_confirm = serializers.BooleanField()
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
+    confirm_by = serializers.PrimaryKeyRelatedField(read_only=True)
+    confirm_date = serializers.DateTimeField()
+    note = serializers.CharField()
 
 
 class WarehouseInventoryLogReadListSerializer(serializers.ModelSerializer):
     product_variant_batch = ProductVariantBatchSerializer(read_only=True)
-    sheet = serializers.SerializerMethodField("get_sheet")
+    sheet = WarehouseInventoryLogSheetSerializer(read_only=True)
 
     class Meta:
         model = models.WarehouseInventoryLog
         fields = "__all__"
 
-    # TODO: Cân nhắc thêm foreign key cho sheet
-    def get_sheet(self, obj):
-        if obj.type in [WarehouseBaseType.IMPORT, WarehouseBaseType.EXPORT]:
-            return obj.import_export_sheet
-        elif obj.type == WarehouseBaseType.TRANSFER:
-            return obj.transfer_sheet
-        elif obj.type == WarehouseBaseType.CHECK:
-            return obj.check_sheet
-        return None
-
 
 class WarehouseInventoryLogReadOneSerializer(serializers.ModelSerializer):
     warehouse = WarehouseReadOneSerializer()
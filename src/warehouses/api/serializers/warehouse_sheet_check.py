@@ -4,15 +4,33 @@ from products.api.serializers import ProductVariantBatchSerializer
 from warehouses import models
 from warehouses.api.serializers.warehouse import WarehouseReadOneSerializer
 from warehouses.api.serializers.warehouse_inventory_reason import WarehouseInventoryReasonReadOneSerializer
+from warehouses.services.sheet_check import load_batches
 
 
 class WarehouseSheetCheckDetailSerializer(serializers.ModelSerializer):
     quantity_actual = serializers.DecimalField(min_value=0, max_digits=15, decimal_places=4)
+    # Lô được kiểm tra tồn tại cho cả phiếu trong `validate_sheet_detail` (một truy vấn thay vì mỗi dòng một truy vấn)
+    product_variant_batch = serializers.UUIDField(source="product_variant_batch_id")
 
     class Meta:
         model = models.WarehouseSheetCheckDetail
         fields = ["id", "quantity_actual", "product_variant_batch"]
-        extra_kwargs = {"product_variant_batch": {"required": True}}
+
+
+class WarehouseSheetCheckDetailsValidateMixin:
+    def validate_sheet_detail(self, sheet_detail):
+        batches = load_batches({detail["product_variant_batch_id"] for detail in sheet_detail})
+        errors = [
+            {}
+            if detail["product_variant_batch_id"] in batches
+            else {"product_variant_batch": [f'Invalid pk "{detail["product_variant_batch_id"]}" - object does not exist.']}
+            for detail in sheet_detail
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        for detail in sheet_detail:
+            detail["product_variant_batch"] = batches[detail.pop("product_variant_batch_id")]
+        return sheet_detail
 
 
 class WarehouseSheetCheckDetailReadSerializer(serializers.ModelSerializer):
@@ -50,7 +68,7 @@ class WarehouseSheetCheckBaseWriteSerializer(serializers.ModelSerializer):
         return WarehouseSheetCheckReadOneSerializer(instance).data
 
 
-class WarehouseSheetCheckCreateSerializer(WarehouseSheetCheckBaseWriteSerializer):
+class WarehouseSheetCheckCreateSerializer(WarehouseSheetCheckDetailsValidateMixin, WarehouseSheetCheckBaseWriteSerializer):
     sheet_detail = WarehouseSheetCheckDetailSerializer(many=True)
     is_confirm = serializers.BooleanField(default=False)
 
@@ -64,3 +82,18 @@ class WarehouseSheetCheckUpdateSerializer(WarehouseSheetCheckBaseWriteSerializer
     class Meta:
         model = models.WarehouseSheetCheck
         fields = ["note", "is_delete", "is_confirm"]
+
+
+class WarehouseSheetCheckPreviewSerializer(WarehouseSheetCheckDetailsValidateMixin, serializers.Serializer):
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=models.Warehouse.objects.all())
+    sheet_detail = WarehouseSheetCheckDetailSerializer(many=True)
+
+
+class WarehouseSheetCheckVarianceSerializer(serializers.Serializer):
+    product_variant_batch = serializers.PrimaryKeyRelatedField(read_only=True)
+    product_variant_batch_name = serializers.CharField(source="product_variant_batch.name", read_only=True)
+    quantity_system = serializers.DecimalField(max_digits=15, decimal_places=4, read_only=True, help_text="Số lượng tồn kho hiện tại")
+    quantity_actual = serializers.DecimalField(max_digits=15, decimal_places=4, read_only=True)
+    quantity_variance = serializers.DecimalField(
+        max_digits=15, decimal_places=4, read_only=True, help_text="Số lượng điều chỉnh tồn kho khi xác nhận phiếu"
+    )
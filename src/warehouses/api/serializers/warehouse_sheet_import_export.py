@@ -84,3 +84,14 @@ class WarehouseSheetImportExportUpdateSerializer(WarehouseSheetImportExportBaseW
     class Meta:
         model = models.WarehouseSheetImportExport
         fields = ["note", "is_delete", "is_confirm", "change_reason", "order_key"]
+
+
+class WarehouseSheetImportExportFromShipmentSerializer(serializers.Serializer):
+    """Một phiếu nhập / xuất theo vận đơn, `sheet_detail` được kiểm tra lại bằng serializer tạo phiếu"""
+
+    order_code = serializers.CharField(max_length=255)
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=models.Warehouse.objects.all())
+    type = serializers.ChoiceField(choices=SheetImportExportType.choices())
+    change_reason_name = serializers.CharField(max_length=255)
+    is_confirm = serializers.BooleanField(default=False)
+    sheet_detail = serializers.ListField(child=serializers.DictField(), allow_empty=False)
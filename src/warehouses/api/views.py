@@ -6,14 +6,13 @@ import pandas as pd
 import pytz
 from dateutil import parser
 from django.db import transaction
-from django.db.models import JSONField
+from django.db.models import Exists
 from django.db.models import OuterRef
-from django.db.models import Subquery
-from django.db.models import Value
-from django.db.models.expressions import Func
-from django.db.models.functions import Cast
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
 from django_filters import rest_framework as django_filters
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import decorators
 from rest_framework import filters
 from rest_framework import generics
 from rest_framework import permissions
@@ -23,12 +22,14 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from core.views import CustomModelViewSet
+from core.views import ExportMixin
+from core.views import ReplicaReadMixin
 from orders.enums import OrderStatus
 from orders.models import Orders
 from products.enums import ProductVariantType
 from products.models import ProductsVariants
 from users.activity_log import ActivityLogMixin
-from utils.basic import data_sortby
+from utils.report_result import ReportResult
 from utils.serializers import PassSerializer
 from warehouses import models
 from warehouses.api.filters import ProductWarehouseReportFilter
@@ -56,15 +57,16 @@ from warehouses.enums import SheetCheckType
 from warehouses.enums import SheetImportExportType
 from warehouses.enums import SheetTransferType
 from warehouses.models import SequenceIdentity
-from warehouses.models import WarehouseInventory
 from warehouses.models import WarehouseInventoryAvailable
 from warehouses.models import WarehouseInventoryLog
-from warehouses.models import WarehouseSheetCheck
-from warehouses.models import WarehouseSheetImportExport
-from warehouses.models import WarehouseSheetTransfer
 from warehouses.reports import process_images
 from warehouses.reports import ReportWarehouse
 from warehouses.reports import get_report_category_inventory
+from warehouses.services.sheet_check import check_variances
+from warehouses.services.sheet_check import create_sheet_details
+from warehouses.services.sheet_confirm import SheetCheckBulkConfirm
+from warehouses.services.sheet_confirm import SheetImportExportBulkConfirm
+from warehouses.services.sheet_confirm import SheetTransferBulkConfirm
 
 
 class WarehouseViewSet(CustomModelViewSet):
@@ -139,7 +141,7 @@ class WarehouseInventoryListAPIView(generics.ListAPIView):
     filterset_class = WarehouseInventoryFilterSet
 
 
-class WarehouseInventoryLogsViewSet(CustomModelViewSet):
+class WarehouseInventoryLogsViewSet(ReplicaReadMixin, CustomModelViewSet):
     http_method_names = ["get"]
     permission_classes = [permissions.IsAuthenticated]
     queryset = models.WarehouseInventoryLog.objects.prefetch_related(
@@ -147,6 +149,8 @@ class WarehouseInventoryLogsViewSet(CustomModelViewSet):
         "product_variant_batch__product_material__images",
         "warehouse",
         "change_reason",
+        # Mỗi loại phiếu có trong trang một truy vấn
+        "sheet",
     ).all()
     default_serializer_class = warehouse_inventory_logs.WarehouseInventoryLogReadOneSerializer
 
@@ -169,59 +173,9 @@ class WarehouseInventoryLogsViewSet(CustomModelViewSet):
     filterset_class = WarehouseInventoryLogFilterSet
     ordering_fields = "__all__"
 
-    def build_sheet_subquery(self, sheet_model):
-        return (
-            sheet_model.objects.filter(code=OuterRef("sheet_code"))
-            .annotate(
-                sheet_data=Cast(
-                    Func(
-                        Value("id"),
-                        "id",
-                        Value("is_confirm"),
-                        "is_confirm",
-                        Value("created_by"),
-                        "created_by",
-                        Value("confirm_by"),
-                        "confirm_by",
-                        Value("confirm_date"),
-                        "confirm_date",
-                        Value("note"),
-                        "note",
-                        function="json_build_object",
-                    ),
-                    output_field=JSONField(),
-                )
-            )
-            .values("sheet_data")[:1]
-        )
-
-    def get_queryset_sheet(self, queryset):
-        import_export_sheet_subquery = self.build_sheet_subquery(WarehouseSheetImportExport)
-        transfer_sheet_subquery = self.build_sheet_subquery(WarehouseSheetTransfer)
-        check_sheet_subquery = self.build_sheet_subquery(WarehouseSheetCheck)
-
-        queryset = queryset.annotate(
-            import_export_sheet=Subquery(import_export_sheet_subquery),
-            check_sheet=Subquery(check_sheet_subquery),
-            transfer_sheet=Subquery(transfer_sheet_subquery),
-        )
-        return queryset
-
     def get_serializer_class(self):
         return self.serializer_classes.get(self.action, self.default_serializer_class)
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-
-        queryset = self.get_queryset_sheet(queryset)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
 
 class WarehouseInventoryAvailableViewSet(CustomModelViewSet):
     http_method_names = ["get"]
@@ -282,10 +236,45 @@ class WarehouseSheetImportExportViewSet(viewsets.ModelViewSet):
     )
     ordering_fields = "__all__"
     filterset_class = WarehouseSheetImportExportFilterSet
+    # Sản phẩm của các đơn đã tính sẵn bằng `expand_orders_items` (tạo phiếu hàng loạt), {order id: (số line item, items)}
+    orders_items = None
+    # Đơn hàng đã tải sẵn bằng `load_orders` (tạo phiếu hàng loạt), {(order key, loại phiếu): đơn hàng}
+    orders = None
 
     def get_serializer_class(self):
         return self.serializer_classes.get(self.action, self.default_serializer_class)
 
+    @swagger_auto_schema(
+        operation_summary="Tạo phiếu nhập / xuất theo danh sách vận đơn",
+        request_body=warehouse_sheet_import_export.WarehouseSheetImportExportFromShipmentSerializer(many=True),
+        responses={201: warehouse_sheet_import_export.WarehouseSheetImportExportReadListSerializer(many=True)},
+    )
+    @decorators.action(methods=["post"], detail=False, url_path="from-shipments")
+    def from_shipments(self, request, *args, **kwargs):
+        """Tạo tất cả phiếu trong một transaction (lỗi ở một phiếu thì không tạo phiếu nào), đơn hàng được tải theo lô"""
+        # Tránh import vòng: service dùng lại viewset này để tạo phiếu
+        from warehouses.services.warehouse_sheet_import_export import WarehouseSheetImportExportService
+
+        serializer = warehouse_sheet_import_export.WarehouseSheetImportExportFromShipmentSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            change_reasons = {}
+            services = [
+                WarehouseSheetImportExportService.from_shipment_to_create_sheet(
+                    sheet_detail=shipment["sheet_detail"],
+                    warehouse_id=shipment["warehouse"].pk,
+                    order_code=shipment["order_code"],
+                    sheet_type=shipment["type"],
+                    change_reason_name=shipment["change_reason_name"],
+                    is_confirm=shipment["is_confirm"],
+                    change_reasons=change_reasons,
+                )
+                for shipment in serializer.validated_data
+            ]
+            sheets = WarehouseSheetImportExportService.create_sheets(services, request.user)
+        data = warehouse_sheet_import_export.WarehouseSheetImportExportReadListSerializer(sheets, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
     def perform_create(self, serializer, current_user=None):
         current_user = current_user or self.request.user
         validated_data = serializer.validated_data
@@ -308,7 +297,9 @@ class WarehouseSheetImportExportViewSet(viewsets.ModelViewSet):
             if sheet_order_key:
                 order = self._get_order(sheet_order_key, sheet_type)
                 validated_data["order"] = order
-                self._validate_sheet_details(list_sheet_detail, order, sheet_order_key)
+                self._validate_sheet_details(list_sheet_detail, self._get_order_items(order), sheet_order_key)
+                # Phiếu sau của cùng đơn trong lô phải thấy phiếu vừa tạo
+                order.has_sheet = True
 
             new_sheet = serializer.save()
             self._create_sheet_details(new_sheet, list_sheet_detail, current_user)
@@ -331,7 +322,9 @@ class WarehouseSheetImportExportViewSet(viewsets.ModelViewSet):
             old_sheet = serializer.instance
             old_sheet_code = old_sheet.code
             old_sheet_is_confirm = old_sheet.is_confirm
-            old_list_sheet_detail = old_sheet.warehouse_sheet_import_export_detail_sheet.all()
+            old_list_sheet_detail = old_sheet.warehouse_sheet_import_export_detail_sheet.select_related(
+                "product_variant_batch__product_variant"
+            )
 
             if new_sheet_is_confirm is False and old_sheet_is_confirm is True:
                 raise ValidationError({"is_confirm": "Không thể cập nhật trạng thái xác nhận từ True -> False."})
@@ -339,7 +332,7 @@ class WarehouseSheetImportExportViewSet(viewsets.ModelViewSet):
             if sheet_order_key:
                 order = self._get_order(sheet_order_key, old_sheet.type)
                 validated_data["order"] = order
-                self._validate_sheet_details(old_list_sheet_detail, order, sheet_order_key)
+                self._validate_sheet_details(old_list_sheet_detail, self._get_order_items(order), sheet_order_key)
 
             if old_sheet_is_confirm is False and new_sheet_is_confirm is True:
                 if not sheet_order_key and old_sheet.order:
@@ -366,23 +359,39 @@ class WarehouseSheetImportExportViewSet(viewsets.ModelViewSet):
         data["confirm_by"] = user
 
     @staticmethod
-    def _get_order(order_key, sheet_type):
-        order = Orders.objects.filter(order_key=order_key).first()
+    def load_orders(order_keys, sheet_type) -> (dict):
+        """{order key: đơn hàng} trong một truy vấn, `has_sheet`: đơn đã có phiếu loại `sheet_type`"""
+        sheets = models.WarehouseSheetImportExport.objects.filter(order=OuterRef("pk"), type=sheet_type)
+        return {order.order_key: order for order in Orders.objects.filter(order_key__in=order_keys).annotate(has_sheet=Exists(sheets))}
+
+    def _get_order(self, order_key, sheet_type):
+        if self.orders is not None and (order_key, sheet_type) in self.orders:
+            order = self.orders[(order_key, sheet_type)]
+        else:
+            order = self.load_orders([order_key], sheet_type).get(order_key)
         if not order:
             raise ValidationError({"order_code": "Không tìm thấy đơn hàng tương ứng."})
-        if order.warehouse_sheet_import_export_order.filter(type=sheet_type).exists():
+        if order.has_sheet:
             raise ValidationError({"order": f"Đơn hàng {order_key} đã tồn tại phiếu."})
         if order.status == OrderStatus.CANCEL.value:
             raise ValidationError({"order": f"Đơn hàng {order_key} đã bị hủy."})
         return order
 
+    def _get_order_items(self, order):
+        if self.orders_items and order.pk in self.orders_items:
+            return self.orders_items[order.pk]
+        return order.items_list()
+
     @staticmethod
-    def _validate_sheet_details(sheet_details, order, order_key):
-        length_order_items, order_items = order.items_list()
+    def _validate_sheet_details(sheet_details, order_items, order_key):
+        length_order_items, order_items = order_items
         if len(sheet_details) != length_order_items:
             raise ValidationError({"product_variant": "Số sản phẩm của sheet detail không bằng số sản phẩm có trong order tương ứng."})
 
         order_variants = {item["code"]: item["quantity"] for item in order_items}
+        # Batch trong sheet detail (dict) lấy từ serializer, lấy variant của tất cả trong một truy vấn
+        batches = [detail["product_variant_batch"] for detail in sheet_details if isinstance(detail, dict)]
+        prefetch_related_objects([batch for batch in batches if batch], "product_variant")
 
         item_details = {}
         for detail in sheet_details:
@@ -455,6 +464,7 @@ class WarehouseSheetImportExportViewSet(viewsets.ModelViewSet):
                 change_reason=change_reason or sheet.change_reason,
                 type=sheet_type or sheet.type,
                 sheet_code=sheet.code,
+                sheet=sheet,
             )
 
 
@@ -504,7 +514,6 @@ class WarehouseSheetCheckViewSet(viewsets.ModelViewSet):
 
         sheet_is_confirm = validated_data["is_confirm"]
         sheet_warehouse = validated_data["warehouse"]
-        sheet_change_reason = validated_data["change_reason"]
 
         list_sheet_detail = validated_data.pop("sheet_detail")
 
@@ -514,45 +523,25 @@ class WarehouseSheetCheckViewSet(viewsets.ModelViewSet):
             seq.value += 1
             seq.save()
 
-            if sheet_is_confirm:
-                validated_data["confirm_date"] = timezone.now()
-                validated_data["confirm_by"] = current_user
+            # Số lượng hệ thống của tất cả lô được kiểm, khóa các dòng tồn kho nếu xác nhận ngay
+            variances = check_variances(sheet_warehouse, list_sheet_detail, lock=sheet_is_confirm)
 
-            # Tạo phiếu check.
+            # Tạo phiếu check, phiếu được xác nhận sau khi lưu chi tiết
+            validated_data["is_confirm"] = False
             new_sheet = serializer.save()
+            create_sheet_details(new_sheet, variances, current_user)
 
-            for sheet_detail in list_sheet_detail:
-                product_variant_batch = sheet_detail["product_variant_batch"]
-                quantity_actual = sheet_detail["quantity_actual"]
-
-                # Tìm số lượng tồn của lô - kho tại thời điểm hiện tại.
-                warehouses_inventory = WarehouseInventory.objects.filter(
-                    warehouse=sheet_warehouse, product_variant_batch=product_variant_batch
-                ).first()
-                if not warehouses_inventory:
-                    raise ValidationError({"warehouses - product_variant_batch": "Không tìm thấy lô - kho tương ứng."})
-                current_quantity_system = warehouses_inventory.quantity
-
-                # Lưu thông tin chi tiết của phiếu
-                new_sheet.warehouse_sheet_check_detail_sheet.create(
-                    created_by=current_user, quantity_system=current_quantity_system, **sheet_detail
-                )
-
-                # Nếu phiếu được xác nhận
-                if sheet_is_confirm:
-                    # Tính số lượng chênh lệch tồn kho
-                    quantity_change = int(quantity_actual) - int(current_quantity_system)
+            # Nếu phiếu được xác nhận: ghi log chênh lệch tồn kho của cả phiếu
+            if sheet_is_confirm:
+                SheetCheckBulkConfirm(current_user).confirm_sheet(new_sheet)
 
-                    # Tạo một record lưu thông tin của phiếu trong bảng WarehouseInventoryLog
-                    WarehouseInventoryLog.objects.create(
-                        created_by=current_user,
-                        product_variant_batch=product_variant_batch,
-                        warehouse=sheet_warehouse,
-                        quantity=quantity_change,
-                        change_reason=sheet_change_reason,
-                        type=sheet_type,
-                        sheet_code=new_sheet.code,
-                    )
+        # Response trả về chi tiết phiếu: lấy lô / sản phẩm của tất cả dòng thay vì từng dòng
+        prefetch_related_objects(
+            [new_sheet],
+            "warehouse_sheet_check_detail_sheet__product_variant_batch__product_variant__images",
+            "warehouse_sheet_check_detail_sheet__product_variant_batch__product_material",
+            "warehouse__addresses",
+        )
 
     def perform_update(self, serializer, current_user=None):
         if current_user is None:
@@ -570,32 +559,26 @@ class WarehouseSheetCheckViewSet(viewsets.ModelViewSet):
             if new_sheet_is_confirm is False and old_sheet_is_confirm is True:
                 raise ValidationError({"is_confirm": "Không thể cập nhật trạng thái xác nhận từ True -> False."})
 
-            # Nếu cập nhật trạng thái xác nhận của phiếu từ False sang True
+            # Nếu cập nhật trạng thái xác nhận của phiếu từ False sang True: ghi log chênh lệch tồn kho của cả phiếu
+            # (số lượng thực tế - số lượng hệ thống lúc tạo phiếu), `confirm_sheet` gán luôn thông tin xác nhận vào phiếu
             if old_sheet_is_confirm is False and new_sheet_is_confirm is True:
-                old_list_sheet_detail = old_sheet.warehouse_sheet_check_detail_sheet.all()
-                validated_data["confirm_date"] = timezone.now()
-                validated_data["confirm_by"] = current_user
-
-                for sheet_detail in old_list_sheet_detail:
-                    old_sheet_quantity_actual = sheet_detail.quantity_actual
-                    old_sheet_quantity_system = sheet_detail.quantity_system
-
-                    # Tính số lượng chênh lệch tồn kho
-                    quantity_change = int(old_sheet_quantity_actual) - int(old_sheet_quantity_system)
-
-                    # Tạo một record lưu thông tin của phiếu trong bảng WarehouseInventoryLog
-                    WarehouseInventoryLog.objects.create(
-                        created_by=current_user,
-                        product_variant_batch=sheet_detail.product_variant_batch,
-                        warehouse=old_sheet.warehouse,
-                        quantity=quantity_change,
-                        change_reason=old_sheet.change_reason,
-                        type=old_sheet.type,
-                        sheet_code=old_sheet.code,
-                    )
+                SheetCheckBulkConfirm(current_user).confirm_sheet(old_sheet)
 
             serializer.save()
 
+    @swagger_auto_schema(
+        operation_summary="Xem trước chênh lệch tồn kho của phiếu kiểm",
+        request_body=warehouse_sheet_check.WarehouseSheetCheckPreviewSerializer,
+        responses={200: warehouse_sheet_check.WarehouseSheetCheckVarianceSerializer(many=True)},
+    )
+    @decorators.action(methods=["post"], detail=False, url_path="preview")
+    def preview(self, request, *args, **kwargs):
+        """Chênh lệch giữa số lượng thực tế và tồn kho hiện tại, không ghi dữ liệu"""
+        serializer = warehouse_sheet_check.WarehouseSheetCheckPreviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        variances = check_variances(serializer.validated_data["warehouse"], serializer.validated_data["sheet_detail"])
+        return Response(warehouse_sheet_check.WarehouseSheetCheckVarianceSerializer(variances, many=True).data)
+
 
 class WarehouseSheetTransferViewSet(viewsets.ModelViewSet):
     http_method_names = ["get", "post", "patch", "delete"]
@@ -680,6 +663,7 @@ class WarehouseSheetTransferViewSet(viewsets.ModelViewSet):
                         change_reason=sheet_change_reason,
                         type=sheet_type,
                         sheet_code=new_sheet.code,
+                        sheet=new_sheet,
                     )
 
                     # Lưu record log cộng tồn của kho đến
@@ -691,6 +675,7 @@ class WarehouseSheetTransferViewSet(viewsets.ModelViewSet):
                         change_reason=sheet_change_reason,
                         type=sheet_type,
                         sheet_code=new_sheet.code,
+                        sheet=new_sheet,
                     )
 
     def perform_update(self, serializer, current_user=None):
@@ -729,6 +714,7 @@ class WarehouseSheetTransferViewSet(viewsets.ModelViewSet):
                         change_reason=old_sheet.change_reason,
                         type=old_sheet.type,
                         sheet_code=old_sheet.code,
+                        sheet=old_sheet,
                     )
 
                     # Lưu record log cộng tồn của kho đến
@@ -740,6 +726,7 @@ class WarehouseSheetTransferViewSet(viewsets.ModelViewSet):
                         change_reason=old_sheet.change_reason,
                         type=old_sheet.type,
                         sheet_code=old_sheet.code,
+                        sheet=old_sheet,
                     )
 
             serializer.save()
@@ -875,114 +862,50 @@ class WarehouseInventoryVariantListAPIView(generics.ListAPIView):
         return self.get_paginated_response(data)
 
 
-class WarehouseSheetImportExportBulkUpdateView(ActivityLogMixin, generics.GenericAPIView):
-    permission_classes = [permissions.IsAuthenticated]
-    serializer_class = warehouse.WarehouseSheetBulkUpdateSerializer
-
-    def post(self, request, *args, **kwargs):
-        sheet_import_export_view_set = WarehouseSheetImportExportViewSet()
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        current_user = self.request.user
-        validated_data = serializer.validated_data
-
-        with transaction.atomic():
-            for sheet in validated_data["sheets"]:
-                sheet_id = sheet["id"]
-                old_sheet_import_export = WarehouseSheetImportExport.objects.filter(pk=sheet_id).first()
-
-                if old_sheet_import_export is None:
-                    raise ValidationError({"sheets": f"Không tìm thấy sheet: {sheet_id}"})
-
-                sheet_import_export_update_serializer_class = sheet_import_export_view_set.serializer_classes.get("partial_update")
-                sheet_import_export_update_serializer = sheet_import_export_update_serializer_class(
-                    instance=old_sheet_import_export, data={"is_confirm": sheet["is_confirm"]}, partial=True
-                )
-                sheet_import_export_update_serializer.is_valid(raise_exception=True)
-                sheet_import_export_view_set.perform_update(serializer=sheet_import_export_update_serializer, current_user=current_user)
+class WarehouseSheetBulkUpdateView(ActivityLogMixin, generics.GenericAPIView):
+    """
+    Xác nhận nhiều phiếu bằng `BulkSheetConfirm`: kết quả trả về theo từng phiếu,
+    phiếu lỗi không làm hủy các phiếu còn lại (chỉ trả 400 khi không phiếu nào thành công).
+    """
 
-        return Response(validated_data)
-
-
-class WarehouseSheetCheckBulkUpdateView(ActivityLogMixin, generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = warehouse.WarehouseSheetBulkUpdateSerializer
+    sheet_confirm_class = None
 
     def post(self, request, *args, **kwargs):
-        sheet_check_view_set = WarehouseSheetCheckViewSet()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        current_user = self.request.user
-        validated_data = serializer.validated_data
-
-        with transaction.atomic():
-            for sheet in validated_data["sheets"]:
-                sheet_id = sheet["id"]
-                old_sheet_check = WarehouseSheetCheck.objects.filter(pk=sheet_id).first()
-
-                if old_sheet_check is None:
-                    raise ValidationError({"sheets": f"Không tìm thấy sheet: {sheet_id}"})
-
-                sheet_check_update_serializer_class = sheet_check_view_set.serializer_classes.get("partial_update")
-                sheet_check_update_serializer = sheet_check_update_serializer_class(
-                    instance=old_sheet_check, data={"is_confirm": sheet["is_confirm"]}, partial=True
-                )
-                sheet_check_update_serializer.is_valid(raise_exception=True)
-                sheet_check_view_set.perform_update(serializer=sheet_check_update_serializer, current_user=current_user)
-
-        return Response(validated_data)
+        results = self.sheet_confirm_class(self.request.user).confirm(serializer.validated_data["sheets"])
+        response_status = status.HTTP_200_OK if any(result.success for result in results) else status.HTTP_400_BAD_REQUEST
+        return Response({"sheets": [result.as_dict() for result in results]}, status=response_status)
 
 
-class WarehouseSheetTransferBulkUpdateView(ActivityLogMixin, generics.GenericAPIView):
-    permission_classes = [permissions.IsAuthenticated]
-    serializer_class = warehouse.WarehouseSheetBulkUpdateSerializer
-
-    def post(self, request, *args, **kwargs):
-        sheet_transfer_view_set = WarehouseSheetTransferViewSet()
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        current_user = self.request.user
-        validated_data = serializer.validated_data
+class WarehouseSheetImportExportBulkUpdateView(WarehouseSheetBulkUpdateView):
+    sheet_confirm_class = SheetImportExportBulkConfirm
 
-        with transaction.atomic():
-            for sheet in validated_data["sheets"]:
-                sheet_id = sheet["id"]
-                old_sheet_transfer = WarehouseSheetTransfer.objects.filter(pk=sheet_id).first()
 
-                if old_sheet_transfer is None:
-                    raise ValidationError({"sheets": f"Không tìm thấy sheet: {sheet_id}"})
+class WarehouseSheetCheckBulkUpdateView(WarehouseSheetBulkUpdateView):
+    sheet_confirm_class = SheetCheckBulkConfirm
 
-                sheet_transfer_update_serializer_class = sheet_transfer_view_set.serializer_classes.get("partial_update")
-                sheet_transfer_update_serializer = sheet_transfer_update_serializer_class(
-                    instance=old_sheet_transfer, data={"is_confirm": sheet["is_confirm"]}, partial=True
-                )
-                sheet_transfer_update_serializer.is_valid(raise_exception=True)
-                sheet_transfer_view_set.perform_update(serializer=sheet_transfer_update_serializer, current_user=current_user)
 
-        return Response(validated_data)
+class WarehouseSheetTransferBulkUpdateView(WarehouseSheetBulkUpdateView):
+    sheet_confirm_class = SheetTransferBulkConfirm
 
 
-class ReportWarehouseView(generics.ListAPIView):
+class ReportWarehouseView(ReplicaReadMixin, ExportMixin, generics.ListAPIView):
     serializer_class = ReportWarehouseSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = (filters.SearchFilter, filters.OrderingFilter, django_filters.DjangoFilterBackend)
     filterset_class = ProductWarehouseReportFilter
     queryset = None
+    export_file_name = "report_warehouse"
 
     def list(self, request, *args, **kwargs):
-        params = request.query_params
-        date_from = params.get("date_from")
-        date_to = params.get("date_to")
-        warehouse_ids = params.getlist("warehouse_id")
         try:
-            date_from = parser.parse(date_from).replace(tzinfo=pytz.utc) if date_from else None
-            date_to = parser.parse(date_to).replace(tzinfo=pytz.utc) if date_to else None
+            date_from, date_to = self.get_date_range()
         except Exception as err:
             return Response(data={"status": "failed", "msg": err.args[0]}, status=status.HTTP_400_BAD_REQUEST)
-        report = ReportWarehouse(
-            warehouse_ids=warehouse_ids, date_from=date_from, date_to=date_to, search=request.GET.get("search", None)
-        ).reports()
-        result = data_sortby(report, request.GET.get("ordering", None))
+        result = self.get_report_rows(date_from, date_to)
 
         page = self.paginate_queryset(result)
         result_page = process_images(page)
@@ -990,6 +913,31 @@ class ReportWarehouseView(generics.ListAPIView):
         response = self.get_paginated_response(result)
         return response
 
+    def get_date_range(self):
+        date_from = self.request.query_params.get("date_from")
+        date_to = self.request.query_params.get("date_to")
+        date_from = parser.parse(date_from).replace(tzinfo=pytz.utc) if date_from else None
+        date_to = parser.parse(date_to).replace(tzinfo=pytz.utc) if date_to else None
+        return date_from, date_to
+
+    def get_report_rows(self, date_from, date_to):
+        params = self.request.query_params
+        report = ReportWarehouse(
+            warehouse_ids=params.getlist("warehouse_id"),
+            date_from=date_from,
+            date_to=date_to,
+            search=params.get("search", None),
+        ).reports()
+        return ReportResult.from_records(report).order_by(params.get("ordering", None))
+
+    def get_report_data(self):
+        try:
+            date_from, date_to = self.get_date_range()
+        except Exception as err:
+            raise ValidationError({"status": "failed", "msg": err.args[0]})  # pylint: disable=W0707
+        result = self.get_report_rows(date_from, date_to).records()
+        return self.serializer_class(process_images(result), many=True).data
+
 
 class WarehouseInventoryAvailableHistoryAPIView(generics.ListAPIView):
     serializer_class = WarehouseInventoryAvailableHistorySerializer
@@ -1019,21 +967,26 @@ class WarehouseInventoryAvailableHistoryAPIView(generics.ListAPIView):
         return response
 
 
-class ReportWarehouseCategoryView(generics.ListAPIView):
+class ReportWarehouseCategoryView(ReplicaReadMixin, ExportMixin, generics.ListAPIView):
     queryset = None
     serializer_class = PassSerializer
     filter_backends = [django_filters.DjangoFilterBackend]
     filterset_class = ReportWarehouseCategoryFilterset
+    export_file_name = "report_warehouse_category"
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_report_result())
+        return self.get_paginated_response(page)
+
+    def get_report_data(self):
+        return self.get_report_result().records()
 
-    def get(self, request, *args, **kwargs):
-        params = request.query_params
+    def get_report_result(self) -> ReportResult:
+        params = self.request.query_params
         warehouse_ids = params.getlist("warehouse_id")
         category_ids = params.getlist("category_id")
         date_from = params.get("date_from")
         date_to = params.get("date_to")
-        
-        data = get_report_category_inventory(warehouse_ids, category_ids, date_from, date_to)
-        result = data_sortby(data, request.GET.get("ordering", None))
 
-        page = self.paginate_queryset(result)
-        return self.get_paginated_response(page)
\ No newline at end of file
+        data = get_report_category_inventory(warehouse_ids, category_ids, date_from, date_to)
+        return ReportResult.from_records(data).order_by(params.get("ordering", None))
\ No newline at end of file
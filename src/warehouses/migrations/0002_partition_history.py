@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from utils.partitioning import convert_to_partitioned
+
+HISTORY_MODELS = ("HistoricalWarehouseInventory", "HistoricalWarehouseInventoryAvailable")
+
+
+def partition_history_tables(apps, schema_editor):
+    for model_name in HISTORY_MODELS:
+        convert_to_partitioned(schema_editor, apps.get_model("warehouses", model_name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouses", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_history_tables, migrations.RunPython.noop),
+    ]
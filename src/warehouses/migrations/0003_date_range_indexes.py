@@ -0,0 +1,49 @@
+# Generated by Django 5.0 on 2026-10-19 14:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_date_range_indexes'),
+        ('products', '0004_inventory_totals'),
+        ('warehouses', '0002_partition_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='warehouseinventorylog',
+            index=models.Index(fields=['created'], name='inventory_log_created'),
+        ),
+        migrations.AddIndex(
+            model_name='warehousesheetcheck',
+            index=models.Index(fields=['created'], name='sheet_check_created'),
+        ),
+        migrations.AddIndex(
+            model_name='warehousesheetcheck',
+            index=models.Index(fields=['confirm_date'], name='sheet_check_confirm_date'),
+        ),
+        migrations.AddIndex(
+            model_name='warehousesheetimportexport',
+            index=models.Index(fields=['created'], name='sheet_ie_created'),
+        ),
+        migrations.AddIndex(
+            model_name='warehousesheetimportexport',
+            index=models.Index(fields=['modified'], name='sheet_ie_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='warehousesheetimportexport',
+            index=models.Index(fields=['confirm_date'], name='sheet_ie_confirm_date'),
+        ),
+        migrations.AddIndex(
+            model_name='warehousesheettransfer',
+            index=models.Index(fields=['created'], name='sheet_transfer_created'),
+        ),
+        migrations.AddIndex(
+            model_name='warehousesheettransfer',
+            index=models.Index(fields=['confirm_date'], name='sheet_transfer_confirm_date'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0 on 2026-10-19 14:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef
+from django.db.models import Subquery
+
+# Loại log -> model phiếu tạo ra log
+SHEET_MODELS = {
+    ("IP", "EP"): "WarehouseSheetImportExport",
+    ("TF",): "WarehouseSheetTransfer",
+    ("CK",): "WarehouseSheetCheck",
+}
+
+
+def backfill_inventory_log_sheet(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    WarehouseInventoryLog = apps.get_model("warehouses", "WarehouseInventoryLog")
+    for log_types, model_name in SHEET_MODELS.items():
+        sheet_model = apps.get_model("warehouses", model_name)
+        content_type, _ = ContentType.objects.get_or_create(app_label="warehouses", model=model_name.lower())
+        sheet_id = Subquery(sheet_model.objects.filter(code=OuterRef("sheet_code")).values("id")[:1])
+        WarehouseInventoryLog.objects.filter(type__in=log_types, sheet_id__isnull=True).update(
+            sheet_content_type=content_type, sheet_id=sheet_id
+        )
+    # Log không tìm thấy phiếu theo sheet_code
+    WarehouseInventoryLog.objects.filter(sheet_id__isnull=True).update(sheet_content_type=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('warehouses', '0003_date_range_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='warehouseinventorylog',
+            name='sheet_content_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype'),
+        ),
+        migrations.AddField(
+            model_name='warehouseinventorylog',
+            name='sheet_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_inventory_log_sheet, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='warehouseinventorylog',
+            index=models.Index(fields=['sheet_content_type', 'sheet_id'], name='inventory_log_sheet'),
+        ),
+    ]
@@ -1,5 +1,9 @@
 import uuid
+from collections import defaultdict
+from decimal import Decimal
 
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db import transaction
 from model_utils.models import TimeStampedModel
@@ -58,6 +62,53 @@ class Warehouse(TimeStampedModel):
         db_table = "tbl_Warehouse"
 
 
+class WarehouseInventoryQuerySet(models.QuerySet):
+    """
+    Tổng tồn của variant / sản phẩm / danh mục được cập nhật bằng signal khi save / delete.
+    `update()` (cả `bulk_update()`, được Django thực hiện bằng `update()`) và `bulk_create()` không gửi signal
+    nên cộng chênh lệch trực tiếp trong cùng transaction.
+    """
+
+    TOTAL_FIELDS = {"quantity", "product_variant_batch", "product_variant_batch_id"}
+
+    def update(self, **kwargs):
+        if not self.TOTAL_FIELDS & kwargs.keys():
+            return super().update(**kwargs)
+        # Tránh import vòng: products.inventory import các model của module này
+        from products.inventory import apply_inventory_deltas
+
+        with transaction.atomic(using=self.db):
+            # Khóa các dòng bị cập nhật và tính chênh lệch trên giá trị trước / sau câu UPDATE
+            before = list(self.select_for_update().values_list("pk", "product_variant_batch_id", "quantity"))
+            rows = super().update(**kwargs)
+            after = WarehouseInventory.objects.filter(pk__in=[pk for pk, _, _ in before]).values_list(
+                "product_variant_batch_id", "quantity"
+            )
+            deltas = defaultdict(Decimal)
+            for _, batch_id, quantity in before:
+                deltas[batch_id] -= quantity or 0
+            for batch_id, quantity in after:
+                deltas[batch_id] += quantity or 0
+            apply_inventory_deltas(deltas)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+            # Không biết dòng nào được tạo / ghi đè nên không tính được chênh lệch tổng tồn
+            raise ValueError("WarehouseInventory.bulk_create không hỗ trợ ignore_conflicts / update_conflicts.")
+        # Tránh import vòng: products.inventory import các model của module này
+        from products.inventory import apply_inventory_deltas
+
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            deltas = defaultdict(Decimal)
+            for obj in objs:
+                # quantity chưa qua to_python (vd: float từ file import) nên đổi sang Decimal trước khi cộng
+                deltas[obj.product_variant_batch_id] += Decimal(str(obj.quantity or 0))
+            apply_inventory_deltas(deltas)
+        return objs
+
+
 class WarehouseInventory(TimeStampedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, null=False)
     modified_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name="warehouse_inventory_modified")
@@ -72,6 +123,13 @@ class WarehouseInventory(TimeStampedModel):
         table_name="tbl_Warehouse_Inventory_Historical",
     )
 
+    objects = WarehouseInventoryQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # Signal tổng tồn khóa dòng hiện tại trước khi lưu (pre_save) và cộng chênh lệch sau khi lưu (post_save)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["-created"]
         db_table = "tbl_Warehouse_Inventory"
@@ -168,10 +226,19 @@ class WarehouseInventoryLog(TimeStampedModel):
     type = models.CharField(max_length=2, choices=WarehouseBaseType.choices())
 
     sheet_code = models.CharField(max_length=255)
+    # Phiếu tạo ra log (nhập / xuất, chuyển kho hoặc kiểm kho)
+    sheet_content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, blank=True, null=True)
+    sheet_id = models.UUIDField(blank=True, null=True)
+    sheet = GenericForeignKey("sheet_content_type", "sheet_id")
 
     class Meta:
         ordering = ["-created"]
         db_table = "tbl_Warehouse_Inventory_Logs"
+        # Lọc theo khoảng ngày (LocalDateRangeFilter) là range scan trên các cột timestamptz
+        indexes = [
+            models.Index(fields=["created"], name="inventory_log_created"),
+            models.Index(fields=["sheet_content_type", "sheet_id"], name="inventory_log_sheet"),
+        ]
 
     # Mục đích để cho các logic signal liên quan model này
     # đảm bảo tính nhất quán của dữ liệu
@@ -213,6 +280,12 @@ class WarehouseSheetImportExport(TimeStampedModel):
     class Meta:
         ordering = ["-created"]
         db_table = "tbl_Warehouse_Sheet_Import_Export"
+        # Lọc theo khoảng ngày (LocalDateRangeFilter) là range scan trên các cột timestamptz
+        indexes = [
+            models.Index(fields=["created"], name="sheet_ie_created"),
+            models.Index(fields=["modified"], name="sheet_ie_modified"),
+            models.Index(fields=["confirm_date"], name="sheet_ie_confirm_date"),
+        ]
 
 
 class WarehouseSheetImportExportDetail(TimeStampedModel):
@@ -280,6 +353,11 @@ class WarehouseSheetTransfer(TimeStampedModel):
     class Meta:
         ordering = ["-created"]
         db_table = "tbl_Warehouse_Sheet_Transfer"
+        # Lọc theo khoảng ngày (LocalDateRangeFilter) là range scan trên các cột timestamptz
+        indexes = [
+            models.Index(fields=["created"], name="sheet_transfer_created"),
+            models.Index(fields=["confirm_date"], name="sheet_transfer_confirm_date"),
+        ]
 
 
 class WarehouseSheetTransferDetail(TimeStampedModel):
@@ -335,6 +413,11 @@ class WarehouseSheetCheck(TimeStampedModel):
     class Meta:
         ordering = ["-created"]
         db_table = "tbl_Warehouse_Sheet_Check"
+        # Lọc theo khoảng ngày (LocalDateRangeFilter) là range scan trên các cột timestamptz
+        indexes = [
+            models.Index(fields=["created"], name="sheet_check_created"),
+            models.Index(fields=["confirm_date"], name="sheet_check_confirm_date"),
+        ]
 
 
 class WarehouseSheetCheckDetail(TimeStampedModel):
@@ -20,6 +20,8 @@ import pandas as pd
 from core.settings import IMAGE_BASE_URL
 from files.models import Images
 from products.models import ProductCategory
+from utils.dates import local_day_end
+from utils.dates import local_day_start
 from warehouses.models import WarehouseInventory
 from warehouses.models import WarehouseInventoryLog
 
@@ -347,7 +349,8 @@ def get_report_category_inventory(warehouse_ids, category_ids, date_from, date_t
     all_categories = list(category_map.keys())
 
     # Get all variants' initial quantities before the date_from
-    query_initial_inventory = Q(history_date__date__lt=date_from)
+    # So sánh trực tiếp với cột history_date (không ép kiểu ::date) để Postgres lọc được partition theo tháng
+    query_initial_inventory = Q(history_date__lt=local_day_start(date_from))
     if warehouse_ids:
         query_initial_inventory.add(Q(warehouse_id__in=warehouse_ids), Q.AND)
     if category_ids:
@@ -385,8 +388,8 @@ def get_report_category_inventory(warehouse_ids, category_ids, date_from, date_t
 
     # Fetch history records between date_from and date_to
     query_history_records = Q(
-        history_date__date__gte=date_from,
-        history_date__date__lte=date_to,
+        history_date__gte=local_day_start(date_from),
+        history_date__lt=local_day_end(date_to),
     )
     if warehouse_ids:
         query_history_records.add(Q(warehouse_id__in=warehouse_ids), Q.AND)
@@ -0,0 +1,78 @@
+"""
+Đối soát phiếu kiểm kho theo tập: số lượng hệ thống của tất cả lô được kiểm lấy bằng một truy vấn,
+chênh lệch được tính cho cả phiếu, chi tiết phiếu và log thao tác được ghi bằng bulk_create.
+Log điều chỉnh tồn kho khi xác nhận được ghi bởi `SheetCheckBulkConfirm`.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from rest_framework.exceptions import ValidationError
+
+from products.models import ProductsVariantsBatches
+from users.models import UserActionLog
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseSheetCheckDetail
+from warehouses.services.sheet_confirm import batch_label
+from warehouses.signals import sheet_check_detail_action_log
+
+
+@dataclass
+class CheckVariance:
+    product_variant_batch: ProductsVariantsBatches
+    quantity_system: Decimal
+    quantity_actual: Decimal
+
+    @property
+    def quantity_variance(self) -> Decimal:
+        return self.quantity_actual - self.quantity_system
+
+
+def load_batches(batch_ids) -> dict:
+    """Lô theo id (kèm variant / nguyên liệu để ghi log thao tác), một truy vấn cho cả phiếu"""
+    return ProductsVariantsBatches.objects.select_related("product_variant", "product_material").in_bulk(batch_ids)
+
+
+def inventory_quantities(warehouse, batch_ids, lock=False) -> dict:
+    """Số lượng tồn hiện tại {batch id: quantity} của các lô trong kho"""
+    queryset = WarehouseInventory.objects.filter(warehouse=warehouse, product_variant_batch_id__in=batch_ids)
+    if lock:
+        queryset = queryset.select_for_update().order_by("product_variant_batch_id")
+    return dict(queryset.values_list("product_variant_batch_id", "quantity"))
+
+
+def check_variances(warehouse, sheet_details: list[dict], lock=False) -> list[CheckVariance]:
+    """
+    Chênh lệch giữa số lượng thực tế (`sheet_details`: [{"product_variant_batch", "quantity_actual"}]) và tồn kho hiện tại.
+    `lock=True` khóa các dòng tồn kho tới hết transaction (xác nhận ngay khi tạo phiếu).
+    """
+    quantities = inventory_quantities(warehouse, {detail["product_variant_batch"].pk for detail in sheet_details}, lock=lock)
+    missing = [detail["product_variant_batch"] for detail in sheet_details if detail["product_variant_batch"].pk not in quantities]
+    if missing:
+        raise ValidationError(
+            {"warehouses - product_variant_batch": [f"Không tìm thấy lô - kho tương ứng: {batch_label(batch)}." for batch in missing]}
+        )
+    return [
+        CheckVariance(
+            product_variant_batch=detail["product_variant_batch"],
+            quantity_system=quantities[detail["product_variant_batch"].pk],
+            quantity_actual=detail["quantity_actual"],
+        )
+        for detail in sheet_details
+    ]
+
+
+def create_sheet_details(sheet, variances: list[CheckVariance], user) -> list[WarehouseSheetCheckDetail]:
+    details = [
+        WarehouseSheetCheckDetail(
+            created_by=user,
+            sheet=sheet,
+            product_variant_batch=variance.product_variant_batch,
+            quantity_system=variance.quantity_system,
+            quantity_actual=variance.quantity_actual,
+        )
+        for variance in variances
+    ]
+    WarehouseSheetCheckDetail.objects.bulk_create(details)
+    # bulk_create không gửi signal `create_action_log_sheet_check`
+    UserActionLog.objects.bulk_create([sheet_check_detail_action_log(detail, "Create") for detail in details])
+    return details
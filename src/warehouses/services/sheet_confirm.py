@@ -0,0 +1,318 @@
+"""
+Xác nhận nhiều phiếu kho (nhập / xuất, kiểm kho, chuyển kho) trong một lần.
+
+Thay vì chạy luồng xác nhận của từng phiếu (mỗi chi tiết một log,
+mỗi log một signal cập nhật tồn kho), engine:
+- khóa các phiếu và các dòng `WarehouseInventory` liên quan theo thứ tự cố định
+  (tránh deadlock giữa các lần xác nhận),
+- kiểm tra tồn kho lần lượt từng phiếu trên số tồn đã khóa, phiếu không hợp lệ / không đủ tồn
+  bị bỏ qua và báo lỗi riêng, các phiếu còn lại vẫn được xác nhận,
+- ghi log bằng bulk_create, cộng dồn chênh lệch của tất cả phiếu và cập nhật mỗi dòng tồn kho một lần.
+
+Log ghi bằng bulk_create không gửi signal `update_warehouse_inventory` nên tồn kho, tổng tồn của sản phẩm
+và lịch sử (simple_history) được cập nhật trực tiếp ở đây.
+"""
+import operator
+import uuid
+from collections import defaultdict
+from dataclasses import asdict
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from simple_history.utils import bulk_create_with_history
+from simple_history.utils import bulk_update_with_history
+
+from orders.enums import OrderStatus
+from products.enums import ProductType
+from warehouses.enums import SheetImportExportType
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseInventoryAvailable
+from warehouses.models import WarehouseInventoryLog
+from warehouses.models import WarehouseSheetCheck
+from warehouses.models import WarehouseSheetCheckDetail
+from warehouses.models import WarehouseSheetImportExport
+from warehouses.models import WarehouseSheetImportExportDetail
+from warehouses.models import WarehouseSheetTransfer
+from warehouses.models import WarehouseSheetTransferDetail
+
+
+@dataclass
+class SheetConfirmResult:
+    id: uuid.UUID
+    is_confirm: bool
+    success: bool = True
+    errors: dict = None
+
+    def fail(self, errors):
+        self.success = False
+        self.errors = errors
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def batch_label(batch) -> str:
+    if batch.type == ProductType.MATERIAL.value and batch.product_material:
+        product_name = batch.product_material.name
+    else:
+        product_name = batch.product_variant.name if batch.product_variant else ""
+    return f"Lô {batch.name}, sản phẩm {product_name}"
+
+
+class BulkSheetConfirm:
+    """
+    Engine xác nhận phiếu, mỗi loại phiếu khai báo model, chi tiết phiếu và `movements()`:
+    danh sách thay đổi tồn kho (kho, lô, số lượng) khi xác nhận phiếu.
+    """
+
+    model = None
+    detail_model = None
+    details_name = None
+    select_related = ("change_reason",)
+
+    def __init__(self, user):
+        self.user = user
+        self.now = timezone.now()
+
+    def validate(self, sheet):
+        """Kiểm tra riêng của loại phiếu trước khi xác nhận, raise ValidationError nếu không hợp lệ"""
+
+    def movements(self, sheet) -> list[tuple]:
+        raise NotImplementedError
+
+    def after_confirm(self, sheets: list):
+        """Cập nhật thêm sau khi các phiếu được xác nhận (trong cùng transaction)"""
+
+    def details(self, sheet) -> list:
+        return getattr(sheet, self.details_name).all()
+
+    def load_sheets(self, ids) -> dict:
+        details = self.detail_model.objects.select_related(
+            "product_variant_batch__product_variant", "product_variant_batch__product_material"
+        ).order_by("created")
+        # `of=("self",)`: chỉ khóa phiếu, không khóa các bảng join (quan hệ null không dùng được FOR UPDATE)
+        sheets = (
+            self.model.objects.select_for_update(of=("self",))
+            .select_related(*self.select_related)
+            .prefetch_related(Prefetch(self.details_name, queryset=details))
+            .filter(pk__in=ids)
+            .order_by("pk")
+        )
+        return {sheet.pk: sheet for sheet in sheets}
+
+    def confirm(self, items: list[dict]) -> list[SheetConfirmResult]:
+        """`items`: [{"id": sheet id, "is_confirm": bool}], trả về kết quả theo thứ tự của `items`"""
+        results = [SheetConfirmResult(id=item["id"], is_confirm=item["is_confirm"]) for item in items]
+        with transaction.atomic():
+            sheets = self.load_sheets({item["id"] for item in items})
+            candidates, seen = [], set()
+            for result in results:
+                try:
+                    sheet = self._check_request(result, sheets, seen)
+                except ValidationError as err:
+                    result.fail(err.detail)
+                    continue
+                if sheet is not None:
+                    candidates.append((result, sheet, self.movements(sheet)))
+
+            if candidates:
+                self._apply(candidates)
+        return results
+
+    def confirm_sheet(self, sheet):
+        """
+        Xác nhận một phiếu (luồng cập nhật / tạo phiếu đơn lẻ),
+        raise ValidationError nếu không xác nhận được
+        """
+        result = self.confirm([{"id": sheet.pk, "is_confirm": True}])[0]
+        if not result.success:
+            raise ValidationError(result.errors)
+        self._mark_confirmed(sheet)
+
+    def _check_request(self, result, sheets, seen):
+        """Trả về phiếu cần xác nhận, None nếu không cần thay đổi"""
+        sheet = sheets.get(result.id)
+        if sheet is None:
+            raise ValidationError({"sheets": f"Không tìm thấy sheet: {result.id}"})
+        if result.id in seen:
+            raise ValidationError({"sheets": f"Sheet {result.id} bị lặp lại trong danh sách."})
+        seen.add(result.id)
+
+        if not result.is_confirm:
+            if sheet.is_confirm:
+                raise ValidationError({"is_confirm": "Không thể cập nhật trạng thái xác nhận từ True -> False."})
+            return None
+        if sheet.is_confirm:
+            return None
+        self.validate(sheet)
+        return sheet
+
+    def _lock_inventories(self, keys) -> dict:
+        # Phiếu không có chi tiết: không có dòng tồn kho nào cần khóa, phiếu vẫn được xác nhận
+        if not keys:
+            return {}
+        # Khóa theo thứ tự (kho, lô) để các lần xác nhận đồng thời luôn chờ nhau theo cùng một thứ tự
+        condition = reduce(operator.or_, (Q(warehouse_id=warehouse, product_variant_batch_id=batch) for warehouse, batch in keys))
+        inventories = WarehouseInventory.objects.select_for_update().filter(condition).order_by("warehouse_id", "product_variant_batch_id")
+        return {(inventory.warehouse_id, inventory.product_variant_batch_id): inventory for inventory in inventories}
+
+    def _apply(self, candidates):
+        batches = {}
+        for _, _, movements in candidates:
+            for warehouse_id, batch, _ in movements:
+                batches[(warehouse_id, batch.pk if batch else None)] = batch
+        inventories = self._lock_inventories(batches.keys())
+        balances = {key: inventory.quantity for key, inventory in inventories.items()}
+
+        # Kiểm tra tồn kho lần lượt từng phiếu,
+        # phiếu không đủ tồn không được tính vào số tồn của các phiếu sau
+        confirmed, logs = [], []
+        for result, sheet, movements in candidates:
+            deltas = defaultdict(Decimal)
+            for warehouse_id, batch, quantity in movements:
+                deltas[(warehouse_id, batch.pk if batch else None)] += quantity
+            shortages = [key for key, delta in deltas.items() if balances.get(key, 0) + delta < 0]
+            if shortages:
+                result.fail({"quantity": [f"{batch_label(batches[key])} không đủ tồn kho." for key in shortages if batches[key]]})
+                continue
+            for key, delta in deltas.items():
+                balances[key] = balances.get(key, 0) + delta
+            confirmed.append(sheet)
+            logs.extend(self._log(sheet, warehouse_id, batch, quantity) for warehouse_id, batch, quantity in movements)
+
+        if not confirmed:
+            return
+        WarehouseInventoryLog.objects.bulk_create(logs)
+        self._save_inventories(inventories, balances)
+        self._save_sheets(confirmed)
+        self.after_confirm(confirmed)
+
+    def _log(self, sheet, warehouse_id, batch, quantity):
+        return WarehouseInventoryLog(
+            created_by=self.user,
+            product_variant_batch=batch,
+            warehouse_id=warehouse_id,
+            quantity=quantity,
+            change_reason_id=sheet.change_reason_id,
+            type=sheet.type,
+            sheet_code=sheet.code,
+            sheet=sheet,
+        )
+
+    def _save_inventories(self, inventories, balances):
+        changed, created = [], []
+        for (warehouse_id, batch_id), quantity in balances.items():
+            inventory = inventories.get((warehouse_id, batch_id))
+            if inventory is None:
+                created.append(
+                    WarehouseInventory(
+                        created_by=self.user, warehouse_id=warehouse_id, product_variant_batch_id=batch_id, quantity=quantity
+                    )
+                )
+            elif inventory.quantity != quantity:
+                inventory.quantity = quantity
+                inventory.modified_by = self.user
+                inventory.modified = self.now
+                changed.append(inventory)
+
+        # Dòng đã khóa nên gán số tồn mới (một câu UPDATE cho tất cả) an toàn như cộng bằng F().
+        # bulk_update / bulk_create của WarehouseInventory tự cộng chênh lệch vào tổng tồn
+        bulk_update_with_history(changed, WarehouseInventory, ["quantity", "modified_by", "modified"], default_user=self.user)
+        bulk_create_with_history(created, WarehouseInventory, default_user=self.user)
+
+    def _mark_confirmed(self, sheet):
+        sheet.is_confirm = True
+        sheet.confirm_date = self.now
+        sheet.confirm_by = self.user
+        sheet.modified_by = self.user
+        sheet.modified = self.now
+
+    def _save_sheets(self, sheets):
+        for sheet in sheets:
+            self._mark_confirmed(sheet)
+        self.model.objects.bulk_update(sheets, ["is_confirm", "confirm_date", "confirm_by", "modified_by", "modified"])
+
+
+class SheetImportExportBulkConfirm(BulkSheetConfirm):
+    model = WarehouseSheetImportExport
+    detail_model = WarehouseSheetImportExportDetail
+    details_name = "warehouse_sheet_import_export_detail_sheet"
+    select_related = ("change_reason", "order")
+
+    def validate(self, sheet):
+        if sheet.order and sheet.order.status == OrderStatus.CANCEL.value:
+            raise ValidationError({"order": f"Đơn hàng {sheet.order.order_key} đã bị hủy."})
+
+    def movements(self, sheet):
+        return [(sheet.warehouse_id, detail.product_variant_batch, detail.quantity) for detail in self.details(sheet)]
+
+    def after_confirm(self, sheets):
+        # Phiếu xuất: cộng số lượng xuất vào số lượng đơn đã xác nhận của variant (giống `create_or_update`)
+        quantities, notes = defaultdict(Decimal), {}
+        for sheet in sheets:
+            if sheet.type != SheetImportExportType.EXPORT.value:
+                continue
+            for detail in self.details(sheet):
+                variant_id = detail.product_variant_batch.product_variant_id if detail.product_variant_batch else None
+                if variant_id:
+                    quantities[variant_id] += detail.quantity
+                    notes[variant_id] = sheet.code
+        if not quantities:
+            return
+
+        availables = WarehouseInventoryAvailable.objects.select_for_update().filter(product_variant_id__in=quantities.keys())
+        availables = {available.product_variant_id: available for available in availables.order_by("product_variant_id")}
+        for variant_id, available in availables.items():
+            available.quantity_confirm += quantities[variant_id]
+            available.note = notes[variant_id]
+            available.modified = self.now
+        bulk_update_with_history(
+            list(availables.values()), WarehouseInventoryAvailable, ["quantity_confirm", "note", "modified"], default_user=self.user
+        )
+        bulk_create_with_history(
+            [
+                WarehouseInventoryAvailable(
+                    created_by=self.user,
+                    product_variant_id=variant_id,
+                    quantity_confirm=quantity,
+                    quantity_non_confirm=0,
+                    note=notes[variant_id],
+                )
+                for variant_id, quantity in quantities.items()
+                if variant_id not in availables
+            ],
+            WarehouseInventoryAvailable,
+            default_user=self.user,
+        )
+
+
+class SheetCheckBulkConfirm(BulkSheetConfirm):
+    model = WarehouseSheetCheck
+    detail_model = WarehouseSheetCheckDetail
+    details_name = "warehouse_sheet_check_detail_sheet"
+
+    def movements(self, sheet):
+        # Chênh lệch giữa số lượng thực tế và số lượng hệ thống lúc tạo phiếu
+        return [
+            (sheet.warehouse_id, detail.product_variant_batch, detail.quantity_actual - (detail.quantity_system or 0))
+            for detail in self.details(sheet)
+        ]
+
+
+class SheetTransferBulkConfirm(BulkSheetConfirm):
+    model = WarehouseSheetTransfer
+    detail_model = WarehouseSheetTransferDetail
+    details_name = "warehouse_sheet_transfer_detail_sheet"
+
+    def movements(self, sheet):
+        movements = []
+        for detail in self.details(sheet):
+            movements.append((sheet.warehouse_from_id, detail.product_variant_batch, -detail.quantity))
+            movements.append((sheet.warehouse_to_id, detail.product_variant_batch, detail.quantity))
+        return movements
@@ -1,3 +1,8 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from orders.models import expand_orders_items
 from warehouses.api.views import WarehouseSheetImportExportViewSet
 from warehouses.models import WarehouseInventoryReason
 
@@ -7,14 +12,35 @@ class WarehouseSheetImportExportService:
         self.data = data
         self.sheet = sheet
 
-    def create_new_sheet(self, created_by):
-        sheet_import_export_view_set = WarehouseSheetImportExportViewSet()
+    def create_new_sheet(self, created_by, sheet_import_export_view_set: WarehouseSheetImportExportViewSet = None):
+        sheet_import_export_view_set = sheet_import_export_view_set or WarehouseSheetImportExportViewSet()
         sheet_import_export_create_serializer_class = sheet_import_export_view_set.serializer_classes.get("create")
         sheet_import_export_create_serializer = sheet_import_export_create_serializer_class(data=self.data)
         sheet_import_export_create_serializer.is_valid(raise_exception=True)
         new_sheet = sheet_import_export_view_set.perform_create(serializer=sheet_import_export_create_serializer, current_user=created_by)
         return new_sheet
 
+    @classmethod
+    def create_sheets(cls, services: list["WarehouseSheetImportExportService"], created_by):
+        """
+        Tạo phiếu cho nhiều đơn hàng (vd: theo danh sách vận đơn) trong một transaction,
+        đơn hàng và sản phẩm của tất cả đơn được tải một lần (`load_orders`, `expand_orders_items`) thay vì từng đơn.
+        """
+        keys_by_type = defaultdict(set)
+        for service in services:
+            if service.data.get("order_key"):
+                keys_by_type[service.data["type"]].add(service.data["order_key"])
+
+        orders = {}
+        for sheet_type, order_keys in keys_by_type.items():
+            for order_key, order in WarehouseSheetImportExportViewSet.load_orders(order_keys, sheet_type).items():
+                orders[(order_key, sheet_type)] = order
+        orders_items = expand_orders_items(list({order.pk: order for order in orders.values()}.values()))
+
+        sheet_import_export_view_set = WarehouseSheetImportExportViewSet(orders=orders, orders_items=orders_items)
+        with transaction.atomic():
+            return [service.create_new_sheet(created_by, sheet_import_export_view_set) for service in services]
+
     def update_sheet(self, modified_by):
         sheet_import_export_view_set = WarehouseSheetImportExportViewSet()
         sheet_import_export_update_serializer_class = sheet_import_export_view_set.serializer_classes.get("partial_update")
@@ -27,13 +53,23 @@ class WarehouseSheetImportExportService:
 
     @classmethod
     def from_shipment_to_create_sheet(
-        cls, sheet_detail: list[dict], warehouse_id: str, order_code: str, sheet_type: str, change_reason_name: str, is_confirm=False
+        cls,
+        sheet_detail: list[dict],
+        warehouse_id: str,
+        order_code: str,
+        sheet_type: str,
+        change_reason_name: str,
+        is_confirm=False,
+        change_reasons: dict = None,
     ):
-        # Tìm hoặc tạo mới lý do tạo phiếu
-        change_reason, _ = WarehouseInventoryReason.objects.get_or_create(
-            type=sheet_type,
-            name=change_reason_name,
-        )
+        # Tìm hoặc tạo mới lý do tạo phiếu, `change_reasons` ({(loại phiếu, tên): lý do}) dùng chung khi tạo nhiều phiếu
+        change_reasons = {} if change_reasons is None else change_reasons
+        if (sheet_type, change_reason_name) not in change_reasons:
+            change_reasons[(sheet_type, change_reason_name)], _ = WarehouseInventoryReason.objects.get_or_create(
+                type=sheet_type,
+                name=change_reason_name,
+            )
+        change_reason = change_reasons[(sheet_type, change_reason_name)]
 
         return cls(
             data={
@@ -42,7 +78,7 @@ class WarehouseSheetImportExportService:
                 "is_confirm": is_confirm,
                 "change_reason": change_reason.id,
                 "warehouse": warehouse_id,
-                "order_code": order_code,
+                "order_key": order_code,
             }
         )
 
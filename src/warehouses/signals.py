@@ -1,10 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from rest_framework.exceptions import ValidationError
 
 from orders.signals import calculate_warehouse_inventory
 from products.enums import ProductType
+from products.inventory import apply_inventory_deltas
 from users.models import UserActionLog
 from warehouses.enums import SheetImportExportType
 from warehouses.models import WarehouseInventory
@@ -15,14 +19,53 @@ from warehouses.models import WarehouseSheetImportExportDetail
 from warehouses.models import WarehouseSheetTransferDetail
 
 
+def _lock_stored_inventory(instance):
+    """
+    Khóa dòng và đọc (lô, số lượng) đang lưu trong DB: các lần lưu / xoá đồng thời chạy lần lượt,
+    chênh lệch tổng tồn luôn tính trên giá trị đã commit
+    """
+    return WarehouseInventory.objects.select_for_update().filter(pk=instance.pk).values_list("product_variant_batch_id", "quantity").first()
+
+
+@receiver(pre_save, sender=WarehouseInventory)
+def lock_inventory_for_totals(sender, instance, **kwargs):
+    instance._stored = None if instance._state.adding else _lock_stored_inventory(instance)
+
+
+@receiver(pre_delete, sender=WarehouseInventory)
+def lock_inventory_for_removal(sender, instance, **kwargs):
+    instance._stored = _lock_stored_inventory(instance)
+
+
+@receiver(post_save, sender=WarehouseInventory)
+def update_inventory_totals(sender, instance, **kwargs):
+    deltas = {}
+    stored = getattr(instance, "_stored", None)
+    if stored:
+        stored_batch_id, stored_quantity = stored
+        deltas[stored_batch_id] = -(stored_quantity or 0)
+    deltas[instance.product_variant_batch_id] = deltas.get(instance.product_variant_batch_id, 0) + (instance.quantity or 0)
+    apply_inventory_deltas(deltas)
+
+
+@receiver(post_delete, sender=WarehouseInventory)
+def remove_inventory_totals(sender, instance, **kwargs):
+    batch_id, quantity = getattr(instance, "_stored", None) or (instance.product_variant_batch_id, instance.quantity)
+    apply_inventory_deltas({batch_id: -(quantity or 0)})
+
+
 @receiver(post_save, sender=WarehouseInventoryLog)
+@transaction.atomic
 def update_warehouse_inventory(sender, instance, **kwargs):
     created_by = instance.created_by
     product_variant_batch = instance.product_variant_batch
     warehouse = instance.warehouse
     quantity = instance.quantity
 
-    warehouse_inventory = WarehouseInventory.objects.filter(warehouse=warehouse, product_variant_batch=product_variant_batch).first()
+    # Khóa dòng tồn kho để cộng số lượng của log trên giá trị mới nhất (nhiều log cùng lô / kho được lưu đồng thời)
+    warehouse_inventory = (
+        WarehouseInventory.objects.select_for_update().filter(warehouse=warehouse, product_variant_batch=product_variant_batch).first()
+    )
 
     if warehouse_inventory:
         # Update warehouse inventory
@@ -115,18 +158,15 @@ def create_action_log_sheet_transfer(sender, instance, **kwargs):
     UserActionLog.objects.create(**data)
 
 
-@receiver(post_save, sender=WarehouseSheetCheckDetail)
-def create_action_log_sheet_check(sender, instance, **kwargs):
+def sheet_check_detail_action_log(instance, action_type) -> UserActionLog:
+    """Log thao tác của một dòng phiếu kiểm (chưa lưu), dùng chung cho signal và tạo phiếu hàng loạt"""
     data = {
         "object_id": instance.sheet.id,
         "user_id": instance.created_by_id,
         "action_name": "WAREHOUSES",
         "status": "Success",
+        "action_type": action_type,
     }
-    if instance._state.adding:
-        data["action_type"] = "Create"
-    else:
-        data["action_type"] = "Update"
 
     batch_name = str(instance.product_variant_batch.name)
     batch_type = "biến thể" if instance.product_variant_batch.type == ProductType.VARIANT.value else "nguyên liệu"
@@ -145,4 +185,10 @@ def create_action_log_sheet_check(sender, instance, **kwargs):
         f"số lượng thực tế {instance.quantity_actual}, mã phiếu {instance.sheet.code}"
     )
 
-    UserActionLog.objects.create(**data)
+    return UserActionLog(**data)
+
+
+@receiver(post_save, sender=WarehouseSheetCheckDetail)
+def create_action_log_sheet_check(sender, instance, **kwargs):
+    action_type = "Create" if instance._state.adding else "Update"
+    sheet_check_detail_action_log(instance, action_type).save()
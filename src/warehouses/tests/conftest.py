@@ -0,0 +1,34 @@
+import pytest
+
+from products.models import ProductCategory
+from products.models import Products
+from products.models import ProductsVariants
+from products.models import ProductsVariantsBatches
+from warehouses.enums import WarehouseBaseType
+from warehouses.models import Warehouse
+from warehouses.models import WarehouseInventoryReason
+
+
+@pytest.fixture
+def warehouse(db):
+    return Warehouse.objects.create(name="Kho 1")
+
+
+@pytest.fixture
+def other_warehouse(db):
+    return Warehouse.objects.create(name="Kho 2")
+
+
+@pytest.fixture
+def batch(db):
+    category = ProductCategory.objects.create(name="Danh mục", code="C1")
+    product = Products.objects.create(name="Sản phẩm", SKU_code="P1", category=category)
+    variant = ProductsVariants.objects.create(product=product, name="Sản phẩm - Loại 1", SKU_code="P1-V1", sale_price=1000)
+    return ProductsVariantsBatches.objects.create(product_variant=variant, name="Lô 1", is_default=True)
+
+
+@pytest.fixture
+def reasons(db):
+    return {
+        reason_type: WarehouseInventoryReason.objects.create(type=reason_type, name=reason_type.name) for reason_type in WarehouseBaseType
+    }
@@ -0,0 +1,110 @@
+import importlib
+
+import pytest
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from warehouses.enums import SheetCheckType
+from warehouses.enums import SheetImportExportType
+from warehouses.enums import SheetTransferType
+from warehouses.enums import WarehouseBaseType
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseInventoryLog
+from warehouses.models import WarehouseSheetCheck
+from warehouses.models import WarehouseSheetImportExport
+from warehouses.models import WarehouseSheetTransfer
+from warehouses.services.sheet_confirm import SheetCheckBulkConfirm
+from warehouses.services.sheet_confirm import SheetImportExportBulkConfirm
+from warehouses.services.sheet_confirm import SheetTransferBulkConfirm
+
+pytestmark = pytest.mark.django_db
+
+LOGS_URL = "/api/warehouses/inventory-logs/"
+
+
+@pytest.fixture
+def sheets(user, warehouse, other_warehouse, batch, reasons):
+    """Một phiếu nhập, một phiếu chuyển kho và một phiếu kiểm kho đã xác nhận (mỗi phiếu tạo log tồn kho)"""
+    WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=10)
+    import_sheet = WarehouseSheetImportExport.objects.create(
+        code="IP0",
+        type=SheetImportExportType.IMPORT,
+        warehouse=warehouse,
+        change_reason=reasons[WarehouseBaseType.IMPORT],
+        created_by=user,
+        note="Nhập",
+    )
+    import_sheet.warehouse_sheet_import_export_detail_sheet.create(product_variant_batch=batch, quantity=5, created_by=user)
+    transfer_sheet = WarehouseSheetTransfer.objects.create(
+        code="TF0",
+        type=SheetTransferType.TRANSFER,
+        warehouse_from=warehouse,
+        warehouse_to=other_warehouse,
+        change_reason=reasons[WarehouseBaseType.TRANSFER],
+        created_by=user,
+    )
+    transfer_sheet.warehouse_sheet_transfer_detail_sheet.create(product_variant_batch=batch, quantity=3, created_by=user)
+    check_sheet = WarehouseSheetCheck.objects.create(
+        code="CK0", type=SheetCheckType.CHECK, warehouse=warehouse, change_reason=reasons[WarehouseBaseType.CHECK], created_by=user
+    )
+    check_sheet.warehouse_sheet_check_detail_sheet.create(
+        product_variant_batch=batch, quantity_system=12, quantity_actual=11, created_by=user
+    )
+
+    for engine, sheet in (
+        (SheetImportExportBulkConfirm, import_sheet),
+        (SheetTransferBulkConfirm, transfer_sheet),
+        (SheetCheckBulkConfirm, check_sheet),
+    ):
+        assert engine(user).confirm([{"id": sheet.pk, "is_confirm": True}])[0].success
+    return [import_sheet, transfer_sheet, check_sheet]
+
+
+def test_confirmed_sheet_logs_reference_sheet(sheets):
+    for sheet in sheets:
+        logs = WarehouseInventoryLog.objects.filter(sheet_code=sheet.code)
+        assert logs.exists()
+        for log in logs:
+            assert (log.sheet_content_type, log.sheet_id) == (ContentType.objects.get_for_model(sheet), sheet.pk)
+            assert log.sheet == sheet
+
+
+def test_log_list_returns_sheet_with_one_query_per_sheet_type(api_client, user, sheets):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(LOGS_URL, {"page_size": 100})
+
+    assert response.status_code == 200
+    results = response.data["results"]
+    # Phiếu nhập 1 log, phiếu chuyển kho 2 log (kho đi và kho đến), phiếu kiểm kho 1 log
+    assert len(results) == 4
+    for log in results:
+        sheet = next(sheet for sheet in sheets if sheet.code == log["sheet_code"])
+        assert log["sheet"] == {
+            "id": str(sheet.pk),
+            "is_confirm": True,
+            "created_by": sheet.created_by_id,
+            "confirm_by": user.pk,
+            "confirm_date": log["sheet"]["confirm_date"],
+            "note": sheet.note,
+        }
+        assert log["sheet"]["confirm_date"] is not None
+    for sheet in sheets:
+        assert len([query for query in queries if f'FROM "{sheet._meta.db_table}"' in query["sql"]]) == 1
+
+
+def test_migration_backfills_sheet_by_code(sheets):
+    WarehouseInventoryLog.objects.update(sheet_content_type=None, sheet_id=None)
+    orphan = WarehouseInventoryLog.objects.filter(sheet_code="IP0").get()
+    orphan.pk = None
+    orphan.sheet_code = "IP-KHONG-TON-TAI"
+    orphan.save()
+
+    migration = importlib.import_module("warehouses.migrations.0004_inventory_log_sheet")
+    migration.backfill_inventory_log_sheet(apps, connection.schema_editor())
+
+    for sheet in sheets:
+        assert {log.sheet for log in WarehouseInventoryLog.objects.filter(sheet_code=sheet.code)} == {sheet}
+    orphan.refresh_from_db()
+    assert (orphan.sheet_content_type, orphan.sheet_id) == (None, None)
@@ -0,0 +1,90 @@
+import pytest
+from simple_history.utils import bulk_update_with_history
+
+from products.models import ProductsVariantsBatches
+from warehouses.models import WarehouseInventory
+
+pytestmark = pytest.mark.django_db
+
+
+def totals(batch):
+    variant = batch.product_variant
+    variant.refresh_from_db()
+    variant.product.refresh_from_db()
+    variant.product.category.refresh_from_db()
+    return variant.total_inventory, variant.product.total_inventory, variant.product.category.total_inventory
+
+
+def test_save_and_delete_keep_totals(warehouse, batch):
+    inventory = WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=10)
+    assert totals(batch) == (10, 10, 10)
+
+    inventory.quantity = 4
+    inventory.save()
+    assert totals(batch) == (4, 4, 4)
+
+    WarehouseInventory.objects.filter(pk=inventory.pk).delete()
+    assert totals(batch) == (0, 0, 0)
+
+
+def test_bulk_create_applies_totals(warehouse, other_warehouse, batch):
+    WarehouseInventory.objects.bulk_create(
+        [
+            WarehouseInventory(warehouse=warehouse, product_variant_batch=batch, quantity=3),
+            WarehouseInventory(warehouse=other_warehouse, product_variant_batch=batch, quantity=5),
+        ]
+    )
+
+    assert totals(batch) == (8, 8, 8)
+
+
+def test_bulk_create_rejects_conflict_modes(warehouse, batch):
+    with pytest.raises(ValueError):
+        WarehouseInventory.objects.bulk_create(
+            [WarehouseInventory(warehouse=warehouse, product_variant_batch=batch)], ignore_conflicts=True
+        )
+
+
+def test_queryset_update_applies_totals(warehouse, other_warehouse, batch):
+    WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=3)
+    WarehouseInventory.objects.create(warehouse=other_warehouse, product_variant_batch=batch, quantity=5)
+
+    WarehouseInventory.objects.filter(warehouse=warehouse).update(quantity=10)
+    assert totals(batch) == (15, 15, 15)
+
+    # Không đổi số lượng / lô: không tính lại
+    WarehouseInventory.objects.update(modified_by=None)
+    assert totals(batch) == (15, 15, 15)
+
+
+def test_update_moving_batch_moves_totals(warehouse, batch):
+    other_variant = batch.product_variant.__class__.objects.create(product=batch.product_variant.product, name="Loại 2", SKU_code="P1-V2")
+    other_batch = ProductsVariantsBatches.objects.create(product_variant=other_variant, name="Lô 2")
+    WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=7)
+
+    WarehouseInventory.objects.update(product_variant_batch=other_batch)
+
+    assert totals(batch) == (0, 7, 7)
+    assert totals(other_batch) == (7, 7, 7)
+
+
+def test_bulk_update_applies_totals(warehouse, other_warehouse, batch):
+    inventories = [
+        WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=3),
+        WarehouseInventory.objects.create(warehouse=other_warehouse, product_variant_batch=batch, quantity=5),
+    ]
+    inventories[0].quantity = 1
+    inventories[1].quantity = 2
+
+    WarehouseInventory.objects.bulk_update(inventories, ["quantity"])
+    assert totals(batch) == (3, 3, 3)
+
+    inventories[0].quantity = 6
+    bulk_update_with_history(inventories, WarehouseInventory, ["quantity"])
+    assert totals(batch) == (8, 8, 8)
+
+
+def test_bulk_create_accepts_float_quantities(warehouse, batch):
+    WarehouseInventory.objects.bulk_create([WarehouseInventory(warehouse=warehouse, product_variant_batch=batch, quantity=2.5)])
+
+    assert totals(batch) == (2.5, 2.5, 2.5)
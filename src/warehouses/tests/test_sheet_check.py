@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from warehouses.enums import WarehouseBaseType
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseInventoryLog
+from warehouses.models import WarehouseSheetCheck
+
+pytestmark = pytest.mark.django_db
+
+SHEET_CHECK_URL = "/api/warehouses/sheet-check/"
+PREVIEW_URL = "/api/warehouses/sheet-check/preview/"
+
+
+@pytest.fixture
+def stock(warehouse, batch):
+    return WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=10)
+
+
+def sheet_data(warehouse, reasons, details, is_confirm):
+    return {
+        "warehouse": str(warehouse.pk),
+        "change_reason": str(reasons[WarehouseBaseType.CHECK].pk),
+        "is_confirm": is_confirm,
+        "sheet_detail": [{"product_variant_batch": str(batch.pk), "quantity_actual": quantity} for batch, quantity in details],
+    }
+
+
+def test_preview_returns_variances_without_writing(api_client, warehouse, batch, stock):
+    data = {"warehouse": str(warehouse.pk), "sheet_detail": [{"product_variant_batch": str(batch.pk), "quantity_actual": 7}]}
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(PREVIEW_URL, data, format="json")
+
+    assert response.status_code == 200
+    assert [(row["quantity_system"], row["quantity_actual"], row["quantity_variance"]) for row in response.data] == [
+        ("10.0000", "7.0000", "-3.0000")
+    ]
+    assert not any(query["sql"].startswith(("INSERT", "UPDATE")) for query in queries.captured_queries)
+    assert not WarehouseSheetCheck.objects.exists()
+
+
+def test_preview_rejects_batch_without_inventory(api_client, warehouse, batch):
+    data = {"warehouse": str(warehouse.pk), "sheet_detail": [{"product_variant_batch": str(batch.pk), "quantity_actual": 1}]}
+
+    response = api_client.post(PREVIEW_URL, data, format="json")
+
+    assert response.status_code == 400
+    assert "warehouses - product_variant_batch" in response.data
+
+
+def test_create_confirmed_sheet_adjusts_inventory(api_client, warehouse, batch, reasons, stock):
+    response = api_client.post(SHEET_CHECK_URL, sheet_data(warehouse, reasons, [(batch, 7)], is_confirm=True), format="json")
+
+    assert response.status_code == 201
+    assert response.data["is_confirm"] is True
+    assert response.data["sheet_detail"][0]["quantity_system"] == "10.0000"
+    stock.refresh_from_db()
+    assert stock.quantity == 7
+    assert WarehouseInventoryLog.objects.get().quantity == -3
+
+
+@pytest.mark.parametrize("is_confirm", [True, False])
+def test_create_empty_sheet(api_client, user, warehouse, reasons, is_confirm):
+    response = api_client.post(SHEET_CHECK_URL, sheet_data(warehouse, reasons, [], is_confirm=is_confirm), format="json")
+
+    assert response.status_code == 201
+    sheet = WarehouseSheetCheck.objects.get()
+    assert sheet.is_confirm is is_confirm
+    assert (sheet.confirm_by == user) is is_confirm
+    assert not WarehouseInventoryLog.objects.exists()
+
+
+def test_update_confirms_empty_sheet(api_client, warehouse, reasons):
+    api_client.post(SHEET_CHECK_URL, sheet_data(warehouse, reasons, [], is_confirm=False), format="json")
+    sheet = WarehouseSheetCheck.objects.get()
+
+    response = api_client.patch(f"{SHEET_CHECK_URL}{sheet.pk}/", {"is_confirm": True}, format="json")
+
+    assert response.status_code == 200
+    sheet.refresh_from_db()
+    assert sheet.is_confirm and sheet.confirm_date is not None
@@ -0,0 +1,131 @@
+import pytest
+
+from warehouses.enums import SheetCheckType
+from warehouses.enums import SheetImportExportType
+from warehouses.enums import SheetTransferType
+from warehouses.enums import WarehouseBaseType
+from warehouses.models import WarehouseInventory
+from warehouses.models import WarehouseInventoryLog
+from warehouses.models import WarehouseSheetCheck
+from warehouses.models import WarehouseSheetImportExport
+from warehouses.models import WarehouseSheetTransfer
+from warehouses.services.sheet_confirm import SheetCheckBulkConfirm
+from warehouses.services.sheet_confirm import SheetImportExportBulkConfirm
+from warehouses.services.sheet_confirm import SheetTransferBulkConfirm
+
+pytestmark = pytest.mark.django_db
+
+IMPORT_EXPORT_URL = "/api/warehouses/sheet-import-export/bulk-update-is-confirm/"
+
+
+def create_sheet(user, warehouse, reasons, batch=None, quantity=None, sheet_type=SheetImportExportType.IMPORT, code=None):
+    sheet = WarehouseSheetImportExport.objects.create(
+        code=code or f"{sheet_type.value}{WarehouseSheetImportExport.objects.count()}",
+        type=sheet_type,
+        warehouse=warehouse,
+        change_reason=reasons[WarehouseBaseType(sheet_type.value)],
+        created_by=user,
+    )
+    if batch is not None:
+        sheet.warehouse_sheet_import_export_detail_sheet.create(product_variant_batch=batch, quantity=quantity, created_by=user)
+    return sheet
+
+
+def inventory(warehouse, batch):
+    return WarehouseInventory.objects.filter(warehouse=warehouse, product_variant_batch=batch).values_list("quantity", flat=True).first()
+
+
+def post_confirm(api_client, sheets, is_confirm=True):
+    data = {"sheets": [{"id": str(sheet.pk), "is_confirm": is_confirm} for sheet in sheets]}
+    return api_client.post(IMPORT_EXPORT_URL, data, format="json")
+
+
+def test_bulk_confirm_updates_inventory_and_totals(api_client, user, warehouse, batch, reasons):
+    sheets = [create_sheet(user, warehouse, reasons, batch, quantity) for quantity in (5, 7)]
+
+    response = post_confirm(api_client, sheets)
+
+    assert response.status_code == 200
+    assert all(sheet["success"] for sheet in response.data["sheets"])
+    assert inventory(warehouse, batch) == 12
+    assert WarehouseInventoryLog.objects.filter(sheet_code__in=[sheet.code for sheet in sheets]).count() == 2
+    batch.product_variant.refresh_from_db()
+    assert batch.product_variant.total_inventory == 12
+    assert all(sheet.is_confirm and sheet.confirm_by == user for sheet in WarehouseSheetImportExport.objects.all())
+
+
+def test_bulk_confirm_skips_sheet_without_stock(api_client, user, warehouse, batch, reasons):
+    WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=5)
+    export = [create_sheet(user, warehouse, reasons, batch, -4, SheetImportExportType.EXPORT) for _ in range(2)]
+
+    response = post_confirm(api_client, export)
+
+    assert response.status_code == 200
+    assert [sheet["success"] for sheet in response.data["sheets"]] == [True, False]
+    assert "không đủ tồn kho" in response.data["sheets"][1]["errors"]["quantity"][0]
+    assert inventory(warehouse, batch) == 1
+    assert list(WarehouseSheetImportExport.objects.order_by("code").values_list("is_confirm", flat=True)) == [True, False]
+
+
+def test_bulk_confirm_returns_400_when_nothing_confirmed(api_client, user, warehouse, batch, reasons):
+    sheet = create_sheet(user, warehouse, reasons, batch, -1, SheetImportExportType.EXPORT)
+
+    response = post_confirm(api_client, [sheet, sheet])
+
+    assert response.status_code == 400
+    assert "quantity" in response.data["sheets"][0]["errors"]
+    assert "sheets" in response.data["sheets"][1]["errors"]
+    assert inventory(warehouse, batch) is None
+
+
+def test_bulk_confirm_rejects_unconfirm(api_client, user, warehouse, batch, reasons):
+    sheet = create_sheet(user, warehouse, reasons, batch, 3)
+    post_confirm(api_client, [sheet])
+
+    response = post_confirm(api_client, [sheet], is_confirm=False)
+
+    assert response.status_code == 400
+    assert "is_confirm" in response.data["sheets"][0]["errors"]
+
+
+def test_bulk_confirm_marks_empty_sheets_confirmed(user, warehouse, other_warehouse, reasons):
+    """Phiếu không có chi tiết không có dòng tồn kho nào để khóa, vẫn được xác nhận"""
+    sheets = {
+        SheetImportExportBulkConfirm: create_sheet(user, warehouse, reasons),
+        SheetCheckBulkConfirm: WarehouseSheetCheck.objects.create(
+            code="CK0", type=SheetCheckType.CHECK, warehouse=warehouse, change_reason=reasons[WarehouseBaseType.CHECK]
+        ),
+        SheetTransferBulkConfirm: WarehouseSheetTransfer.objects.create(
+            code="TF0",
+            type=SheetTransferType.TRANSFER,
+            warehouse_from=warehouse,
+            warehouse_to=other_warehouse,
+            change_reason=reasons[WarehouseBaseType.TRANSFER],
+        ),
+    }
+    for engine, sheet in sheets.items():
+        results = engine(user).confirm([{"id": sheet.pk, "is_confirm": True}])
+
+        assert results[0].success, engine
+        sheet.refresh_from_db()
+        assert sheet.is_confirm and sheet.confirm_by == user
+    assert not WarehouseInventoryLog.objects.exists()
+
+
+def test_bulk_confirm_transfer_moves_stock(user, warehouse, other_warehouse, batch, reasons):
+    WarehouseInventory.objects.create(warehouse=warehouse, product_variant_batch=batch, quantity=5)
+    sheet = WarehouseSheetTransfer.objects.create(
+        code="TF0",
+        type=SheetTransferType.TRANSFER,
+        warehouse_from=warehouse,
+        warehouse_to=other_warehouse,
+        change_reason=reasons[WarehouseBaseType.TRANSFER],
+    )
+    sheet.warehouse_sheet_transfer_detail_sheet.create(product_variant_batch=batch, quantity=3, created_by=user)
+
+    results = SheetTransferBulkConfirm(user).confirm([{"id": sheet.pk, "is_confirm": True}])
+
+    assert results[0].success
+    assert (inventory(warehouse, batch), inventory(other_warehouse, batch)) == (2, 3)
+    batch.product_variant.refresh_from_db()
+    assert batch.product_variant.total_inventory == 5
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from orders.enums import OrderStatus
+from orders.models import Orders
+from orders.models import OrdersItems
+from warehouses.enums import SheetImportExportType
+from warehouses.models import WarehouseSheetImportExport
+
+pytestmark = pytest.mark.django_db
+
+FROM_SHIPMENTS_URL = "/api/warehouses/sheet-import-export/from-shipments/"
+
+
+def create_orders(batch, count, start=0):
+    orders = []
+    for index in range(start, start + count):
+        order = Orders.objects.create(status=OrderStatus.DRAFT, order_number=index, order_key=f"KEY{index}")
+        OrdersItems.objects.create(order=order, variant=batch.product_variant, quantity=2, price_variant_logs=1000, price_total=2000)
+        orders.append(order)
+    return orders
+
+
+def shipments(warehouse, batch, orders):
+    return [
+        {
+            "order_code": order.order_key,
+            "warehouse": str(warehouse.pk),
+            "type": SheetImportExportType.EXPORT.value,
+            "change_reason_name": "Xuất bán",
+            "sheet_detail": [{"product_variant_batch": str(batch.pk), "quantity": 2}],
+        }
+        for order in orders
+    ]
+
+
+def post_shipments(api_client, data):
+    """Trả về response và số truy vấn đọc đơn hàng / sản phẩm của đơn"""
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(FROM_SHIPMENTS_URL, data, format="json")
+    order_queries = [query for query in queries.captured_queries if 'FROM "tbl_Orders' in query["sql"]]
+    return response, len(order_queries)
+
+
+def test_from_shipments_creates_sheets_for_orders(api_client, warehouse, batch):
+    orders = create_orders(batch, 3)
+
+    response, _ = post_shipments(api_client, shipments(warehouse, batch, orders))
+
+    assert response.status_code == 201
+    assert sorted(sheet["order_key"] for sheet in response.data) == ["KEY0", "KEY1", "KEY2"]
+    sheets = WarehouseSheetImportExport.objects.filter(type=SheetImportExportType.EXPORT)
+    assert sorted(sheets.values_list("order__order_key", flat=True)) == ["KEY0", "KEY1", "KEY2"]
+    assert all(sheet.warehouse_sheet_import_export_detail_sheet.get().quantity == -2 for sheet in sheets)
+
+
+def test_from_shipments_loads_orders_once(api_client, warehouse, batch):
+    _, few_queries = post_shipments(api_client, shipments(warehouse, batch, create_orders(batch, 2)))
+    response, many_queries = post_shipments(api_client, shipments(warehouse, batch, create_orders(batch, 6, start=2)))
+
+    assert response.status_code == 201
+    assert many_queries == few_queries
+
+
+def test_from_shipments_rejects_order_with_sheet(api_client, warehouse, batch):
+    orders = create_orders(batch, 2)
+    data = shipments(warehouse, batch, orders)
+
+    response, _ = post_shipments(api_client, data + data[:1])
+
+    assert response.status_code == 400
+    assert "order" in response.data
+    assert not WarehouseSheetImportExport.objects.exists()